@@ -1,18 +1,21 @@
+import asyncio
 import uvicorn
 import sqlite3
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
-from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from pathlib import Path
 
 # Configurações
-from util.config import APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION
+from util.config import APP_NAME, HOST, PORT, RELOAD, VERSION, SENHA_BCRYPT_ROUNDS
 
 # Logger
 from util.logger_config import logger
 
+# Arquivos estáticos com hash e cache longo
+from util.assets import StaticFilesComCache
+
 # Exception Handlers
 from util.exception_handlers import (
     http_exception_handler,
@@ -30,7 +33,8 @@ from repo import (
     chamado_interacao_repo,
     indices_repo,
 )
-from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo
+from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, chat_mensagem_arquivo_repo
+from repo import presenca_repo, sessao_repo, email_saida_repo
 from repo import atividade_repo, turma_repo, matricula_repo, categoria_repo, pagamento_repo
 
 # Rotas
@@ -53,19 +57,98 @@ from routes.admin_pagamentos_routes import router as admin_pagamentos_router
 # Seeds
 from util.seed_data import inicializar_dados
 
+# Migrações de schema
+from util.migrar_schema import migrar_schema
+
 # CSRF Protection
 from util.csrf_protection import MiddlewareProtecaoCSRF
 
+# Métricas de rate limit (rota de cada bloqueio)
+from util.rate_limit_metricas import MiddlewareRotaRateLimit
+
+# Tarefas em segundo plano
+from util.db_util import habilitar_vacuum_incremental
+from util.tarefas_periodicas import iniciar_tarefas, parar_tarefas
+from util.chat_arquivamento import registrar_tarefa_arquivamento
+from util.presenca import registrar_tarefa_presenca
+
+# Fila de saída de e-mails
+from util.email_saida import registrar_tarefa_email
+
+# Sessões no servidor
+from util.sessao_servidor import MiddlewareSessaoServidor, registrar_tarefa_sessoes
+
+# Backups em segundo plano
+from util.backup_util import aguardar_backup
+
+# Fotos de perfil (migração do formato antigo e coleta de órfãs)
+from util.foto_util import migrar_fotos_legado, registrar_tarefa_fotos
+
+# Compressão gzip das respostas
+from util.compressao import MiddlewareCompressao
+
+# Cache de configurações
+from util.config_cache import config as config_cache
+
+# Pool de processos do bcrypt
+from util.pool_senhas import pool_senhas
+from util.pool_imagens import pool_imagens
+from util.security import medir_custo_hash
+
+# Templates compartilhados
+from util.config import TEMPLATES_PRECOMPILAR
+from util.template_util import precompilar_templates
+
+
+# A medição do bcrypt roda uma vez por processo (o lifespan pode rodar várias, ex: nos testes)
+_custo_hash_medido = False
+
+
+async def _registrar_custo_hash() -> None:
+    """Mede o custo do bcrypt neste host (referência para ajustar SENHA_BCRYPT_ROUNDS)."""
+    global _custo_hash_medido
+    if _custo_hash_medido:
+        return
+    _custo_hash_medido = True
+    # Um hash completo: fora do event loop e fora do import do main.py
+    custo_hash_ms = await asyncio.to_thread(medir_custo_hash)
+    logger.info(f"bcrypt com custo {SENHA_BCRYPT_ROUNDS}: {custo_hash_ms:.0f} ms por hash")
+    if custo_hash_ms > 1000:
+        logger.warning("Hash de senha acima de 1s: logins ficarão lentos; considere reduzir SENHA_BCRYPT_ROUNDS")
+    elif custo_hash_ms < 100:
+        logger.warning("Hash de senha abaixo de 100ms: considere aumentar SENHA_BCRYPT_ROUNDS")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia as tarefas periódicas com a aplicação; no shutdown, encerra-as e os pools de processos."""
+    await _registrar_custo_hash()
+    await iniciar_tarefas()
+    yield
+    await parar_tarefas()
+    # Não interromper um backup em segundo plano no meio da cópia
+    if not aguardar_backup(timeout=60):
+        logger.warning("Backup em andamento não terminou antes do encerramento")
+    pool_senhas.encerrar()
+    pool_imagens.encerrar()
+
+
 # Criar aplicação FastAPI
-app = FastAPI(title=APP_NAME, version=VERSION)
+app = FastAPI(title=APP_NAME, version=VERSION, lifespan=lifespan)
 
-# Configurar SessionMiddleware
-app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
+# Sessões no servidor (o cookie leva apenas o ID assinado)
+app.add_middleware(MiddlewareSessaoServidor)
 
 # Configurar CSRF Protection Middleware
 app.add_middleware(MiddlewareProtecaoCSRF)
 logger.info("CSRF Protection habilitado")
 
+# Expõe a rota atual às métricas dos rate limiters
+app.add_middleware(MiddlewareRotaRateLimit)
+
+# Compressão gzip (mais externo: comprime a resposta final, sem tocar no SSE)
+app.add_middleware(MiddlewareCompressao)
+
 # Registrar Exception Handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -76,7 +159,8 @@ logger.info("Exception handlers registrados")
 # Montar arquivos estáticos
 static_path = Path("static")
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    # static/dist (gerado por python -m util.assets) é servido com cache imutável
+    app.mount("/static", StaticFilesComCache(directory="static"), name="static")
     logger.info("Arquivos estáticos montados em /static")
 
 # Definir repositórios e nomes das tabelas
@@ -88,11 +172,18 @@ TABELAS = [
     (chat_sala_repo, "chat_sala"),
     (chat_participante_repo, "chat_participante"),
     (chat_mensagem_repo, "chat_mensagem"),
+    (chat_mensagem_arquivo_repo, "chat_mensagem_arquivo"),
+    (presenca_repo, "presenca"),
+    (sessao_repo, "sessao"),
+    (email_saida_repo, "email_saida"),
 ]
 
 # Criar tabelas do banco de dados
 logger.info("Criando tabelas do banco de dados...")
 try:
+    # Só tem efeito em bancos novos; permite o vacuum incremental após arquivamentos
+    habilitar_vacuum_incremental()
+
     for repo, nome in TABELAS:
         repo.criar_tabela()
         logger.info(f"Tabela '{nome}' criada/verificada")
@@ -112,6 +203,9 @@ try:
     pagamento_repo.criar_tabela()
     logger.info("Tabela 'pagamento' criada/verificada")
 
+    # Adicionar colunas novas em bancos criados por versões anteriores
+    migrar_schema()
+
     # Criar índices para otimização de performance
     indices_repo.criar_indices()
 
@@ -125,6 +219,14 @@ try:
 except sqlite3.Error as e:
     logger.error(f"Erro ao inicializar dados seed: {e}", exc_info=True)
 
+# Mover fotos do formato antigo (um arquivo por usuário) para o armazenamento por hash
+try:
+    resultado_fotos = migrar_fotos_legado()
+    if resultado_fotos["fotos"]:
+        logger.info(f"Fotos antigas migradas: {resultado_fotos}")
+except (OSError, sqlite3.Error) as e:
+    logger.error(f"Erro ao migrar fotos antigas: {e}", exc_info=True)
+
 # Migrar configurações do .env para o banco de dados
 try:
     from util.migrar_config import migrar_configs_para_banco
@@ -133,6 +235,20 @@ try:
 except sqlite3.Error as e:
     logger.error(f"Erro ao migrar configurações para banco: {e}", exc_info=True)
 
+# Carregar todas as configurações em um snapshot (leituras sem lock nem banco)
+config_cache.carregar()
+
+# Compilar todos os templates agora, e não na primeira requisição a cada página
+if TEMPLATES_PRECOMPILAR:
+    precompilar_templates()
+
+# Registrar tarefas periódicas (iniciadas no lifespan)
+registrar_tarefa_arquivamento()
+registrar_tarefa_presenca()
+registrar_tarefa_sessoes()
+registrar_tarefa_email()
+registrar_tarefa_fotos()
+
 # Definir routers e suas configurações
 # IMPORTANTE: public_router e examples_router devem ser incluídos por último
 ROUTERS = [
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from util.enum_base import EnumEntidade
+
+
+class StatusEmail(EnumEntidade):
+    """
+    Enum para status de e-mails na fila de saída.
+
+    Herda de EnumEntidade que fornece métodos úteis:
+        - valores(): Lista todos os valores
+        - existe(valor): Verifica se valor existe
+        - from_valor(valor): Converte string para enum
+        - validar(valor): Valida e retorna ou levanta ValueError
+    """
+
+    PENDENTE = "Pendente"
+    ENVIANDO = "Enviando"
+    ENVIADO = "Enviado"
+    FALHOU = "Falhou"
+
+
+@dataclass
+class EmailSaida:
+    """
+    E-mail na fila de saída (outbox).
+
+    As rotas apenas gravam o e-mail; o envio é feito em segundo plano
+    por util/email_saida.py, com novas tentativas em caso de falha.
+
+    Attributes:
+        id: Identificador do e-mail na fila
+        para_email: Destinatário
+        para_nome: Nome do destinatário
+        assunto: Assunto
+        html: Corpo em HTML
+        texto: Corpo em texto puro (opcional)
+        status: Situação do envio (Enum StatusEmail)
+        tentativas: Tentativas de envio já feitas
+        proxima_tentativa: Quando o e-mail pode ser (re)enviado
+        ultimo_erro: Mensagem da última falha
+        id_externo: ID retornado pelo provedor
+        criado_em: Data de entrada na fila
+        enviado_em: Data do envio bem-sucedido
+    """
+    id: int
+    para_email: str
+    para_nome: str
+    assunto: str
+    html: str
+    texto: Optional[str] = None
+    status: StatusEmail = StatusEmail.PENDENTE
+    tentativas: int = 0
+    proxima_tentativa: Optional[datetime] = None
+    ultimo_erro: Optional[str] = None
+    id_externo: Optional[str] = None
+    criado_em: Optional[datetime] = None
+    enviado_em: Optional[datetime] = None
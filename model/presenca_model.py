@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class Presenca:
+    """
+    Estado de presença de um usuário no chat.
+
+    `online` indica se há uma conexão SSE com heartbeat dentro do TTL;
+    `ultimo_acesso` é o horário do último heartbeat ("visto por último").
+    """
+    usuario_id: int
+    online: bool
+    ultimo_acesso: Optional[datetime] = None
+    alterado_em: Optional[datetime] = None
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class Sessao:
+    """
+    Sessão guardada no servidor.
+
+    `dados` é o conteúdo de request.session serializado em JSON;
+    `usuario_id` vem de dados["usuario_logado"] (None para visitantes).
+    """
+    id: str
+    dados: str
+    usuario_id: Optional[int]
+    expira_em: datetime
+    atualizada_em: Optional[datetime] = None
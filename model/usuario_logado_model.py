@@ -13,6 +13,8 @@ class UsuarioLogado:
     nome: str
     email: str
     perfil: str
+    # Hash da foto de perfil (None = foto padrão): exibida no navbar sem consultar o banco
+    foto: Optional[str] = None
 
     def is_admin(self) -> bool:
         """Verifica se o usuário é administrador."""
@@ -80,6 +82,7 @@ class UsuarioLogado:
             nome=data["nome"],
             email=data["email"],
             perfil=data["perfil"],
+            foto=data.get("foto"),
         )
 
     @classmethod
@@ -98,4 +101,5 @@ class UsuarioLogado:
             nome=usuario.nome,
             email=usuario.email,
             perfil=usuario.perfil,
+            foto=usuario.foto,
         )
@@ -23,6 +23,7 @@ class Usuario:
         confirmado: Se o usuário confirmou a conta (campo interno)
         token_redefinicao: Token para redefinição de senha (temporário)
         data_token: Data de expiração do token de redefinição
+        foto: Hash da foto de perfil em static/img/fotos (None = foto padrão)
         data_cadastro: Data de criação do registro
         data_atualizacao: Data da última modificação
 
@@ -43,5 +44,6 @@ class Usuario:
     confirmado: bool = True
     token_redefinicao: Optional[str] = None
     data_token: Optional[datetime] = None
+    foto: Optional[str] = None
     data_cadastro: Optional[datetime] = None
     data_atualizacao: Optional[datetime] = None
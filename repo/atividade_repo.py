@@ -17,6 +17,7 @@ from model.atividade_model import Atividade
 from sql.atividade_sql import *
 from sql.atividade_sql import OBTER_POR_CATEGORIA
 from util.db_util import obter_conexao as get_connection
+from util.cache_fragmentos import cache_fragmentos
 
 
 def _converter_data(data_str: Optional[str]) -> Optional[datetime]:
@@ -54,7 +55,10 @@ def inserir(atividade: Atividade) -> Optional[int]:
             atividade.nome,
             atividade.descricao
         ))
-        return cursor.lastrowid
+        novo_id = cursor.lastrowid
+
+    cache_fragmentos.invalidar("atividade")
+    return novo_id
 
 def alterar(atividade: Atividade) -> bool:
     with get_connection() as conn:
@@ -65,13 +69,19 @@ def alterar(atividade: Atividade) -> bool:
             atividade.descricao,
             atividade.id_atividade
         ))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+
+    cache_fragmentos.invalidar("atividade")
+    return sucesso
 
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (id,))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+
+    cache_fragmentos.invalidar("atividade")
+    return sucesso
 
 def obter_por_id(id: int) -> Optional[Atividade]:
     with get_connection() as conn:
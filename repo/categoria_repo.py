@@ -14,6 +14,7 @@ from typing import Optional
 from model.categoria_model import Categoria
 from sql.categoria_sql import *
 from util.db_util import obter_conexao as get_connection
+from util.cache_fragmentos import cache_fragmentos
 
 
 def criar_tabela() -> bool:
@@ -30,7 +31,10 @@ def inserir(categoria: Categoria) -> Optional[int]:
             categoria.nome,
             categoria.descricao
         ))
-        return cursor.lastrowid
+        novo_id = cursor.lastrowid
+
+    cache_fragmentos.invalidar("categoria")
+    return novo_id
 
 
 def alterar(categoria: Categoria) -> bool:
@@ -41,14 +45,20 @@ def alterar(categoria: Categoria) -> bool:
             categoria.descricao,
             categoria.id_categoria
         ))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+
+    cache_fragmentos.invalidar("categoria")
+    return sucesso
 
 
 def excluir(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (id,))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+
+    cache_fragmentos.invalidar("categoria")
+    return sucesso
 
 
 def obter_por_id(id: int) -> Optional[Categoria]:
@@ -0,0 +1,237 @@
+"""
+Repositório para operações com a tabela chat_mensagem_arquivo.
+
+Mensagens mais antigas que o período de retenção saem de chat_mensagem e
+são gravadas aqui em blocos (uma linha por sala e dia), serializadas em
+JSON e opcionalmente comprimidas com zlib.
+"""
+import json
+import zlib
+from datetime import datetime
+from itertools import groupby
+from typing import List, Optional
+from sqlite3 import Row
+
+from model.chat_mensagem_model import ChatMensagem
+from sql.chat_mensagem_arquivo_sql import (
+    CRIAR_TABELA,
+    INSERIR,
+    LISTAR_BLOCOS_ANTES_DE,
+    LISTAR_BLOCOS_DEPOIS_DE,
+    CONTAR_POR_SALA,
+    SELECIONAR_LOTE_PARA_ARQUIVAR,
+    EXCLUIR_MENSAGEM_ARQUIVADA,
+    ESTATISTICAS
+)
+from util.db_util import obter_conexao, adaptar_datetime, converter_datetime
+from util.datetime_util import agora
+
+
+# Cursor usado quando nenhum before_id é informado (maior INTEGER do SQLite)
+_MAIOR_ID = 2**63 - 1
+
+
+def _datetime_para_str(dt: Optional[datetime]) -> Optional[str]:
+    """Serializa datetime no mesmo formato usado pelo banco (UTC naive)."""
+    return adaptar_datetime(dt) if dt else None
+
+
+def _str_para_datetime(s: Optional[str]) -> Optional[datetime]:
+    """Desserializa datetime gravado por _datetime_para_str."""
+    return converter_datetime(s.encode()) if s else None
+
+
+def _serializar_bloco(mensagens: List[ChatMensagem], comprimir: bool) -> bytes:
+    """Converte as mensagens de um bloco em bytes (JSON, opcionalmente zlib)."""
+    dados = json.dumps([
+        {
+            "id": m.id,
+            "usuario_id": m.usuario_id,
+            "mensagem": m.mensagem,
+            "data_envio": _datetime_para_str(m.data_envio),
+            "data_atualizacao": _datetime_para_str(m.data_atualizacao),
+            "lida_em": _datetime_para_str(m.lida_em),
+        }
+        for m in mensagens
+    ], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return zlib.compress(dados) if comprimir else dados
+
+
+def _row_to_mensagens(row: Row) -> List[ChatMensagem]:
+    """Converte um bloco arquivado em lista de ChatMensagem (ordem crescente de ID)."""
+    dados = row["dados"]
+    if row["comprimido"]:
+        dados = zlib.decompress(dados)
+
+    return [
+        ChatMensagem(
+            id=item["id"],
+            sala_id=row["sala_id"],
+            usuario_id=item["usuario_id"],
+            mensagem=item["mensagem"],
+            data_envio=_str_para_datetime(item["data_envio"]),
+            data_atualizacao=_str_para_datetime(item["data_atualizacao"]),
+            lida_em=_str_para_datetime(item["lida_em"])
+        )
+        for item in json.loads(dados)
+    ]
+
+
+def criar_tabela():
+    """Cria a tabela chat_mensagem_arquivo se não existir."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+
+
+def arquivar_lote(limite: datetime, tamanho_lote: int, comprimir: bool = False) -> int:
+    """
+    Move um lote de mensagens anteriores a `limite` para o arquivo.
+
+    A leitura, a gravação dos blocos e a remoção de chat_mensagem acontecem
+    na mesma transação: uma mensagem nunca fica nas duas tabelas nem some.
+    A transação pega o lock de escrita antes da leitura (BEGIN IMMEDIATE):
+    todos os workers executam a tarefa no mesmo intervalo, e dois lotes
+    lidos ao mesmo tempo seriam arquivados duas vezes.
+
+    Args:
+        limite: Mensagens com data_envio anterior a este instante são arquivadas
+        tamanho_lote: Número máximo de mensagens movidas nesta chamada
+        comprimir: Se True, comprime cada bloco com zlib
+
+    Returns:
+        Número de mensagens arquivadas (0 quando não há mais nada a arquivar)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        # O sqlite3 só abriria a transação no primeiro INSERT, depois da leitura
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(SELECIONAR_LOTE_PARA_ARQUIVAR, (limite, tamanho_lote))
+        mensagens = [
+            ChatMensagem(
+                id=row["id"],
+                sala_id=row["sala_id"],
+                usuario_id=row["usuario_id"],
+                mensagem=row["mensagem"],
+                data_envio=row["data_envio"],
+                data_atualizacao=row["data_atualizacao"],
+                lida_em=row["lida_em"]
+            )
+            for row in cursor.fetchall()
+        ]
+        if not mensagens:
+            return 0
+
+        # Um bloco por sala e dia (UTC), preservando a ordem de ID dentro do bloco
+        def chave_bloco(m: ChatMensagem):
+            return (m.sala_id, _datetime_para_str(m.data_envio)[:10])
+
+        arquivado_em = agora()
+        ordenadas = sorted(mensagens, key=lambda m: (chave_bloco(m), m.id))
+        for (sala_id, dia), grupo in groupby(ordenadas, key=chave_bloco):
+            bloco = list(grupo)
+            cursor.execute(INSERIR, (
+                sala_id,
+                dia,
+                bloco[0].id,
+                bloco[-1].id,
+                len(bloco),
+                1 if comprimir else 0,
+                _serializar_bloco(bloco, comprimir),
+                arquivado_em
+            ))
+
+        cursor.executemany(EXCLUIR_MENSAGEM_ARQUIVADA, [(m.id,) for m in mensagens])
+        return len(mensagens)
+
+
+def listar_por_sala(
+    sala_id: str,
+    limit: int,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None
+) -> List[ChatMensagem]:
+    """
+    Lista mensagens arquivadas de uma sala com a mesma semântica de cursor
+    de chat_mensagem_repo.listar_por_sala.
+
+    Apenas os blocos necessários para preencher a página são descomprimidos.
+
+    Args:
+        sala_id: ID da sala
+        limit: Número máximo de mensagens a retornar
+        before_id: Retornar apenas mensagens com ID menor que este
+        after_id: Retornar apenas mensagens com ID maior que este
+
+    Returns:
+        Lista de objetos ChatMensagem (mais recentes primeiro)
+    """
+    if limit <= 0:
+        return []
+
+    crescente = after_id is not None
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        if crescente:
+            cursor.execute(LISTAR_BLOCOS_DEPOIS_DE, (sala_id, after_id))
+        else:
+            cursor_id = before_id if before_id is not None else _MAIOR_ID
+            cursor.execute(LISTAR_BLOCOS_ANTES_DE, (sala_id, cursor_id))
+
+        coletadas: List[ChatMensagem] = []
+        for row in cursor:
+            # Blocos de uma sala não se sobrepõem: com a página cheia,
+            # o próximo bloco só teria mensagens fora do intervalo pedido
+            if len(coletadas) >= limit:
+                break
+
+            for mensagem in _row_to_mensagens(row):
+                if crescente and mensagem.id > after_id:
+                    coletadas.append(mensagem)
+                elif not crescente and (before_id is None or mensagem.id < before_id):
+                    coletadas.append(mensagem)
+
+    if crescente:
+        coletadas.sort(key=lambda m: m.id)
+        return list(reversed(coletadas[:limit]))
+
+    coletadas.sort(key=lambda m: m.id, reverse=True)
+    return coletadas[:limit]
+
+
+def contar_por_sala(sala_id: str) -> int:
+    """
+    Conta as mensagens arquivadas de uma sala.
+
+    Args:
+        sala_id: ID da sala
+
+    Returns:
+        Número de mensagens arquivadas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_POR_SALA, (sala_id,))
+        row = cursor.fetchone()
+
+        return row["total"] if row else 0
+
+
+def obter_estatisticas() -> dict:
+    """
+    Retorna totais do arquivo de mensagens.
+
+    Returns:
+        Dicionário com número de blocos, mensagens e bytes armazenados
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ESTATISTICAS)
+        row = cursor.fetchone()
+
+        return {
+            "blocos": row["blocos"],
+            "mensagens": row["mensagens"],
+            "bytes": row["bytes"]
+        }
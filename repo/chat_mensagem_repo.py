@@ -5,16 +5,21 @@ from typing import Optional, List
 from sqlite3 import Row
 
 from model.chat_mensagem_model import ChatMensagem
+from repo import chat_mensagem_arquivo_repo
 from sql.chat_mensagem_sql import (
     CRIAR_TABELA,
     INSERIR,
     OBTER_POR_ID,
     LISTAR_POR_SALA,
+    LISTAR_POR_SALA_ANTES_DE,
+    LISTAR_POR_SALA_DEPOIS_DE,
     CONTAR_POR_SALA,
     MARCAR_COMO_LIDAS,
     OBTER_ULTIMA_MENSAGEM_SALA,
     EXCLUIR
 )
+from sql.chat_participante_sql import INCREMENTAR_NAO_LIDAS, ZERAR_NAO_LIDAS
+from sql.chat_sala_sql import ATUALIZAR_ULTIMA_ATIVIDADE
 from util.db_util import obter_conexao
 from util.datetime_util import agora
 
@@ -51,24 +56,32 @@ def criar_tabela():
         cursor.execute(CRIAR_TABELA)
 
 
-def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
+def inserir(sala_id: str, usuario_id: int, mensagem: str) -> Optional[ChatMensagem]:
     """
     Insere uma nova mensagem em uma sala.
 
+    Tudo acontece em uma única transação: atualiza a última atividade da
+    sala (o que também confirma que ela existe), grava a mensagem e
+    incrementa o contador de não lidas dos demais participantes.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que enviou
         mensagem: Conteúdo da mensagem
 
     Returns:
-        Objeto ChatMensagem criado
+        Objeto ChatMensagem criado ou None se a sala não existir
     """
     data_envio = agora()
 
     with obter_conexao() as conn:
         cursor = conn.cursor()
+        cursor.execute(ATUALIZAR_ULTIMA_ATIVIDADE, (data_envio, sala_id))
+        if cursor.rowcount == 0:
+            return None
         cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
         mensagem_id = cursor.lastrowid
+        cursor.execute(INCREMENTAR_NAO_LIDAS, (sala_id, usuario_id))
 
     return ChatMensagem(
         id=mensagem_id,
@@ -101,29 +114,68 @@ def obter_por_id(mensagem_id: int) -> Optional[ChatMensagem]:
         return None
 
 
-def listar_por_sala(sala_id: str, limit: int = 50, offset: int = 0) -> List[ChatMensagem]:
+def listar_por_sala(
+    sala_id: str,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None
+) -> List[ChatMensagem]:
     """
-    Lista mensagens de uma sala com paginação.
+    Lista mensagens de uma sala com paginação por cursor (keyset).
+
+    Sem cursor, retorna a página mais recente. Com before_id, retorna as
+    mensagens anteriores a esse ID (histórico); com after_id, as mensagens
+    posteriores a esse ID (novas mensagens). O custo independe da posição
+    da página, pois a busca usa o índice (sala_id, id).
+
+    Mensagens já movidas para chat_mensagem_arquivo são lidas de forma
+    transparente quando a página alcança o período arquivado.
 
     Args:
         sala_id: ID da sala
         limit: Número máximo de mensagens a retornar
-        offset: Número de mensagens a pular (para paginação)
+        before_id: Retornar apenas mensagens com ID menor que este
+        after_id: Retornar apenas mensagens com ID maior que este
 
     Returns:
-        Lista de objetos ChatMensagem (ordenadas por ID crescente - mais antigas primeiro)
+        Lista de objetos ChatMensagem (ordenadas por ID decrescente - mais recentes primeiro)
+
+    Raises:
+        ValueError: Se before_id e after_id forem informados juntos
     """
+    if before_id is not None and after_id is not None:
+        raise ValueError("Informe apenas um cursor: before_id ou after_id")
+
     with obter_conexao() as conn:
         cursor = conn.cursor()
-        cursor.execute(LISTAR_POR_SALA, (sala_id, limit, offset))
+        if before_id is not None:
+            cursor.execute(LISTAR_POR_SALA_ANTES_DE, (sala_id, before_id, limit))
+        elif after_id is not None:
+            cursor.execute(LISTAR_POR_SALA_DEPOIS_DE, (sala_id, after_id, limit))
+        else:
+            cursor.execute(LISTAR_POR_SALA, (sala_id, limit))
         rows = cursor.fetchall()
 
-        return [_row_to_mensagem(row) for row in rows]
+        mensagens = [_row_to_mensagem(row) for row in rows]
+
+    if after_id is not None:
+        # O arquivo guarda as mensagens mais antigas, que vêm antes das ativas
+        arquivadas = chat_mensagem_arquivo_repo.listar_por_sala(sala_id, limit, after_id=after_id)
+        mensagens = sorted(arquivadas + mensagens, key=lambda m: m.id)[:limit]
+        mensagens.reverse()
+    elif len(mensagens) < limit:
+        # Página incompleta: completar com o histórico arquivado
+        cursor_arquivo = mensagens[-1].id if mensagens else before_id
+        mensagens += chat_mensagem_arquivo_repo.listar_por_sala(
+            sala_id, limit - len(mensagens), before_id=cursor_arquivo
+        )
+
+    return mensagens
 
 
 def contar_por_sala(sala_id: str) -> int:
     """
-    Conta o total de mensagens em uma sala.
+    Conta o total de mensagens em uma sala, incluindo as arquivadas.
 
     Args:
         sala_id: ID da sala
@@ -136,13 +188,17 @@ def contar_por_sala(sala_id: str) -> int:
         cursor.execute(CONTAR_POR_SALA, (sala_id,))
         row = cursor.fetchone()
 
-        return row["total"] if row else 0
+        total = row["total"] if row else 0
+
+    return total + chat_mensagem_arquivo_repo.contar_por_sala(sala_id)
 
 
 def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     """
     Marca como lidas todas as mensagens não lidas de outros usuários em uma sala.
 
+    Também zera o contador de não lidas do usuário na sala.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que está marcando como lidas
@@ -153,6 +209,7 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(MARCAR_COMO_LIDAS, (agora(), sala_id, usuario_id))
+        cursor.execute(ZERAR_NAO_LIDAS, (sala_id, usuario_id))
         return cursor.rowcount >= 0  # Retorna True mesmo se nenhuma mensagem foi marcada
 
 
@@ -173,7 +230,10 @@ def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
 
         if row:
             return _row_to_mensagem(row)
-        return None
+
+    # Sala sem mensagens recentes: a última pode estar no arquivo
+    arquivadas = chat_mensagem_arquivo_repo.listar_por_sala(sala_id, 1)
+    return arquivadas[0] if arquivadas else None
 
 
 def excluir(mensagem_id: int) -> bool:
@@ -11,8 +11,11 @@ from sql.chat_participante_sql import (
     OBTER_POR_SALA_E_USUARIO,
     LISTAR_POR_SALA,
     LISTAR_POR_USUARIO,
+    LISTAR_CONTATOS,
     ATUALIZAR_ULTIMA_LEITURA,
-    CONTAR_MENSAGENS_NAO_LIDAS,
+    OBTER_NAO_LIDAS,
+    SOMAR_NAO_LIDAS_POR_USUARIO,
+    RECALCULAR_NAO_LIDAS,
     EXCLUIR
 )
 from util.db_util import obter_conexao
@@ -26,10 +29,15 @@ def _row_to_participante(row: Row) -> ChatParticipante:
     if "ultima_leitura" in row.keys():
         ultima_leitura = row["ultima_leitura"]
 
+    nao_lidas = 0
+    if "nao_lidas" in row.keys():
+        nao_lidas = row["nao_lidas"] or 0
+
     return ChatParticipante(
         sala_id=row["sala_id"],
         usuario_id=row["usuario_id"],
-        ultima_leitura=ultima_leitura
+        ultima_leitura=ultima_leitura,
+        nao_lidas=nao_lidas
     )
 
 
@@ -119,6 +127,24 @@ def listar_por_usuario(usuario_id: int) -> List[ChatParticipante]:
         return [_row_to_participante(row) for row in rows]
 
 
+def listar_contatos(usuario_id: int) -> List[int]:
+    """
+    Lista os usuários que compartilham alguma sala com o usuário.
+
+    Usado para saber quem deve ser avisado de mudanças de presença.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Lista de IDs dos outros participantes das salas do usuário
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_CONTATOS, (usuario_id,))
+        return [row["usuario_id"] for row in cursor.fetchall()]
+
+
 def atualizar_ultima_leitura(sala_id: str, usuario_id: int) -> bool:
     """
     Atualiza o timestamp de última leitura do participante.
@@ -140,6 +166,9 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     Conta quantas mensagens não lidas existem para um usuário em uma sala.
 
+    Lê o contador materializado em chat_participante.nao_lidas, mantido por
+    chat_mensagem_repo.inserir (incremento) e marcar_como_lidas (zera).
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário
@@ -149,13 +178,46 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     with obter_conexao() as conn:
         cursor = conn.cursor()
-        # Passar usuario_id 3 vezes: para sala_id, usuario_id != ?, e duas vezes na subquery
-        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id, usuario_id, usuario_id))
+        cursor.execute(OBTER_NAO_LIDAS, (sala_id, usuario_id))
+        row = cursor.fetchone()
+
+        return row["nao_lidas"] if row else 0
+
+
+def contar_total_nao_lidas(usuario_id: int) -> int:
+    """
+    Soma as mensagens não lidas de um usuário em todas as suas salas.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Total de mensagens não lidas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SOMAR_NAO_LIDAS_POR_USUARIO, (usuario_id,))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
 
 
+def recalcular_nao_lidas() -> int:
+    """
+    Recalcula os contadores de não lidas de todos os participantes
+    a partir das mensagens armazenadas.
+
+    Usado na migração de bancos criados antes da coluna nao_lidas existir.
+
+    Returns:
+        Número de participantes atualizados
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RECALCULAR_NAO_LIDAS)
+        return cursor.rowcount
+
+
 def excluir(sala_id: str, usuario_id: int) -> bool:
     """
     Remove um participante de uma sala.
@@ -167,7 +229,12 @@ def excluir(sala_id: str, usuario_id: int) -> bool:
     Returns:
         True se excluído com sucesso, False caso contrário
     """
+    # Import local: util.participacao_cache importa este módulo
+    from util.participacao_cache import participacao_cache
+
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (sala_id, usuario_id))
-        return cursor.rowcount > 0
+        excluido = cursor.rowcount > 0
+    participacao_cache.invalidar(sala_id, usuario_id)
+    return excluido
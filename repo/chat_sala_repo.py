@@ -143,7 +143,11 @@ def excluir(sala_id: str) -> bool:
     Returns:
         True se excluído com sucesso, False caso contrário
     """
+    from util.participacao_cache import participacao_cache
+
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (sala_id,))
-        return cursor.rowcount > 0
+        excluido = cursor.rowcount > 0
+    participacao_cache.invalidar(sala_id)
+    return excluido
@@ -7,8 +7,13 @@ from sql.configuracao_sql import (
     OBTER_POR_CHAVE,
     OBTER_TODOS,
     ATUALIZAR,
+    CRIAR_TABELA_VERSAO,
+    INICIALIZAR_VERSAO,
+    CRIAR_GATILHOS_VERSAO,
+    OBTER_VERSAO,
 )
 from util.db_util import obter_conexao
+from util.cache_fragmentos import cache_fragmentos
 from util.logger_config import logger
 
 
@@ -34,9 +39,28 @@ def criar_tabela() -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_TABELA_VERSAO)
+        cursor.execute(INICIALIZAR_VERSAO)
+        for gatilho in CRIAR_GATILHOS_VERSAO:
+            cursor.execute(gatilho)
         return True
 
 
+def obter_versao() -> int:
+    """
+    Obtém a versão atual das configurações.
+
+    A versão é incrementada por gatilhos a cada alteração na tabela
+    configuracao, feita por qualquer processo.
+
+    Returns:
+        Número da versão (0 se a tabela de versão estiver vazia)
+    """
+    with obter_conexao() as conn:
+        row = conn.execute(OBTER_VERSAO).fetchone()
+        return row[0] if row else 0
+
+
 def obter_por_chave(chave: str) -> Optional[Configuracao]:
     with obter_conexao() as conn:
         cursor = conn.cursor()
@@ -122,7 +146,10 @@ def atualizar(chave: str, valor: str) -> bool:
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(ATUALIZAR, (valor, chave))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+
+    cache_fragmentos.invalidar(f"config:{chave}")
+    return sucesso
 
 
 def atualizar_multiplas(configs: dict[str, str]) -> tuple[int, list[str]]:
@@ -161,6 +188,8 @@ def atualizar_multiplas(configs: dict[str, str]) -> tuple[int, list[str]]:
                 quantidade_atualizada += 1
                 logger.debug(f"Configuração '{chave}' atualizada para: {valor}")
 
+    cache_fragmentos.invalidar(*(f"config:{chave}" for chave in configs))
+
     logger.info(
         f"Atualização em lote concluída: {quantidade_atualizada} atualizadas, "
         f"{len(chaves_nao_encontradas)} não encontradas"
@@ -198,7 +227,10 @@ def inserir_ou_atualizar(chave: str, valor: str, descricao: str = "") -> bool:
             with obter_conexao() as conn:
                 cursor = conn.cursor()
                 cursor.execute(INSERIR, (chave, valor, descricao))
-                return cursor.rowcount > 0
+                sucesso = cursor.rowcount > 0
+
+            cache_fragmentos.invalidar(f"config:{chave}")
+            return sucesso
 
     except sqlite3.Error as e:
         logger.error(f"Erro ao inserir ou atualizar configuração '{chave}': {e}")
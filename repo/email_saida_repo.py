@@ -0,0 +1,172 @@
+"""
+Repositório para operações com a tabela email_saida (fila de e-mails).
+
+Usado por util/email_service.py (inserção) e util/email_saida.py (envio).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlite3 import Row
+
+from model.email_saida_model import EmailSaida, StatusEmail
+from sql.email_saida_sql import (
+    CRIAR_TABELA,
+    CRIAR_INDICE_FILA,
+    INSERIR,
+    RESERVAR_LOTE,
+    LIBERAR_RESERVAS_ANTIGAS,
+    MARCAR_ENVIADO,
+    REAGENDAR,
+    MARCAR_FALHOU,
+    OBTER_POR_ID,
+    CONTAR_POR_STATUS,
+    EXCLUIR_ENVIADOS_ANTES
+)
+from util.db_util import obter_conexao
+from util.datetime_util import agora
+
+
+def _row_to_email(row: Row) -> EmailSaida:
+    """Converte uma row do banco em objeto EmailSaida."""
+    return EmailSaida(
+        id=row["id"],
+        para_email=row["para_email"],
+        para_nome=row["para_nome"],
+        assunto=row["assunto"],
+        html=row["html"],
+        texto=row["texto"],
+        status=StatusEmail(row["status"]),
+        tentativas=row["tentativas"],
+        proxima_tentativa=row["proxima_tentativa"],
+        ultimo_erro=row["ultimo_erro"],
+        id_externo=row["id_externo"],
+        criado_em=row["criado_em"],
+        enviado_em=row["enviado_em"]
+    )
+
+
+def criar_tabela():
+    """Cria a tabela email_saida e seu índice se não existirem."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_INDICE_FILA)
+
+
+def inserir(email: EmailSaida) -> Optional[int]:
+    """
+    Coloca um e-mail na fila, pronto para envio imediato.
+
+    Args:
+        email: E-mail a enviar
+
+    Returns:
+        ID do e-mail na fila
+    """
+    instante = agora()
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR, (
+            email.para_email,
+            email.para_nome,
+            email.assunto,
+            email.html,
+            email.texto,
+            instante,
+            instante
+        ))
+        return cursor.lastrowid
+
+
+def reservar_lote(tamanho: int) -> List[EmailSaida]:
+    """
+    Reserva para envio os próximos e-mails prontos (status Enviando).
+
+    Args:
+        tamanho: Máximo de e-mails reservados
+
+    Returns:
+        Lista de e-mails reservados, na ordem da fila
+    """
+    instante = agora()
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(RESERVAR_LOTE, (instante, instante, tamanho))
+        emails = [_row_to_email(row) for row in cursor.fetchall()]
+    return sorted(emails, key=lambda e: (e.proxima_tentativa, e.id))
+
+
+def liberar_reservas_antigas(antes_de: datetime) -> int:
+    """
+    Devolve à fila e-mails reservados antes de `antes_de` e nunca concluídos.
+
+    Args:
+        antes_de: Reservas mais antigas que isto são consideradas abandonadas
+
+    Returns:
+        Quantidade de e-mails devolvidos à fila
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LIBERAR_RESERVAS_ANTIGAS, (antes_de,))
+        return cursor.rowcount
+
+
+def marcar_enviado(id: int, id_externo: Optional[str] = None) -> bool:
+    """Registra o envio bem-sucedido de um e-mail."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(MARCAR_ENVIADO, (agora(), id_externo, id))
+        return cursor.rowcount > 0
+
+
+def reagendar(id: int, proxima_tentativa: datetime, erro: str) -> bool:
+    """Registra uma falha temporária e agenda a próxima tentativa."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(REAGENDAR, (proxima_tentativa, erro, id))
+        return cursor.rowcount > 0
+
+
+def marcar_falhou(id: int, erro: str) -> bool:
+    """Registra a falha definitiva de um e-mail (sem novas tentativas)."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(MARCAR_FALHOU, (erro, id))
+        return cursor.rowcount > 0
+
+
+def obter_por_id(id: int) -> Optional[EmailSaida]:
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_ID, (id,))
+        row = cursor.fetchone()
+        return _row_to_email(row) if row else None
+
+
+def contar_por_status() -> Dict[str, int]:
+    """
+    Conta os e-mails da fila por status.
+
+    Returns:
+        Dicionário status -> quantidade (todos os status, inclusive zerados)
+    """
+    contagens = {status: 0 for status in StatusEmail.valores()}
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_POR_STATUS)
+        for row in cursor.fetchall():
+            contagens[row["status"]] = row["total"]
+    return contagens
+
+
+def excluir_enviados_antes(instante: datetime) -> int:
+    """
+    Exclui os e-mails enviados antes de `instante`.
+
+    Returns:
+        Quantidade de e-mails excluídos
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_ENVIADOS_ANTES, (instante,))
+        return cursor.rowcount
@@ -0,0 +1,165 @@
+"""
+Repositório para operações com a tabela presenca.
+
+É o backend compartilhado do serviço de presença (util/presenca.py):
+todos os workers gravam heartbeats aqui e leem as mudanças dos demais.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+from sqlite3 import Row
+
+from model.presenca_model import Presenca
+from sql.presenca_sql import (
+    CRIAR_TABELA,
+    OBTER_ONLINE,
+    REGISTRAR_HEARTBEAT,
+    REGISTRAR_CONEXAO,
+    REGISTRAR_DESCONEXAO,
+    EXPIRAR,
+    OBTER_POR_USUARIOS,
+    LISTAR_ALTERADOS_DESDE
+)
+from util.db_util import obter_conexao
+from util.datetime_util import agora
+
+# Limite de variáveis por consulta do SQLite (SQLITE_MAX_VARIABLE_NUMBER antigo)
+_TAMANHO_LOTE_IN = 500
+
+
+def _row_to_presenca(row: Row) -> Presenca:
+    """Converte uma row do banco em objeto Presenca."""
+    return Presenca(
+        usuario_id=row["usuario_id"],
+        online=bool(row["online"]),
+        ultimo_acesso=row["ultimo_acesso"],
+        alterado_em=row["alterado_em"]
+    )
+
+
+def criar_tabela():
+    """Cria a tabela presenca se não existir."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+
+
+def registrar_heartbeat(usuario_id: int) -> bool:
+    """
+    Registra um heartbeat do usuário, marcando-o como online.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        True se o usuário estava offline (mudança de presença), False caso contrário
+    """
+    instante = agora()
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ONLINE, (usuario_id,))
+        row = cursor.fetchone()
+        cursor.execute(REGISTRAR_HEARTBEAT, (usuario_id, instante, instante))
+        return not (row and row["online"])
+
+
+def registrar_conexao(usuario_id: int) -> bool:
+    """
+    Registra a abertura de um stream SSE do usuário (heartbeat + contador de conexões).
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        True se o usuário estava offline (mudança de presença), False caso contrário
+    """
+    instante = agora()
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ONLINE, (usuario_id,))
+        row = cursor.fetchone()
+        cursor.execute(REGISTRAR_CONEXAO, (usuario_id, instante, instante))
+        return not (row and row["online"])
+
+
+def registrar_desconexao(usuario_id: int) -> bool:
+    """
+    Registra o fechamento de um stream SSE do usuário.
+
+    O usuário só fica offline quando fecha a última conexão, somando as de
+    todos os workers.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        True se o usuário passou a offline (mudança de presença), False caso contrário
+    """
+    instante = agora()
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ONLINE, (usuario_id,))
+        row = cursor.fetchone()
+        cursor.execute(REGISTRAR_DESCONEXAO, (instante, instante, usuario_id))
+        return bool(row and row["online"] and row["conexoes"] <= 1)
+
+
+def expirar(ttl_segundos: int) -> List[int]:
+    """
+    Marca como offline os usuários sem heartbeat há mais de `ttl_segundos`.
+
+    Args:
+        ttl_segundos: Tempo máximo sem heartbeat para continuar online
+
+    Returns:
+        Lista de IDs dos usuários que passaram a offline
+    """
+    instante = agora()
+    limite = instante - timedelta(seconds=ttl_segundos)
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXPIRAR, (instante, limite))
+        return [row["usuario_id"] for row in cursor.fetchall()]
+
+
+def obter_por_usuarios(usuario_ids: Iterable[int]) -> Dict[int, Presenca]:
+    """
+    Obtém a presença de vários usuários com uma consulta por lote.
+
+    Args:
+        usuario_ids: IDs dos usuários
+
+    Returns:
+        Dicionário usuario_id -> Presenca (usuários sem registro ficam de fora)
+    """
+    ids = list(dict.fromkeys(usuario_ids))
+    presencas: Dict[int, Presenca] = {}
+    if not ids:
+        return presencas
+
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(ids), _TAMANHO_LOTE_IN):
+            lote = ids[inicio:inicio + _TAMANHO_LOTE_IN]
+            sql = OBTER_POR_USUARIOS.format(placeholders=", ".join("?" * len(lote)))
+            cursor.execute(sql, lote)
+            for row in cursor.fetchall():
+                presenca = _row_to_presenca(row)
+                presencas[presenca.usuario_id] = presenca
+
+    return presencas
+
+
+def listar_alterados_desde(instante: datetime) -> List[Presenca]:
+    """
+    Lista as mudanças de presença feitas depois de `instante` (por qualquer worker).
+
+    Args:
+        instante: Momento da última leitura
+
+    Returns:
+        Lista de objetos Presenca, da mudança mais antiga para a mais recente
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_ALTERADOS_DESDE, (instante,))
+        return [_row_to_presenca(row) for row in cursor.fetchall()]
@@ -0,0 +1,150 @@
+"""
+Repositório para operações com a tabela sessao.
+
+É a persistência do armazenamento de sessões (util/sessao_servidor.py),
+compartilhada por todos os workers.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlite3 import Row
+
+from model.sessao_model import Sessao
+from sql.sessao_sql import (
+    CRIAR_TABELA,
+    CRIAR_INDICE_USUARIO,
+    CRIAR_INDICE_EXPIRA_EM,
+    OBTER_POR_ID,
+    INSERIR,
+    ATUALIZAR,
+    EXCLUIR,
+    EXCLUIR_POR_USUARIO,
+    EXCLUIR_EXPIRADAS
+)
+from util.db_util import obter_conexao
+from util.datetime_util import agora
+
+
+def _row_to_sessao(row: Row) -> Sessao:
+    """Converte uma row do banco em objeto Sessao."""
+    return Sessao(
+        id=row["id"],
+        dados=row["dados"],
+        usuario_id=row["usuario_id"],
+        expira_em=row["expira_em"],
+        atualizada_em=row["atualizada_em"]
+    )
+
+
+def criar_tabela():
+    """Cria a tabela sessao e seus índices se não existirem."""
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_INDICE_USUARIO)
+        cursor.execute(CRIAR_INDICE_EXPIRA_EM)
+
+
+def obter_por_id(sessao_id: str) -> Optional[Sessao]:
+    """
+    Obtém uma sessão ainda válida.
+
+    Args:
+        sessao_id: ID da sessão (valor do cookie)
+
+    Returns:
+        Sessao ou None se não existir ou estiver expirada
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_ID, (sessao_id, agora()))
+        row = cursor.fetchone()
+        return _row_to_sessao(row) if row else None
+
+
+def inserir(sessao: Sessao) -> None:
+    """
+    Insere uma sessão nova (ID recém-gerado).
+
+    Args:
+        sessao: Sessão com dados já serializados
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR, (
+            sessao.id,
+            sessao.dados,
+            sessao.usuario_id,
+            sessao.expira_em,
+            sessao.atualizada_em or agora()
+        ))
+
+
+def atualizar(sessao: Sessao) -> bool:
+    """
+    Atualiza uma sessão existente (nunca a recria).
+
+    Args:
+        sessao: Sessão com dados já serializados
+
+    Returns:
+        True se a sessão existia; False se foi excluída (logout, revogação)
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ATUALIZAR, (
+            sessao.dados,
+            sessao.usuario_id,
+            sessao.expira_em,
+            sessao.atualizada_em or agora(),
+            sessao.id
+        ))
+        return cursor.rowcount > 0
+
+
+def excluir(sessao_id: str) -> bool:
+    """
+    Exclui uma sessão (logout).
+
+    Args:
+        sessao_id: ID da sessão
+
+    Returns:
+        True se a sessão existia
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR, (sessao_id,))
+        return cursor.rowcount > 0
+
+
+def excluir_por_usuario(usuario_id: int, exceto_id: str = "") -> int:
+    """
+    Exclui as sessões de um usuário.
+
+    Args:
+        usuario_id: ID do usuário
+        exceto_id: ID de uma sessão a preservar (ex: a sessão atual)
+
+    Returns:
+        Quantidade de sessões excluídas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_POR_USUARIO, (usuario_id, exceto_id))
+        return cursor.rowcount
+
+
+def excluir_expiradas(instante: Optional[datetime] = None) -> int:
+    """
+    Exclui as sessões expiradas.
+
+    Args:
+        instante: Referência de tempo (padrão: agora)
+
+    Returns:
+        Quantidade de sessões excluídas
+    """
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_EXPIRADAS, (instante or agora(),))
+        return cursor.rowcount
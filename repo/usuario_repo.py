@@ -17,9 +17,11 @@ from sql.usuario_sql import (
     LIMPAR_TOKEN,
     OBTER_TODOS_POR_PERFIL,
     BUSCAR_POR_TERMO,
+    ATUALIZAR_FOTO,
+    OBTER_FOTO,
+    OBTER_FOTOS_REFERENCIADAS,
 )
 from util.db_util import obter_conexao
-from util.foto_util import criar_foto_padrao_usuario
 
 
 def _converter_data_nascimento(data_str: Optional[str]) -> Optional[date]:
@@ -56,6 +58,7 @@ def _row_to_usuario(row: sqlite3.Row) -> Usuario:
         confirmado=bool(row["confirmado"]) if "confirmado" in row.keys() else True,
         token_redefinicao=row["token_redefinicao"] if "token_redefinicao" in row.keys() else None,
         data_token=row["data_token"] if "data_token" in row.keys() else None,
+        foto=row["foto"] if "foto" in row.keys() else None,
         data_cadastro=row["data_cadastro"] if "data_cadastro" in row.keys() else None,
         data_atualizacao=row["data_atualizacao"] if "data_atualizacao" in row.keys() else None
     )
@@ -81,13 +84,8 @@ def inserir(usuario: Usuario) -> Optional[int]:
             usuario.telefone,
             1 if usuario.confirmado else 0
         ))
-        usuario_id = cursor.lastrowid
-
-        # Criar foto padrão para o novo usuário
-        if usuario_id:
-            criar_foto_padrao_usuario(usuario_id)
-
-        return usuario_id
+        # Sem foto própria (foto = NULL), o usuário usa a foto padrão compartilhada
+        return cursor.lastrowid
 
 
 def alterar(usuario: Usuario) -> bool:
@@ -113,10 +111,15 @@ def atualizar_senha(id: int, senha: str) -> bool:
 
 
 def excluir(id: int) -> bool:
+    from util.participacao_cache import participacao_cache
+
     with obter_conexao() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (id,))
-        return cursor.rowcount > 0
+        excluido = cursor.rowcount > 0
+    # O cascade remove as participações do usuário nas salas de chat
+    participacao_cache.invalidar_usuario(id)
+    return excluido
 
 
 def obter_por_id(id: int) -> Optional[Usuario]:
@@ -129,6 +132,28 @@ def obter_por_id(id: int) -> Optional[Usuario]:
         return None
 
 
+def atualizar_foto(id: int, foto: Optional[str]) -> bool:
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ATUALIZAR_FOTO, (foto, id))
+        return cursor.rowcount > 0
+
+
+def obter_foto(id: int) -> Optional[str]:
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_FOTO, (id,))
+        row = cursor.fetchone()
+        return row["foto"] if row else None
+
+
+def obter_fotos_referenciadas() -> set[str]:
+    with obter_conexao() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_FOTOS_REFERENCIADAS)
+        return {row["foto"] for row in cursor.fetchall()}
+
+
 def obter_todos() -> list[Usuario]:
     with obter_conexao() as conn:
         cursor = conn.cursor()
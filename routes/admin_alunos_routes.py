@@ -15,7 +15,8 @@ from util.template_util import criar_templates
 from util.logger_config import logger
 from util.rate_limiter import RateLimiter, obter_identificador_cliente
 from util.exceptions import ErroValidacaoFormulario
-from util.security import criar_hash_senha
+from util.security import criar_hash_senha_async
+from util.sessao_servidor import revogar_sessoes_usuario
 
 from repo import usuario_repo
 from model.usuario_model import Usuario
@@ -27,7 +28,7 @@ router = APIRouter(prefix="/admin/alunos")
 templates = criar_templates()
 
 # Rate limiter para operações administrativas
-admin_alunos_limiter = RateLimiter(max_tentativas=10, janela_minutos=1)
+admin_alunos_limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="admin_alunos")
 
 
 def verificar_email_disponivel_aluno(email: str, id_excluir: Optional[int] = None) -> tuple[bool, str]:
@@ -108,7 +109,7 @@ async def post_cadastrar(
             )
 
         # Criar hash da senha
-        senha_hash = criar_hash_senha(dto.senha)
+        senha_hash = await criar_hash_senha_async(dto.senha)
 
         # Criar aluno
         aluno = Usuario(
@@ -256,6 +257,7 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
         return RedirectResponse("/admin/alunos/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     usuario_repo.excluir(id)
+    revogar_sessoes_usuario(id)
     logger.info(f"Aluno {id} excluído por admin {usuario_logado.id}")
 
     informar_sucesso(request, "Aluno excluído com sucesso!")
@@ -291,6 +293,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[dict]
         return RedirectResponse("/admin/alunos/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     usuario_repo.excluir(id)
+    revogar_sessoes_usuario(id)
     logger.info(f"Aluno {id} excluído por admin {usuario_logado.id}")
 
     informar_sucesso(request, "Aluno excluído com sucesso!")
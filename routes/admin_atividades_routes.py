@@ -25,7 +25,7 @@ from dtos.atividade_dto import CriarAtividadeDTO, AlterarAtividadeDTO
 router = APIRouter(prefix="/admin/atividades")
 
 # Rate limiter para operações administrativas
-admin_atividades_limiter = RateLimiter(max_tentativas=10, janela_minutos=1)
+admin_atividades_limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="admin_atividades")
 
 # Instância global de templates para este conjunto de rotas
 templates = criar_templates()
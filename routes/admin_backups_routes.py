@@ -4,8 +4,8 @@ Rotas administrativas para gerenciamento de backups do banco de dados.
 Permite ao administrador criar, listar, restaurar e excluir backups do banco SQLite.
 """
 from typing import Optional
-from fastapi import APIRouter, Request, status
-from fastapi.responses import RedirectResponse, FileResponse
+from fastapi import APIRouter, Form, Request, status
+from fastapi.responses import RedirectResponse, FileResponse, JSONResponse
 
 from util.auth_decorator import requer_autenticacao
 from util.template_util import criar_templates
@@ -49,8 +49,9 @@ async def get_listar(request: Request, usuario_logado: Optional[dict] = None):
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
-    # Obter lista de backups
+    # Obter lista de backups e o andamento do backup em segundo plano
     backups = backup_util.listar_backups()
+    progresso = backup_util.obter_progresso_backup()
 
     logger.debug(f"Admin {usuario_logado.id} acessou página de backups - {len(backups)} backup(s) encontrado(s)")
 
@@ -59,6 +60,7 @@ async def get_listar(request: Request, usuario_logado: Optional[dict] = None):
         {
             "request": request,
             "backups": backups,
+            "progresso": progresso,
             "usuario_logado": usuario_logado,
         }
     )
@@ -66,11 +68,19 @@ async def get_listar(request: Request, usuario_logado: Optional[dict] = None):
 
 @router.post("/criar")
 @requer_autenticacao([Perfil.ADMIN.value])
-async def post_criar(request: Request, usuario_logado: Optional[dict] = None):
+async def post_criar(
+    request: Request,
+    incremental: bool = Form(False),
+    usuario_logado: Optional[dict] = None
+):
     """
-    Cria um novo backup do banco de dados
+    Inicia a criação de um novo backup do banco de dados
+
+    A cópia (para backups/, com timestamp no nome) roda em segundo plano e a
+    resposta volta imediatamente; o progresso é exibido na listagem.
 
-    Copia o arquivo database.db para backups/ com timestamp no nome.
+    Args:
+        incremental: Gravar apenas as páginas alteradas desde o último backup completo
     """
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
@@ -81,14 +91,14 @@ async def post_criar(request: Request, usuario_logado: Optional[dict] = None):
         informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
         return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
 
-    # Criar backup
-    sucesso, mensagem = backup_util.criar_backup()
+    # Iniciar backup em segundo plano
+    iniciado, mensagem = backup_util.iniciar_backup_em_segundo_plano(incremental=incremental)
 
-    if sucesso:
-        logger.info(f"Backup criado por admin {usuario_logado.id}: {mensagem}")
+    if iniciado:
+        logger.info(f"Backup {'incremental ' if incremental else ''}iniciado por admin {usuario_logado.id}")
         informar_sucesso(request, mensagem)
     else:
-        logger.error(f"Erro ao criar backup por admin {usuario_logado.id}: {mensagem}")
+        logger.warning(f"Backup não iniciado por admin {usuario_logado.id}: {mensagem}")
         informar_erro(request, mensagem)
 
     return RedirectResponse(
@@ -97,6 +107,33 @@ async def post_criar(request: Request, usuario_logado: Optional[dict] = None):
     )
 
 
+@router.get("/progresso")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def get_progresso(request: Request, usuario_logado: Optional[dict] = None):
+    """
+    Retorna o andamento do backup em segundo plano (consultado pela listagem)
+
+    Returns:
+        JSON com em_andamento, percentual, páginas copiadas/total, sucesso e
+        mensagem; ou {"em_andamento": false} se nenhum backup foi iniciado
+    """
+    if not usuario_logado:
+        return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
+
+    progresso = backup_util.obter_progresso_backup()
+    if progresso is None:
+        return JSONResponse({"em_andamento": False})
+
+    return JSONResponse({
+        "em_andamento": progresso.em_andamento,
+        "percentual": progresso.percentual,
+        "paginas_copiadas": progresso.paginas_copiadas,
+        "paginas_total": progresso.paginas_total,
+        "sucesso": progresso.sucesso,
+        "mensagem": progresso.mensagem,
+    })
+
+
 @router.post("/restaurar/{nome_arquivo}")
 @requer_autenticacao([Perfil.ADMIN.value])
 async def post_restaurar(
@@ -24,7 +24,7 @@ from dtos.categoria_dto import CriarCategoriaDTO, AlterarCategoriaDTO
 router = APIRouter(prefix="/admin/categorias")
 
 # Rate limiter para operações administrativas
-admin_categorias_limiter = RateLimiter(max_tentativas=10, janela_minutos=1)
+admin_categorias_limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="admin_categorias")
 
 # Instância global de templates para este conjunto de rotas
 templates = criar_templates()
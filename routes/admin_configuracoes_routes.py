@@ -5,6 +5,7 @@
 # Standard library
 import shutil
 import sqlite3
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
@@ -21,12 +22,15 @@ from repo import configuracao_repo
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.config import APP_TIMEZONE
 from util.config_cache import config
 from util.datetime_util import agora
 from util.flash_messages import informar_sucesso, informar_erro, informar_aviso
 from util.logger_config import logger
 from util.perfis import Perfil
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+from util.pool_senhas import pool_senhas
+from util.pool_imagens import pool_imagens
+from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente, registro_limiters
 from util.template_util import criar_templates
 from util.validation_util import processar_erros_validacao
 
@@ -146,8 +150,8 @@ async def post_salvar_lote_configuracoes(
         # Atualizar configurações no banco
         quantidade_atualizada, chaves_nao_encontradas = configuracao_repo.atualizar_multiplas(dto.configs)
 
-        # Limpar cache de configurações
-        config.limpar()
+        # Publicar novo snapshot das configurações
+        config.carregar()
 
         # Log de auditoria
         logger.info(
@@ -297,8 +301,8 @@ async def post_aplicar_tema(
         )
 
         if sucesso:
-            # Limpar cache de configurações
-            config.limpar()
+            # Publicar novo snapshot das configurações
+            config.carregar()
 
             logger.info(
                 f"Tema alterado para '{tema_normalizado}' por admin {usuario_logado.id} "
@@ -435,3 +439,66 @@ async def post_filtrar_auditoria(
             "usuario_logado": usuario_logado,
         }
     )
+
+
+# === Painel de Rate Limits ===
+
+# Minutos mais recentes exibidos na série de cada limiter
+MINUTOS_SERIE_PAINEL = 30
+
+
+def _preparar_serie(serie: list[dict]) -> list[dict]:
+    """Limita a série aos minutos recentes e converte o início para datetime local."""
+    recentes = serie[-MINUTOS_SERIE_PAINEL:]
+    maximo = max((p["permitidas"] + p["bloqueadas"] for p in recentes), default=0)
+    return [
+        {
+            **ponto,
+            "inicio": datetime.fromtimestamp(ponto["inicio"], APP_TIMEZONE),
+            "altura": round((ponto["permitidas"] + ponto["bloqueadas"]) / maximo * 100) if maximo else 0,
+        }
+        for ponto in recentes
+    ]
+
+
+@router.get("/rate-limits")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def get_rate_limits(request: Request, usuario_logado: Optional[dict] = None):
+    """Exibe o painel de métricas dos rate limiters (bloqueios, rotas e infratores), do bcrypt e das imagens"""
+    if not usuario_logado:
+        return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
+
+    painel = registro_limiters.obter_painel()
+    for limiter in painel["limiters"]:
+        limiter["serie"] = _preparar_serie(limiter["serie"])
+
+    return templates.TemplateResponse(
+        "admin/rate_limits.html",
+        {
+            "request": request,
+            "painel": painel,
+            "senhas": pool_senhas.obter_estatisticas(),
+            "imagens": pool_imagens.obter_estatisticas(),
+            "usuario_logado": usuario_logado,
+        }
+    )
+
+
+@router.post("/rate-limits/zerar")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def post_zerar_rate_limits(request: Request, usuario_logado: Optional[dict] = None):
+    """Zera as métricas de todos os rate limiters (não altera os bloqueios em vigor)"""
+    if not usuario_logado:
+        return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
+
+    ip = obter_identificador_cliente(request)
+    if not admin_config_limiter.verificar(ip):
+        informar_erro(request, "Muitas operações. Aguarde um momento e tente novamente.")
+        return RedirectResponse("/admin/rate-limits", status_code=status.HTTP_303_SEE_OTHER)
+
+    registro_limiters.limpar_metricas()
+    pool_senhas.limpar_estatisticas()
+    pool_imagens.limpar_estatisticas()
+    logger.info(f"Métricas de rate limit zeradas por admin {usuario_logado.id}")
+    informar_sucesso(request, "Métricas de rate limit zeradas.")
+    return RedirectResponse("/admin/rate-limits", status_code=status.HTTP_303_SEE_OTHER)
@@ -24,7 +24,7 @@ from dtos.matricula_dto import CriarMatriculaDTO, AlterarMatriculaDTO
 router = APIRouter(prefix="/admin/matriculas")
 
 # Rate limiter para operações administrativas
-admin_matriculas_limiter = RateLimiter(max_tentativas=10, janela_minutos=1)
+admin_matriculas_limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="admin_matriculas")
 
 # Templates
 templates = criar_templates()
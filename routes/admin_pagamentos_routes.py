@@ -24,7 +24,7 @@ from dtos.pagamento_dto import CriarPagamentoDTO, AlterarPagamentoDTO
 router = APIRouter(prefix="/admin/pagamentos")
 
 # Rate limiter para operações administrativas
-admin_pagamentos_limiter = RateLimiter(max_tentativas=10, janela_minutos=1)
+admin_pagamentos_limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="admin_pagamentos")
 
 # Templates
 templates = criar_templates()
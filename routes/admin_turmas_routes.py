@@ -23,7 +23,7 @@ from dtos.turma_dto import CriarTurmaDTO, AlterarTurmaDTO
 router = APIRouter(prefix="/admin/turmas")
 
 # Rate limiter para operações administrativas
-admin_turmas_limiter = RateLimiter(max_tentativas=10, janela_minutos=1)
+admin_turmas_limiter = RateLimiter(max_tentativas=10, janela_minutos=1, nome="admin_turmas")
 
 # Templates
 templates = criar_templates()
@@ -28,7 +28,8 @@ from util.logger_config import logger
 from util.perfis import Perfil
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha
+from util.security import criar_hash_senha_async
+from util.sessao_servidor import revogar_sessoes_usuario
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -156,7 +157,7 @@ async def post_cadastrar(
             )
 
         # Criar hash da senha
-        senha_hash = criar_hash_senha(dto.senha)
+        senha_hash = await criar_hash_senha_async(dto.senha)
 
         # Criar usuário
         usuario = Usuario(
@@ -362,6 +363,7 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     usuario_repo.excluir(id)
+    revogar_sessoes_usuario(id)
     logger.info(f"Usuário {id} ({usuario.email}) excluído por admin {usuario_logado.id}")
     informar_sucesso(request, "Usuário excluído com sucesso!")
     return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
@@ -397,6 +399,7 @@ async def post_excluir(request: Request, id: int, usuario_logado: Optional[dict]
         return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
 
     usuario_repo.excluir(id)
+    revogar_sessoes_usuario(id)
     logger.info(f"Usuário {id} ({usuario.email}) excluído por admin {usuario_logado.id}")
     informar_sucesso(request, "Usuário excluído com sucesso!")
     return RedirectResponse("/admin/usuarios/listar", status_code=status.HTTP_303_SEE_OTHER)
@@ -28,11 +28,12 @@ from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.security import (
-    criar_hash_senha,
-    verificar_senha,
+    criar_hash_senha_async,
+    verificar_e_atualizar_senha_async,
     gerar_token_redefinicao,
     obter_data_expiracao_token,
 )
+from util.sessao_servidor import revogar_sessoes_usuario
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 from model.usuario_logado_model import UsuarioLogado
@@ -174,8 +175,12 @@ async def post_login(
         # Buscar usuário
         usuario = usuario_repo.obter_por_email(dto.email)
 
-        # Verificar credenciais
-        if not usuario or not verificar_senha(dto.senha, usuario.senha):
+        # Verificar credenciais (e se o hash está no custo bcrypt configurado)
+        senha_correta, novo_hash = (
+            await verificar_e_atualizar_senha_async(dto.senha, usuario.senha)
+            if usuario else (False, None)
+        )
+        if not senha_correta:
             informar_erro(request, "E-mail ou senha inválidos")
             logger.warning(f"Tentativa de login falhou para: {dto.email}")
             erros = {"geral": "E-mail ou senha inválidos"}
@@ -189,6 +194,11 @@ async def post_login(
                 },
             )
 
+        # Refazer o hash com o custo atual, sem exigir migração
+        if novo_hash:
+            usuario_repo.atualizar_senha(usuario.id, novo_hash)
+            logger.info(f"Hash de senha de {usuario.email} atualizado para o custo configurado")
+
         # Salvar sessão
         usuario_logado = UsuarioLogado.from_usuario(usuario)
         criar_sessao(request, usuario_logado)
@@ -272,7 +282,7 @@ async def post_cadastrar(
             id=0,
             nome=dto.nome,
             email=dto.email,
-            senha=criar_hash_senha(dto.senha),
+            senha=await criar_hash_senha_async(dto.senha),
             perfil=dto.perfil,
         )
 
@@ -282,7 +292,7 @@ async def post_cadastrar(
         if usuario_id:
             logger.info(f"Novo usuário cadastrado: {usuario.email}")
 
-            # Enviar e-mail de boas-vindas
+            # Colocar o e-mail de boas-vindas na fila de saída
             servico_email.enviar_boas_vindas(usuario.email, usuario.nome)
 
             informar_sucesso(
@@ -343,16 +353,16 @@ async def post_esqueci_senha(request: Request, email: str = Form()):
             # Salvar token no banco
             usuario_repo.atualizar_token(usuario.email, token, data_expiracao)
 
-            # Enviar e-mail com link de recuperação
-            email_enviado = servico_email.enviar_recuperacao_senha(
+            # Colocar o e-mail com link de recuperação na fila de saída
+            email_na_fila = servico_email.enviar_recuperacao_senha(
                 usuario.email, usuario.nome, token
             )
 
-            if email_enviado:
-                logger.info(f"E-mail de recuperação enviado para: {usuario.email}")
+            if email_na_fila:
+                logger.info(f"E-mail de recuperação na fila para: {usuario.email}")
             else:
                 logger.error(
-                    f"Falha ao enviar e-mail de recuperação para: {usuario.email}"
+                    f"Falha ao enfileirar e-mail de recuperação para: {usuario.email}"
                 )
 
         # Sempre retornar mesma mensagem (segurança)
@@ -444,12 +454,15 @@ async def post_redefinir_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha)
+        senha_hash = await criar_hash_senha_async(dto.senha)
         usuario_repo.atualizar_senha(usuario.id, senha_hash)
 
         # Limpar token
         usuario_repo.limpar_token(usuario.id)
 
+        # Encerrar as sessões abertas com a senha antiga
+        revogar_sessoes_usuario(usuario.id)
+
         logger.info(f"Senha redefinida com sucesso para usuário: {usuario.email}")
         informar_sucesso(
             request, "Senha redefinida com sucesso! Faça login com sua nova senha."
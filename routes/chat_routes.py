@@ -14,6 +14,7 @@ from typing import Optional
 # Third-party
 from fastapi import APIRouter, Request, status, HTTPException, Form
 from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
 from pydantic import ValidationError
 
 # DTOs
@@ -24,11 +25,15 @@ from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, usu
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.cache_http import controlar_cache
 from util.chat_manager import gerenciador_chat
+from util.config import PRESENCA_HEARTBEAT_SEGUNDOS
 from util.datetime_util import agora
-from util.foto_util import obter_caminho_foto_usuario
+from util.foto_util import url_foto
 from util.logger_config import logger
+from util.participacao_cache import participacao_cache
 from util.perfis import Perfil
+from util.presenca import servico_presenca
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 
 # =============================================================================
@@ -37,6 +42,12 @@ from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# Máximo de usuários por consulta de presença
+MAX_IDS_PRESENCA = 100
+
+# O widget exibe as fotos com 32-40 px; a versão de 64 px serve também telas 2x
+TAMANHO_FOTO_CHAT = 64
+
 # =============================================================================
 # Rate Limiters
 # =============================================================================
@@ -77,6 +88,9 @@ async def stream_mensagens(request: Request, usuario_logado: Optional[dict] = No
     """
     Endpoint SSE para receber mensagens em tempo real.
     Cada usuário mantém UMA conexão que recebe mensagens de TODAS as suas salas.
+
+    A conexão também alimenta a presença do usuário: sem eventos por
+    PRESENCA_HEARTBEAT_SEGUNDOS, envia um comentário keepalive e renova o heartbeat.
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
@@ -85,10 +99,16 @@ async def stream_mensagens(request: Request, usuario_logado: Optional[dict] = No
     async def event_generator():
         # Conectar usuário ao GerenciadorChat
         queue = await gerenciador_chat.conectar(usuario_id)
+        await servico_presenca.registrar_conexao(usuario_id)
         try:
             while True:
-                # Aguardar mensagem na fila
-                evento = await queue.get()
+                # Aguardar mensagem na fila (ou o próximo heartbeat)
+                try:
+                    evento = await asyncio.wait_for(queue.get(), timeout=PRESENCA_HEARTBEAT_SEGUNDOS)
+                except asyncio.TimeoutError:
+                    await servico_presenca.registrar_heartbeat(usuario_id)
+                    yield ": keepalive\n\n"
+                    continue
 
                 # Formatar como SSE
                 sse_data = f"data: {json.dumps(evento)}\n\n"
@@ -99,8 +119,10 @@ async def stream_mensagens(request: Request, usuario_logado: Optional[dict] = No
         except asyncio.CancelledError:
             logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
         finally:
-            # Desconectar ao fechar stream
-            await gerenciador_chat.desconectar(usuario_id)
+            # Desconectar ao fechar stream; a presença só fica offline quando
+            # o usuário não tem mais conexões abertas em nenhum worker
+            await gerenciador_chat.desconectar(usuario_id, queue)
+            await servico_presenca.registrar_desconexao(usuario_id)
 
     return StreamingResponse(
         event_generator(),
@@ -179,6 +201,7 @@ async def criar_ou_obter_sala(
 
 
 @router.get("/conversas")
+@controlar_cache()
 @requer_autenticacao()
 async def listar_conversas(
     request: Request,
@@ -230,8 +253,8 @@ async def listar_conversas(
         # Obter última mensagem
         ultima_mensagem = chat_mensagem_repo.obter_ultima_mensagem_sala(sala.id)
 
-        # Contar não lidas
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(sala.id, usuario_id)
+        # Contador de não lidas já vem materializado na participação
+        nao_lidas = participacao.nao_lidas
 
         conversa = {
             "sala_id": sala.id,
@@ -239,7 +262,7 @@ async def listar_conversas(
                 "id": outro_usuario.id,
                 "nome": outro_usuario.nome,
                 "email": outro_usuario.email,
-                "foto_url": obter_caminho_foto_usuario(outro_usuario.id)
+                "foto_url": url_foto(outro_usuario.foto, TAMANHO_FOTO_CHAT)
             },
             "ultima_mensagem": {
                 "mensagem": ultima_mensagem.mensagem,
@@ -257,23 +280,87 @@ async def listar_conversas(
     # Aplicar paginação
     conversas_paginadas = conversas[offset:offset + limit]
 
+    # Presença dos contatos da página em uma única consulta
+    presencas = await servico_presenca.obter_presencas(
+        c["outro_usuario"]["id"] for c in conversas_paginadas
+    )
+    for conversa in conversas_paginadas:
+        presenca = presencas[conversa["outro_usuario"]["id"]]
+        conversa["outro_usuario"]["online"] = presenca["online"]
+        conversa["outro_usuario"]["ultimo_acesso"] = presenca["ultimo_acesso"]
+
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content=conversas_paginadas
     )
 
 
+@router.get("/presenca")
+@requer_autenticacao()
+async def obter_presenca(
+    request: Request,
+    ids: str = "",
+    usuario_logado: Optional[dict] = None
+):
+    """
+    Retorna a presença (online e visto por último) de uma lista de usuários.
+
+    Os IDs são informados separados por vírgula (ex: ?ids=3,7,12) e resolvidos
+    em uma única consulta. Serve para o estado inicial; as mudanças seguintes
+    chegam pelo stream SSE como eventos do tipo "presenca".
+    """
+    if not usuario_logado:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
+
+    # Rate limiting por IP
+    ip = obter_identificador_cliente(request)
+    if not chat_listagem_limiter.verificar(ip):
+        logger.warning(f"Rate limit excedido para consulta de presença - IP: {ip}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas requisições de listagem. Aguarde alguns minutos."
+        )
+
+    try:
+        usuario_ids = [int(parte) for parte in ids.split(",") if parte.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="IDs inválidos."
+        )
+
+    if len(usuario_ids) > MAX_IDS_PRESENCA:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Informe no máximo {MAX_IDS_PRESENCA} usuários."
+        )
+
+    presencas = await servico_presenca.obter_presencas(usuario_ids)
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={str(usuario_id): presenca for usuario_id, presenca in presencas.items()}
+    )
+
+
 @router.get("/mensagens/{sala_id}")
+@controlar_cache()
 @requer_autenticacao()
 async def listar_mensagens(
     request: Request,
     sala_id: str,
     limit: int = 50,
-    offset: int = 0,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     usuario_logado: Optional[dict] = None
 ):
     """
-    Lista mensagens de uma sala específica com paginação.
+    Lista mensagens de uma sala específica com paginação por cursor.
+
+    Retorna as mensagens da mais recente para a mais antiga e o cursor da
+    próxima página: sem cursor ou com before_id, o ID da mensagem mais
+    antiga (usar como before_id); com after_id, o ID da mais recente
+    (usar como after_id). O cursor é None quando não há mais mensagens.
     """
     if not usuario_logado:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
@@ -287,18 +374,30 @@ async def listar_mensagens(
             detail="Muitas requisições de listagem. Aguarde alguns minutos."
         )
 
+    if before_id is not None and after_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe apenas um cursor: before_id ou after_id."
+        )
+
     usuario_id = usuario_logado.id
 
-    # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
-    if not participante:
+    # Verificar se usuário participa da sala (cache das salas ativas)
+    if not await participacao_cache.participa_async(sala_id, usuario_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem acesso a esta sala."
         )
 
-    # Obter mensagens
-    mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
+    # Obter mensagens (mais recentes primeiro)
+    mensagens = chat_mensagem_repo.listar_por_sala(
+        sala_id, limit, before_id=before_id, after_id=after_id
+    )
+
+    # Página cheia indica que pode haver mais mensagens na direção do cursor
+    proximo_cursor = None
+    if mensagens and len(mensagens) >= limit:
+        proximo_cursor = mensagens[0].id if after_id is not None else mensagens[-1].id
 
     mensagens_json = [
         {
@@ -314,7 +413,10 @@ async def listar_mensagens(
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content=mensagens_json
+        content={
+            "mensagens": mensagens_json,
+            "proximo_cursor": proximo_cursor
+        }
     )
 
 
@@ -347,53 +449,46 @@ async def enviar_mensagem(
 
         usuario_id = usuario_logado.id
 
-        # Verificar se usuário participa da sala
-        participante = chat_participante_repo.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
-        if not participante:
+        # Verificar se usuário participa da sala (cache das salas ativas)
+        if not await participacao_cache.participa_async(dto.sala_id, usuario_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Você não tem acesso a esta sala."
             )
 
-        # Verificar se sala existe
-        sala = chat_sala_repo.obter_por_id(dto.sala_id)
-        if not sala:
+        # Inserir mensagem e atualizar última atividade da sala em uma única
+        # transação, fora do event loop
+        nova_mensagem = await asyncio.to_thread(
+            chat_mensagem_repo.inserir, dto.sala_id, usuario_id, dto.mensagem
+        )
+        if not nova_mensagem:
+            participacao_cache.invalidar(dto.sala_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sala não encontrada."
             )
 
-        # Inserir mensagem
-        nova_mensagem = chat_mensagem_repo.inserir(dto.sala_id, usuario_id, dto.mensagem)
-
-        # Atualizar última atividade da sala
-        chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
+        mensagem_json = {
+            "id": nova_mensagem.id,
+            "sala_id": nova_mensagem.sala_id,
+            "usuario_id": nova_mensagem.usuario_id,
+            "mensagem": nova_mensagem.mensagem,
+            "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
+            "lida_em": None
+        }
 
-        # Broadcast via SSE para ambos participantes
+        # Broadcast via SSE para ambos participantes depois do commit,
+        # executado após o envio da resposta
         mensagem_sse = {
             "tipo": "nova_mensagem",
             "sala_id": nova_mensagem.sala_id,
-            "mensagem": {
-                "id": nova_mensagem.id,
-                "sala_id": nova_mensagem.sala_id,
-                "usuario_id": nova_mensagem.usuario_id,
-                "mensagem": nova_mensagem.mensagem,
-                "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
-                "lida_em": None
-            }
+            "mensagem": mensagem_json
         }
-        await gerenciador_chat.broadcast_para_sala(dto.sala_id, mensagem_sse)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
-                "id": nova_mensagem.id,
-                "sala_id": nova_mensagem.sala_id,
-                "usuario_id": nova_mensagem.usuario_id,
-                "mensagem": nova_mensagem.mensagem,
-                "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
-                "lida_em": None
-            }
+            content=mensagem_json,
+            background=BackgroundTask(gerenciador_chat.broadcast_para_sala, dto.sala_id, mensagem_sse)
         )
 
     except ValidationError as e:
@@ -417,9 +512,8 @@ async def marcar_como_lidas(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
     usuario_id = usuario_logado.id
 
-    # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
-    if not participante:
+    # Verificar se usuário participa da sala (cache das salas ativas)
+    if not await participacao_cache.participa_async(sala_id, usuario_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem acesso a esta sala."
@@ -487,7 +581,7 @@ async def buscar_usuarios(
             "id": u.id,
             "nome": u.nome,
             "email": u.email,
-            "foto_url": obter_caminho_foto_usuario(u.id)
+            "foto_url": url_foto(u.foto, TAMANHO_FOTO_CHAT)
         }
         for u in usuarios_filtrados
     ]
@@ -499,6 +593,7 @@ async def buscar_usuarios(
 
 
 @router.get("/mensagens/nao-lidas/total")
+@controlar_cache()
 @requer_autenticacao()
 async def contar_nao_lidas_total(
     request: Request,
@@ -511,16 +606,8 @@ async def contar_nao_lidas_total(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Não autenticado")
     usuario_id = usuario_logado.id
 
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    total_nao_lidas = 0
-    for participacao in participacoes:
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            participacao.sala_id,
-            usuario_id
-        )
-        total_nao_lidas += nao_lidas
+    # Soma dos contadores materializados (uma única query indexada)
+    total_nao_lidas = chat_participante_repo.contar_total_nao_lidas(usuario_id)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
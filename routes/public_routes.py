@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request, status
 
 from util.template_util import criar_templates
+from util.cache_http import controlar_cache, politica_pagina_publica, versao_pagina_publica
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.flash_messages import informar_erro
 from util.logger_config import logger
@@ -19,6 +20,7 @@ public_limiter = DynamicRateLimiter(
 
 
 @router.get("/")
+@controlar_cache(politica_pagina_publica, versao=versao_pagina_publica)
 async def home(request: Request):
     """
     Rota inicial - Landing Page pública (sempre)
@@ -41,6 +43,7 @@ async def home(request: Request):
 
 
 @router.get("/index")
+@controlar_cache(politica_pagina_publica, versao=versao_pagina_publica)
 async def index(request: Request):
     """
     Página pública inicial (Landing Page)
@@ -64,6 +67,7 @@ async def index(request: Request):
 
 
 @router.get("/sobre")
+@controlar_cache(politica_pagina_publica, versao=versao_pagina_publica)
 async def sobre(request: Request):
     """
     Página "Sobre" com informações do projeto acadêmico
@@ -18,14 +18,19 @@ from repo import usuario_repo, chamado_repo, turma_repo, matricula_repo, pagamen
 
 # Utilities
 from util.auth_decorator import requer_autenticacao
+from util.config import FOTO_MAX_UPLOAD_BYTES
+from util.config_cache import config
 from util.perfis import Perfil
 from util.exceptions import ErroValidacaoFormulario
 from util.flash_messages import informar_sucesso, informar_erro
-from util.foto_util import salvar_foto_cropada_usuario
+from util.foto_util import salvar_foto_cropada_usuario_async
+from util.pool_imagens import FilaImagensCheia
+from util.upload_util import UploadMuitoGrande, receber_arquivo_multipart
 from util.logger_config import logger
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 from util.repository_helpers import obter_ou_404
-from util.security import criar_hash_senha, verificar_senha
+from util.security import criar_hash_senha_async, verificar_senha_async
+from util.sessao_servidor import revogar_sessoes_usuario
 from util.template_util import criar_templates
 from util.validation_helpers import verificar_email_disponivel
 
@@ -294,7 +299,7 @@ async def post_alterar_senha(
             return usuario
 
         # Validar senha atual
-        if not verificar_senha(dto.senha_atual, usuario.senha):
+        if not await verificar_senha_async(dto.senha_atual, usuario.senha):
             informar_erro(request, "Senha atual está incorreta")
             logger.warning(
                 f"Tentativa de alteração de senha com senha atual incorreta - Usuário ID: {usuario.id}"
@@ -309,7 +314,7 @@ async def post_alterar_senha(
             )
 
         # Verificar se a nova senha é diferente da atual
-        if verificar_senha(dto.senha_nova, usuario.senha):
+        if await verificar_senha_async(dto.senha_nova, usuario.senha):
             informar_erro(request, "A nova senha deve ser diferente da senha atual.")
             return templates_usuario.TemplateResponse(
                 "perfil/alterar-senha.html",
@@ -323,8 +328,10 @@ async def post_alterar_senha(
             )
 
         # Atualizar senha
-        senha_hash = criar_hash_senha(dto.senha_nova)
+        senha_hash = await criar_hash_senha_async(dto.senha_nova)
         if usuario_repo.atualizar_senha(usuario.id, senha_hash):
+            # Encerrar as sessões de outros dispositivos (a atual continua)
+            revogar_sessoes_usuario(usuario.id, request)
             logger.info(f"Senha alterada com sucesso - Usuário ID: {usuario.id}")
             informar_sucesso(request, "Senha alterada com sucesso!")
             return RedirectResponse(
@@ -357,10 +364,15 @@ async def post_alterar_senha(
 @requer_autenticacao()
 async def post_atualizar_foto(
     request: Request,
-    foto_base64: str = Form(),
     usuario_logado: Optional[dict] = None,
 ):
-    """Upload de foto de perfil cropada"""
+    """
+    Upload de foto de perfil cropada.
+
+    Espera multipart/form-data com o arquivo binário no campo "foto". O
+    corpo é lido em streaming para um arquivo temporário (sem request.form()),
+    com o limite foto_max_upload_bytes aplicado durante a leitura.
+    """
     if not usuario_logado:
         return RedirectResponse(url="/login", status_code=status.HTTP_302_FOUND)
 
@@ -379,25 +391,40 @@ async def post_atualizar_foto(
             "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
         )
 
+    arquivo = None
     try:
+        limite_bytes = config.obter_int("foto_max_upload_bytes", FOTO_MAX_UPLOAD_BYTES)
+        try:
+            arquivo = await receber_arquivo_multipart(request, "foto", limite_bytes)
+        except UploadMuitoGrande as e:
+            logger.warning(f"Upload de foto acima do limite - Usuário ID {usuario_id}: {e}")
+            informar_erro(
+                request, f"Imagem muito grande. O tamanho máximo é {round(limite_bytes / (1024 * 1024), 1):g}MB."
+            )
+            return RedirectResponse(
+                "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
+            )
+
         # Validação básica
-        if not foto_base64 or len(foto_base64) < 100:
+        if arquivo is None:
             informar_erro(request, "Foto inválida. Por favor, tente novamente.")
             return RedirectResponse(
                 "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
             )
 
-        # Validar tamanho aproximado (base64 é ~33% maior que binário)
-        tamanho_aproximado = len(foto_base64) * 3 / 4
-        max_size = 10 * 1024 * 1024  # 10MB
-        if tamanho_aproximado > max_size:
-            informar_erro(request, "Imagem muito grande. O tamanho máximo é 10MB.")
+        # Salvar foto cropada (processada no pool de imagens, fora do event loop)
+        try:
+            foto = await salvar_foto_cropada_usuario_async(usuario_id, arquivo)
+        except FilaImagensCheia as e:
+            logger.warning(f"Upload de foto recusado, pool de imagens cheio - Usuário ID {usuario_id}: {e}")
+            informar_erro(request, "O servidor está processando muitas imagens. Tente novamente em instantes.")
             return RedirectResponse(
                 "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
             )
 
-        # Salvar foto cropada
-        if salvar_foto_cropada_usuario(usuario_id, foto_base64):
+        if foto is not None:
+            # O navbar exibe a foto a partir da sessão (sem consultar o banco)
+            request.session["usuario_logado"]["foto"] = foto
             logger.info(f"Foto de perfil atualizada - Usuário ID: {usuario_id}")
             informar_sucesso(request, "Foto de perfil atualizada com sucesso!")
         else:
@@ -412,7 +439,7 @@ async def post_atualizar_foto(
         )
 
     except (ValueError, IOError, OSError) as e:
-        # Erros de validação de dados (base64 inválido) ou I/O (escrita de arquivo)
+        # Erros de validação de dados (multipart inválido) ou I/O (escrita de arquivo)
         logger.error(f"Erro ao fazer upload de foto - Usuário ID {usuario_id}: {e}")
         msg_erro = (
             "Ocorreu um erro ao processar a imagem. "
@@ -423,6 +450,10 @@ async def post_atualizar_foto(
             "/usuario/perfil/visualizar", status_code=status.HTTP_303_SEE_OTHER
         )
 
+    finally:
+        if arquivo is not None:
+            arquivo.unlink(missing_ok=True)
+
 
 # =============================================================================
 # Rotas de Visualização para Professor
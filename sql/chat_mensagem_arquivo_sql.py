@@ -0,0 +1,69 @@
+"""
+SQL statements para a tabela chat_mensagem_arquivo.
+Armazena mensagens antigas do chat em blocos por sala e dia,
+opcionalmente comprimidos com zlib, mantendo chat_mensagem pequena.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS chat_mensagem_arquivo (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sala_id TEXT NOT NULL,
+    dia TEXT NOT NULL,
+    primeiro_id INTEGER NOT NULL,
+    ultimo_id INTEGER NOT NULL,
+    quantidade INTEGER NOT NULL,
+    comprimido INTEGER NOT NULL DEFAULT 0,
+    dados BLOB NOT NULL,
+    arquivado_em TIMESTAMP NOT NULL,
+    FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE
+)
+"""
+
+INSERIR = """
+INSERT INTO chat_mensagem_arquivo
+    (sala_id, dia, primeiro_id, ultimo_id, quantidade, comprimido, dados, arquivado_em)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Blocos com mensagens anteriores ao cursor, do mais recente para o mais antigo
+LISTAR_BLOCOS_ANTES_DE = """
+SELECT id, sala_id, primeiro_id, ultimo_id, comprimido, dados
+FROM chat_mensagem_arquivo
+WHERE sala_id = ? AND primeiro_id < ?
+ORDER BY ultimo_id DESC
+"""
+
+# Blocos com mensagens posteriores ao cursor, do mais antigo para o mais recente
+LISTAR_BLOCOS_DEPOIS_DE = """
+SELECT id, sala_id, primeiro_id, ultimo_id, comprimido, dados
+FROM chat_mensagem_arquivo
+WHERE sala_id = ? AND ultimo_id > ?
+ORDER BY primeiro_id ASC
+"""
+
+CONTAR_POR_SALA = """
+SELECT COALESCE(SUM(quantidade), 0) as total
+FROM chat_mensagem_arquivo
+WHERE sala_id = ?
+"""
+
+# Mensagens elegíveis para arquivamento, em ordem de ID (as mais antigas primeiro)
+SELECIONAR_LOTE_PARA_ARQUIVAR = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, data_atualizacao, lida_em
+FROM chat_mensagem
+WHERE data_envio < ?
+ORDER BY id ASC
+LIMIT ?
+"""
+
+EXCLUIR_MENSAGEM_ARQUIVADA = """
+DELETE FROM chat_mensagem
+WHERE id = ?
+"""
+
+ESTATISTICAS = """
+SELECT COUNT(*) as blocos,
+       COALESCE(SUM(quantidade), 0) as mensagens,
+       COALESCE(SUM(LENGTH(dados)), 0) as bytes
+FROM chat_mensagem_arquivo
+"""
@@ -23,17 +23,37 @@ VALUES (?, ?, ?, ?, ?)
 """
 
 OBTER_POR_ID = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], data_atualizacao[timestamp], lida_em[timestamp]
+SELECT id, sala_id, usuario_id, mensagem, data_envio, data_atualizacao, lida_em
 FROM chat_mensagem
 WHERE id = ?
 """
 
+# Paginação por cursor (keyset) sobre o índice (sala_id, id).
+# Páginas retornam da mais recente para a mais antiga.
 LISTAR_POR_SALA = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], data_atualizacao[timestamp], lida_em[timestamp]
+SELECT id, sala_id, usuario_id, mensagem, data_envio, data_atualizacao, lida_em
 FROM chat_mensagem
 WHERE sala_id = ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+LISTAR_POR_SALA_ANTES_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, data_atualizacao, lida_em
+FROM chat_mensagem
+WHERE sala_id = ? AND id < ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+# Mensagens posteriores ao cursor em ordem crescente, para não pular lacunas;
+# o repositório inverte o resultado para manter a ordem mais recente primeiro.
+LISTAR_POR_SALA_DEPOIS_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, data_atualizacao, lida_em
+FROM chat_mensagem
+WHERE sala_id = ? AND id > ?
 ORDER BY id ASC
-LIMIT ? OFFSET ?
+LIMIT ?
 """
 
 CONTAR_POR_SALA = """
@@ -51,7 +71,7 @@ WHERE sala_id = ?
 """
 
 OBTER_ULTIMA_MENSAGEM_SALA = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], data_atualizacao[timestamp], lida_em[timestamp]
+SELECT id, sala_id, usuario_id, mensagem, data_envio, data_atualizacao, lida_em
 FROM chat_mensagem
 WHERE sala_id = ?
 ORDER BY id DESC
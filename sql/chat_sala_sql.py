@@ -17,7 +17,7 @@ VALUES (?, ?, ?)
 """
 
 OBTER_POR_ID = """
-SELECT id, criada_em[timestamp], ultima_atividade[timestamp]
+SELECT id, criada_em, ultima_atividade
 FROM chat_sala
 WHERE id = ?
 """
@@ -20,3 +20,28 @@ SET valor = ?,
     data_atualizacao = CURRENT_TIMESTAMP
 WHERE chave = ?
 """
+
+# Versão das configurações: linha única incrementada por gatilhos a cada
+# INSERT/UPDATE/DELETE em configuracao. Os workers comparam com a versão do
+# seu snapshot para saber quando recarregar.
+CRIAR_TABELA_VERSAO = """
+CREATE TABLE IF NOT EXISTS configuracao_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versao INTEGER NOT NULL
+)
+"""
+
+INICIALIZAR_VERSAO = "INSERT OR IGNORE INTO configuracao_versao (id, versao) VALUES (1, 0)"
+
+CRIAR_GATILHOS_VERSAO = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS configuracao_versao_{operacao.lower()}
+    AFTER {operacao} ON configuracao
+    BEGIN
+        UPDATE configuracao_versao SET versao = versao + 1 WHERE id = 1;
+    END
+    """
+    for operacao in ("INSERT", "UPDATE", "DELETE")
+]
+
+OBTER_VERSAO = "SELECT versao FROM configuracao_versao WHERE id = 1"
@@ -0,0 +1,91 @@
+"""
+SQL statements para a tabela email_saida.
+Fila de saída de e-mails: as rotas inserem, e o job de envio reserva lotes
+(status Enviando), envia e registra o resultado. A reserva é um único
+UPDATE ... RETURNING, então dois workers nunca enviam o mesmo e-mail.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS email_saida (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    para_email TEXT NOT NULL,
+    para_nome TEXT NOT NULL,
+    assunto TEXT NOT NULL,
+    html TEXT NOT NULL,
+    texto TEXT,
+    status TEXT NOT NULL DEFAULT 'Pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa TIMESTAMP NOT NULL,
+    reservado_em TIMESTAMP,
+    ultimo_erro TEXT,
+    id_externo TEXT,
+    criado_em TIMESTAMP NOT NULL,
+    enviado_em TIMESTAMP
+)
+"""
+
+CRIAR_INDICE_FILA = """
+CREATE INDEX IF NOT EXISTS idx_email_saida_fila ON email_saida(status, proxima_tentativa)
+"""
+
+INSERIR = """
+INSERT INTO email_saida (para_email, para_nome, assunto, html, texto, status, proxima_tentativa, criado_em)
+VALUES (?, ?, ?, ?, ?, 'Pendente', ?, ?)
+"""
+
+# Reserva os próximos e-mails prontos para envio
+RESERVAR_LOTE = """
+UPDATE email_saida
+SET status = 'Enviando', reservado_em = ?
+WHERE id IN (
+    SELECT id FROM email_saida
+    WHERE status = 'Pendente' AND proxima_tentativa <= ?
+    ORDER BY proxima_tentativa, id
+    LIMIT ?
+)
+RETURNING *
+"""
+
+# Reservas abandonadas (processo encerrado durante o envio) voltam para a fila
+LIBERAR_RESERVAS_ANTIGAS = """
+UPDATE email_saida
+SET status = 'Pendente'
+WHERE status = 'Enviando' AND reservado_em < ?
+"""
+
+MARCAR_ENVIADO = """
+UPDATE email_saida
+SET status = 'Enviado', tentativas = tentativas + 1, enviado_em = ?, id_externo = ?,
+    ultimo_erro = NULL
+WHERE id = ?
+"""
+
+REAGENDAR = """
+UPDATE email_saida
+SET status = 'Pendente', tentativas = tentativas + 1, proxima_tentativa = ?, ultimo_erro = ?
+WHERE id = ?
+"""
+
+MARCAR_FALHOU = """
+UPDATE email_saida
+SET status = 'Falhou', tentativas = tentativas + 1, ultimo_erro = ?
+WHERE id = ?
+"""
+
+OBTER_POR_ID = """
+SELECT *
+FROM email_saida
+WHERE id = ?
+"""
+
+CONTAR_POR_STATUS = """
+SELECT status, COUNT(*) AS total
+FROM email_saida
+GROUP BY status
+"""
+
+# E-mails enviados guardam tokens de redefinição: não ficam para sempre
+EXCLUIR_ENVIADOS_ANTES = """
+DELETE FROM email_saida
+WHERE status = 'Enviado' AND enviado_em < ?
+"""
@@ -28,9 +28,16 @@ ON chamado_interacao(chamado_id)
 """
 
 # Índices da tabela chat_mensagem
+# Composto (sala_id, id) para paginação por cursor (keyset) do histórico
 CRIAR_INDICE_CHAT_MENSAGEM_SALA = """
-CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala_id
-ON chat_mensagem(sala_id)
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala_id_id
+ON chat_mensagem(sala_id, id)
+"""
+
+# Índices da tabela chat_mensagem_arquivo
+CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_SALA = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_arquivo_sala_ultimo_id
+ON chat_mensagem_arquivo(sala_id, ultimo_id)
 """
 
 # Índices da tabela chat_participante
@@ -41,6 +48,12 @@ CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario_id
 ON chat_participante(usuario_id)
 """
 
+# Índice de cobertura para SUM(nao_lidas) por usuário (total de não lidas)
+CRIAR_INDICE_CHAT_PARTICIPANTE_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario_nao_lidas
+ON chat_participante(usuario_id, nao_lidas)
+"""
+
 # Índices da tabela atividade
 CRIAR_INDICE_ATIVIDADE_CATEGORIA = """
 CREATE INDEX IF NOT EXISTS idx_atividade_categoria
@@ -59,7 +72,9 @@ TODOS_INDICES = [
     CRIAR_INDICE_INTERACAO_CHAMADO,
     # Chat
     CRIAR_INDICE_CHAT_MENSAGEM_SALA,
+    CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_SALA,
     CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO,
+    CRIAR_INDICE_CHAT_PARTICIPANTE_NAO_LIDAS,
     # Atividade
     CRIAR_INDICE_ATIVIDADE_CATEGORIA,
 ]
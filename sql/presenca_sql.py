@@ -0,0 +1,85 @@
+"""
+SQL statements para a tabela presenca.
+Guarda o último heartbeat de cada usuário conectado ao chat. A tabela é
+compartilhada por todos os workers, que usam alterado_em para descobrir
+mudanças de presença feitas pelos outros processos.
+
+conexoes conta os streams SSE abertos do usuário somando todos os workers:
+o usuário só fica offline na desconexão quando o total chega a 0.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS presenca (
+    usuario_id INTEGER PRIMARY KEY,
+    online INTEGER NOT NULL DEFAULT 0,
+    conexoes INTEGER NOT NULL DEFAULT 0,
+    ultimo_acesso TIMESTAMP NOT NULL,
+    alterado_em TIMESTAMP NOT NULL,
+    FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
+)
+"""
+
+OBTER_ONLINE = """
+SELECT online, conexoes
+FROM presenca
+WHERE usuario_id = ?
+"""
+
+# Heartbeat: atualiza ultimo_acesso e só move alterado_em quando o usuário estava offline
+REGISTRAR_HEARTBEAT = """
+INSERT INTO presenca (usuario_id, online, ultimo_acesso, alterado_em)
+VALUES (?, 1, ?, ?)
+ON CONFLICT(usuario_id) DO UPDATE SET
+    ultimo_acesso = excluded.ultimo_acesso,
+    alterado_em = CASE WHEN presenca.online = 1
+                       THEN presenca.alterado_em
+                       ELSE excluded.alterado_em END,
+    online = 1
+"""
+
+# Abertura de um stream SSE: heartbeat + uma conexão a mais
+REGISTRAR_CONEXAO = """
+INSERT INTO presenca (usuario_id, online, conexoes, ultimo_acesso, alterado_em)
+VALUES (?, 1, 1, ?, ?)
+ON CONFLICT(usuario_id) DO UPDATE SET
+    ultimo_acesso = excluded.ultimo_acesso,
+    alterado_em = CASE WHEN presenca.online = 1
+                       THEN presenca.alterado_em
+                       ELSE excluded.alterado_em END,
+    online = 1,
+    conexoes = presenca.conexoes + 1
+"""
+
+# Fechamento de um stream SSE: offline só ao fechar a última conexão (de qualquer worker).
+# No SET, as colunas à direita têm os valores anteriores ao UPDATE.
+REGISTRAR_DESCONEXAO = """
+UPDATE presenca
+SET conexoes = MAX(conexoes - 1, 0),
+    online = CASE WHEN conexoes <= 1 THEN 0 ELSE online END,
+    ultimo_acesso = ?,
+    alterado_em = CASE WHEN online = 1 AND conexoes <= 1 THEN ? ELSE alterado_em END
+WHERE usuario_id = ?
+"""
+
+# Usuários cujo heartbeat venceu o TTL (conexão perdida sem desconexão limpa, ex:
+# worker encerrado): sem heartbeat, nenhuma conexão está viva e o contador é zerado
+EXPIRAR = """
+UPDATE presenca
+SET online = 0, conexoes = 0, alterado_em = ?
+WHERE online = 1 AND ultimo_acesso < ?
+RETURNING usuario_id
+"""
+
+# Placeholders do IN são montados pelo repositório conforme a quantidade de IDs
+OBTER_POR_USUARIOS = """
+SELECT usuario_id, online, ultimo_acesso, alterado_em
+FROM presenca
+WHERE usuario_id IN ({placeholders})
+"""
+
+LISTAR_ALTERADOS_DESDE = """
+SELECT usuario_id, online, ultimo_acesso, alterado_em
+FROM presenca
+WHERE alterado_em > ?
+ORDER BY alterado_em ASC
+"""
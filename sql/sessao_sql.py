@@ -0,0 +1,59 @@
+"""
+SQL statements para a tabela sessao.
+Guarda as sessões do servidor (util/sessao_servidor.py): o cookie do
+navegador leva apenas o ID, e os dados (usuário logado, mensagens flash,
+token CSRF) ficam aqui em JSON. usuario_id permite revogar todas as
+sessões de um usuário.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS sessao (
+    id TEXT PRIMARY KEY,
+    dados TEXT NOT NULL,
+    usuario_id INTEGER,
+    expira_em TIMESTAMP NOT NULL,
+    atualizada_em TIMESTAMP NOT NULL
+)
+"""
+
+CRIAR_INDICE_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_sessao_usuario ON sessao(usuario_id)
+"""
+
+CRIAR_INDICE_EXPIRA_EM = """
+CREATE INDEX IF NOT EXISTS idx_sessao_expira_em ON sessao(expira_em)
+"""
+
+OBTER_POR_ID = """
+SELECT id, dados, usuario_id, expira_em, atualizada_em
+FROM sessao
+WHERE id = ? AND expira_em > ?
+"""
+
+INSERIR = """
+INSERT INTO sessao (id, dados, usuario_id, expira_em, atualizada_em)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+# Sem upsert: uma sessão excluída (logout, revogação) não pode ser recriada
+# por uma requisição que a carregou antes da exclusão
+ATUALIZAR = """
+UPDATE sessao
+SET dados = ?, usuario_id = ?, expira_em = ?, atualizada_em = ?
+WHERE id = ?
+"""
+
+EXCLUIR = """
+DELETE FROM sessao
+WHERE id = ?
+"""
+
+EXCLUIR_POR_USUARIO = """
+DELETE FROM sessao
+WHERE usuario_id = ? AND id <> ?
+"""
+
+EXCLUIR_EXPIRADAS = """
+DELETE FROM sessao
+WHERE expira_em <= ?
+"""
@@ -11,6 +11,7 @@ CREATE TABLE IF NOT EXISTS usuario (
     confirmado INTEGER DEFAULT 1,
     token_redefinicao TEXT,
     data_token TIMESTAMP,
+    foto TEXT,
     data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 )
@@ -37,6 +38,13 @@ EXCLUIR = "DELETE FROM usuario WHERE id = ?"
 
 OBTER_POR_ID = "SELECT * FROM usuario WHERE id = ?"
 
+# Ponteiro da foto de perfil (hash do arquivo em static/img/fotos; NULL = foto padrão)
+ATUALIZAR_FOTO = "UPDATE usuario SET foto = ? WHERE id = ?"
+
+OBTER_FOTO = "SELECT foto FROM usuario WHERE id = ?"
+
+OBTER_FOTOS_REFERENCIADAS = "SELECT DISTINCT foto FROM usuario WHERE foto IS NOT NULL"
+
 OBTER_TODOS = "SELECT * FROM usuario ORDER BY nome"
 
 OBTER_QUANTIDADE = "SELECT COUNT(*) as quantidade FROM usuario"
@@ -68,7 +76,7 @@ ORDER BY nome
 
 BUSCAR_POR_TERMO = """
 SELECT id, nome, email, senha, perfil,
-       token_redefinicao, data_token,
+       token_redefinicao, data_token, foto,
        data_cadastro[timestamp], data_atualizacao[timestamp]
 FROM usuario
 WHERE (LOWER(nome) LIKE LOWER(?) OR LOWER(email) LIKE LOWER(?))
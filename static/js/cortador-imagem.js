@@ -223,7 +223,7 @@ function inicializarCortadorImagem(modalId, aspectRatio = 1.0, maxFileSizeMB = 5
     const cropperImage = document.getElementById(`cropper-image-${modalId}`);
     const previewImage = document.getElementById(`preview-${modalId}`);
     const btnSubmit = document.getElementById(`btn-submit-${modalId}`);
-    const fotoBase64Input = document.getElementById(`foto-base64-${modalId}`);
+    const fotoArquivoInput = document.getElementById(`foto-arquivo-${modalId}`);
     const form = document.getElementById(`form-${modalId}`);
 
     if (!cropperContainer || !cropperImage) {
@@ -260,14 +260,24 @@ function inicializarCortadorImagem(modalId, aspectRatio = 1.0, maxFileSizeMB = 5
                 imageSmoothingQuality: 'high'
             });
 
-            // Converter para base64 (JPEG com qualidade 90)
-            const base64 = canvas.toDataURL('image/jpeg', 0.9);
+            // Converter para JPEG binario (qualidade 90): sem os 33% extras
+            // do base64 e sem copias da imagem em string
+            if (btnSubmit) btnSubmit.disabled = true;
+            canvas.toBlob(function(blob) {
+                if (!blob) {
+                    if (btnSubmit) btnSubmit.disabled = false;
+                    window.App.Modal.showWarning('Nao foi possivel processar a imagem. Tente novamente.', 'Erro na Imagem');
+                    return;
+                }
 
-            // Definir no campo hidden
-            fotoBase64Input.value = base64;
+                // Colocar o arquivo no campo oculto (multipart/form-data)
+                const transferencia = new DataTransfer();
+                transferencia.items.add(new File([blob], 'foto.jpg', { type: 'image/jpeg' }));
+                fotoArquivoInput.files = transferencia.files;
 
-            // Submeter formulario
-            form.submit();
+                // Submeter formulario
+                form.submit();
+            }, 'image/jpeg', 0.9);
         });
     }
 
@@ -9,7 +9,7 @@ const chatWidget = (() => {
     let conversaAtual = null;
     let conversasOffset = 0;
     let debounceTimer = null;
-    let mensagensOffset = 0;
+    let cursorMensagens = null;
     let carregandoMensagens = false;
     let todasMensagensCarregadas = false;
 
@@ -97,9 +97,21 @@ const chatWidget = (() => {
         } else if (mensagem.tipo === 'atualizar_contador') {
             // Atualizar contador de não lidas
             atualizarContadorNaoLidas();
+        } else if (mensagem.tipo === 'presenca') {
+            // Atualizar indicador online do contato (sem recarregar a lista)
+            atualizarPresenca(mensagem.usuario_id, mensagem.online);
         }
     }
 
+    /**
+     * Atualiza o indicador de presença de um usuário na lista de conversas
+     */
+    function atualizarPresenca(usuarioId, online) {
+        elementos.conversationsList
+            .querySelectorAll(`.chat-presence-dot[data-usuario-id="${usuarioId}"]`)
+            .forEach(indicador => indicador.classList.toggle('online', online));
+    }
+
     /**
      * Carrega lista de conversas
      */
@@ -138,11 +150,23 @@ const chatWidget = (() => {
             const foto = document.createElement('img');
             foto.src = conversa.outro_usuario.foto_url;
             foto.alt = conversa.outro_usuario.nome;
-            foto.className = 'rounded-circle me-2';
+            foto.className = 'rounded-circle';
             foto.style.width = '40px';
             foto.style.height = '40px';
             foto.style.objectFit = 'cover';
 
+            // Foto com indicador de presença (atualizado via SSE)
+            const avatar = document.createElement('div');
+            avatar.className = 'chat-avatar position-relative me-2';
+            const presenca = document.createElement('span');
+            presenca.className = 'chat-presence-dot';
+            presenca.setAttribute('data-usuario-id', conversa.outro_usuario.id);
+            if (conversa.outro_usuario.online) {
+                presenca.classList.add('online');
+            }
+            avatar.appendChild(foto);
+            avatar.appendChild(presenca);
+
             // Conteúdo
             const content = document.createElement('div');
             content.className = 'flex-grow-1 overflow-hidden';
@@ -165,11 +189,11 @@ const chatWidget = (() => {
                 const badge = document.createElement('span');
                 badge.className = 'badge bg-danger rounded-pill ms-2';
                 badge.textContent = conversa.nao_lidas;
-                item.appendChild(foto);
+                item.appendChild(avatar);
                 item.appendChild(content);
                 item.appendChild(badge);
             } else {
-                item.appendChild(foto);
+                item.appendChild(avatar);
                 item.appendChild(content);
             }
 
@@ -315,7 +339,7 @@ const chatWidget = (() => {
         conversaAtual = conversa;
 
         // Resetar estado de paginação
-        mensagensOffset = 0;
+        cursorMensagens = null;
         todasMensagensCarregadas = false;
 
         // Marcar como ativa na lista
@@ -351,44 +375,46 @@ const chatWidget = (() => {
 
         try {
             const limit = 24;
-            const response = await fetch(`/chat/mensagens/${salaId}?limit=${limit}&offset=${mensagensOffset}`);
-            const mensagens = await response.json();
-
-            // Se retornou menos que o limite, não há mais mensagens
-            if (mensagens.length < limit) {
+            let url = `/chat/mensagens/${salaId}?limit=${limit}`;
+            if (!inicial && cursorMensagens !== null) {
+                url += `&before_id=${cursorMensagens}`;
+            }
+            const response = await fetch(url);
+            const pagina = await response.json();
+            // Mensagens vêm da mais recente para a mais antiga
+            const mensagens = pagina.mensagens;
+
+            // Sem cursor, não há mais mensagens antigas
+            cursorMensagens = pagina.proximo_cursor;
+            if (cursorMensagens === null) {
                 todasMensagensCarregadas = true;
             }
 
             if (inicial) {
                 elementos.messagesContainer.innerHTML = '';
-                mensagensOffset = 0;
             }
 
             // Salvar posição de scroll antes de adicionar
             const alturaAntes = elementos.messagesContainer.scrollHeight;
             const scrollAntes = elementos.messagesContainer.scrollTop;
 
-            // Renderizar mensagens na ordem (mais antigas primeiro)
             if (inicial) {
-                // Carregamento inicial: adicionar no final
-                mensagens.forEach(msg => renderizarMensagem(msg, false));
+                // Carregamento inicial: adicionar no final, mais antigas primeiro
+                for (let i = mensagens.length - 1; i >= 0; i--) {
+                    renderizarMensagem(mensagens[i], false);
+                }
 
                 // Scroll para o final (mensagens mais recentes)
                 elementos.messagesContainer.scrollTop = elementos.messagesContainer.scrollHeight;
             } else {
                 // Carregamento paginado: adicionar no início (prepend)
-                // Inverter ordem para adicionar corretamente
-                for (let i = mensagens.length - 1; i >= 0; i--) {
-                    renderizarMensagem(mensagens[i], true);
-                }
+                // Na ordem recebida, a mais antiga termina no topo
+                mensagens.forEach(msg => renderizarMensagem(msg, true));
 
                 // Manter posição de scroll relativa
                 const alturaDepois = elementos.messagesContainer.scrollHeight;
                 elementos.messagesContainer.scrollTop = scrollAntes + (alturaDepois - alturaAntes);
             }
-
-            mensagensOffset += mensagens.length;
-
         } catch (error) {
             console.error('[Chat] Erro ao carregar mensagens:', error);
         } finally {
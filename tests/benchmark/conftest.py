@@ -0,0 +1,20 @@
+"""
+Configuração dos benchmarks.
+
+Benchmarks medem vazão e latência de caminhos críticos (um worker, banco
+de teste) e imprimem os resultados. As asserções são apenas limites
+mínimos de sanidade, para não falhar em máquinas lentas.
+
+Ficam fora da execução padrão (addopts do pytest.ini tem -m "not benchmark").
+Executar apenas os benchmarks:
+    pytest tests/benchmark -m benchmark
+"""
+import pytest
+
+
+def pytest_collection_modifyitems(items):
+    """Adiciona as marcas 'benchmark' e 'slow' a todos os testes nesta pasta."""
+    for item in items:
+        if "benchmark" in str(item.fspath):
+            item.add_marker(pytest.mark.benchmark)
+            item.add_marker(pytest.mark.slow)
@@ -0,0 +1,157 @@
+"""
+Benchmark do backup online (util/backup_util.py).
+
+Com um banco de algumas dezenas de MB, mede:
+- o tempo de resposta de POST /admin/backups/criar (o backup roda em
+  segundo plano) comparado à duração da cópia
+- a maior espera de uma escrita concorrente durante a cópia, com a cópia
+  em passos (BACKUP_PAGINAS_POR_PASSO) e em um passo único (o banco fica
+  bloqueado para escrita do início ao fim)
+- o tamanho do backup completo comprimido e do incremental
+- a listagem com centenas de backups: a primeira (que registra os arquivos
+  no manifesto) e as seguintes (só leem o manifesto)
+"""
+import sqlite3
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from util import backup_util
+
+TOTAL_LINHAS = 200_000
+TAMANHO_LINHA = 150
+TOTAL_BACKUPS_LISTAGEM = 500
+
+
+@pytest.fixture
+def banco_grande(tmp_path):
+    """Banco com TOTAL_LINHAS linhas e diretório de backups temporários."""
+    db_path = tmp_path / "grande.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("CREATE TABLE registro (id INTEGER PRIMARY KEY, dados TEXT)")
+    conn.executemany(
+        "INSERT INTO registro (dados) VALUES (?)",
+        (("x" * TAMANHO_LINHA,) for _ in range(TOTAL_LINHAS)),
+    )
+    conn.commit()
+    conn.close()
+    print(f"\n[Benchmark] banco: {db_path.stat().st_size / (1024 * 1024):.1f} MB")
+
+    with patch("util.backup_util.DATABASE_PATH", str(db_path)), \
+            patch("util.backup_util.BACKUP_DIR", tmp_path / "backups"):
+        yield db_path
+
+
+def _espera_maxima_escrita(db_path, paginas_por_passo: int) -> tuple:
+    """Executa um backup enquanto outra conexão escreve; retorna (duração, maior espera) em ms."""
+    esperas = []
+    terminou = threading.Event()
+
+    def escrever():
+        conn = sqlite3.connect(str(db_path), timeout=30)
+        while not terminou.is_set():
+            inicio = time.perf_counter()
+            conn.execute("UPDATE registro SET dados = dados WHERE id = 1")
+            conn.commit()
+            esperas.append(time.perf_counter() - inicio)
+            time.sleep(0.005)
+        conn.close()
+
+    escritor = threading.Thread(target=escrever)
+    escritor.start()
+    inicio = time.perf_counter()
+    with patch("util.backup_util.BACKUP_PAGINAS_POR_PASSO", paginas_por_passo):
+        sucesso, _ = backup_util.criar_backup()
+    duracao = time.perf_counter() - inicio
+    terminou.set()
+    escritor.join()
+
+    assert sucesso
+    return duracao * 1000, max(esperas) * 1000
+
+
+class TestBenchmarkBackup:
+    """Tempo de resposta e impacto do backup nas escritas"""
+
+    def test_rota_responde_antes_da_copia(self, admin_autenticado, banco_grande):
+        """A rota só inicia o backup; a cópia termina depois"""
+        inicio = time.perf_counter()
+        response = admin_autenticado.post("/admin/backups/criar", follow_redirects=False)
+        resposta_ms = (time.perf_counter() - inicio) * 1000
+        assert response.status_code == 303
+
+        assert backup_util.aguardar_backup(timeout=120)
+        progresso = backup_util.obter_progresso_backup()
+        copia_ms = (progresso.concluido_em - progresso.iniciado_em).total_seconds() * 1000
+
+        print(
+            f"\n[Benchmark] POST /admin/backups/criar: {resposta_ms:.0f} ms | "
+            f"cópia em segundo plano: {copia_ms:.0f} ms ({progresso.paginas_total} páginas)"
+        )
+        assert progresso.sucesso
+
+    def test_escritas_durante_o_backup(self, banco_grande):
+        """Em passos, as escritas esperam um passo; em passo único, a cópia toda"""
+        passos_ms, espera_passos_ms = _espera_maxima_escrita(banco_grande, backup_util.BACKUP_PAGINAS_POR_PASSO)
+        unico_ms, espera_unico_ms = _espera_maxima_escrita(banco_grande, -1)
+
+        print(
+            f"\n[Benchmark] backup em passos de {backup_util.BACKUP_PAGINAS_POR_PASSO} páginas: "
+            f"{passos_ms:.0f} ms, maior espera de escrita {espera_passos_ms:.1f} ms"
+            f"\n[Benchmark] backup em passo único: {unico_ms:.0f} ms, "
+            f"maior espera de escrita {espera_unico_ms:.1f} ms"
+        )
+        assert espera_passos_ms < espera_unico_ms
+
+    def test_tamanho_completo_e_incremental(self, banco_grande):
+        """O incremental grava só as páginas alteradas desde o completo"""
+        with patch("util.backup_util.BACKUP_PAUSA_MS", 0):
+            inicio = time.perf_counter()
+            backup_util.criar_backup()
+            completo_ms = (time.perf_counter() - inicio) * 1000
+
+            conn = sqlite3.connect(str(banco_grande))
+            conn.execute("UPDATE registro SET dados = 'alterado' WHERE id % 1000 = 0")
+            conn.commit()
+            conn.close()
+
+            inicio = time.perf_counter()
+            _, mensagem = backup_util.criar_backup(incremental=True)
+            incremental_ms = (time.perf_counter() - inicio) * 1000
+
+        completo, incremental = sorted(backup_util.listar_backups(), key=lambda b: b.incremental)
+        print(
+            f"\n[Benchmark] banco {completo.tamanho_banco_bytes / (1024 * 1024):.1f} MB | "
+            f"completo ({completo.compressao}): {completo.tamanho_formatado} em {completo_ms:.0f} ms | "
+            f"incremental: {incremental.tamanho_formatado} em {incremental_ms:.0f} ms"
+            f"\n[Benchmark] {mensagem}"
+        )
+        assert incremental.incremental_de == completo.nome_arquivo
+        assert incremental.tamanho_bytes < completo.tamanho_bytes
+
+    def test_listagem_com_centenas_de_backups(self, tmp_path):
+        """Depois de registrados no manifesto, os arquivos não são lidos na listagem"""
+        pasta = tmp_path / "backups"
+        pasta.mkdir()
+        for i in range(TOTAL_BACKUPS_LISTAGEM):
+            (pasta / f"backup_2025-01-01_00-00-{i:05d}.db.gz").write_bytes(b"x" * 1024)
+
+        with patch("util.backup_util.BACKUP_DIR", pasta):
+            inicio = time.perf_counter()
+            backup_util.listar_backups()
+            primeira_ms = (time.perf_counter() - inicio) * 1000
+
+            tempos = []
+            for _ in range(10):
+                inicio = time.perf_counter()
+                backups = backup_util.listar_backups()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+
+        print(
+            f"\n[Benchmark] listagem de {TOTAL_BACKUPS_LISTAGEM} backups: "
+            f"primeira (registro no manifesto) {primeira_ms:.1f} ms | "
+            f"seguintes {min(tempos):.1f} ms"
+        )
+        assert len(backups) == TOTAL_BACKUPS_LISTAGEM
@@ -0,0 +1,75 @@
+"""
+Benchmark do envio de mensagens do chat.
+
+Mede mensagens por segundo em um único worker:
+- pela rota POST /chat/mensagens (validação, cache de participação,
+  transação única de gravação e broadcast SSE após a resposta)
+- direto no repositório (apenas a transação de gravação)
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from repo import chat_mensagem_repo
+from util.chat_manager import gerenciador_chat
+
+TOTAL_MENSAGENS = 200
+
+
+@pytest.fixture
+def sala_benchmark(client, fazer_login, criar_usuario_direto):
+    """Cria dois usuários, loga o primeiro e abre a sala entre eles."""
+    usuario1_id = criar_usuario_direto(
+        nome="Bench Chat 1", email="bench1@teste.com", senha="Teste@123"
+    )
+    usuario2_id = criar_usuario_direto(
+        nome="Bench Chat 2", email="bench2@teste.com", senha="Teste@123"
+    )
+    fazer_login("bench1@teste.com", "Teste@123")
+    sala_id = client.post("/chat/salas", data={"outro_usuario_id": usuario2_id}).json()["sala_id"]
+    return client, sala_id, usuario1_id, usuario2_id
+
+
+def _relatar(nome: str, total: int, segundos: float) -> float:
+    """Imprime e retorna a vazão medida."""
+    vazao = total / segundos
+    print(f"\n[Benchmark] {nome}: {total} mensagens em {segundos:.2f}s = {vazao:.0f} msg/s")
+    return vazao
+
+
+class TestBenchmarkEnvioMensagens:
+    """Vazão do envio de mensagens por worker"""
+
+    def test_vazao_rota_envio(self, sala_benchmark):
+        """Mensagens por segundo pela rota, com um destinatário conectado"""
+        client, sala_id, _, usuario2_id = sala_benchmark
+        fila = asyncio.Queue()
+        gerenciador_chat._connections[usuario2_id] = fila
+
+        with patch("routes.chat_routes.chat_mensagem_limiter") as mock_limiter:
+            mock_limiter.verificar.return_value = True
+
+            inicio = time.perf_counter()
+            for i in range(TOTAL_MENSAGENS):
+                response = client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": f"msg {i}"})
+                assert response.status_code == 200
+            duracao = time.perf_counter() - inicio
+
+        vazao = _relatar("rota POST /chat/mensagens", TOTAL_MENSAGENS, duracao)
+        assert fila.qsize() == TOTAL_MENSAGENS
+        assert vazao > 10
+
+    def test_vazao_repositorio(self, sala_benchmark):
+        """Mensagens por segundo na transação de gravação"""
+        _, sala_id, usuario1_id, _ = sala_benchmark
+
+        inicio = time.perf_counter()
+        for i in range(TOTAL_MENSAGENS):
+            chat_mensagem_repo.inserir(sala_id, usuario1_id, f"msg {i}")
+        duracao = time.perf_counter() - inicio
+
+        vazao = _relatar("chat_mensagem_repo.inserir", TOTAL_MENSAGENS, duracao)
+        assert chat_mensagem_repo.contar_por_sala(sala_id) == TOTAL_MENSAGENS
+        assert vazao > 50
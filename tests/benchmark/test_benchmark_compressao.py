@@ -0,0 +1,87 @@
+"""
+Benchmark da compressão de respostas (util/compressao.py).
+
+Mede, nas maiores listagens da área administrativa:
+- bytes transferidos com e sem gzip
+- latência da rota com e sem gzip
+- tempo e tamanho de cada nível de compressão sobre o mesmo HTML
+"""
+import gzip
+import time
+from datetime import datetime
+
+import pytest
+
+from model.atividade_model import Atividade
+from model.categoria_model import Categoria
+from repo import atividade_repo, categoria_repo
+
+TOTAL_CATEGORIAS = 50
+TOTAL_ATIVIDADES = 300
+REPETICOES = 30
+
+PAGINAS = ("/admin/categorias/listar", "/admin/atividades/listar")
+
+
+@pytest.fixture
+def admin_com_listagens(admin_autenticado):
+    """Admin logado com listagens grandes de categorias e atividades."""
+    ids = [
+        categoria_repo.inserir(Categoria(0, f"Categoria {i}", f"Descrição da categoria {i}"))
+        for i in range(TOTAL_CATEGORIAS)
+    ]
+    for i in range(TOTAL_ATIVIDADES):
+        atividade_repo.inserir(Atividade(
+            0, ids[i % len(ids)], f"Atividade {i}", f"Descrição detalhada da atividade {i}",
+            datetime.now()
+        ))
+    return admin_autenticado
+
+
+def _medir(client, url: str, accept_encoding: str) -> tuple:
+    """Retorna (bytes do corpo transferido, latência média em ms)."""
+    response = client.get(url, headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    tamanho = response.num_bytes_downloaded
+
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        client.get(url, headers={"Accept-Encoding": accept_encoding})
+    latencia = (time.perf_counter() - inicio) / REPETICOES * 1000
+    return tamanho, latencia
+
+
+class TestBenchmarkCompressao:
+    """Bytes e latência das listagens administrativas"""
+
+    @pytest.mark.parametrize("url", PAGINAS)
+    def test_bytes_e_latencia(self, admin_com_listagens, url):
+        """Compara a mesma página com e sem gzip"""
+        client = admin_com_listagens
+
+        bytes_original, latencia_original = _medir(client, url, "identity")
+        bytes_gzip, latencia_gzip = _medir(client, url, "gzip")
+
+        print(
+            f"\n[Benchmark] {url}: {bytes_original} -> {bytes_gzip} bytes "
+            f"({bytes_gzip / bytes_original:.0%}); "
+            f"{latencia_original:.1f} ms -> {latencia_gzip:.1f} ms por requisição"
+        )
+        assert bytes_gzip < bytes_original / 3
+
+    def test_niveis_de_compressao(self, admin_com_listagens):
+        """Tempo e tamanho por nível, sobre o HTML da maior listagem"""
+        html = admin_com_listagens.get(
+            PAGINAS[-1], headers={"Accept-Encoding": "identity"}
+        ).content
+
+        for nivel in (1, 6, 9):
+            inicio = time.perf_counter()
+            for _ in range(REPETICOES):
+                comprimido = gzip.compress(html, compresslevel=nivel)
+            duracao = (time.perf_counter() - inicio) / REPETICOES * 1000
+            print(
+                f"\n[Benchmark] gzip nível {nivel}: {len(html)} -> {len(comprimido)} bytes "
+                f"em {duracao:.2f} ms"
+            )
+            assert len(comprimido) < len(html)
@@ -0,0 +1,114 @@
+"""
+Benchmark de uma rajada de logins com o chat em uso.
+
+O bcrypt leva centenas de milissegundos por login. Executado no event
+loop, ele atrasa todas as outras requisições e as conexões SSE do chat;
+no pool de senhas, o loop continua livre. O teste dispara logins
+simultâneos e mede, ao mesmo tempo:
+- o atraso do event loop (o que uma conexão SSE sentiria)
+- a latência de GET /chat/health
+
+e compara com o hash executado direto no loop (comportamento anterior).
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+
+from util.pool_senhas import pool_senhas
+from util.security import verificar_e_atualizar_senha
+
+TOTAL_LOGINS = 8
+EMAIL = "rajada@teste.com"
+SENHA = "Teste@123"
+
+
+async def _verificar_no_loop(senha_plana: str, senha_hash: str):
+    """Comportamento anterior: bcrypt executado no próprio event loop."""
+    return verificar_e_atualizar_senha(senha_plana, senha_hash)
+
+
+async def _medir_rajada(app) -> dict:
+    """Dispara os logins e mede o loop e o chat enquanto eles rodam."""
+    atrasos_loop = []
+    latencias_chat = []
+    terminou = asyncio.Event()
+
+    async def sondar_loop():
+        while not terminou.is_set():
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.01)
+            atrasos_loop.append(time.perf_counter() - inicio - 0.01)
+
+    async def usar_chat(cliente):
+        while not terminou.is_set():
+            inicio = time.perf_counter()
+            response = await cliente.get("/chat/health")
+            assert response.status_code == 200
+            latencias_chat.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0.02)
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://testserver") as cliente:
+        sondas = [asyncio.create_task(sondar_loop()), asyncio.create_task(usar_chat(cliente))]
+        inicio = time.perf_counter()
+        respostas = await asyncio.gather(*[
+            cliente.post("/login", data={"email": EMAIL, "senha": SENHA}, follow_redirects=False)
+            for _ in range(TOTAL_LOGINS)
+        ])
+        duracao = time.perf_counter() - inicio
+        terminou.set()
+        await asyncio.gather(*sondas)
+
+    assert all(r.status_code == 303 for r in respostas)
+    return {
+        "duracao": duracao,
+        "atraso_max_ms": max(atrasos_loop) * 1000,
+        "chat_max_ms": max(latencias_chat) * 1000,
+        "chat_requisicoes": len(latencias_chat),
+    }
+
+
+def _relatar(nome: str, resultado: dict) -> None:
+    print(
+        f"\n[Benchmark] {nome}: {TOTAL_LOGINS} logins em {resultado['duracao']:.2f}s | "
+        f"atraso máximo do loop {resultado['atraso_max_ms']:.0f} ms | "
+        f"chat: {resultado['chat_requisicoes']} requisições, máx {resultado['chat_max_ms']:.0f} ms"
+    )
+
+
+class TestBenchmarkRajadaLogin:
+    """Responsividade do chat durante uma rajada de logins"""
+
+    async def test_chat_responsivo_durante_rajada(self, criar_usuario_direto):
+        """Com o pool de senhas, o loop não fica bloqueado pelo bcrypt"""
+        from main import app
+
+        criar_usuario_direto(nome="Rajada", email=EMAIL, senha=SENHA)
+        pool_senhas.limpar_estatisticas()
+
+        with patch("routes.auth_routes.login_limiter") as mock_limiter:
+            mock_limiter.verificar.return_value = True
+
+            with patch("routes.auth_routes.verificar_e_atualizar_senha_async", _verificar_no_loop):
+                no_loop = await _medir_rajada(app)
+            _relatar("bcrypt no event loop", no_loop)
+
+            try:
+                com_pool = await _medir_rajada(app)
+            finally:
+                pool_senhas.encerrar()
+            _relatar(f"bcrypt no pool ({pool_senhas.processos} processo(s))", com_pool)
+
+        verificacao = pool_senhas.obter_estatisticas()["operacoes"]["verificacao"]
+        print(
+            f"[Benchmark] verificação no pool: p50 {verificacao['p50_ms']} ms, "
+            f"p95 {verificacao['p95_ms']} ms, máx {verificacao['max_ms']} ms"
+        )
+
+        assert verificacao["total"] == TOTAL_LOGINS
+        # No loop, cada bcrypt trava tudo por um hash inteiro; no pool, o
+        # atraso fica bem abaixo disso
+        assert com_pool["atraso_max_ms"] < no_loop["atraso_max_ms"] / 2
+        assert com_pool["chat_requisicoes"] > no_loop["chat_requisicoes"]
@@ -0,0 +1,155 @@
+"""
+Benchmark de uploads simultâneos de fotos de perfil.
+
+Decodificar, redimensionar (LANCZOS) e codificar o JPEG com optimize=True
+leva dezenas de milissegundos por foto. Executado no event loop, isso
+atrasa todas as outras requisições; no pool de imagens, o loop continua
+livre. O teste dispara uploads simultâneos e mede, ao mesmo tempo:
+- o atraso do event loop
+- a latência de GET /chat/health
+
+e compara com o processamento direto no loop (comportamento anterior).
+
+O upload é binário (multipart/form-data), como o enviado pelo cortador de
+imagem; o tamanho equivalente em base64 (formato anterior) é exibido para
+comparação.
+"""
+import asyncio
+import base64
+import io
+import time
+from unittest.mock import patch
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+from repo import usuario_repo
+from util.foto_util import _argumentos_processamento, processar_foto_cropada
+from util.pool_imagens import pool_imagens
+
+TOTAL_UPLOADS = 8
+EMAIL = "fotos@teste.com"
+SENHA = "Teste@123"
+BOUNDARY = "benchmarkfoto"
+
+
+def _formulario_foto() -> bytes:
+    """
+    Corpo multipart já codificado com uma foto 1600x1200 com ruído (custosa
+    de decodificar e codificar). Codificado uma vez aqui: o httpx codificaria
+    cada upload no mesmo event loop medido.
+    """
+    imagem = Image.effect_noise((1600, 1200), 64).convert("RGB")
+    buffer = io.BytesIO()
+    imagem.save(buffer, format="JPEG", quality=95)
+    foto = buffer.getvalue()
+    print(
+        f"\n[Benchmark] foto: {len(foto)} bytes em binário, "
+        f"{len(base64.b64encode(foto))} bytes em base64"
+    )
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="foto"; filename="foto.jpg"\r\n'
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + foto + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def _salvar_no_loop(id: int, arquivo: Path) -> str:
+    """Comportamento anterior: processamento executado no próprio event loop."""
+    foto, _ = processar_foto_cropada(*_argumentos_processamento(arquivo))
+    usuario_repo.atualizar_foto(id, foto)
+    return foto
+
+
+async def _medir_uploads(app, formulario: bytes) -> dict:
+    """Dispara os uploads e mede o loop e o chat enquanto eles rodam."""
+    atrasos_loop = []
+    latencias_chat = []
+    terminou = asyncio.Event()
+
+    async def sondar_loop():
+        while not terminou.is_set():
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.01)
+            atrasos_loop.append(time.perf_counter() - inicio - 0.01)
+
+    async def usar_chat(cliente):
+        while not terminou.is_set():
+            inicio = time.perf_counter()
+            response = await cliente.get("/chat/health")
+            assert response.status_code == 200
+            latencias_chat.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0.02)
+
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://testserver") as cliente:
+        await cliente.post("/login", data={"email": EMAIL, "senha": SENHA})
+        sondas = [asyncio.create_task(sondar_loop()), asyncio.create_task(usar_chat(cliente))]
+        inicio = time.perf_counter()
+        respostas = await asyncio.gather(*[
+            cliente.post(
+                "/usuario/perfil/atualizar-foto",
+                content=formulario,
+                headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+                follow_redirects=False,
+            )
+            for _ in range(TOTAL_UPLOADS)
+        ])
+        duracao = time.perf_counter() - inicio
+        terminou.set()
+        await asyncio.gather(*sondas)
+
+    assert all(r.status_code == 303 for r in respostas)
+    return {
+        "duracao": duracao,
+        "atraso_max_ms": max(atrasos_loop) * 1000,
+        "chat_max_ms": max(latencias_chat) * 1000,
+        "chat_requisicoes": len(latencias_chat),
+    }
+
+
+def _relatar(nome: str, resultado: dict) -> None:
+    print(
+        f"\n[Benchmark] {nome}: {TOTAL_UPLOADS} uploads em {resultado['duracao']:.2f}s | "
+        f"atraso máximo do loop {resultado['atraso_max_ms']:.0f} ms | "
+        f"chat: {resultado['chat_requisicoes']} requisições, máx {resultado['chat_max_ms']:.0f} ms"
+    )
+
+
+class TestBenchmarkUploadFotos:
+    """Responsividade do servidor durante uploads simultâneos de fotos"""
+
+    async def test_chat_responsivo_durante_uploads(self, criar_usuario_direto):
+        """Com o pool de imagens, o loop não fica bloqueado pelo Pillow"""
+        from main import app
+
+        criar_usuario_direto(nome="Fotos", email=EMAIL, senha=SENHA)
+        formulario = _formulario_foto()
+        pool_imagens.limpar_estatisticas()
+
+        with patch("routes.usuario_routes.upload_foto_limiter") as mock_limiter, \
+                patch.object(pool_imagens, "max_fila", TOTAL_UPLOADS):
+            mock_limiter.verificar.return_value = True
+
+            with patch("routes.usuario_routes.salvar_foto_cropada_usuario_async", _salvar_no_loop):
+                no_loop = await _medir_uploads(app, formulario)
+            _relatar("Pillow no event loop", no_loop)
+
+            try:
+                com_pool = await _medir_uploads(app, formulario)
+            finally:
+                pool_imagens.encerrar()
+            _relatar(f"Pillow no pool ({pool_imagens.processos} processo(s))", com_pool)
+
+        etapas = pool_imagens.obter_estatisticas()["etapas"]
+        for nome, histograma in etapas.items():
+            print(
+                f"[Benchmark] {nome}: média {histograma['media_ms']} ms, "
+                f"p95 {histograma['p95_ms']} ms, máx {histograma['max_ms']} ms"
+            )
+
+        assert etapas["total"]["total"] == TOTAL_UPLOADS
+        # O corpo binário vai em blocos para o disco e o Pillow roda no pool:
+        # sobra para o loop só a disputa pela CPU com os processos do pool
+        assert com_pool["atraso_max_ms"] < no_loop["atraso_max_ms"] / 4
+        assert com_pool["chat_requisicoes"] > no_loop["chat_requisicoes"]
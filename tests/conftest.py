@@ -78,6 +78,7 @@ def limpar_rate_limiter():
     )
     from routes.public_routes import public_limiter
     from routes.examples_routes import examples_limiter
+    from util.rate_limiter import registro_limiters
 
     # Lista de todos os limiters
     limiters = [
@@ -105,6 +106,7 @@ def limpar_rate_limiter():
     # Limpar antes do teste
     for limiter in limiters:
         limiter.limpar()
+    registro_limiters.limpar_metricas()
 
     yield
 
@@ -127,20 +129,51 @@ def limpar_config_cache():
     config.limpar()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def limpar_cache_fragmentos():
+    """Limpa o cache de fragmentos de templates (o banco é recriado a cada teste)"""
+    from util.cache_fragmentos import cache_fragmentos
+
+    cache_fragmentos.limpar()
+    yield
+    cache_fragmentos.limpar()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def isolar_diretorio_backups(tmp_path, monkeypatch):
+    """Grava backups e manifesto em um diretório temporário, nunca em ./backups"""
+    monkeypatch.setattr("util.backup_util.BACKUP_DIR", tmp_path / "backups")
+
+
+@pytest.fixture(scope="function", autouse=True)
+def aguardar_backup_em_segundo_plano():
+    """Não deixa um backup iniciado por um teste rodando durante o próximo"""
+    yield
+    from util import backup_util
+
+    backup_util.aguardar_backup(timeout=30)
+
+
 @pytest.fixture(scope="function", autouse=True)
 def limpar_chat_manager():
     """Limpa o gerenciador de chat antes de cada teste para evitar interferência"""
     from util.chat_manager import gerenciador_chat
+    from util.presenca import servico_presenca
+    from util.participacao_cache import participacao_cache
 
     # Limpar antes do teste
     gerenciador_chat._connections.clear()
     gerenciador_chat._active_connections.clear()
+    servico_presenca.limpar()
+    participacao_cache.limpar()
 
     yield
 
     # Limpar depois do teste também
     gerenciador_chat._connections.clear()
     gerenciador_chat._active_connections.clear()
+    servico_presenca.limpar()
+    participacao_cache.limpar()
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -148,6 +181,7 @@ def limpar_banco_dados():
     """Limpa todas as tabelas do banco antes de cada teste para evitar interferência"""
     # Importar após configuração do banco de dados
     from util.db_util import obter_conexao
+    from util.sessao_servidor import armazenamento_sessoes
 
     def _limpar_tabelas():
         """Limpa tabelas se elas existirem e reseta autoincrement"""
@@ -156,10 +190,18 @@ def limpar_banco_dados():
             # Verificar se tabelas existem antes de limpar
             cursor.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' "
-                "AND name IN ('chamado', 'chamado_interacao', 'usuario', 'configuracao')"
+                "AND name IN ('chamado', 'chamado_interacao', 'usuario', 'configuracao', "
+                "'chat_mensagem_arquivo', 'chat_sala', 'sessao', 'email_saida')"
             )
             tabelas_existentes = [row[0] for row in cursor.fetchall()]
 
+            # Salas de chat não dependem de usuario: limpar explicitamente
+            # (mensagens e participantes são removidos em cascata)
+            if "chat_mensagem_arquivo" in tabelas_existentes:
+                cursor.execute("DELETE FROM chat_mensagem_arquivo")
+            if "chat_sala" in tabelas_existentes:
+                cursor.execute("DELETE FROM chat_sala")
+
             # Limpar apenas tabelas que existem (respeitando foreign keys)
             # Limpar chamado_interacao antes de chamado (devido à FK)
             if "chamado_interacao" in tabelas_existentes:
@@ -170,6 +212,10 @@ def limpar_banco_dados():
                 cursor.execute("DELETE FROM usuario")
             if "configuracao" in tabelas_existentes:
                 cursor.execute("DELETE FROM configuracao")
+            if "sessao" in tabelas_existentes:
+                cursor.execute("DELETE FROM sessao")
+            if "email_saida" in tabelas_existentes:
+                cursor.execute("DELETE FROM email_saida")
 
             # Resetar autoincrement (limpar sqlite_sequence se existir)
             cursor.execute(
@@ -180,6 +226,9 @@ def limpar_banco_dados():
 
             conn.commit()
 
+        # Sessões em memória espelham a tabela sessao
+        armazenamento_sessoes.limpar()
+
     # Limpar antes do teste
     _limpar_tabelas()
 
@@ -363,6 +412,20 @@ def foto_teste_base64():
     )
 
 
+@pytest.fixture
+def foto_teste_jpeg():
+    """
+    Retorna uma imagem JPEG 64x64 em bytes
+    Útil para testes de upload binário (multipart) de foto
+    """
+    from PIL import Image
+    import io
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 80, 40)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
 @pytest.fixture
 def criar_backup():
     """
@@ -413,7 +476,7 @@ def dois_usuarios(client, criar_usuario):
 
 
 @pytest.fixture
-def usuario_com_foto(aluno_autenticado, foto_teste_base64):
+def usuario_com_foto(aluno_autenticado, foto_teste_jpeg):
     """
     Fixture que retorna um aluno autenticado com foto de perfil.
 
@@ -422,8 +485,8 @@ def usuario_com_foto(aluno_autenticado, foto_teste_base64):
     """
     # Atualizar foto do perfil
     response = aluno_autenticado.post(
-        "/perfil/foto/atualizar",
-        json={"imagem": foto_teste_base64},
+        "/usuario/perfil/atualizar-foto",
+        files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
         follow_redirects=False,
     )
 
@@ -36,6 +36,10 @@ def criar_tabelas_integracao():
         chat_sala_repo,
         chat_participante_repo,
         chat_mensagem_repo,
+        chat_mensagem_arquivo_repo,
+        presenca_repo,
+        sessao_repo,
+        email_saida_repo,
     )
 
     # Criar tabelas na ordem correta (respeitando dependencias)
@@ -47,5 +51,9 @@ def criar_tabelas_integracao():
     chat_sala_repo.criar_tabela()
     chat_participante_repo.criar_tabela()
     chat_mensagem_repo.criar_tabela()
+    chat_mensagem_arquivo_repo.criar_tabela()
+    presenca_repo.criar_tabela()
+    sessao_repo.criar_tabela()
+    email_saida_repo.criar_tabela()
 
     yield
@@ -521,6 +521,39 @@ class TestIntegracao:
         assert resultado["nao_existe"] is None
 
 
+
+class TestVersao:
+    """Testes da versão das configurações (gatilhos)"""
+
+    def test_versao_inicial(self, configuracao_db):
+        """Tabela recém-criada começa na versão 0"""
+        configuracao_repo.criar_tabela()
+
+        assert configuracao_repo.obter_versao() == 0
+
+    def test_alteracoes_incrementam_versao(self, configuracao_db):
+        """Inserção, atualização e exclusão devem mudar a versão"""
+        configuracao_repo.criar_tabela()
+
+        configuracao_repo.inserir_ou_atualizar("chave", "1")
+        assert configuracao_repo.obter_versao() == 1
+
+        configuracao_repo.atualizar_multiplas({"chave": "2"})
+        assert configuracao_repo.obter_versao() == 2
+
+        with configuracao_repo.obter_conexao() as conn:
+            conn.execute("DELETE FROM configuracao")
+        assert configuracao_repo.obter_versao() == 3
+
+    def test_leitura_nao_altera_versao(self, configuracao_db):
+        """Consultas não devem mudar a versão"""
+        configuracao_repo.criar_tabela()
+        configuracao_repo.inserir_ou_atualizar("chave", "1")
+
+        configuracao_repo.obter_todos()
+
+        assert configuracao_repo.obter_versao() == 1
+
 # Fixture para banco de dados de teste
 @pytest.fixture
 def configuracao_db(tmp_path):
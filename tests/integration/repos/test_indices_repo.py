@@ -90,3 +90,27 @@ class TestCriarIndices:
                     mock_cursor.execute.assert_not_called()
                     # Deve logar sucesso mesmo assim
                     mock_logger.info.assert_called_once()
+
+
+class TestIndicesSubstituidos:
+    """Índices substituídos são removidos pela migração de schema"""
+
+    def test_migracao_remove_indice_antigo_do_chat(self):
+        """idx_chat_mensagem_sala_id (substituído pelo composto sala_id, id) é removido"""
+        from util.db_util import obter_conexao
+        from util.migrar_schema import migrar_schema
+
+        with obter_conexao() as conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala_id ON chat_mensagem(sala_id)")
+
+        migrar_schema()
+        indices_repo.criar_indices()
+
+        with obter_conexao() as conn:
+            nomes = {
+                linha[0] for linha in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'chat_mensagem'"
+                )
+            }
+        assert "idx_chat_mensagem_sala_id" not in nomes
+        assert "idx_chat_mensagem_sala_id_id" in nomes
@@ -458,6 +458,50 @@ class TestUsuarioRepoToken:
         assert resultado is False
 
 
+class TestUsuarioRepoFoto:
+    """Testes para o ponteiro da foto do usuário."""
+
+    def _inserir(self, email: str) -> int:
+        return usuario_repo.inserir(Usuario(
+            id=0,
+            nome="Teste Foto",
+            email=email,
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.ALUNO.value
+        ))
+
+    def test_novo_usuario_sem_foto(self):
+        """Usuário novo usa a foto padrão (foto = None)."""
+        usuario_id = self._inserir("sem_foto@example.com")
+
+        assert usuario_repo.obter_foto(usuario_id) is None
+        assert usuario_repo.obter_por_id(usuario_id).foto is None
+
+    def test_atualizar_foto(self):
+        """Deve gravar o hash da foto no usuário."""
+        usuario_id = self._inserir("com_foto@example.com")
+
+        resultado = usuario_repo.atualizar_foto(usuario_id, "abc123")
+
+        assert resultado is True
+        assert usuario_repo.obter_foto(usuario_id) == "abc123"
+        assert usuario_repo.obter_por_id(usuario_id).foto == "abc123"
+
+    def test_atualizar_foto_usuario_inexistente(self):
+        """Deve retornar False quando usuário não existe."""
+        assert usuario_repo.atualizar_foto(99999, "abc123") is False
+
+    def test_obter_fotos_referenciadas(self):
+        """Deve retornar os hashes distintos em uso, sem os NULL."""
+        primeiro = self._inserir("ref1@example.com")
+        segundo = self._inserir("ref2@example.com")
+        self._inserir("ref3@example.com")
+        usuario_repo.atualizar_foto(primeiro, "abc123")
+        usuario_repo.atualizar_foto(segundo, "abc123")
+
+        assert usuario_repo.obter_fotos_referenciadas() == {"abc123"}
+
+
 class TestUsuarioRepoCriarTabela:
     """Testes para a função criar_tabela."""
 
@@ -65,6 +65,7 @@ class TestCriarBackup:
 
         # Criar backup
         admin_autenticado.post("/admin/backups/criar")
+        backup_util.aguardar_backup(timeout=10)  # Backup roda em segundo plano
 
         # Verificar que existe pelo menos um backup
         backups = backup_util.listar_backups()
@@ -76,6 +77,7 @@ class TestCriarBackup:
 
         # Criar backup
         admin_autenticado.post("/admin/backups/criar")
+        backup_util.aguardar_backup(timeout=10)  # Backup roda em segundo plano
 
         # Verificar formato do nome
         backups = backup_util.listar_backups()
@@ -395,6 +397,8 @@ class TestErroCriarBackup:
         """Deve mostrar mensagem de erro quando criação falha"""
         from unittest.mock import patch
 
+        from util import backup_util
+
         with patch(
             "routes.admin_backups_routes.backup_util.criar_backup",
             return_value=(False, "Erro ao criar backup"),
@@ -402,9 +406,79 @@ class TestErroCriarBackup:
             response = admin_autenticado.post(
                 "/admin/backups/criar", follow_redirects=True
             )
+            backup_util.aguardar_backup(timeout=10)
 
             assert response.status_code == status.HTTP_200_OK
 
+        # A falha aparece na listagem (a thread não tem como gerar flash)
+        response = admin_autenticado.get("/admin/backups/listar")
+        assert "Erro ao criar backup" in response.text
+
+
+class TestBackupEmSegundoPlano:
+    """Testes da criação de backup em segundo plano"""
+
+    def test_criar_retorna_antes_do_fim_do_backup(self, admin_autenticado):
+        """A rota responde enquanto a cópia ainda está em andamento"""
+        import threading
+        from unittest.mock import patch
+        from util import backup_util
+
+        liberar = threading.Event()
+
+        def copiar_lento(origem, destino, progresso=None):
+            progresso(1, 4)
+            liberar.wait(10)
+            destino.write_bytes(b"")
+
+        with patch("util.backup_util._copiar_banco_online", copiar_lento):
+            response = admin_autenticado.post("/admin/backups/criar", follow_redirects=False)
+            assert response.status_code == status.HTTP_303_SEE_OTHER
+
+            # Em andamento: progresso na página e um segundo backup é recusado
+            progresso = admin_autenticado.get("/admin/backups/progresso").json()
+            assert progresso["em_andamento"] is True
+            assert progresso["percentual"] == 25
+            assert "progresso-backup" in admin_autenticado.get("/admin/backups/listar").text
+            admin_autenticado.post("/admin/backups/criar")
+            assert backup_util.obter_progresso_backup().paginas_total == 4
+
+            liberar.set()
+            assert backup_util.aguardar_backup(timeout=10)
+
+        progresso = admin_autenticado.get("/admin/backups/progresso").json()
+        assert progresso["em_andamento"] is False
+        assert progresso["sucesso"] is True
+        assert progresso["percentual"] == 100
+
+    def test_criar_backup_incremental(self, admin_autenticado):
+        """O formulário com incremental=true cria um backup incremental"""
+        from util import backup_util
+
+        admin_autenticado.post("/admin/backups/criar")
+        backup_util.aguardar_backup(timeout=10)
+        admin_autenticado.post("/admin/backups/criar", data={"incremental": "true"})
+        backup_util.aguardar_backup(timeout=10)
+
+        assert "incremental" in backup_util.obter_progresso_backup().mensagem
+        incremental = next(b for b in backup_util.listar_backups() if b.incremental)
+        assert incremental.incremental_de is not None
+
+        response = admin_autenticado.get("/admin/backups/listar")
+        assert f"Incremental de {incremental.incremental_de}" in response.text
+        assert "Verificado" in response.text
+
+        # Sem incrementais dependentes, os arquivos do teste podem ser excluídos
+        assert backup_util.excluir_backup(incremental.nome_arquivo)[0] is True
+
+    def test_progresso_requer_admin(self, aluno_autenticado):
+        """Aluno não deve consultar o progresso"""
+        response = aluno_autenticado.get("/admin/backups/progresso", follow_redirects=False)
+        assert response.status_code in [
+            status.HTTP_303_SEE_OTHER,
+            status.HTTP_403_FORBIDDEN,
+        ]
+
 
 class TestFluxoCompletoBackup:
     """Testes de fluxo completo de backup"""
@@ -415,6 +489,7 @@ class TestFluxoCompletoBackup:
 
         # 1. Criar backup
         admin_autenticado.post("/admin/backups/criar")
+        backup_util.aguardar_backup(timeout=10)  # Backup roda em segundo plano
 
         # 2. Listar e verificar
         backups = backup_util.listar_backups()
@@ -446,6 +521,7 @@ class TestFluxoCompletoBackup:
 
         # Criar primeiro backup
         admin_autenticado.post("/admin/backups/criar")
+        backup_util.aguardar_backup(timeout=10)  # Backup roda em segundo plano
         backups_1 = backup_util.listar_backups()
 
         # Aguardar um pouco para garantir timestamp diferente
@@ -453,6 +529,7 @@ class TestFluxoCompletoBackup:
 
         # Criar segundo backup
         admin_autenticado.post("/admin/backups/criar")
+        backup_util.aguardar_backup(timeout=10)  # Backup roda em segundo plano
         backups_2 = backup_util.listar_backups()
 
         # Deve ter mais backups
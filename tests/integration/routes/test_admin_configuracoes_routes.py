@@ -1,6 +1,6 @@
 """
 Testes de configurações administrativas
-Testa seleção de temas visuais e sistema de auditoria de logs
+Testa seleção de temas visuais, sistema de auditoria de logs e painel de rate limits
 """
 
 from fastapi import status
@@ -10,6 +10,7 @@ import pytest
 import sqlite3
 
 from util.datetime_util import agora
+from util.rate_limiter import registro_limiters
 
 
 class TestTema:
@@ -238,6 +239,58 @@ class TestAuditoria:
                 assert "erro" in erro.lower()
 
 
+class TestRateLimits:
+    """Testes do painel de métricas de rate limit"""
+
+    def _exceder_limite_auditoria(self, cliente):
+        """Excede o limiter admin_config pela rota de filtro de logs."""
+        limite = registro_limiters.obter("admin_config").max_tentativas
+        for _ in range(limite + 2):
+            cliente.post(
+                "/admin/auditoria/filtrar",
+                data={"data": agora().strftime("%Y-%m-%d"), "nivel": "TODOS"},
+                follow_redirects=False,
+            )
+
+    def test_get_rate_limits_requer_admin(self, aluno_autenticado):
+        """Aluno não deve acessar o painel"""
+        response = aluno_autenticado.get("/admin/rate-limits", follow_redirects=False)
+        assert response.status_code in [
+            status.HTTP_303_SEE_OTHER,
+            status.HTTP_403_FORBIDDEN,
+        ]
+
+    def test_get_rate_limits_admin_acessa(self, admin_autenticado):
+        """Admin deve ver os limiters registrados"""
+        response = admin_autenticado.get("/admin/rate-limits")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "admin_config" in response.text
+        assert "Nenhum bloqueio registrado" in response.text
+        assert "Processamento de imagens" in response.text
+
+    def test_bloqueio_aparece_por_rota_e_infrator(self, admin_autenticado):
+        """Bloqueios devem ser contados pelo template da rota e pelo IP"""
+        self._exceder_limite_auditoria(admin_autenticado)
+
+        painel = registro_limiters.obter_painel()
+        assert ("POST /admin/auditoria/filtrar", 2) in painel["bloqueios_por_rota"]
+        assert painel["infratores"][0]["identificador"] == "testclient"
+
+        response = admin_autenticado.get("/admin/rate-limits")
+        assert "POST /admin/auditoria/filtrar" in response.text
+        assert "testclient" in response.text
+
+    def test_zerar_metricas(self, admin_autenticado):
+        """Zerar deve limpar as métricas"""
+        admin_autenticado.post("/admin/auditoria/filtrar", data={"data": "2000-01-01", "nivel": "TODOS"})
+
+        response = admin_autenticado.post("/admin/rate-limits/zerar", follow_redirects=False)
+
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert registro_limiters.obter("admin_config").metricas.permitidas == 0
+
+
 class TestSegurancaConfiguracoes:
     """Testes de segurança das configurações"""
 
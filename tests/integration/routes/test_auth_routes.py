@@ -78,6 +78,31 @@ class TestLogin:
             "string_too_short" in texto or "obrigatório" in texto or "e-mail" in texto
         )
 
+    def test_login_refaz_hash_com_outro_custo(self, client, criar_usuario, usuario_teste):
+        """Login bem-sucedido deve atualizar hash com custo diferente do configurado"""
+        from passlib.context import CryptContext
+        from repo import usuario_repo
+        from util.config import SENHA_BCRYPT_ROUNDS
+        from util.security import obter_custo_hash
+
+        criar_usuario(
+            usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"]
+        )
+        usuario = usuario_repo.obter_por_email(usuario_teste["email"])
+        hash_antigo = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(usuario_teste["senha"])
+        usuario_repo.atualizar_senha(usuario.id, hash_antigo)
+
+        response = client.post(
+            "/login",
+            data={"email": usuario_teste["email"], "senha": usuario_teste["senha"]},
+            follow_redirects=False,
+        )
+
+        assert_redirects_to(response, "/usuario")
+        senha_atual = usuario_repo.obter_por_email(usuario_teste["email"]).senha
+        assert senha_atual != hash_antigo
+        assert obter_custo_hash(senha_atual) == SENHA_BCRYPT_ROUNDS
+
     def test_usuario_logado_nao_acessa_login(self, aluno_autenticado):
         """Usuário já logado deve ser redirecionado ao acessar /login"""
         response = aluno_autenticado.get("/login", follow_redirects=False)
@@ -174,7 +174,42 @@ class TestChatRoutes:
 
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
+        assert isinstance(data["mensagens"], list)
+        assert data["proximo_cursor"] is None
+
+    def test_listar_mensagens_paginacao_por_cursor(self, usuarios_chat):
+        """Deve paginar do mais recente para o mais antigo usando before_id"""
+        client = usuarios_chat["client"]
+        outro_id = usuarios_chat["outro_usuario_id"]
+
+        resp = client.post("/chat/salas", data={"outro_usuario_id": outro_id})
+        sala_id = resp.json()["sala_id"]
+        for i in range(5):
+            client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": f"Msg {i}"})
+
+        pagina1 = client.get(f"/chat/mensagens/{sala_id}?limit=3").json()
+        textos1 = [m["mensagem"] for m in pagina1["mensagens"]]
+        assert textos1 == ["Msg 4", "Msg 3", "Msg 2"]
+        assert pagina1["proximo_cursor"] == pagina1["mensagens"][-1]["id"]
+
+        pagina2 = client.get(
+            f"/chat/mensagens/{sala_id}?limit=3&before_id={pagina1['proximo_cursor']}"
+        ).json()
+        textos2 = [m["mensagem"] for m in pagina2["mensagens"]]
+        assert textos2 == ["Msg 1", "Msg 0"]
+        assert pagina2["proximo_cursor"] is None
+
+    def test_listar_mensagens_cursores_simultaneos(self, usuarios_chat):
+        """Não deve aceitar before_id e after_id juntos"""
+        client = usuarios_chat["client"]
+        outro_id = usuarios_chat["outro_usuario_id"]
+
+        resp = client.post("/chat/salas", data={"outro_usuario_id": outro_id})
+        sala_id = resp.json()["sala_id"]
+
+        response = client.get(f"/chat/mensagens/{sala_id}?before_id=10&after_id=1")
+
+        assert response.status_code == 400
 
     # =========================================================================
     # Testes de Envio de Mensagem
@@ -228,6 +263,27 @@ class TestChatRoutes:
         assert data["mensagem"] == "Olá, tudo bem?"
         assert data["sala_id"] == sala_id
 
+    def test_enviar_mensagem_broadcast_apos_resposta(self, usuarios_chat):
+        """Deve publicar a mensagem via SSE e atualizar a atividade da sala"""
+        import asyncio
+        from repo import chat_sala_repo
+        from util.chat_manager import gerenciador_chat
+
+        client = usuarios_chat["client"]
+        outro_id = usuarios_chat["outro_usuario_id"]
+        sala_id = client.post("/chat/salas", data={"outro_usuario_id": outro_id}).json()["sala_id"]
+        fila = asyncio.Queue()
+        gerenciador_chat._connections[outro_id] = fila
+
+        response = client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": "Ao vivo"})
+
+        assert response.status_code == 200
+        evento = fila.get_nowait()
+        assert evento["tipo"] == "nova_mensagem"
+        assert evento["mensagem"]["id"] == response.json()["id"]
+        sala = chat_sala_repo.obter_por_id(sala_id)
+        assert sala.ultima_atividade.isoformat() == response.json()["data_envio"]
+
     def test_enviar_mensagem_sala_inexistente(self, client, fazer_login, criar_usuario_direto):
         """Não pode enviar mensagem em sala inexistente"""
         criar_usuario_direto(
@@ -347,6 +403,54 @@ class TestChatRoutes:
         for usuario in data:
             assert usuario.get("perfil") != "Administrador"
 
+    # =========================================================================
+    # Testes de Presença
+    # =========================================================================
+
+    def test_presenca_requer_autenticacao(self, client):
+        """Consulta de presença deve requerer autenticação"""
+        response = client.get("/chat/presenca?ids=1", follow_redirects=False)
+
+        assert response.status_code == 303
+
+    def test_presenca_em_lote(self, usuarios_chat):
+        """Deve retornar a presença de todos os IDs pedidos"""
+        from repo import presenca_repo
+
+        client = usuarios_chat["client"]
+        outro_id = usuarios_chat["outro_usuario_id"]
+        presenca_repo.registrar_heartbeat(outro_id)
+
+        response = client.get(f"/chat/presenca?ids={outro_id},{usuarios_chat['usuario1_id']}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data[str(outro_id)]["online"] is True
+        assert data[str(outro_id)]["ultimo_acesso"] is not None
+        assert data[str(usuarios_chat["usuario1_id"])] == {"online": False, "ultimo_acesso": None}
+
+    def test_presenca_ids_invalidos(self, usuarios_chat):
+        """IDs não numéricos devem retornar 400"""
+        response = usuarios_chat["client"].get("/chat/presenca?ids=1,abc")
+
+        assert response.status_code == 400
+
+    def test_listar_conversas_inclui_presenca(self, usuarios_chat):
+        """Conversas devem trazer o estado online do outro usuário"""
+        from repo import presenca_repo
+
+        client = usuarios_chat["client"]
+        outro_id = usuarios_chat["outro_usuario_id"]
+        client.post("/chat/salas", data={"outro_usuario_id": outro_id})
+        presenca_repo.registrar_heartbeat(outro_id)
+
+        response = client.get("/chat/conversas")
+
+        assert response.status_code == 200
+        outro_usuario = response.json()[0]["outro_usuario"]
+        assert outro_usuario["online"] is True
+        assert outro_usuario["ultimo_acesso"] is not None
+
     # =========================================================================
     # Testes de Contagem de Não Lidas
     # =========================================================================
@@ -549,6 +653,32 @@ class TestChatTotalNaoLidas:
             assert "total" in data
             assert isinstance(data["total"], int)
 
+    def test_total_nao_lidas_soma_contadores(self, client, fazer_login, criar_usuario_direto):
+        """Deve somar as mensagens recebidas e zerar após marcar como lidas"""
+        from repo import chat_mensagem_repo
+
+        criar_usuario_direto(
+            nome="User Soma Nao Lidas",
+            email="soma_nao_lidas@teste.com",
+            senha="Teste@123"
+        )
+        fazer_login("soma_nao_lidas@teste.com", "Teste@123")
+        outro_id = criar_usuario_direto(
+            nome="Outro Soma Nao Lidas",
+            email="outro_soma_nao_lidas@teste.com",
+            senha="Teste@123"
+        )
+
+        sala_id = client.post("/chat/salas", data={"outro_usuario_id": outro_id}).json()["sala_id"]
+        chat_mensagem_repo.inserir(sala_id, outro_id, "Primeira")
+        chat_mensagem_repo.inserir(sala_id, outro_id, "Segunda")
+
+        assert client.get("/chat/mensagens/nao-lidas/total").json()["total"] == 2
+
+        client.post(f"/chat/mensagens/lidas/{sala_id}")
+
+        assert client.get("/chat/mensagens/nao-lidas/total").json()["total"] == 0
+
 
 class TestChatListarConversasEdgeCases:
     """Testes de casos de borda para listagem de conversas"""
@@ -305,96 +305,159 @@ class TestAlterarSenha:
 class TestAtualizarFoto:
     """Testes de upload de foto de perfil"""
 
-    def test_atualizar_foto_requer_autenticacao(self, client, foto_teste_base64):
+    def test_atualizar_foto_requer_autenticacao(self, client, foto_teste_jpeg):
         """Deve exigir autenticação para atualizar foto"""
         response = client.post(
             "/usuario/perfil/atualizar-foto",
-            data={"foto_base64": foto_teste_base64},
+            files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
             follow_redirects=False,
         )
         assert_permission_denied(response)
 
     def test_atualizar_foto_com_dados_validos(
-        self, aluno_autenticado, foto_teste_base64
+        self, aluno_autenticado, foto_teste_jpeg, usuario_teste
     ):
         """Deve permitir atualizar foto com dados válidos"""
+        from repo import usuario_repo
+
         response = aluno_autenticado.post(
             "/usuario/perfil/atualizar-foto",
-            data={"foto_base64": foto_teste_base64},
+            files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
             follow_redirects=False,
         )
 
         assert_redirects_to(response, "/usuario/perfil/visualizar")
+        # O usuário passa a apontar para a foto gravada pelo hash
+        usuario = usuario_repo.obter_por_email(usuario_teste["email"])
+        assert usuario.foto is not None
+        assert usuario.foto in aluno_autenticado.get("/usuario/perfil/visualizar").text
+
+    def test_navbar_usa_foto_da_sessao(self, aluno_autenticado, foto_teste_jpeg, usuario_teste):
+        """Após o upload, o navbar exibe a nova foto a partir da sessão, sem consultar o banco"""
+        from repo import usuario_repo
+
+        aluno_autenticado.post(
+            "/usuario/perfil/atualizar-foto",
+            files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
+            follow_redirects=False,
+        )
+        foto = usuario_repo.obter_por_email(usuario_teste["email"]).foto
+
+        with patch("util.foto_util.usuario_repo.obter_foto") as obter_foto:
+            html = aluno_autenticado.get("/usuario").text
+
+        obter_foto.assert_not_called()
+        assert f"{foto}-32.jpg" in html
 
     def test_atualizar_foto_com_dados_invalidos(self, aluno_autenticado):
         """Deve rejeitar dados inválidos"""
         response = aluno_autenticado.post(
             "/usuario/perfil/atualizar-foto",
-            data={"foto_base64": "dados-invalidos"},
-            follow_redirects=False,
+            files={"foto": ("foto.jpg", b"dados-invalidos", "image/jpeg")},
         )
 
-        assert response.status_code == status.HTTP_303_SEE_OTHER
-
-    def test_atualizar_foto_muito_grande(self, aluno_autenticado):
-        """Deve rejeitar foto muito grande (>10MB)"""
-        foto_grande = "data:image/png;base64," + ("A" * 15 * 1024 * 1024)
+        assert "erro desconhecido" in response.text
 
+    def test_atualizar_foto_sem_multipart(self, aluno_autenticado, foto_teste_base64):
+        """O formulário antigo (base64 urlencoded) é rejeitado"""
         response = aluno_autenticado.post(
             "/usuario/perfil/atualizar-foto",
-            data={"foto_base64": foto_grande},
+            data={"foto_base64": foto_teste_base64},
             follow_redirects=False,
         )
 
         assert response.status_code == status.HTTP_303_SEE_OTHER
 
+    def test_atualizar_foto_muito_grande(self, aluno_autenticado):
+        """Deve rejeitar foto acima de foto_max_upload_bytes"""
+        with patch("routes.usuario_routes.config.obter_int", return_value=1024):
+            response = aluno_autenticado.post(
+                "/usuario/perfil/atualizar-foto",
+                files={"foto": ("foto.jpg", b"\xff" * 4096, "image/jpeg")},
+            )
+
+        assert "Imagem muito grande" in response.text
+
     def test_atualizar_foto_vazia(self, aluno_autenticado):
         """Deve rejeitar foto vazia"""
         response = aluno_autenticado.post(
             "/usuario/perfil/atualizar-foto",
-            data={"foto_base64": ""},
-            follow_redirects=False,
+            files={"foto": ("foto.jpg", b"", "image/jpeg")},
         )
 
-        assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert "Por favor, tente novamente" in response.text
 
-    def test_post_atualizar_foto_rate_limit(self, aluno_autenticado):
+    def test_post_atualizar_foto_rate_limit(self, aluno_autenticado, foto_teste_jpeg):
         """Rate limit deve bloquear upload de foto"""
         with patch(
             "routes.usuario_routes.upload_foto_limiter.verificar", return_value=False
         ):
             response = aluno_autenticado.post(
                 "/usuario/perfil/atualizar-foto",
-                data={"foto_base64": "data:image/png;base64," + "A" * 100},
+                files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
                 follow_redirects=False,
             )
 
             assert response.status_code == status.HTTP_303_SEE_OTHER
 
-    def test_atualizar_foto_erro_io(self, aluno_autenticado):
+    def test_atualizar_foto_erro_io(self, aluno_autenticado, foto_teste_jpeg):
         """Deve tratar erro de I/O ao salvar foto"""
         with patch(
-            "routes.usuario_routes.salvar_foto_cropada_usuario",
+            "routes.usuario_routes.salvar_foto_cropada_usuario_async",
             side_effect=IOError("Disk full"),
         ):
             response = aluno_autenticado.post(
                 "/usuario/perfil/atualizar-foto",
-                data={"foto_base64": "data:image/png;base64," + "A" * 200},
+                files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
                 follow_redirects=False,
             )
 
             assert response.status_code == status.HTTP_303_SEE_OTHER
 
-    def test_atualizar_foto_erro_os(self, aluno_autenticado):
+    def test_atualizar_foto_erro_os(self, aluno_autenticado, foto_teste_jpeg):
         """Deve tratar OSError ao salvar foto"""
         with patch(
-            "routes.usuario_routes.salvar_foto_cropada_usuario",
+            "routes.usuario_routes.salvar_foto_cropada_usuario_async",
             side_effect=OSError("Permission denied"),
         ):
             response = aluno_autenticado.post(
                 "/usuario/perfil/atualizar-foto",
-                data={"foto_base64": "data:image/png;base64," + "A" * 200},
+                files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
                 follow_redirects=False,
             )
 
             assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    def test_atualizar_foto_apaga_arquivo_temporario(self, aluno_autenticado, foto_teste_jpeg):
+        """O arquivo temporário do upload é apagado após o processamento"""
+        recebidos = []
+
+        async def salvar(usuario_id, arquivo):
+            recebidos.append(arquivo)
+            assert arquivo.read_bytes() == foto_teste_jpeg
+            return "ab" * 32
+
+        with patch("routes.usuario_routes.salvar_foto_cropada_usuario_async", salvar):
+            aluno_autenticado.post(
+                "/usuario/perfil/atualizar-foto",
+                files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
+                follow_redirects=False,
+            )
+
+        assert len(recebidos) == 1
+        assert not recebidos[0].exists()
+
+    def test_atualizar_foto_pool_de_imagens_cheio(self, aluno_autenticado, foto_teste_jpeg):
+        """Com a fila de processamento cheia, o upload é recusado com aviso"""
+        from util.pool_imagens import FilaImagensCheia
+
+        with patch(
+            "routes.usuario_routes.salvar_foto_cropada_usuario_async",
+            side_effect=FilaImagensCheia("10 pendentes"),
+        ):
+            response = aluno_autenticado.post(
+                "/usuario/perfil/atualizar-foto",
+                files={"foto": ("foto.jpg", foto_teste_jpeg, "image/jpeg")},
+            )
+
+        assert "processando muitas imagens" in response.text
@@ -179,6 +179,28 @@ class TestGerenciadorChat:
         assert queue1 is not queue2
         assert gerenciador.esta_conectado(1)
 
+    @pytest.mark.asyncio
+    async def test_desconectar_fila_antiga_mantem_reconexao(self, gerenciador):
+        """Fechar a conexão antiga não deve derrubar a reconexão do usuário"""
+        queue1 = await gerenciador.conectar(1)
+        queue2 = await gerenciador.conectar(1)
+
+        assert await gerenciador.desconectar(1, queue1) is False
+        assert gerenciador.esta_conectado(1)
+
+        assert await gerenciador.desconectar(1, queue2) is True
+        assert not gerenciador.esta_conectado(1)
+
+    @pytest.mark.asyncio
+    async def test_enviar_para_usuarios_apenas_conectados(self, gerenciador):
+        """enviar_para_usuarios deve ignorar usuários desconectados"""
+        queue1 = await gerenciador.conectar(1)
+
+        await gerenciador.enviar_para_usuarios([1, 2], {"tipo": "presenca"})
+
+        assert queue1.qsize() == 1
+        assert not gerenciador.esta_conectado(2)
+
 
 class TestGerenciadorChatSingleton:
     """Testes para a instância singleton"""
@@ -177,3 +177,30 @@ class TestConstantesConfig:
         from util.config import IS_DEVELOPMENT
 
         assert isinstance(IS_DEVELOPMENT, bool)
+
+
+class TestInvalidacaoEntreProcessos:
+    """Alteração gravada por outro worker deve chegar ao snapshot local"""
+
+    def test_outro_processo_altera_configuracao(self):
+        """Após o intervalo de verificação, a leitura reflete o novo valor"""
+        import sqlite3
+        from repo import configuracao_repo
+        from util.config_cache import ConfigCache, config
+        from util.db_util import DATABASE_PATH
+
+        configuracao_repo.inserir_ou_atualizar("rate_limit_login_max", "5")
+        config.carregar()
+        assert config.obter_int("rate_limit_login_max", 0) == 5
+
+        # Outro worker: conexão própria, sem passar por este cache
+        conn = sqlite3.connect(DATABASE_PATH)
+        with conn:
+            conn.execute("UPDATE configuracao SET valor = '7' WHERE chave = 'rate_limit_login_max'")
+        conn.close()
+
+        # Dentro do intervalo o snapshot ainda vale
+        assert config.obter_int("rate_limit_login_max", 0) == 5
+
+        ConfigCache._proxima_verificacao = 0
+        assert config.obter_int("rate_limit_login_max", 0) == 7
@@ -0,0 +1,154 @@
+"""
+Testes para o módulo util/assets.py
+
+Testa o build dos arquivos estáticos (nomes com hash, .gz e manifesto),
+as URLs geradas para os templates e os cabeçalhos ao servir static/dist.
+"""
+
+import gzip
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from util.assets import (
+    CACHE_IMUTAVEL,
+    ManifestoAssets,
+    StaticFilesComCache,
+    construir_assets,
+)
+
+CSS = "body { color: #333; }\n" * 50
+
+
+@pytest.fixture
+def static(tmp_path):
+    """Diretório static/ mínimo."""
+    (tmp_path / "css" / "bootswatch").mkdir(parents=True)
+    (tmp_path / "css" / "custom.css").write_text(CSS)
+    (tmp_path / "css" / "bootswatch" / "darkly.bootstrap.min.css").write_text(CSS + "/* darkly */")
+    (tmp_path / "img" / "usuarios").mkdir(parents=True)
+    (tmp_path / "img" / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 100)
+    (tmp_path / "img" / "usuarios" / "000001.jpg").write_bytes(b"foto")
+    (tmp_path / "img" / "fotos" / "ab" / "cd").mkdir(parents=True)
+    (tmp_path / "img" / "fotos" / "ab" / "cd" / "abcd.jpg").write_bytes(b"foto")
+    return tmp_path
+
+
+def ler_manifesto(static):
+    return json.loads((static / "dist" / "manifest.json").read_text(encoding="utf-8"))
+
+
+class TestConstruirAssets:
+    """Testes para construir_assets()"""
+
+    def test_gera_nomes_com_hash_e_manifesto(self, static):
+        """Cada arquivo ganha uma cópia com hash, registrada no manifesto"""
+        resultado = construir_assets(str(static), brotli_ativo=False)
+        manifesto = ler_manifesto(static)
+
+        assert resultado["arquivos"] == 3
+        assert manifesto["css/custom.css"].startswith("css/custom.")
+        assert manifesto["css/custom.css"] != "css/custom.css"
+        assert (static / "dist" / manifesto["css/custom.css"]).read_text() == CSS
+
+    def test_ignora_fotos_de_usuarios(self, static):
+        """Fotos de usuários têm armazenamento próprio e ficam fora do build"""
+        construir_assets(str(static), brotli_ativo=False)
+
+        assert not any(caminho.startswith(("img/usuarios", "img/fotos")) for caminho in ler_manifesto(static))
+
+    def test_gera_gz_apenas_de_textos(self, static):
+        """Textos ganham .gz; imagens não são comprimidas de novo"""
+        construir_assets(str(static), brotli_ativo=False)
+        manifesto = ler_manifesto(static)
+
+        css_gz = static / "dist" / (manifesto["css/custom.css"] + ".gz")
+        assert gzip.decompress(css_gz.read_bytes()).decode() == CSS
+        assert not (static / "dist" / (manifesto["img/logo.png"] + ".gz")).exists()
+
+    def test_remove_arquivos_de_builds_anteriores(self, static):
+        """Ao mudar o conteúdo, a cópia antiga sai de dist/"""
+        construir_assets(str(static), brotli_ativo=False)
+        antigo = static / "dist" / ler_manifesto(static)["css/custom.css"]
+
+        (static / "css" / "custom.css").write_text(CSS + "a { }")
+        construir_assets(str(static), brotli_ativo=False)
+
+        assert not antigo.exists()
+        assert (static / "dist" / ler_manifesto(static)["css/custom.css"]).exists()
+
+
+class TestManifestoAssets:
+    """Testes para as URLs usadas nos templates"""
+
+    def test_sem_build_usa_url_original(self, tmp_path):
+        """Sem manifesto, as URLs apontam para /static"""
+        manifesto = ManifestoAssets(str(tmp_path))
+
+        assert manifesto.url("css/custom.css") == "/static/css/custom.css"
+        assert manifesto.url_tema("darkly") == "/static/css/bootstrap.min.css?v=darkly"
+        assert manifesto.versao() == ""
+
+    def test_com_build_usa_url_com_hash(self, static):
+        """Com manifesto, as URLs apontam para static/dist"""
+        construir_assets(str(static), brotli_ativo=False)
+        manifesto = ManifestoAssets(str(static))
+        mapa = ler_manifesto(static)
+
+        assert manifesto.url("/css/custom.css") == f"/static/dist/{mapa['css/custom.css']}"
+        assert manifesto.url_tema("darkly") == (
+            f"/static/dist/{mapa['css/bootswatch/darkly.bootstrap.min.css']}"
+        )
+        assert manifesto.url("js/inexistente.js") == "/static/js/inexistente.js"
+
+
+class TestStaticFilesComCache:
+    """Testes dos cabeçalhos ao servir os arquivos"""
+
+    @pytest.fixture
+    def cliente(self, static):
+        construir_assets(str(static), brotli_ativo=False)
+        app = Starlette(routes=[
+            Mount("/static", StaticFilesComCache(directory=str(static)), name="static")
+        ])
+        return TestClient(app)
+
+    def test_dist_comprimido_e_imutavel(self, cliente, static):
+        """Com Accept-Encoding gzip, serve o .gz pré-comprimido com cache longo"""
+        url = f"/static/dist/{ler_manifesto(static)['css/custom.css']}"
+
+        response = cliente.get(url, headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["cache-control"] == CACHE_IMUTAVEL
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == CSS
+
+    def test_dist_sem_compressao(self, cliente, static):
+        """Sem suporte a gzip, serve o arquivo original"""
+        url = f"/static/dist/{ler_manifesto(static)['css/custom.css']}"
+
+        response = cliente.get(url, headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["cache-control"] == CACHE_IMUTAVEL
+        assert response.text == CSS
+
+    def test_fora_de_dist_revalida(self, cliente):
+        """Arquivos sem hash no nome são revalidados a cada uso"""
+        response = cliente.get("/static/css/custom.css")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_fotos_por_hash_imutaveis(self, cliente):
+        """Fotos de usuários (nome = hash do conteúdo) têm cache longo, sem .gz"""
+        response = cliente.get("/static/img/fotos/ab/cd/abcd.jpg", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == CACHE_IMUTAVEL
+        assert "content-encoding" not in response.headers
@@ -4,6 +4,8 @@ Testes para o módulo util/backup_util.py
 Testa todas as funções de gerenciamento de backup do banco de dados.
 """
 
+import gzip
+import json
 import pytest
 import sqlite3
 from pathlib import Path
@@ -21,16 +23,28 @@ from util.backup_util import (
     _extrair_data_do_nome,
     _validar_integridade_backup,
     criar_backup,
+    iniciar_backup_em_segundo_plano,
+    obter_progresso_backup,
+    aguardar_backup,
     listar_backups,
     restaurar_backup,
     excluir_backup,
     obter_info_backup,
     obter_caminho_backup,
+    _extrair_banco,
     BACKUP_DIR,
     BACKUP_FILENAME_PATTERN,
 )
 
 
+
+def _descomprimir(caminho: Path) -> Path:
+    """Descomprime um backup .gz ao lado do original (para abrir com sqlite3)."""
+    destino = caminho.with_name(caminho.name + ".sqlite")
+    with gzip.open(caminho, "rb") as origem, open(destino, "wb") as saida:
+        shutil.copyfileobj(origem, saida)
+    return destino
+
 class TestBackupInfo:
     """Testes para o dataclass BackupInfo"""
 
@@ -94,6 +108,13 @@ class TestValidarNomeArquivo:
         """Deve aceitar nome válido de backup automático"""
         assert _validar_nome_arquivo("backup_auto_2025-01-15_10-30-00.db") is True
 
+    def test_nome_valido_comprimido_e_incremental(self):
+        """Deve aceitar backups comprimidos e incrementais"""
+        assert _validar_nome_arquivo("backup_2025-01-15_10-30-00.db.gz") is True
+        assert _validar_nome_arquivo("backup_2025-01-15_10-30-00.db.zst") is True
+        assert _validar_nome_arquivo("backup_2025-01-15_10-30-00.incr.gz") is True
+        assert _validar_nome_arquivo("backup_auto_2025-01-15_10-30-00.incr") is True
+
     def test_path_traversal_dois_pontos(self):
         """Deve rejeitar tentativa de path traversal com .."""
         assert _validar_nome_arquivo("../etc/passwd.db") is False
@@ -118,6 +139,8 @@ class TestValidarNomeArquivo:
         assert _validar_nome_arquivo("backup_2025-01-15.sql") is False
         assert _validar_nome_arquivo("backup_2025-01-15.txt") is False
         assert _validar_nome_arquivo("backup_2025-01-15") is False
+        assert _validar_nome_arquivo("backup_2025-01-15.gz") is False
+        assert _validar_nome_arquivo("backup_2025-01-15.db.gz.parcial") is False
 
 
 class TestGarantirDiretorioBackup:
@@ -178,6 +201,11 @@ class TestExtrairDataDoNome:
         assert resultado.day == 20
         assert resultado.hour == 14
 
+    def test_extrair_data_backup_comprimido(self):
+        """Deve extrair data de backups comprimidos e incrementais"""
+        assert _extrair_data_do_nome("backup_2025-01-15_10-30-45.db.gz") == datetime(2025, 1, 15, 10, 30, 45)
+        assert _extrair_data_do_nome("backup_auto_2025-01-15_10-30-45.incr.zst") == datetime(2025, 1, 15, 10, 30, 45)
+
     def test_nome_invalido_retorna_none(self):
         """Deve retornar None para nome inválido"""
         resultado = _extrair_data_do_nome("backup_invalido.db")
@@ -284,8 +312,8 @@ class TestCriarBackup:
         assert "sucesso" in mensagem.lower()
         assert "manual" in mensagem.lower()
 
-        # Verificar se arquivo foi criado
-        backups = list(setup_backup_env['backup_dir'].glob("backup_*.db"))
+        # Verificar se arquivo foi criado (comprimido com gzip, o padrão)
+        backups = list(setup_backup_env['backup_dir'].glob("backup_*.db.gz"))
         assert len(backups) == 1
         assert "_auto_" not in backups[0].name
 
@@ -298,9 +326,53 @@ class TestCriarBackup:
         assert "automático" in mensagem.lower()
 
         # Verificar se arquivo foi criado com prefixo auto
-        backups = list(setup_backup_env['backup_dir'].glob("backup_auto_*.db"))
+        backups = list(setup_backup_env['backup_dir'].glob("backup_auto_*.db.gz"))
         assert len(backups) == 1
 
+    def test_copia_em_passos_com_progresso(self, setup_backup_env):
+        """A cópia usa a API de backup em passos, informando o progresso"""
+        conn = sqlite3.connect(str(setup_backup_env['db_path']))
+        conn.executemany("INSERT INTO teste VALUES (?)", [(i,) for i in range(5000)])
+        conn.commit()
+        conn.close()
+        passos = []
+
+        with patch('util.backup_util.BACKUP_PAGINAS_POR_PASSO', 4), \
+                patch('util.backup_util.BACKUP_PAUSA_MS', 0):
+            sucesso, _ = criar_backup(progresso=lambda copiadas, total: passos.append((copiadas, total)))
+
+        assert sucesso is True
+        assert len(passos) > 1
+        assert passos[-1][0] == passos[-1][1]
+        caminho = _descomprimir(next(setup_backup_env['backup_dir'].glob("backup_*.db.gz")))
+        conn = sqlite3.connect(str(caminho))
+        assert conn.execute("SELECT COUNT(*) FROM teste").fetchone()[0] == 5000
+        conn.close()
+
+    def test_copia_consistente_com_escrita_em_andamento(self, setup_backup_env):
+        """Transação aberta em outra conexão não entra pela metade no backup"""
+        escritor = sqlite3.connect(str(setup_backup_env['db_path']))
+        escritor.execute("INSERT INTO teste VALUES (1)")  # Transação não confirmada
+        try:
+            sucesso, _ = criar_backup()
+        finally:
+            escritor.rollback()
+            escritor.close()
+
+        assert sucesso is True
+        caminho = _descomprimir(next(setup_backup_env['backup_dir'].glob("backup_*.db.gz")))
+        assert _validar_integridade_backup(caminho)[0] is True
+
+    def test_erro_remove_arquivo_parcial(self, setup_backup_env):
+        """Falha no meio da cópia não deixa arquivo parcial nem backup listado"""
+        def progresso(copiadas, total):
+            raise sqlite3.OperationalError("disco cheio")
+
+        sucesso, mensagem = criar_backup(progresso=progresso)
+
+        assert sucesso is False
+        assert list(setup_backup_env['backup_dir'].iterdir()) == []
+
     def test_criar_backup_sem_banco(self):
         """Deve falhar se banco de dados não existir"""
         with patch('util.backup_util.DATABASE_PATH', '/caminho/inexistente/db.db'):
@@ -312,6 +384,64 @@ class TestCriarBackup:
                     assert "não encontrado" in mensagem.lower()
 
 
+class TestBackupEmSegundoPlano:
+    """Testes do backup executado em thread, com progresso"""
+
+    @pytest.fixture
+    def ambiente(self, tmp_path):
+        db_path = tmp_path / "database.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE teste (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+        with patch('util.backup_util.BACKUP_DIR', tmp_path / "backups"), \
+                patch('util.backup_util.DATABASE_PATH', str(db_path)):
+            yield tmp_path / "backups"
+
+    def test_executa_e_registra_conclusao(self, ambiente):
+        """O backup termina na thread e o progresso registra o resultado"""
+        iniciado, _ = iniciar_backup_em_segundo_plano()
+        assert iniciado is True
+        assert aguardar_backup(timeout=10) is True
+
+        progresso = obter_progresso_backup()
+        assert progresso.em_andamento is False
+        assert progresso.sucesso is True
+        assert progresso.percentual == 100
+        assert len(list(ambiente.glob("backup_*.db.gz"))) == 1
+
+    def test_um_backup_por_vez(self, ambiente):
+        """Enquanto um backup roda, outro não é iniciado"""
+        import threading
+        liberar = threading.Event()
+
+        with patch('util.backup_util.criar_backup', side_effect=lambda *a, **k: (liberar.wait(10), "ok")):
+            assert iniciar_backup_em_segundo_plano()[0] is True
+            iniciado, mensagem = iniciar_backup_em_segundo_plano()
+            # Restaurar também é recusado até o backup terminar
+            ambiente.mkdir()
+            (ambiente / "backup_2025-01-15_10-00-00.db").write_bytes(b"x")
+            restaurado, msg_restaurar, _ = restaurar_backup("backup_2025-01-15_10-00-00.db")
+            liberar.set()
+            aguardar_backup(timeout=10)
+
+        assert iniciado is False
+        assert "andamento" in mensagem
+        assert restaurado is False
+        assert "andamento" in msg_restaurar
+
+    def test_erro_registrado_no_progresso(self, ambiente):
+        """Uma exceção inesperada encerra o job com a mensagem de erro"""
+        with patch('util.backup_util.criar_backup', side_effect=RuntimeError("falhou")):
+            iniciar_backup_em_segundo_plano()
+            aguardar_backup(timeout=10)
+
+        progresso = obter_progresso_backup()
+        assert progresso.em_andamento is False
+        assert progresso.sucesso is False
+        assert "falhou" in progresso.mensagem
+
+
 class TestListarBackups:
     """Testes para a função listar_backups"""
 
@@ -712,7 +842,7 @@ class TestBackupErrosIO:
 
             with patch('util.backup_util.BACKUP_DIR', backup_dir):
                 with patch('util.backup_util.DATABASE_PATH', str(db_path)):
-                    with patch('shutil.copy2', side_effect=OSError("Permission denied")):
+                    with patch('util.backup_util._copiar_banco_online', side_effect=OSError("Permission denied")):
                         sucesso, mensagem = criar_backup()
 
                         assert sucesso is False
@@ -913,3 +1043,356 @@ class TestListarBackupsDataFallback:
                 assert len(backups) == 1
                 # Data deve ter sido obtida do mtime
                 assert backups[0].data_criacao is not None
+
+
+class TestCompressao:
+    """Testes da compressão configurável (BACKUP_COMPRESSAO)"""
+
+    @pytest.fixture
+    def ambiente(self, tmp_path):
+        db_path = tmp_path / "database.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE teste (valor TEXT)")
+        conn.executemany("INSERT INTO teste VALUES (?)", [("x" * 100,) for _ in range(1000)])
+        conn.commit()
+        conn.close()
+        with patch('util.backup_util.BACKUP_DIR', tmp_path / "backups"), \
+                patch('util.backup_util.DATABASE_PATH', str(db_path)):
+            yield {'backup_dir': tmp_path / "backups", 'db_path': db_path}
+
+    def test_gzip_menor_que_o_banco(self, ambiente):
+        """O backup gzip é menor que o banco e descomprime para um banco íntegro"""
+        criar_backup()
+
+        caminho = next(ambiente['backup_dir'].glob("backup_*.db.gz"))
+        assert caminho.stat().st_size < ambiente['db_path'].stat().st_size / 5
+        assert _validar_integridade_backup(_descomprimir(caminho))[0] is True
+
+    def test_sem_compressao(self, ambiente):
+        """BACKUP_COMPRESSAO=nenhuma grava o banco como .db"""
+        with patch('util.backup_util.BACKUP_COMPRESSAO', "nenhuma"):
+            criar_backup()
+
+        caminho = next(ambiente['backup_dir'].glob("backup_*.db"))
+        assert _validar_integridade_backup(caminho)[0] is True
+
+    def test_zstd_sem_pacote_usa_gzip(self, ambiente):
+        """Sem o pacote zstandard, BACKUP_COMPRESSAO=zstd usa gzip"""
+        with patch('util.backup_util.BACKUP_COMPRESSAO', "zstd"), \
+                patch('util.backup_util.zstandard', None):
+            sucesso, mensagem = criar_backup()
+
+        assert sucesso is True
+        assert ".db.gz" in mensagem
+
+    def test_zstd(self, ambiente):
+        """Com o pacote instalado, o backup zstd é criado e restaurado"""
+        pytest.importorskip("zstandard")
+        with patch('util.backup_util.BACKUP_COMPRESSAO', "zstd"):
+            criar_backup()
+
+        nome = next(ambiente['backup_dir'].glob("backup_*.db.zst")).name
+        sucesso, _, _ = restaurar_backup(nome, criar_backup_antes=False)
+        assert sucesso is True
+
+    def test_restaura_backup_comprimido(self, ambiente):
+        """O backup comprimido é restaurado sobre o banco"""
+        criar_backup()
+        nome = listar_backups()[0].nome_arquivo
+        conn = sqlite3.connect(str(ambiente['db_path']))
+        conn.execute("DELETE FROM teste")
+        conn.commit()
+        conn.close()
+
+        sucesso, _, _ = restaurar_backup(nome, criar_backup_antes=False)
+
+        assert sucesso is True
+        conn = sqlite3.connect(str(ambiente['db_path']))
+        assert conn.execute("SELECT COUNT(*) FROM teste").fetchone()[0] == 1000
+        conn.close()
+
+    def test_gzip_truncado_nao_restaura(self, ambiente):
+        """Arquivo comprimido truncado é recusado sem tocar no banco"""
+        criar_backup()
+        caminho = next(ambiente['backup_dir'].glob("backup_*.db.gz"))
+        caminho.write_bytes(caminho.read_bytes()[:200])
+        # Sem checksum registrado, a falha vem da descompressão
+        (ambiente['backup_dir'] / "manifest.json").unlink()
+        antes = ambiente['db_path'].read_bytes()
+
+        sucesso, mensagem, _ = restaurar_backup(caminho.name, criar_backup_antes=False)
+
+        assert sucesso is False
+        assert "corrompido" in mensagem.lower()
+        assert ambiente['db_path'].read_bytes() == antes
+
+
+class TestManifesto:
+    """Testes do manifesto de backups (tamanho, checksum e integridade em cache)"""
+
+    @pytest.fixture
+    def ambiente(self, tmp_path):
+        db_path = tmp_path / "database.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE teste (id INTEGER PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+        with patch('util.backup_util.BACKUP_DIR', tmp_path / "backups"), \
+                patch('util.backup_util.DATABASE_PATH', str(db_path)):
+            yield tmp_path / "backups"
+
+    def _manifesto(self, backup_dir):
+        return json.loads((backup_dir / "manifest.json").read_text(encoding="utf-8"))
+
+    def test_criar_registra_no_manifesto(self, ambiente):
+        """O backup criado entra no manifesto com checksum e integridade"""
+        criar_backup()
+
+        info = listar_backups()[0]
+        entrada = self._manifesto(ambiente)[info.nome_arquivo]
+        assert entrada["integridade"] == "ok"
+        assert entrada["compressao"] == "gzip"
+        assert entrada["tamanho_bytes"] == (ambiente / info.nome_arquivo).stat().st_size
+        assert len(entrada["sha256"]) == 64
+        assert info.integridade == "ok"
+        assert info.sha256 == entrada["sha256"]
+        assert info.tamanho_banco_bytes > 0
+
+    def test_listagem_nao_le_arquivos_registrados(self, ambiente):
+        """Backups já registrados são listados sem stat dos arquivos"""
+        criar_backup()
+        listar_backups()
+        original_stat = Path.stat
+
+        def stat_sem_backups(self, follow_symlinks=True):
+            assert not self.name.startswith("backup_"), f"stat de {self.name}"
+            return original_stat(self, follow_symlinks=follow_symlinks)
+
+        with patch.object(Path, 'stat', stat_sem_backups):
+            backups = listar_backups()
+
+        assert len(backups) == 1
+
+    def test_arquivos_novos_e_removidos(self, ambiente):
+        """Arquivos copiados para o diretório entram; excluídos saem"""
+        criar_backup()
+        externo = ambiente / "backup_2024-01-01_00-00-00.db"
+        externo.write_bytes(b"x")
+
+        assert len(listar_backups()) == 2
+        assert self._manifesto(ambiente)[externo.name]["integridade"] is None
+
+        externo.unlink()
+        assert len(listar_backups()) == 1
+        assert externo.name not in self._manifesto(ambiente)
+
+    def test_listagem_sob_o_lock_do_manifesto(self, ambiente):
+        """O diretório é listado com o lock: um backup registrado no meio não é descartado"""
+        import util.backup_util as backup_util
+        criar_backup()
+        glob_original = Path.glob
+
+        def glob_com_lock(self, padrao):
+            if self == ambiente:
+                assert backup_util._lock_manifesto._is_owned(), "listagem fora do lock"
+            return glob_original(self, padrao)
+
+        with patch.object(Path, 'glob', glob_com_lock):
+            assert len(listar_backups()) == 1
+
+    def test_manifesto_ilegivel_e_refeito(self, ambiente):
+        """Manifesto corrompido é refeito a partir dos arquivos"""
+        criar_backup()
+        (ambiente / "manifest.json").write_text("{nao e json", encoding="utf-8")
+
+        backups = listar_backups()
+
+        assert len(backups) == 1
+        assert backups[0].sha256 is None
+        assert self._manifesto(ambiente)[backups[0].nome_arquivo]["tamanho_bytes"] > 0
+
+    def test_restauracao_verificada_pula_integrity_check(self, ambiente):
+        """Checksum conferido + integridade já verificada: sem integrity_check do backup"""
+        criar_backup()
+        nome = listar_backups()[0].nome_arquivo
+
+        with patch('util.backup_util._validar_integridade_backup', wraps=_validar_integridade_backup) as validar:
+            sucesso, _, _ = restaurar_backup(nome, criar_backup_antes=False)
+
+        assert sucesso is True
+        # Apenas a verificação do banco após a restauração
+        assert validar.call_count == 1
+
+    def test_restauracao_sem_cache_verifica_e_registra(self, ambiente):
+        """Backup não verificado passa pelo integrity_check e o resultado é registrado"""
+        ambiente.mkdir()
+        nome = "backup_2025-01-15_10-00-00.db"
+        conn = sqlite3.connect(str(ambiente / nome))
+        conn.execute("CREATE TABLE t (id INT)")
+        conn.commit()
+        conn.close()
+
+        sucesso, _, _ = restaurar_backup(nome, criar_backup_antes=False)
+
+        assert sucesso is True
+        entrada = self._manifesto(ambiente)[nome]
+        assert entrada["integridade"] == "ok"
+        assert len(entrada["sha256"]) == 64
+
+    def test_checksum_divergente_nao_restaura(self, ambiente):
+        """Arquivo alterado depois do registro é recusado"""
+        criar_backup()
+        nome = listar_backups()[0].nome_arquivo
+        caminho = ambiente / nome
+        with gzip.open(caminho, "rb") as arquivo:
+            conteudo = arquivo.read()
+        with gzip.open(caminho, "wb") as arquivo:
+            arquivo.write(conteudo)  # Mesmo banco, bytes comprimidos diferentes
+
+        sucesso, mensagem, _ = restaurar_backup(nome, criar_backup_antes=False)
+
+        assert sucesso is False
+        assert "checksum" in mensagem.lower()
+
+
+class TestBackupIncremental:
+    """Testes do backup incremental (páginas alteradas desde o último completo)"""
+
+    @pytest.fixture
+    def ambiente(self, tmp_path):
+        db_path = tmp_path / "database.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE teste (id INTEGER PRIMARY KEY, valor TEXT)")
+        conn.executemany("INSERT INTO teste VALUES (?, ?)", [(i, "x" * 200) for i in range(2000)])
+        conn.commit()
+        conn.close()
+        with patch('util.backup_util.BACKUP_DIR', tmp_path / "backups"), \
+                patch('util.backup_util.DATABASE_PATH', str(db_path)):
+            yield {'backup_dir': tmp_path / "backups", 'db_path': db_path}
+
+    def _executar(self, db_path, sql, parametros=()):
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(sql, parametros)
+        conn.commit()
+        conn.close()
+
+    def _criar_completo_e_incremental(self, ambiente):
+        """Cria um backup completo, altera uma linha e cria um incremental."""
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 10, 0, 0)):
+            criar_backup()
+        self._executar(ambiente['db_path'], "UPDATE teste SET valor = 'alterado' WHERE id = 5")
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 11, 0, 0)):
+            sucesso, mensagem = criar_backup(incremental=True)
+        assert sucesso is True
+        return "backup_2025-01-15_10-00-00.db.gz", "backup_2025-01-15_11-00-00.incr.gz", mensagem
+
+    def test_sem_completo_faz_backup_completo(self, ambiente):
+        """Sem backup completo para servir de base, o incremental vira completo"""
+        sucesso, mensagem = criar_backup(incremental=True)
+
+        assert sucesso is True
+        assert "completo" in mensagem
+        assert len(list(ambiente['backup_dir'].glob("backup_*.db.gz"))) == 1
+
+    def test_grava_apenas_paginas_alteradas(self, ambiente):
+        """O incremental contém poucas páginas e registra a base"""
+        base, incremental, mensagem = self._criar_completo_e_incremental(ambiente)
+
+        assert "incremental" in mensagem
+        tamanho_base = (ambiente['backup_dir'] / base).stat().st_size
+        assert (ambiente['backup_dir'] / incremental).stat().st_size < tamanho_base / 5
+        info = obter_info_backup(incremental)
+        assert info.incremental is True
+        assert info.incremental_de == base
+
+    def test_restaurar_incremental(self, ambiente):
+        """Restaurar o incremental reconstrói o banco (base + páginas)"""
+        _, incremental, _ = self._criar_completo_e_incremental(ambiente)
+        self._executar(ambiente['db_path'], "DELETE FROM teste")
+
+        sucesso, _, _ = restaurar_backup(incremental, criar_backup_antes=False)
+
+        assert sucesso is True
+        conn = sqlite3.connect(str(ambiente['db_path']))
+        assert conn.execute("SELECT COUNT(*) FROM teste").fetchone()[0] == 2000
+        assert conn.execute("SELECT valor FROM teste WHERE id = 5").fetchone()[0] == "alterado"
+        conn.close()
+
+    def test_banco_que_encolheu(self, ambiente):
+        """Banco menor que a base (após VACUUM) é reconstruído com o tamanho certo"""
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 10, 0, 0)):
+            criar_backup()
+        self._executar(ambiente['db_path'], "DELETE FROM teste WHERE id > 10")
+        self._executar(ambiente['db_path'], "VACUUM")
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 11, 0, 0)):
+            criar_backup(incremental=True)
+        destino = ambiente['backup_dir'] / "extraido.db"
+
+        _extrair_banco("backup_2025-01-15_11-00-00.incr.gz", destino, {})
+
+        assert destino.stat().st_size == ambiente['db_path'].stat().st_size
+        assert _validar_integridade_backup(destino)[0] is True
+
+    def test_nao_exclui_base_com_incrementais(self, ambiente):
+        """A base só pode ser excluída depois dos incrementais"""
+        base, incremental, _ = self._criar_completo_e_incremental(ambiente)
+
+        sucesso, mensagem = excluir_backup(base)
+        assert sucesso is False
+        assert incremental in mensagem
+
+        assert excluir_backup(incremental)[0] is True
+        assert excluir_backup(base)[0] is True
+        assert listar_backups() == []
+
+    def _criar_incremental_durante(self, ambiente, acao):
+        """Cria um completo e um incremental, executando `acao(base)` durante a gravação."""
+        import util.backup_util as backup_util
+        base = "backup_2025-01-15_10-00-00.db.gz"
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 10, 0, 0)):
+            criar_backup()
+        gravar_incremental = backup_util._gravar_incremental
+        resultados = []
+
+        def _gravar(*args):
+            retorno = gravar_incremental(*args)
+            resultados.append(acao(base))
+            return retorno
+
+        with patch('util.backup_util.agora', return_value=datetime(2025, 1, 15, 11, 0, 0)), \
+                patch('util.backup_util._gravar_incremental', side_effect=_gravar):
+            sucesso, mensagem = criar_backup(incremental=True)
+        assert sucesso is True
+        return base, resultados[0], mensagem
+
+    def test_base_reservada_durante_incremental(self, ambiente):
+        """A base escolhida não pode ser excluída enquanto o incremental é gravado"""
+        base, (sucesso, mensagem), _ = self._criar_incremental_durante(ambiente, excluir_backup)
+
+        assert sucesso is False
+        assert "em andamento" in mensagem
+        assert obter_info_backup("backup_2025-01-15_11-00-00.incr.gz").incremental_de == base
+        # Terminado o incremental, a reserva é liberada (resta o incremental como dependente)
+        assert "incremental(is)" in excluir_backup(base)[1]
+
+    def test_base_excluida_por_outro_worker_vira_completo(self, ambiente):
+        """Se a base some durante a gravação, o backup é gravado como completo"""
+        def _excluir_arquivo(base):
+            (ambiente['backup_dir'] / base).unlink()
+
+        self._criar_incremental_durante(ambiente, _excluir_arquivo)
+
+        backups = listar_backups()
+        assert [b.nome_arquivo for b in backups] == ["backup_2025-01-15_11-00-00.db.gz"]
+        assert backups[0].incremental_de is None
+        assert list(ambiente['backup_dir'].glob("*.parcial")) == []
+
+    def test_base_ausente_nao_restaura(self, ambiente):
+        """Sem o arquivo da base, a restauração do incremental é recusada"""
+        base, incremental, _ = self._criar_completo_e_incremental(ambiente)
+        (ambiente['backup_dir'] / base).unlink()
+
+        sucesso, mensagem, _ = restaurar_backup(incremental, criar_backup_antes=False)
+
+        assert sucesso is False
+        assert "base" in mensagem.lower()
@@ -0,0 +1,211 @@
+"""
+Testes para o módulo util/cache_fragmentos.py e a tag {% cache %}
+
+Testa o LRU com TTL de fragmentos renderizados, a invalidação por tags
+emitidas pelos repositórios e o uso nos templates.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from jinja2 import DictLoader, Environment
+
+from model.categoria_model import Categoria
+from repo import categoria_repo, configuracao_repo
+from util.cache_fragmentos import CacheFragmentos, cache_fragmentos
+from util.config_cache import config
+from util.template_util import ExtensaoCache, menu_ativo
+
+
+@pytest.fixture
+def cache():
+    """Cache isolado com TTL longo."""
+    return CacheFragmentos(max_entradas=10, ttl_segundos=60)
+
+
+@pytest.fixture
+def cache_ativo(monkeypatch):
+    """Ativa o cache global (desativado por padrão em desenvolvimento)."""
+    monkeypatch.setattr(cache_fragmentos, "max_entradas", 1000)
+    return cache_fragmentos
+
+
+@pytest.fixture
+def env(cache):
+    """Ambiente Jinja2 com a tag {% cache %} usando o cache isolado."""
+    ambiente = Environment(
+        extensions=[ExtensaoCache],
+        loader=DictLoader({
+            "lista.html": '{% cache "lista", tags %}{% for i in itens %}{{ i }};{% endfor %}{% endcache %}',
+            "menu.html": '{% cache ("menu", perfil) %}{{ perfil }}-{{ contador() }}{% endcache %}',
+        })
+    )
+    ambiente.cache_fragmentos = cache
+    return ambiente
+
+
+class TestCacheFragmentos:
+    """Testes para CacheFragmentos"""
+
+    def test_guardar_e_obter(self, cache):
+        """Fragmento guardado deve ser retornado até expirar"""
+        cache.guardar("a", "<p>a</p>")
+
+        assert cache.obter("a") == "<p>a</p>"
+        assert cache.obter("b") is None
+
+    def test_ttl_expirado(self, cache):
+        """Fragmento expirado não é retornado"""
+        cache.guardar("a", "<p>a</p>", ttl_segundos=0)
+
+        assert cache.obter("a") is None
+        assert len(cache) == 0
+
+    def test_limite_descarta_menos_recente(self, cache):
+        """Acima do limite, o fragmento menos usado sai do cache"""
+        cache.max_entradas = 2
+        cache.guardar("a", "a")
+        cache.guardar("b", "b")
+        cache.obter("a")
+        cache.guardar("c", "c")
+
+        assert cache.obter("b") is None
+        assert cache.obter("a") == "a"
+        assert cache.obter("c") == "c"
+
+    def test_invalidar_por_tag(self, cache):
+        """Apenas os fragmentos com a tag invalidada são removidos"""
+        cache.guardar("categorias", "c", tags=["categoria"])
+        cache.guardar("atividades", "a", tags=["atividade", "categoria"])
+        cache.guardar("menu", "m")
+
+        assert cache.invalidar("atividade") == 1
+        assert cache.obter("categorias") == "c"
+        assert cache.invalidar("categoria") == 1
+        assert cache.obter("menu") == "m"
+        assert len(cache) == 1
+
+    def test_regravar_atualiza_tags(self, cache):
+        """Ao regravar uma chave, valem apenas as tags novas"""
+        cache.guardar("a", "1", tags=["x"])
+        cache.guardar("a", "2", tags=["y"])
+
+        assert cache.invalidar("x") == 0
+        assert cache.obter("a") == "2"
+
+    def test_desativado(self):
+        """Com max_entradas=0 nada é guardado"""
+        cache = CacheFragmentos(max_entradas=0)
+        cache.guardar("a", "a")
+
+        assert cache.obter("a") is None
+
+
+class TestExtensaoCache:
+    """Testes para a tag {% cache %}"""
+
+    def test_renderiza_uma_vez(self, env):
+        """O conteúdo só é renderizado de novo após a invalidação"""
+        template = env.get_template("lista.html")
+
+        assert template.render(itens=[1, 2], tags="categoria") == "1;2;"
+        assert template.render(itens=[3], tags="categoria") == "1;2;"
+        env.cache_fragmentos.invalidar("categoria")
+        assert template.render(itens=[3], tags="categoria") == "3;"
+
+    def test_chave_composta(self, env):
+        """Partes da chave separam fragmentos diferentes"""
+        contador = iter(range(100))
+        template = env.get_template("menu.html")
+
+        def renderizar(perfil):
+            return template.render(perfil=perfil, contador=lambda: next(contador))
+
+        assert renderizar("Aluno") == "Aluno-0"
+        assert renderizar("Administrador") == "Administrador-1"
+        assert renderizar("Aluno") == "Aluno-0"
+        assert env.cache_fragmentos.obter("menu:Aluno") == "Aluno-0"
+
+
+class TestInvalidacaoPelosRepositorios:
+    """Testes das tags emitidas nas escritas"""
+
+    def test_categoria_invalida_tag(self, client):
+        """Inserir, alterar e excluir categoria invalidam a tag 'categoria'"""
+        with patch.object(cache_fragmentos, "invalidar") as invalidar:
+            id_categoria = categoria_repo.inserir(Categoria(0, "Lutas", ""))
+            categoria_repo.alterar(Categoria(id_categoria, "Artes marciais", ""))
+            categoria_repo.excluir(id_categoria)
+
+        assert [c.args for c in invalidar.call_args_list] == [("categoria",)] * 3
+
+    def test_configuracao_invalida_tag_da_chave(self, cache_ativo):
+        """Alterar uma configuração invalida a tag 'config:<chave>'"""
+        cache_fragmentos.guardar("links_tema", "x", tags=["config:theme"])
+
+        configuracao_repo.inserir_ou_atualizar("theme", "darkly")
+
+        assert cache_fragmentos.obter("links_tema") is None
+
+    def test_recarga_de_configuracoes_invalida_chaves_alteradas(self, cache_ativo):
+        """Alterações vistas ao recarregar (ex: de outro worker) invalidam as tags"""
+        configuracao_repo.inserir_ou_atualizar("theme", "original")
+        config.carregar()
+        cache_fragmentos.guardar("links_tema", "x", tags=["config:theme"])
+        cache_fragmentos.guardar("outro", "y", tags=["config:chave_inexistente"])
+
+        with patch.object(configuracao_repo, "obter_todos", return_value=[]):
+            config.carregar()
+
+        assert cache_fragmentos.obter("links_tema") is None
+        assert cache_fragmentos.obter("outro") == "y"
+
+
+class TestMenuAtivo:
+    """Testes da seção ativa do navbar (parte da chave do fragmento)"""
+
+    @pytest.mark.parametrize("caminho, secao", [
+        ("/usuario", "/usuario"),
+        ("/usuario/perfil/editar", "/usuario/perfil/"),
+        ("/admin/usuarios/editar/7", "/admin/usuarios/"),
+        ("/admin/usuarios/editar/8", "/admin/usuarios/"),
+        ("/admin/chamados/3/responder", "/admin/chamados/"),
+        ("/chamados/3/visualizar", "/chamados/"),
+        ("/chat/salas", ""),
+    ])
+    def test_secao_do_caminho(self, caminho, secao):
+        assert menu_ativo(caminho) == secao
+
+
+class TestFragmentosNasPaginas:
+    """Testes dos fragmentos em páginas da aplicação"""
+
+    def test_lista_de_categorias_atualizada_apos_cadastro(self, cache_ativo, admin_autenticado):
+        """A lista em cache é invalidada quando uma categoria é cadastrada"""
+        admin_autenticado.get("/admin/categorias/listar")
+        assert cache_fragmentos.obter("admin_categorias") is not None
+
+        categoria_repo.inserir(Categoria(0, "Natação", "Aulas na piscina"))
+        response = admin_autenticado.get("/admin/categorias/listar")
+
+        assert "Natação" in response.text
+
+    def test_link_do_tema_muda_com_o_tema(self, cache_ativo, client):
+        """O link do CSS do tema leva o tema atual e é atualizado ao trocá-lo"""
+        configuracao_repo.inserir_ou_atualizar("theme", "original")
+        config.carregar()
+        assert "bootstrap.min.css?v=original" in client.get("/").text
+
+        configuracao_repo.inserir_ou_atualizar("theme", "darkly")
+        config.carregar()
+
+        assert "bootstrap.min.css?v=darkly" in client.get("/").text
+
+    def test_navbar_compartilhado_entre_paginas_da_secao(self, cache_ativo, admin_autenticado):
+        """Páginas da mesma seção do menu usam um único fragmento do navbar"""
+        cache_ativo.limpar()
+        admin_autenticado.get("/admin/categorias/listar")
+        admin_autenticado.get("/admin/categorias/cadastrar")
+
+        chaves = [c for c in cache_ativo._entradas if c.startswith("navbar_privada:")]
+        assert chaves == ["navbar_privada:Administrador:/admin/categorias/"]
@@ -0,0 +1,166 @@
+"""
+Testes para o módulo util/cache_http.py
+
+Testa os validadores (ETag/Last-Modified), as respostas 304 e as
+políticas de Cache-Control das páginas públicas e das APIs do chat.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+from repo import configuracao_repo
+from util.cache_http import (
+    CarimbosVistos,
+    etag_corresponde,
+    gerar_etag,
+    nao_modificado_desde,
+)
+from util.config_cache import config
+
+
+class TestValidadores:
+    """Testes das funções de comparação"""
+
+    def test_etag_fraco_e_estavel(self):
+        """O mesmo conteúdo gera o mesmo ETag fraco"""
+        assert gerar_etag("abc") == gerar_etag(b"abc")
+        assert gerar_etag("abc").startswith('W/"')
+        assert gerar_etag("abc") != gerar_etag("abd")
+
+    def test_etag_corresponde(self):
+        """If-None-Match aceita lista, '*' e comparação fraca"""
+        etag = gerar_etag("x")
+
+        assert etag_corresponde(etag, etag)
+        assert etag_corresponde(f'"outro", {etag}', etag)
+        assert etag_corresponde(etag.removeprefix("W/"), etag)
+        assert etag_corresponde("*", etag)
+        assert not etag_corresponde('"outro"', etag)
+        assert not etag_corresponde(None, etag)
+
+    def test_nao_modificado_desde(self):
+        """If-Modified-Since compara com resolução de segundos"""
+        data = datetime(2025, 1, 10, 12, 0, 0, 500000, tzinfo=timezone.utc)
+
+        assert nao_modificado_desde(format_datetime(data, usegmt=True), data)
+        assert not nao_modificado_desde(
+            format_datetime(data - timedelta(seconds=1), usegmt=True), data
+        )
+        assert not nao_modificado_desde("data inválida", data)
+
+    def test_carimbo_novo_tem_data_posterior(self):
+        """Cada carimbo novo recebe uma data maior que a dos anteriores"""
+        carimbos = CarimbosVistos()
+
+        primeira = carimbos.data("v1")
+        segunda = carimbos.data("v2")
+
+        assert segunda > primeira
+        assert carimbos.data("v1") == primeira
+
+
+class TestPaginasPublicas:
+    """Testes dos validadores nas páginas públicas"""
+
+    def test_visitante_recebe_validadores_e_politica_publica(self, client):
+        """Sem sessão, a página é pública e tem ETag e Last-Modified"""
+        config.carregar()
+
+        response = client.get("/sobre")
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        assert response.headers["etag"].startswith('W/"')
+        assert "last-modified" in response.headers
+        assert "Cookie" in response.headers["vary"]
+
+    def test_304_sem_renderizar(self, client):
+        """Com o ETag atual, responde 304 sem executar a rota"""
+        from routes import public_routes
+
+        config.carregar()
+        etag = client.get("/sobre").headers["etag"]
+
+        with patch.object(public_routes.templates_public, "TemplateResponse") as renderizar:
+            response = client.get("/sobre", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        renderizar.assert_not_called()
+
+    def test_if_modified_since(self, client):
+        """Sem If-None-Match, Last-Modified também valida"""
+        config.carregar()
+        ultima_modificacao = client.get("/sobre").headers["last-modified"]
+
+        response = client.get("/sobre", headers={"If-Modified-Since": ultima_modificacao})
+
+        assert response.status_code == 304
+
+    def test_troca_de_tema_muda_etag(self, client):
+        """Alterar configurações gera um novo ETag (a cópia antiga não vale)"""
+        config.carregar()
+        etag = client.get("/").headers["etag"]
+
+        configuracao_repo.inserir_ou_atualizar("theme", "darkly")
+        config.carregar()
+        response = client.get("/", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_paginas_diferentes_tem_etags_diferentes(self, client):
+        """O caminho faz parte do carimbo"""
+        config.carregar()
+
+        assert client.get("/").headers["etag"] != client.get("/sobre").headers["etag"]
+
+    def test_usuario_logado_recebe_politica_privada(
+        self, client, criar_usuario, fazer_login, usuario_teste
+    ):
+        """Com sessão, a página é privada e o ETag vem do conteúdo"""
+        config.carregar()
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+        client.get("/sobre")  # exibe a mensagem flash do login
+
+        response = client.get("/sobre")
+
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert response.headers["etag"] == gerar_etag(response.content)
+        assert "last-modified" not in response.headers
+        assert client.get(
+            "/sobre", headers={"If-None-Match": response.headers["etag"]}
+        ).status_code == 304
+
+
+class TestApisDoChat:
+    """Testes dos validadores nas APIs JSON do chat"""
+
+    def test_conversas_revalidadas_por_conteudo(self, aluno_autenticado):
+        """A lista de conversas tem ETag do corpo e responde 304 se não mudou"""
+        response = aluno_autenticado.get("/chat/conversas")
+        etag = response.headers["etag"]
+
+        assert response.headers["cache-control"] == "private, no-cache"
+        assert aluno_autenticado.get(
+            "/chat/conversas", headers={"If-None-Match": etag}
+        ).status_code == 304
+
+    def test_total_nao_lidas_muda_etag(self, aluno_autenticado):
+        """Um ETag antigo não corresponde quando o conteúdo muda"""
+        response = aluno_autenticado.get(
+            "/chat/mensagens/nao-lidas/total", headers={"If-None-Match": gerar_etag("antigo")}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"total": 0}
+
+    def test_erros_nao_recebem_validadores(self, client):
+        """Respostas que não são 200 passam sem alteração"""
+        response = client.get("/chat/conversas", follow_redirects=False)
+
+        assert response.status_code != 200
+        assert "etag" not in response.headers
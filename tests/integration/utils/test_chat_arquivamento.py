@@ -0,0 +1,177 @@
+"""
+Testes para o módulo util/chat_arquivamento.py e repo/chat_mensagem_arquivo_repo.py
+
+Testa o arquivamento em lotes das mensagens antigas do chat e a leitura
+transparente do histórico arquivado.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from model.usuario_model import Usuario
+from repo import (
+    usuario_repo,
+    chat_sala_repo,
+    chat_mensagem_repo,
+    chat_mensagem_arquivo_repo,
+)
+from util.chat_arquivamento import arquivar_mensagens_antigas
+from util.datetime_util import agora
+from util.db_util import obter_conexao
+from util.perfis import Perfil
+from util.security import criar_hash_senha
+
+
+@pytest.fixture
+def sala_com_historico():
+    """Cria uma sala com 6 mensagens antigas (40 dias) e 2 recentes."""
+    ids_usuarios = []
+    for i in range(2):
+        ids_usuarios.append(usuario_repo.inserir(Usuario(
+            id=0,
+            nome=f"Usuario Arquivo {i}",
+            email=f"arquivo{i}@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.ALUNO.value
+        )))
+    usuario1_id, usuario2_id = ids_usuarios
+    sala = chat_sala_repo.criar_ou_obter_sala(usuario1_id, usuario2_id)
+
+    ids = []
+    for i in range(8):
+        remetente = usuario1_id if i % 2 == 0 else usuario2_id
+        ids.append(chat_mensagem_repo.inserir(sala.id, remetente, f"Msg {i}").id)
+
+    # Envelhecer as 6 primeiras mensagens, espalhadas em dois dias
+    with obter_conexao() as conn:
+        for i, mensagem_id in enumerate(ids[:6]):
+            data = agora() - timedelta(days=40 + (i // 3))
+            conn.execute("UPDATE chat_mensagem SET data_envio = ? WHERE id = ?", (data, mensagem_id))
+
+    return sala.id, ids
+
+
+class TestArquivarMensagensAntigas:
+    """Testes para a função arquivar_mensagens_antigas"""
+
+    def test_retencao_desativada_nao_arquiva(self, sala_com_historico):
+        """Com retenção 0 nada deve ser movido"""
+        assert arquivar_mensagens_antigas(dias=0) == 0
+
+    def test_arquiva_em_lotes(self, sala_com_historico):
+        """Deve mover apenas mensagens antigas, em vários lotes"""
+        sala_id, ids = sala_com_historico
+
+        total = arquivar_mensagens_antigas(dias=30, tamanho_lote=4, comprimir=True)
+
+        assert total == 6
+        with obter_conexao() as conn:
+            restantes = [row["id"] for row in conn.execute(
+                "SELECT id FROM chat_mensagem WHERE sala_id = ? ORDER BY id", (sala_id,)
+            )]
+        assert restantes == ids[6:]
+
+        estatisticas = chat_mensagem_arquivo_repo.obter_estatisticas()
+        assert estatisticas["mensagens"] == 6
+        # Um bloco por sala e dia em cada lote
+        assert estatisticas["blocos"] >= 2
+
+    def test_segunda_execucao_nao_duplica(self, sala_com_historico):
+        """Executar novamente não deve arquivar as mesmas mensagens"""
+        arquivar_mensagens_antigas(dias=30, tamanho_lote=100)
+
+        assert arquivar_mensagens_antigas(dias=30, tamanho_lote=100) == 0
+        assert chat_mensagem_arquivo_repo.obter_estatisticas()["mensagens"] == 6
+
+
+    def test_lotes_simultaneos_nao_duplicam(self, sala_com_historico):
+        """Dois workers arquivando ao mesmo tempo não gravam as mesmas mensagens"""
+        limite = agora() - timedelta(days=30)
+        # Segura quem já leu o lote até o outro também tentar ler
+        barreira = threading.Barrier(2)
+        serializar = chat_mensagem_arquivo_repo._serializar_bloco
+
+        def serializar_apos_barreira(*args):
+            try:
+                barreira.wait(timeout=1)
+            except threading.BrokenBarrierError:
+                pass
+            return serializar(*args)
+
+        with patch.object(chat_mensagem_arquivo_repo, "_serializar_bloco", serializar_apos_barreira), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            resultados = list(executor.map(
+                lambda _: chat_mensagem_arquivo_repo.arquivar_lote(limite, 100), range(2)
+            ))
+
+        assert sorted(resultados) == [0, 6]
+        assert chat_mensagem_arquivo_repo.obter_estatisticas()["mensagens"] == 6
+
+
+class TestLeituraTransparente:
+    """O histórico deve continuar igual depois do arquivamento"""
+
+    @pytest.mark.parametrize("comprimir", [True, False])
+    def test_paginas_iguais_antes_e_depois(self, sala_com_historico, comprimir):
+        """Páginas por cursor devem ser idênticas com ou sem arquivo"""
+        sala_id, ids = sala_com_historico
+
+        def paginar():
+            paginas = []
+            cursor = None
+            while True:
+                pagina = chat_mensagem_repo.listar_por_sala(sala_id, limit=3, before_id=cursor)
+                if not pagina:
+                    return paginas
+                paginas.append([(m.id, m.mensagem, m.usuario_id) for m in pagina])
+                cursor = pagina[-1].id
+
+        antes = paginar()
+        arquivar_mensagens_antigas(dias=30, tamanho_lote=100, comprimir=comprimir)
+        depois = paginar()
+
+        assert depois == antes
+        assert [m for pagina in depois for m in pagina][0][0] == ids[-1]
+
+    def test_after_id_atravessa_arquivo(self, sala_com_historico):
+        """after_id deve retornar mensagens arquivadas e ativas em sequência"""
+        sala_id, ids = sala_com_historico
+        arquivar_mensagens_antigas(dias=30, tamanho_lote=100)
+
+        mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit=4, after_id=ids[3])
+
+        assert [m.id for m in mensagens] == [ids[7], ids[6], ids[5], ids[4]]
+
+    def test_datas_preservadas(self, sala_com_historico):
+        """Datas das mensagens arquivadas devem ser preservadas"""
+        sala_id, ids = sala_com_historico
+        original = chat_mensagem_repo.obter_por_id(ids[0])
+
+        arquivar_mensagens_antigas(dias=30, tamanho_lote=100)
+        arquivada = chat_mensagem_repo.listar_por_sala(sala_id, limit=1, before_id=ids[1])[0]
+
+        assert arquivada.id == ids[0]
+        assert arquivada.data_envio == original.data_envio
+
+    def test_contar_inclui_arquivadas(self, sala_com_historico):
+        """contar_por_sala deve somar mensagens ativas e arquivadas"""
+        sala_id, _ = sala_com_historico
+        arquivar_mensagens_antigas(dias=30, tamanho_lote=100)
+
+        assert chat_mensagem_repo.contar_por_sala(sala_id) == 8
+
+    def test_ultima_mensagem_vem_do_arquivo(self, sala_com_historico):
+        """Sala só com mensagens arquivadas ainda tem última mensagem"""
+        sala_id, ids = sala_com_historico
+        for mensagem_id in ids[6:]:
+            chat_mensagem_repo.excluir(mensagem_id)
+        arquivar_mensagens_antigas(dias=30, tamanho_lote=100)
+
+        ultima = chat_mensagem_repo.obter_ultima_mensagem_sala(sala_id)
+
+        assert ultima is not None
+        assert ultima.id == ids[5]
@@ -0,0 +1,160 @@
+"""
+Testes para o módulo util/compressao.py
+
+Testa quais respostas são comprimidas (tipo, tamanho, Accept-Encoding),
+a compressão em streaming e as exceções: SSE e respostas já comprimidas.
+"""
+
+import asyncio
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from util.compressao import MiddlewareCompressao
+
+HTML = "<tr><td>Categoria</td><td>Descrição</td></tr>\n" * 200
+
+
+async def pagina(request):
+    return HTMLResponse(HTML, headers={"ETag": '"abc"'})
+
+
+async def pequena(request):
+    return HTMLResponse("<p>oi</p>")
+
+
+async def json(request):
+    return JSONResponse([{"id": i, "mensagem": "olá"} for i in range(200)])
+
+
+async def imagem(request):
+    return Response(b"\x89PNG" + b"\x00" * 5000, media_type="image/png")
+
+
+async def ja_comprimida(request):
+    return Response(
+        gzip.compress(HTML.encode()), media_type="text/css", headers={"Content-Encoding": "gzip"}
+    )
+
+
+async def stream(request):
+    async def gerar():
+        for _ in range(10):
+            yield HTML
+    return StreamingResponse(gerar(), media_type="text/csv")
+
+
+@pytest.fixture
+def cliente():
+    """Aplicação mínima com o middleware."""
+    app = Starlette(routes=[
+        Route("/pagina", pagina),
+        Route("/pequena", pequena),
+        Route("/json", json),
+        Route("/imagem", imagem),
+        Route("/ja-comprimida", ja_comprimida),
+        Route("/stream", stream),
+    ])
+    app.add_middleware(MiddlewareCompressao, nivel=6, min_bytes=500)
+    return TestClient(app)
+
+
+def obter(cliente, caminho, accept_encoding="gzip"):
+    return cliente.get(caminho, headers={"Accept-Encoding": accept_encoding})
+
+
+class TestRespostasComprimidas:
+    """Respostas que devem ser comprimidas"""
+
+    def test_html_comprimido(self, cliente):
+        """HTML grande sai em gzip, com Vary e o corpo original ao descomprimir"""
+        response = obter(cliente, "/pagina")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(HTML.encode())
+        assert response.text == HTML
+
+    def test_etag_forte_vira_fraco(self, cliente):
+        """A representação comprimida não é byte a byte igual à original"""
+        assert obter(cliente, "/pagina").headers["etag"] == 'W/"abc"'
+
+    def test_json_comprimido(self, cliente):
+        """Respostas JSON também são comprimidas"""
+        response = obter(cliente, "/json")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 200
+
+    def test_streaming_comprimido(self, cliente):
+        """Streams textuais são comprimidos pedaço a pedaço, sem Content-Length"""
+        response = obter(cliente, "/stream")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text == HTML * 10
+
+
+class TestRespostasNaoComprimidas:
+    """Respostas que devem passar sem alteração"""
+
+    def test_cliente_sem_gzip(self, cliente):
+        """Sem gzip no Accept-Encoding, a resposta sai como está"""
+        response = obter(cliente, "/pagina", accept_encoding="identity")
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"abc"'
+
+    def test_abaixo_do_minimo(self, cliente):
+        """Corpos pequenos não compensam a compressão"""
+        assert "content-encoding" not in obter(cliente, "/pequena").headers
+
+    def test_tipo_nao_comprimivel(self, cliente):
+        """Imagens já são comprimidas"""
+        assert "content-encoding" not in obter(cliente, "/imagem").headers
+
+    def test_ja_comprimida(self, cliente):
+        """Respostas com Content-Encoding (ex: .gz de static/dist) não são recomprimidas"""
+        response = obter(cliente, "/ja-comprimida")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == HTML
+
+    def test_sse_nunca_comprimido(self):
+        """Eventos SSE são repassados um a um, sem compressão nem espera"""
+        async def app(scope, receive, send):
+            await send({
+                "type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream; charset=utf-8")],
+            })
+            for i in range(3):
+                await send({"type": "http.response.body", "body": b"data: %d\n\n" % i, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        enviadas = []
+
+        async def send(message):
+            enviadas.append(message)
+
+        scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+        asyncio.run(MiddlewareCompressao(app, min_bytes=1)(scope, None, send))
+
+        assert dict(enviadas[0]["headers"]).get(b"content-encoding") is None
+        assert [m.get("body") for m in enviadas[1:]] == [b"data: 0\n\n", b"data: 1\n\n", b"data: 2\n\n", b""]
+
+
+class TestAplicacao:
+    """Compressão nas rotas da aplicação"""
+
+    def test_listagem_admin_comprimida(self, admin_autenticado):
+        """As páginas de listagem da área administrativa saem em gzip"""
+        response = admin_autenticado.get(
+            "/admin/usuarios/listar", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
@@ -0,0 +1,267 @@
+"""
+Testes para os módulos util/email_saida.py, util/email_transporte.py
+e repo/email_saida_repo.py
+
+Testa o envio em segundo plano da fila de e-mails: lotes, novas tentativas
+com espera exponencial, falhas permanentes, reservas abandonadas, retenção
+e os transportes (Resend, arquivo e SMTP).
+"""
+
+import smtplib
+from datetime import timedelta
+from email import message_from_bytes
+from unittest.mock import patch
+
+import pytest
+from resend.exceptions import ResendError
+
+from model.email_saida_model import EmailSaida, StatusEmail
+from repo import email_saida_repo
+from util import email_saida
+from util.datetime_util import agora
+from util.db_util import obter_conexao
+from util.email_saida import calcular_espera, excluir_enviados_antigos, processar_fila
+from util.email_transporte import (
+    ErroTransporteEmail,
+    TransporteArquivo,
+    TransporteResend,
+    TransporteSMTP,
+    criar_transporte,
+)
+
+
+class TransporteFalso:
+    """Transporte que registra os envios e pode falhar sob demanda."""
+
+    def __init__(self, erro=None):
+        self.erro = erro
+        self.enviados = []
+
+    def enviar(self, email):
+        if self.erro:
+            raise self.erro
+        self.enviados.append(email.para_email)
+        return f"ext-{email.id}"
+
+
+def _enfileirar(quantidade: int = 1) -> list:
+    """Coloca e-mails na fila e retorna seus IDs."""
+    return [
+        email_saida_repo.inserir(EmailSaida(
+            id=0, para_email=f"dest{i}@example.com", para_nome=f"Dest {i}",
+            assunto="Assunto", html="<p>Olá</p>"
+        ))
+        for i in range(quantidade)
+    ]
+
+
+def _email(id: int = 1) -> EmailSaida:
+    """E-mail avulso para os testes de transporte."""
+    return EmailSaida(
+        id=id, para_email="dest@example.com", para_nome="Destino",
+        assunto="Assunto", html="<p>Olá</p>", texto="Olá"
+    )
+
+
+class TestProcessarFila:
+    """Testes do job de envio"""
+
+    def test_envia_todos_em_lotes(self):
+        """Todos os e-mails prontos são enviados, em vários lotes"""
+        ids = _enfileirar(5)
+        transporte = TransporteFalso()
+
+        resultado = processar_fila(transporte, tamanho_lote=2)
+
+        assert resultado == {"enviados": 5, "reagendados": 0, "falhas": 0}
+        assert len(transporte.enviados) == 5
+        email = email_saida_repo.obter_por_id(ids[0])
+        assert email.status == StatusEmail.ENVIADO
+        assert email.id_externo == f"ext-{ids[0]}"
+        assert email.enviado_em is not None
+
+    def test_falha_temporaria_reagenda_com_espera(self):
+        """Falha temporária agenda nova tentativa e registra o erro"""
+        [email_id] = _enfileirar()
+
+        resultado = processar_fila(TransporteFalso(ErroTransporteEmail("timeout")))
+
+        email = email_saida_repo.obter_por_id(email_id)
+        assert resultado["reagendados"] == 1
+        assert email.status == StatusEmail.PENDENTE
+        assert email.tentativas == 1
+        assert email.ultimo_erro == "timeout"
+        assert email.proxima_tentativa > agora() + timedelta(seconds=calcular_espera(1) - 5)
+        # Ainda não está pronto: a próxima execução não o reenvia
+        assert processar_fila(TransporteFalso()) == {"enviados": 0, "reagendados": 0, "falhas": 0}
+
+    def test_falha_permanente_nao_repete(self):
+        """Falha permanente marca o e-mail como Falhou na primeira tentativa"""
+        [email_id] = _enfileirar()
+
+        processar_fila(TransporteFalso(ErroTransporteEmail("inválido", permanente=True)))
+
+        email = email_saida_repo.obter_por_id(email_id)
+        assert email.status == StatusEmail.FALHOU
+        assert email.tentativas == 1
+
+    def test_desiste_apos_max_tentativas(self):
+        """Esgotadas as tentativas, o e-mail é marcado como Falhou"""
+        [email_id] = _enfileirar()
+
+        with patch.object(email_saida, "EMAIL_MAX_TENTATIVAS", 2), \
+                patch.object(email_saida, "calcular_espera", return_value=0):
+            processar_fila(TransporteFalso(ErroTransporteEmail("timeout")))
+            processar_fila(TransporteFalso(ErroTransporteEmail("timeout")))
+
+        email = email_saida_repo.obter_por_id(email_id)
+        assert email.status == StatusEmail.FALHOU
+        assert email.tentativas == 2
+
+    def test_erro_inesperado_e_tratado_como_temporario(self):
+        """Exceções fora do transporte não derrubam o job"""
+        [email_id] = _enfileirar()
+
+        resultado = processar_fila(TransporteFalso(RuntimeError("bug")))
+
+        assert resultado["reagendados"] == 1
+        assert email_saida_repo.obter_por_id(email_id).status == StatusEmail.PENDENTE
+
+    def test_reserva_abandonada_volta_para_fila(self):
+        """E-mails reservados por um processo que parou são reenviados"""
+        [email_id] = _enfileirar()
+        email_saida_repo.reservar_lote(10)
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE email_saida SET reservado_em = ? WHERE id = ?",
+                (agora() - timedelta(hours=1), email_id)
+            )
+
+        resultado = processar_fila(TransporteFalso())
+
+        assert resultado["enviados"] == 1
+
+    def test_reserva_recente_nao_e_reenviada(self):
+        """E-mails reservados por outro worker não são enviados em dobro"""
+        _enfileirar()
+        email_saida_repo.reservar_lote(10)
+
+        assert processar_fila(TransporteFalso())["enviados"] == 0
+
+    def test_calcular_espera_exponencial_com_teto(self):
+        """A espera dobra a cada tentativa, limitada ao máximo"""
+        with patch.object(email_saida, "EMAIL_ESPERA_INICIAL_SEGUNDOS", 30), \
+                patch.object(email_saida, "EMAIL_ESPERA_MAXIMA_SEGUNDOS", 100):
+            assert [calcular_espera(t) for t in (1, 2, 3, 4)] == [30, 60, 100, 100]
+
+    def test_excluir_enviados_antigos(self):
+        """Só e-mails enviados há mais tempo que a retenção são excluídos"""
+        enviado, pendente = _enfileirar(2)
+        email_saida_repo.marcar_enviado(enviado, "ext")
+        with obter_conexao() as conn:
+            conn.execute(
+                "UPDATE email_saida SET enviado_em = ? WHERE id = ?",
+                (agora() - timedelta(days=10), enviado)
+            )
+
+        assert excluir_enviados_antigos(dias=7) == 1
+        assert email_saida_repo.obter_por_id(enviado) is None
+        assert email_saida_repo.obter_por_id(pendente) is not None
+
+
+class TestTransportes:
+    """Testes dos transportes de e-mail"""
+
+    def test_resend_sem_api_key_e_falha_permanente(self):
+        """Sem API key não adianta tentar de novo"""
+        with pytest.raises(ErroTransporteEmail) as erro:
+            TransporteResend(api_key="").enviar(_email())
+
+        assert erro.value.permanente is True
+
+    def test_resend_envio_com_sucesso(self):
+        """Deve retornar o ID do Resend"""
+        transporte = TransporteResend(api_key="test_key")
+
+        with patch("util.email_transporte.resend.Emails.send", return_value={"id": "re_123"}) as mock_send:
+            assert transporte.enviar(_email()) == "re_123"
+
+        params = mock_send.call_args.args[0]
+        assert params["to"] == ["dest@example.com"]
+        assert params["text"] == "Olá"
+
+    @pytest.mark.parametrize("codigo,permanente", [(422, True), (429, False), (500, False)])
+    def test_resend_classifica_erros(self, codigo, permanente):
+        """Erros 4xx são permanentes, exceto 429; 5xx são temporários"""
+        transporte = TransporteResend(api_key="test_key")
+        erro_resend = ResendError(
+            code=codigo, error_type="erro", message="Falhou", suggested_action="Tente de novo"
+        )
+
+        with patch("util.email_transporte.resend.Emails.send", side_effect=erro_resend):
+            with pytest.raises(ErroTransporteEmail) as erro:
+                transporte.enviar(_email())
+
+        assert erro.value.permanente is permanente
+
+    def test_arquivo_grava_eml(self, tmp_path):
+        """O transporte de arquivo grava a mensagem MIME completa"""
+        transporte = TransporteArquivo(diretorio=str(tmp_path / "emails"))
+
+        nome = transporte.enviar(_email(id=42))
+
+        mensagem = message_from_bytes((tmp_path / "emails" / nome).read_bytes())
+        assert mensagem["Subject"] == "Assunto"
+        assert "dest@example.com" in mensagem["To"]
+        assert mensagem.is_multipart()
+
+    def test_smtp_entrega_mensagem(self):
+        """O transporte SMTP entrega a mensagem ao servidor configurado"""
+        with patch("util.email_transporte.smtplib.SMTP") as mock_smtp:
+            TransporteSMTP(host="smtp.local", porta=2525).enviar(_email())
+
+        mock_smtp.assert_called_once_with("smtp.local", 2525, timeout=10)
+        mock_smtp.return_value.__enter__.return_value.send_message.assert_called_once()
+
+    def test_smtp_indisponivel_e_falha_temporaria(self):
+        """Servidor fora do ar gera nova tentativa"""
+        with patch("util.email_transporte.smtplib.SMTP", side_effect=ConnectionRefusedError()):
+            with pytest.raises(ErroTransporteEmail) as erro:
+                TransporteSMTP().enviar(_email())
+
+        assert erro.value.permanente is False
+
+    def test_smtp_destinatario_recusado_e_permanente(self):
+        """Destinatário recusado não é reenviado"""
+        with patch("util.email_transporte.smtplib.SMTP") as mock_smtp:
+            mock_smtp.return_value.__enter__.return_value.send_message.side_effect = (
+                smtplib.SMTPRecipientsRefused({"dest@example.com": (550, b"no")})
+            )
+            with pytest.raises(ErroTransporteEmail) as erro:
+                TransporteSMTP().enviar(_email())
+
+        assert erro.value.permanente is True
+
+    def test_criar_transporte(self):
+        """Nome desconhecido usa o Resend"""
+        assert isinstance(criar_transporte("arquivo"), TransporteArquivo)
+        assert isinstance(criar_transporte("smtp"), TransporteSMTP)
+        assert isinstance(criar_transporte("outro"), TransporteResend)
+
+
+class TestRotasUsamFila:
+    """As rotas não esperam o provedor de e-mail"""
+
+    def test_esqueci_senha_enfileira_sem_chamar_provedor(self, client, criar_usuario, usuario_teste):
+        """A recuperação de senha só grava o e-mail na fila"""
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+
+        with patch("util.email_transporte.resend.Emails.send") as mock_send:
+            response = client.post(
+                "/esqueci-senha", data={"email": usuario_teste["email"]}, follow_redirects=False
+            )
+            mock_send.assert_not_called()
+
+        assert response.status_code == 303
+        pendentes = email_saida_repo.reservar_lote(10)
+        assert [e.assunto for e in pendentes] == ["Bem-vindo ao Sistema", "Recuperação de Senha"]
@@ -1,7 +1,7 @@
 """
 Testes para o módulo util/email_service.py
 
-Testa o serviço de envio de e-mails via Resend.
+Testa a montagem dos e-mails e sua inclusão na fila de saída.
 """
 
 import pytest
@@ -9,88 +9,44 @@ from unittest.mock import patch, MagicMock
 import os
 
 
-class TestServicoEmailInit:
-    """Testes para inicialização do ServicoEmail"""
-
-    def test_init_sem_api_key(self):
-        """Deve inicializar sem API key"""
-        with patch.dict(os.environ, {'RESEND_API_KEY': ''}, clear=False):
-            from util.email_service import ServicoEmail
-            servico = ServicoEmail()
-            # Pode ser '' ou None dependendo do ambiente
-            assert servico.api_key == '' or servico.api_key is None
-
-    def test_init_com_api_key(self):
-        """Deve configurar API key do Resend"""
-        with patch.dict(os.environ, {'RESEND_API_KEY': 'test_key_123'}, clear=False):
-            with patch('util.email_service.resend'):
-                from util.email_service import ServicoEmail
-                servico = ServicoEmail()
-                assert servico.api_key == 'test_key_123'
-
-    def test_init_valores_padrao(self):
-        """Deve usar valores padrão quando não configurados"""
-        from util.email_service import ServicoEmail
-        servico = ServicoEmail()
-
-        # from_name deve ter valor padrão
-        assert servico.from_name is not None
-
-
 class TestEnviarEmail:
-    """Testes para o método enviar_email()"""
+    """Testes para o método enviar_email() (fila de saída)"""
 
-    def test_sem_api_key_retorna_false(self):
-        """Deve retornar False quando API key não está configurada"""
+    def test_email_entra_na_fila(self):
+        """Deve gravar o e-mail como pendente, sem chamar o provedor"""
+        from model.email_saida_model import StatusEmail
+        from repo import email_saida_repo
         from util.email_service import ServicoEmail
-        servico = ServicoEmail()
-        servico.api_key = None
-
-        resultado = servico.enviar_email(
-            para_email="test@email.com",
-            para_nome="Teste",
-            assunto="Teste",
-            html="<p>Teste</p>"
-        )
 
-        assert resultado is False
-
-    def test_envio_com_sucesso(self):
-        """Deve retornar True quando e-mail é enviado com sucesso"""
-        from util.email_service import ServicoEmail
         servico = ServicoEmail()
-        servico.api_key = 'test_key'
-
-        with patch('util.email_service.resend.Emails.send') as mock_send:
-            mock_send.return_value = {'id': 'email123'}
 
+        with patch('util.email_transporte.resend.Emails.send') as mock_send:
             resultado = servico.enviar_email(
                 para_email="test@email.com",
                 para_nome="Teste",
                 assunto="Assunto Teste",
-                html="<p>Conteúdo</p>"
+                html="<p>Conteúdo</p>",
+                texto="Conteúdo"
             )
 
-            assert resultado is True
-            mock_send.assert_called_once()
+            mock_send.assert_not_called()
 
-    def test_envio_com_erro_resend(self):
-        """Deve retornar False quando Resend retorna erro"""
-        from resend.exceptions import ResendError
+        assert resultado is True
+        email = email_saida_repo.reservar_lote(10)[0]
+        assert email.para_email == "test@email.com"
+        assert email.assunto == "Assunto Teste"
+        assert email.texto == "Conteúdo"
+        assert email.tentativas == 0
+        assert email_saida_repo.contar_por_status()[StatusEmail.ENVIANDO.value] == 1
+
+    def test_erro_de_banco_retorna_false(self):
+        """Deve retornar False quando não consegue gravar na fila"""
+        import sqlite3
         from util.email_service import ServicoEmail
 
         servico = ServicoEmail()
-        servico.api_key = 'test_key'
-
-        with patch('util.email_service.resend.Emails.send') as mock_send:
-            # ResendError requer code, error_type, message, suggested_action
-            mock_send.side_effect = ResendError(
-                code=500,
-                error_type="api_error",
-                message="API Error",
-                suggested_action="Try again"
-            )
 
+        with patch('util.email_service.email_saida_repo.inserir', side_effect=sqlite3.OperationalError("locked")):
             resultado = servico.enviar_email(
                 para_email="test@email.com",
                 para_nome="Teste",
@@ -98,7 +54,7 @@ class TestEnviarEmail:
                 html="<p>HTML</p>"
             )
 
-            assert resultado is False
+        assert resultado is False
 
 
 class TestEnviarRecuperacaoSenha:
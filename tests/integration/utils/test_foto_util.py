@@ -1,266 +1,414 @@
 """
 Testes para o módulo util/foto_util.py
 
-Testa o gerenciamento de fotos de usuários.
+Testa o gerenciamento de fotos de usuários: armazenamento por hash,
+ponteiro do usuário, versões reduzidas, migração e coleta de órfãs.
 """
 
 import pytest
 import base64
-import tempfile
 import os
+import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from PIL import Image
 import io
 
+from model.usuario_model import Usuario
+from repo import usuario_repo
 from util.foto_util import (
     obter_caminho_foto_usuario,
     obter_path_absoluto_foto,
-    criar_foto_padrao_usuario,
     salvar_foto_cropada_usuario,
+    processar_foto_cropada,
     foto_existe,
     obter_tamanho_foto,
-    PASTA_FOTOS,
+    obter_srcset_foto_usuario,
+    gerar_variantes_fotos_existentes,
+    migrar_fotos_legado,
+    coletar_fotos_orfas,
+    caminho_foto,
+    caminho_variante,
+    calcular_hash,
+    url_foto,
+    TAMANHOS_FOTO,
     FOTO_DEFAULT
 )
+from util.perfis import Perfil
 
 
-class TestObterCaminhoFotoUsuario:
-    """Testes para a função obter_caminho_foto_usuario()"""
-
-    def test_id_1_retorna_caminho_correto(self):
-        """ID 1 deve retornar caminho com zeros à esquerda"""
-        resultado = obter_caminho_foto_usuario(1)
-        assert "000001.jpg" in resultado
-        assert resultado.startswith("/")
-
-    def test_id_grande_retorna_caminho_correto(self):
-        """ID grande deve formatar corretamente"""
-        resultado = obter_caminho_foto_usuario(123456)
-        assert "123456.jpg" in resultado
-
-    def test_caminho_inclui_pasta(self):
-        """Caminho deve incluir pasta de usuários"""
-        resultado = obter_caminho_foto_usuario(1)
-        assert "usuarios" in resultado
+def _criar_usuario(email="foto@example.com") -> int:
+    """Insere um usuário (sem foto própria) e retorna o ID"""
+    return usuario_repo.inserir(Usuario(
+        id=0, nome="Usuário Foto", email=email, senha="hash", perfil=Perfil.ALUNO.value
+    ))
 
 
-class TestObterPathAbsolutoFoto:
-    """Testes para a função obter_path_absoluto_foto()"""
+def _imagem_base64(mode="RGB", size=(100, 100), cor="red"):
+    """Helper para criar imagem base64"""
+    img = Image.new(mode, size, color=cor)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG" if mode in ("RGBA", "P") else "JPEG")
+    return base64.b64encode(buffer.getvalue()).decode()
 
-    def test_retorna_path_objeto(self):
-        """Deve retornar objeto Path"""
-        resultado = obter_path_absoluto_foto(1)
-        assert isinstance(resultado, Path)
 
-    def test_path_inclui_id_formatado(self):
-        """Path deve incluir ID formatado"""
-        resultado = obter_path_absoluto_foto(5)
-        assert "000005.jpg" in str(resultado)
+@pytest.fixture
+def pasta_fotos(tmp_path):
+    """Armazenamento de fotos em tmp_path"""
+    pasta = tmp_path / "fotos"
+    with patch('util.foto_util.PASTA_FOTOS', pasta):
+        yield pasta
 
-    def test_cria_diretorio_se_nao_existir(self):
-        """Deve criar diretório de fotos se não existir"""
-        # O diretório pode já existir, então apenas verificamos que não dá erro
-        resultado = obter_path_absoluto_foto(1)
-        assert resultado is not None
 
+class TestObterCaminhoFotoUsuario:
+    """Testes para a função obter_caminho_foto_usuario()"""
 
-class TestCriarFotoPadraoUsuario:
-    """Testes para a função criar_foto_padrao_usuario()"""
+    def test_sem_foto_retorna_foto_padrao(self):
+        """Usuário sem foto própria aponta para a foto padrão"""
+        usuario_id = _criar_usuario()
 
-    def test_cria_foto_quando_padrao_existe(self):
-        """Deve criar cópia da foto padrão quando existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            # Criar arquivo fake de foto padrão
-            foto_padrao = Path(tmpdir) / "user.jpg"
-            foto_padrao.write_bytes(b"fake image data")
+        assert obter_caminho_foto_usuario(usuario_id) == "/static/img/user.jpg"
 
-            pasta_fotos = Path(tmpdir) / "usuarios"
+    def test_usuario_inexistente_retorna_foto_padrao(self):
+        """ID inexistente também recebe a foto padrão"""
+        assert obter_caminho_foto_usuario(999999) == "/static/img/user.jpg"
 
-            with patch('util.foto_util.FOTO_DEFAULT', foto_padrao):
-                with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                    resultado = criar_foto_padrao_usuario(1)
+    def test_com_foto_retorna_caminho_por_hash(self):
+        """A URL é montada a partir do hash, em duas subpastas"""
+        usuario_id = _criar_usuario()
+        foto = calcular_hash(b"conteudo")
+        usuario_repo.atualizar_foto(usuario_id, foto)
 
-                    assert resultado is True
-                    assert (pasta_fotos / "000001.jpg").exists()
+        resultado = obter_caminho_foto_usuario(usuario_id)
 
-    def test_retorna_false_quando_padrao_nao_existe(self):
-        """Deve retornar False quando foto padrão não existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            foto_inexistente = Path(tmpdir) / "nao_existe.jpg"
+        assert resultado == f"/static/img/fotos/{foto[:2]}/{foto[2:4]}/{foto}.jpg"
 
-            with patch('util.foto_util.FOTO_DEFAULT', foto_inexistente):
-                resultado = criar_foto_padrao_usuario(1)
 
-                assert resultado is False
+class TestObterPathAbsolutoFoto:
+    """Testes para a função obter_path_absoluto_foto()"""
 
-    def test_retorna_false_em_erro_io(self):
-        """Deve retornar False em erro de I/O"""
-        with patch('util.foto_util.FOTO_DEFAULT') as mock_default:
-            mock_default.exists.return_value = True
+    def test_sem_foto_retorna_foto_padrao(self):
+        """Sem ponteiro, o arquivo é a foto padrão"""
+        assert obter_path_absoluto_foto(_criar_usuario()) == FOTO_DEFAULT
 
-            with patch('util.foto_util.obter_path_absoluto_foto') as mock_path:
-                mock_path.side_effect = OSError("Permission denied")
+    def test_com_foto_retorna_arquivo_do_hash(self, pasta_fotos):
+        """Com ponteiro, o arquivo fica no armazenamento"""
+        usuario_id = _criar_usuario()
+        foto = calcular_hash(b"x")
+        usuario_repo.atualizar_foto(usuario_id, foto)
 
-                resultado = criar_foto_padrao_usuario(1)
+        resultado = obter_path_absoluto_foto(usuario_id)
 
-                assert resultado is False
+        assert isinstance(resultado, Path)
+        assert resultado == pasta_fotos / foto[:2] / foto[2:4] / f"{foto}.jpg"
 
 
 class TestSalvarFotoCropadaUsuario:
     """Testes para a função salvar_foto_cropada_usuario()"""
 
-    def _criar_imagem_base64(self, mode="RGB", size=(100, 100)):
-        """Helper para criar imagem base64"""
-        img = Image.new(mode, size, color="red")
-        buffer = io.BytesIO()
-        if mode in ("RGBA", "P"):
-            img.save(buffer, format="PNG")
-        else:
-            img.save(buffer, format="JPEG")
-        return base64.b64encode(buffer.getvalue()).decode()
-
-    def test_salva_imagem_rgb(self):
-        """Deve salvar imagem RGB corretamente"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
-
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                base64_img = self._criar_imagem_base64("RGB")
+    def test_salva_imagem_e_atualiza_ponteiro(self, pasta_fotos):
+        """A foto é gravada pelo hash do JPG e vira o ponteiro do usuário"""
+        usuario_id = _criar_usuario()
 
-                resultado = salvar_foto_cropada_usuario(1, base64_img)
+        resultado = salvar_foto_cropada_usuario(usuario_id, _imagem_base64())
 
-                assert resultado is True
-                assert (pasta_fotos / "000001.jpg").exists()
+        assert resultado is True
+        foto = usuario_repo.obter_foto(usuario_id)
+        destino = caminho_foto(foto)
+        assert destino.exists()
+        assert calcular_hash(destino.read_bytes()) == foto
 
-    def test_salva_imagem_com_prefixo_data_url(self):
+    def test_salva_imagem_com_prefixo_data_url(self, pasta_fotos):
         """Deve remover prefixo data:image e salvar"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
+        data_url = f"data:image/jpeg;base64,{_imagem_base64()}"
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                base64_img = self._criar_imagem_base64("RGB")
-                data_url = f"data:image/jpeg;base64,{base64_img}"
+        assert salvar_foto_cropada_usuario(_criar_usuario(), data_url) is True
 
-                resultado = salvar_foto_cropada_usuario(1, data_url)
-
-                assert resultado is True
-
-    def test_converte_rgba_para_rgb(self):
+    def test_converte_rgba_para_rgb(self, pasta_fotos):
         """Deve converter RGBA para RGB"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
-
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                base64_img = self._criar_imagem_base64("RGBA")
-
-                resultado = salvar_foto_cropada_usuario(1, base64_img)
+        usuario_id = _criar_usuario()
 
-                assert resultado is True
+        assert salvar_foto_cropada_usuario(usuario_id, _imagem_base64("RGBA")) is True
+        with Image.open(obter_path_absoluto_foto(usuario_id)) as img:
+            assert img.mode == "RGB"
 
-    def test_converte_modo_p_para_rgb(self):
+    def test_converte_modo_p_para_rgb(self, pasta_fotos):
         """Deve converter modo P (palette) para RGB"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
+        assert salvar_foto_cropada_usuario(_criar_usuario(), _imagem_base64("P")) is True
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                # Criar imagem P (palette)
-                img = Image.new("P", (100, 100))
-                buffer = io.BytesIO()
-                img.save(buffer, format="PNG")
-                base64_img = base64.b64encode(buffer.getvalue()).decode()
-
-                resultado = salvar_foto_cropada_usuario(1, base64_img)
-
-                assert resultado is True
-
-    def test_redimensiona_imagem_grande(self):
+    def test_redimensiona_imagem_grande(self, pasta_fotos):
         """Deve redimensionar imagem maior que o limite"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
+        usuario_id = _criar_usuario()
+        with patch('util.foto_util.config') as mock_config:
+            mock_config.obter_int.return_value = 50  # Limite de 50px
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                with patch('util.foto_util.config') as mock_config:
-                    mock_config.obter_int.return_value = 50  # Limite de 50px
+            resultado = salvar_foto_cropada_usuario(usuario_id, _imagem_base64(size=(100, 100)))
 
-                    # Imagem grande de 100x100
-                    base64_img = self._criar_imagem_base64("RGB", (100, 100))
+        assert resultado is True
+        with Image.open(obter_path_absoluto_foto(usuario_id)) as img:
+            assert img.width <= 50
+            assert img.height <= 50
 
-                    resultado = salvar_foto_cropada_usuario(1, base64_img)
+    def test_fotos_iguais_gravadas_uma_vez(self, pasta_fotos):
+        """Dois usuários com a mesma foto compartilham o arquivo"""
+        imagem = _imagem_base64()
+        primeiro, segundo = _criar_usuario(), _criar_usuario("outro@example.com")
 
-                    assert resultado is True
+        salvar_foto_cropada_usuario(primeiro, imagem)
+        salvar_foto_cropada_usuario(segundo, imagem)
 
-                    # Verificar que foi salvo e redimensionado
-                    saved_img = Image.open(pasta_fotos / "000001.jpg")
-                    assert saved_img.width <= 50
-                    assert saved_img.height <= 50
+        assert usuario_repo.obter_foto(primeiro) == usuario_repo.obter_foto(segundo)
+        assert [f.stem for f in pasta_fotos.glob("*/*/*.jpg") if "-" not in f.stem] == [
+            usuario_repo.obter_foto(primeiro)
+        ]
 
-    def test_retorna_false_base64_invalido(self):
+    def test_retorna_false_base64_invalido(self, pasta_fotos):
         """Deve retornar False para base64 inválido"""
         resultado = salvar_foto_cropada_usuario(1, "isso não é base64 válido!!!")
 
         assert resultado is False
 
-    def test_retorna_false_imagem_invalida(self):
-        """Deve retornar False para dados que não são imagem"""
-        # Base64 válido mas não é imagem
+    def test_retorna_false_imagem_invalida(self, pasta_fotos):
+        """Deve retornar False para dados que não são imagem, sem mudar o ponteiro"""
+        usuario_id = _criar_usuario()
         base64_data = base64.b64encode(b"texto qualquer").decode()
 
-        resultado = salvar_foto_cropada_usuario(1, base64_data)
+        resultado = salvar_foto_cropada_usuario(usuario_id, base64_data)
 
         assert resultado is False
+        assert usuario_repo.obter_foto(usuario_id) is None
 
 
-class TestFotoExiste:
-    """Testes para a função foto_existe()"""
+class TestProcessarFotoCropada:
+    """Testes do processamento a partir do arquivo enviado no upload"""
 
-    def test_retorna_true_quando_existe(self):
-        """Deve retornar True quando foto existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
-            pasta_fotos.mkdir()
-            (pasta_fotos / "000001.jpg").write_bytes(b"fake")
+    def test_jpeg_grande_decodificado_em_escala_reduzida(self, tmp_path):
+        """JPEG com o dobro ou mais do tamanho final usa o modo draft"""
+        from PIL.JpegImagePlugin import JpegImageFile
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                resultado = foto_existe(1)
+        origem = tmp_path / "upload.tmp"
+        Image.new("RGB", (2000, 1600), color="green").save(origem, format="JPEG")
 
-                assert resultado is True
+        with patch.object(JpegImageFile, "draft", autospec=True, side_effect=JpegImageFile.draft) as draft:
+            foto, tempos = processar_foto_cropada(origem, 256, tmp_path)
 
-    def test_retorna_false_quando_nao_existe(self):
-        """Deve retornar False quando foto não existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
-            pasta_fotos.mkdir()
+        # Primeira chamada, antes do load (o thumbnail também chama draft depois)
+        assert draft.call_args_list[0].args[1:] == ("RGB", (256, 256))
+        with Image.open(caminho_foto(foto, tmp_path)) as img:
+            assert img.size == (256, 205)
+        assert "decodificacao" in tempos
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                resultado = foto_existe(999)
+    def test_png_nao_usa_draft(self, tmp_path):
+        """Formatos sem decodificação reduzida são lidos normalmente"""
+        origem = tmp_path / "upload.tmp"
+        Image.new("RGBA", (600, 600), (0, 0, 255, 128)).save(origem, format="PNG")
 
-                assert resultado is False
+        foto, _ = processar_foto_cropada(origem, 256, tmp_path)
 
+        with Image.open(caminho_foto(foto, tmp_path)) as img:
+            assert img.mode == "RGB"
+            assert img.size == (256, 256)
 
-class TestObterTamanhoFoto:
-    """Testes para a função obter_tamanho_foto()"""
+    def test_foto_repetida_nao_regrava(self, tmp_path):
+        """Conteúdo já armazenado só tem o mtime renovado"""
+        origem = tmp_path / "upload.tmp"
+        Image.new("RGB", (100, 100), "red").save(origem, format="JPEG")
 
-    def test_retorna_tamanho_quando_existe(self):
-        """Deve retornar tamanho em bytes quando foto existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
-            pasta_fotos.mkdir()
-            foto = pasta_fotos / "000001.jpg"
-            foto.write_bytes(b"12345678")  # 8 bytes
+        foto, primeira = processar_foto_cropada(origem, 256, tmp_path)
+        destino = caminho_foto(foto, tmp_path)
+        os.utime(destino, (0, 0))
+        mesma, segunda = processar_foto_cropada(origem, 256, tmp_path)
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                resultado = obter_tamanho_foto(1)
+        assert mesma == foto
+        assert "gravacao" in primeira and "gravacao" not in segunda
+        assert destino.stat().st_mtime > 0
 
-                assert resultado == 8
 
-    def test_retorna_none_quando_nao_existe(self):
-        """Deve retornar None quando foto não existe"""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pasta_fotos = Path(tmpdir) / "usuarios"
-            pasta_fotos.mkdir()
+class TestFotoExiste:
+    """Testes para a função foto_existe()"""
 
-            with patch('util.foto_util.PASTA_FOTOS', pasta_fotos):
-                resultado = obter_tamanho_foto(999)
+    def test_retorna_true_quando_existe(self, pasta_fotos):
+        """Deve retornar True quando o usuário aponta para foto gravada"""
+        usuario_id = _criar_usuario()
+        salvar_foto_cropada_usuario(usuario_id, _imagem_base64())
 
-                assert resultado is None
+        assert foto_existe(usuario_id) is True
+
+    def test_retorna_false_com_foto_padrao(self, pasta_fotos):
+        """Usuário sem foto própria não tem foto"""
+        assert foto_existe(_criar_usuario()) is False
+
+    def test_retorna_false_quando_arquivo_nao_existe(self, pasta_fotos):
+        """Ponteiro para arquivo ausente conta como sem foto"""
+        usuario_id = _criar_usuario()
+        usuario_repo.atualizar_foto(usuario_id, calcular_hash(b"sumiu"))
+
+        assert foto_existe(usuario_id) is False
+
+
+class TestObterTamanhoFoto:
+    """Testes para a função obter_tamanho_foto()"""
+
+    def test_retorna_tamanho_quando_existe(self, pasta_fotos):
+        """Deve retornar tamanho em bytes quando foto existe"""
+        usuario_id = _criar_usuario()
+        foto = calcular_hash(b"12345678")
+        destino = caminho_foto(foto)
+        destino.parent.mkdir(parents=True)
+        destino.write_bytes(b"12345678")  # 8 bytes
+        usuario_repo.atualizar_foto(usuario_id, foto)
+
+        assert obter_tamanho_foto(usuario_id) == 8
+
+    def test_retorna_none_quando_nao_existe(self, pasta_fotos):
+        """Deve retornar None quando o arquivo da foto não existe"""
+        usuario_id = _criar_usuario()
+        usuario_repo.atualizar_foto(usuario_id, calcular_hash(b"sumiu"))
+
+        assert obter_tamanho_foto(usuario_id) is None
+
+
+class TestVariantesFoto:
+    """Testes das versões reduzidas (JPG e WebP) usadas em srcset"""
+
+    def _salvar_foto(self, usuario_id, tamanho=(300, 200)):
+        return salvar_foto_cropada_usuario(usuario_id, _imagem_base64("RGBA", tamanho))
+
+    def test_upload_gera_todas_as_variantes(self, pasta_fotos):
+        """Cada upload grava um JPG e um WebP por tamanho"""
+        usuario_id = _criar_usuario()
+        assert self._salvar_foto(usuario_id) is True
+        foto = obter_path_absoluto_foto(usuario_id)
+
+        for tamanho in TAMANHOS_FOTO:
+            with Image.open(caminho_variante(foto, tamanho)) as jpg:
+                assert max(jpg.size) == min(tamanho, 256)
+            with Image.open(caminho_variante(foto, tamanho, "webp")) as webp:
+                assert webp.format == "WEBP"
+
+    def test_variante_nao_amplia(self, pasta_fotos):
+        """Fotos menores que o tamanho não são ampliadas"""
+        usuario_id = _criar_usuario()
+        self._salvar_foto(usuario_id, (50, 50))
+
+        with Image.open(caminho_variante(obter_path_absoluto_foto(usuario_id), 256)) as jpg:
+            assert jpg.size == (50, 50)
+
+    def test_caminho_com_tamanho(self):
+        """Com tamanho, usa a menor variante que o cobre"""
+        foto = calcular_hash(b"x")
+
+        assert url_foto(foto, 40).endswith(f"{foto}-64.jpg")
+        assert url_foto(foto, 1000).endswith(f"{foto}-256.jpg")
+        assert url_foto(foto).endswith(f"{foto}.jpg")
+        assert url_foto(None, 40) == "/static/img/user-64.jpg"
+
+    def test_srcset(self):
+        """srcset traz as versões 1x e 2x da foto do usuário"""
+        usuario_id = _criar_usuario()
+        assert obter_srcset_foto_usuario(usuario_id, 32) == (
+            "/static/img/user-32.jpg 1x, /static/img/user-64.jpg 2x"
+        )
+
+        foto = calcular_hash(b"x")
+        usuario_repo.atualizar_foto(usuario_id, foto)
+        srcset = obter_srcset_foto_usuario(usuario_id, 32, "webp")
+
+        assert srcset == (
+            f"/static/img/fotos/{foto[:2]}/{foto[2:4]}/{foto}-32.webp 1x, "
+            f"/static/img/fotos/{foto[:2]}/{foto[2:4]}/{foto}-64.webp 2x"
+        )
+
+    def test_backfill_de_fotos_existentes(self, pasta_fotos):
+        """O backfill gera as variantes que faltam e pula as atualizadas"""
+        valida = caminho_foto("a" * 64)
+        corrompida = caminho_foto("b" * 64)
+        valida.parent.mkdir(parents=True)
+        corrompida.parent.mkdir(parents=True)
+        Image.new("RGB", (256, 256)).save(valida)
+        corrompida.write_bytes(b"corrompida")
+
+        with patch('util.foto_util.FOTO_DEFAULT', pasta_fotos / "inexistente.jpg"):
+            primeira = gerar_variantes_fotos_existentes()
+            segunda = gerar_variantes_fotos_existentes()
+
+        assert primeira == {"fotos": 2, "atualizadas": 1, "erros": 1}
+        assert segunda["atualizadas"] == 0
+        assert caminho_variante(valida, 128).exists()
+
+
+class TestMigrarFotosLegado:
+    """Testes da migração do formato anterior (uma cópia por usuário)"""
+
+    @pytest.fixture
+    def pasta_legado(self, tmp_path, pasta_fotos):
+        pasta = tmp_path / "usuarios"
+        pasta.mkdir()
+        padrao = tmp_path / "user.jpg"
+        Image.new("RGB", (64, 64), "gray").save(padrao)
+        with patch('util.foto_util.PASTA_FOTOS_LEGADO', pasta), \
+                patch('util.foto_util.FOTO_DEFAULT', padrao):
+            yield pasta
+
+    def test_migra_fotos_e_descarta_copias_da_padrao(self, pasta_legado, tmp_path):
+        """Fotos próprias viram ponteiros; cópias da padrão são apagadas"""
+        com_foto, sem_foto = _criar_usuario(), _criar_usuario("padrao@example.com")
+        Image.new("RGB", (100, 100), "red").save(pasta_legado / f"{com_foto:06d}.jpg")
+        Image.new("RGB", (100, 100), "red").save(pasta_legado / f"{com_foto:06d}-64.jpg")
+        (pasta_legado / f"{sem_foto:06d}.jpg").write_bytes((tmp_path / "user.jpg").read_bytes())
+
+        resultado = migrar_fotos_legado()
+
+        assert resultado == {"fotos": 2, "migradas": 1, "padrao": 1, "erros": 0}
+        assert usuario_repo.obter_foto(sem_foto) is None
+        foto = obter_path_absoluto_foto(com_foto)
+        assert foto.exists()
+        # Variante existente reaproveitada, as que faltavam geradas
+        assert caminho_variante(foto, 64).exists()
+        assert caminho_variante(foto, 256, "webp").exists()
+        assert not pasta_legado.exists()
+
+    def test_mantem_arquivo_com_erro(self, pasta_legado):
+        """Arquivo ilegível fica na pasta antiga para nova tentativa"""
+        usuario_id = _criar_usuario()
+        (pasta_legado / f"{usuario_id:06d}.jpg").write_bytes(b"corrompida")
+
+        resultado = migrar_fotos_legado()
+
+        assert resultado["erros"] == 1
+        assert (pasta_legado / f"{usuario_id:06d}.jpg").exists()
+        assert usuario_repo.obter_foto(usuario_id) is None
+
+    def test_sem_pasta_antiga(self, pasta_fotos, tmp_path):
+        """Sem a pasta antiga, nada a migrar"""
+        with patch('util.foto_util.PASTA_FOTOS_LEGADO', tmp_path / "inexistente"):
+            assert migrar_fotos_legado()["fotos"] == 0
+
+
+class TestColetarFotosOrfas:
+    """Testes da remoção de fotos que nenhum usuário referencia"""
+
+    def test_remove_orfas_antigas(self, pasta_fotos):
+        """A foto anterior de quem trocou de foto é removida com as variantes"""
+        usuario_id = _criar_usuario()
+        salvar_foto_cropada_usuario(usuario_id, _imagem_base64(cor="red"))
+        antiga = obter_path_absoluto_foto(usuario_id)
+        salvar_foto_cropada_usuario(usuario_id, _imagem_base64(cor="blue"))
+        atual = obter_path_absoluto_foto(usuario_id)
+        os.utime(antiga, (0, 0))
+
+        resultado = coletar_fotos_orfas()
+
+        assert resultado == {"fotos": 2, "removidas": 1}
+        assert not antiga.exists()
+        assert not caminho_variante(antiga, 64, "webp").exists()
+        assert atual.exists()
+
+    def test_mantem_orfas_recentes(self, pasta_fotos):
+        """Uma foto recém-gravada, ainda sem ponteiro, não é removida"""
+        usuario_id = _criar_usuario()
+        salvar_foto_cropada_usuario(usuario_id, _imagem_base64())
+        usuario_repo.atualizar_foto(usuario_id, None)
+
+        assert coletar_fotos_orfas()["removidas"] == 0
+        assert coletar_fotos_orfas(idade_minima_segundos=-time.time())["removidas"] == 1
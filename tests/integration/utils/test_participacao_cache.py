@@ -0,0 +1,153 @@
+"""
+Testes para o módulo util/participacao_cache.py
+
+Testa o cache LRU com TTL das verificações de participação em salas.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from model.usuario_model import Usuario
+from repo import usuario_repo, chat_sala_repo, chat_participante_repo
+from util.participacao_cache import ParticipacaoCache, participacao_cache
+from util.perfis import Perfil
+from util.security import criar_hash_senha
+
+
+@pytest.fixture
+def sala_com_participante():
+    """Cria uma sala com um participante e um usuário de fora."""
+    ids = []
+    for i in range(2):
+        ids.append(usuario_repo.inserir(Usuario(
+            id=0,
+            nome=f"Usuario Cache {i}",
+            email=f"cache{i}@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.ALUNO.value
+        )))
+    sala = chat_sala_repo.criar_ou_obter_sala(ids[0], ids[1])
+    chat_participante_repo.adicionar_participante(sala.id, ids[0])
+    return sala.id, ids[0], ids[1]
+
+
+def _contar_consultas(cache, sala_id, usuario_id, vezes):
+    """Executa a verificação várias vezes e conta as consultas ao banco."""
+    original = chat_participante_repo.obter_por_sala_e_usuario
+    with patch.object(chat_participante_repo, "obter_por_sala_e_usuario", side_effect=original) as mock:
+        resultados = [cache.participa(sala_id, usuario_id) for _ in range(vezes)]
+    return resultados, mock.call_count
+
+
+class TestParticipacaoCache:
+    """Testes para ParticipacaoCache"""
+
+    def test_positivo_consulta_banco_uma_vez(self, sala_com_participante):
+        """Participação confirmada deve ser servida do cache"""
+        sala_id, participante_id, _ = sala_com_participante
+        cache = ParticipacaoCache(ttl_segundos=60, max_entradas=10)
+
+        resultados, consultas = _contar_consultas(cache, sala_id, participante_id, 5)
+
+        assert resultados == [True] * 5
+        assert consultas == 1
+
+    def test_negativo_nao_e_cacheado(self, sala_com_participante):
+        """Não participante deve ser reconhecido assim que for adicionado"""
+        sala_id, _, outro_id = sala_com_participante
+        cache = ParticipacaoCache(ttl_segundos=60, max_entradas=10)
+
+        assert cache.participa(sala_id, outro_id) is False
+        chat_participante_repo.adicionar_participante(sala_id, outro_id)
+
+        assert cache.participa(sala_id, outro_id) is True
+
+    def test_ttl_expirado_consulta_novamente(self, sala_com_participante):
+        """Entradas vencidas devem ser revalidadas no banco"""
+        sala_id, participante_id, _ = sala_com_participante
+        cache = ParticipacaoCache(ttl_segundos=0, max_entradas=10)
+
+        _, consultas = _contar_consultas(cache, sala_id, participante_id, 3)
+
+        assert consultas == 3
+
+    def test_limite_descarta_menos_recente(self, sala_com_participante):
+        """Acima do limite, a entrada usada há mais tempo sai do cache"""
+        sala_id, participante_id, outro_id = sala_com_participante
+        chat_participante_repo.adicionar_participante(sala_id, outro_id)
+        cache = ParticipacaoCache(ttl_segundos=60, max_entradas=1)
+
+        cache.participa(sala_id, participante_id)
+        cache.participa(sala_id, outro_id)
+
+        assert len(cache) == 1
+        _, consultas = _contar_consultas(cache, sala_id, participante_id, 1)
+        assert consultas == 1
+
+    def test_invalidar_sala(self, sala_com_participante):
+        """invalidar deve remover as participações da sala"""
+        sala_id, participante_id, _ = sala_com_participante
+        cache = ParticipacaoCache(ttl_segundos=60, max_entradas=10)
+        cache.participa(sala_id, participante_id)
+
+        cache.invalidar(sala_id)
+
+        assert len(cache) == 0
+
+    def test_participa_async_consulta_banco_fora_do_event_loop(self, sala_com_participante):
+        """Em cache miss, a consulta ao banco não deve rodar no event loop"""
+        sala_id, participante_id, _ = sala_com_participante
+        cache = ParticipacaoCache(ttl_segundos=60, max_entradas=10)
+        original = chat_participante_repo.obter_por_sala_e_usuario
+        consultas_no_loop = []
+
+        def consultar(*args):
+            try:
+                asyncio.get_running_loop()
+                consultas_no_loop.append(args)
+            except RuntimeError:
+                pass
+            return original(*args)
+
+        with patch.object(chat_participante_repo, "obter_por_sala_e_usuario", side_effect=consultar) as mock:
+            assert asyncio.run(cache.participa_async(sala_id, participante_id)) is True
+            assert asyncio.run(cache.participa_async(sala_id, participante_id)) is True
+
+        assert mock.call_count == 1
+        assert consultas_no_loop == []
+
+
+class TestInvalidacaoPelosRepositorios:
+    """Exclusões nos repositórios devem invalidar o cache global"""
+
+    @pytest.fixture(autouse=True)
+    def limpar_cache(self):
+        participacao_cache.limpar()
+        yield
+        participacao_cache.limpar()
+
+    def test_remover_participante(self, sala_com_participante):
+        sala_id, participante_id, _ = sala_com_participante
+        assert participacao_cache.participa(sala_id, participante_id) is True
+
+        chat_participante_repo.excluir(sala_id, participante_id)
+
+        assert participacao_cache.participa(sala_id, participante_id) is False
+
+    def test_excluir_sala(self, sala_com_participante):
+        sala_id, participante_id, _ = sala_com_participante
+        assert participacao_cache.participa(sala_id, participante_id) is True
+
+        chat_sala_repo.excluir(sala_id)
+
+        assert participacao_cache.participa(sala_id, participante_id) is False
+
+    def test_excluir_usuario(self, sala_com_participante):
+        sala_id, participante_id, _ = sala_com_participante
+        assert participacao_cache.participa(sala_id, participante_id) is True
+
+        usuario_repo.excluir(participante_id)
+
+        assert participacao_cache.participa(sala_id, participante_id) is False
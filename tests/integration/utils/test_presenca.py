@@ -0,0 +1,197 @@
+"""
+Testes para o módulo util/presenca.py e repo/presenca_repo.py
+
+Testa heartbeats, expiração por TTL, consulta em lote e a publicação
+das mudanças de presença via SSE (inclusive as feitas por outros workers).
+"""
+
+import time
+import pytest
+from datetime import timedelta
+
+from model.usuario_model import Usuario
+from repo import usuario_repo, chat_sala_repo, chat_participante_repo, presenca_repo
+from util.chat_manager import gerenciador_chat
+from util.datetime_util import agora
+from util.db_util import obter_conexao
+from util.perfis import Perfil
+from util.presenca import ServicoPresenca, BackendPresencaMemoria, criar_backend
+from util.security import criar_hash_senha
+
+
+@pytest.fixture
+def contatos():
+    """Cria dois usuários que compartilham uma sala."""
+    ids = []
+    for i in range(2):
+        ids.append(usuario_repo.inserir(Usuario(
+            id=0,
+            nome=f"Usuario Presenca {i}",
+            email=f"presenca{i}@example.com",
+            senha=criar_hash_senha("Senha@123"),
+            perfil=Perfil.ALUNO.value
+        )))
+    sala = chat_sala_repo.criar_ou_obter_sala(ids[0], ids[1])
+    for usuario_id in ids:
+        chat_participante_repo.adicionar_participante(sala.id, usuario_id)
+    return ids
+
+
+@pytest.fixture(params=["sqlite", "memoria"])
+def backend(request):
+    """Executa os testes com os dois backends de presença."""
+    return criar_backend(request.param)
+
+
+def _envelhecer_heartbeat(usuario_id: int, segundos: int):
+    """Simula um heartbeat antigo no backend SQLite."""
+    with obter_conexao() as conn:
+        conn.execute(
+            "UPDATE presenca SET ultimo_acesso = ? WHERE usuario_id = ?",
+            (agora() - timedelta(seconds=segundos), usuario_id)
+        )
+
+
+class TestBackendPresenca:
+    """Testes da interface comum dos backends"""
+
+    def test_heartbeat_indica_transicao(self, backend, contatos):
+        """Só o primeiro heartbeat muda o usuário para online"""
+        assert backend.registrar_heartbeat(contatos[0]) is True
+        assert backend.registrar_heartbeat(contatos[0]) is False
+
+    def test_desconexao_da_ultima_conexao(self, backend, contatos):
+        """A desconexão só muda para offline ao fechar a última conexão"""
+        assert backend.registrar_desconexao(contatos[0]) is False
+
+        assert backend.registrar_conexao(contatos[0]) is True
+        assert backend.registrar_conexao(contatos[0]) is False
+
+        assert backend.registrar_desconexao(contatos[0]) is False
+        assert backend.obter_por_usuarios([contatos[0]])[contatos[0]].online is True
+        assert backend.registrar_desconexao(contatos[0]) is True
+        assert backend.obter_por_usuarios([contatos[0]])[contatos[0]].online is False
+
+    def test_expiracao_zera_conexoes(self, backend, contatos):
+        """Conexões de um worker encerrado não seguram o usuário online após expirar"""
+        backend.registrar_conexao(contatos[0])
+        backend.registrar_conexao(contatos[0])  # Stream de um worker que morreu
+        time.sleep(0.002)
+        backend.expirar(0)
+
+        assert backend.registrar_conexao(contatos[0]) is True
+        assert backend.registrar_desconexao(contatos[0]) is True
+
+    def test_obter_por_usuarios_em_lote(self, backend, contatos):
+        """Usuários sem registro ficam fora do resultado"""
+        backend.registrar_heartbeat(contatos[0])
+
+        presencas = backend.obter_por_usuarios([contatos[0], contatos[1], 9999])
+
+        assert list(presencas) == [contatos[0]]
+        assert presencas[contatos[0]].online is True
+
+    def test_listar_alterados_desde(self, backend, contatos):
+        """Deve listar apenas mudanças posteriores ao instante"""
+        backend.registrar_heartbeat(contatos[0])
+        time.sleep(0.002)
+        instante = agora()
+        time.sleep(0.002)
+        backend.registrar_heartbeat(contatos[1])
+
+        alterados = backend.listar_alterados_desde(instante)
+
+        assert [p.usuario_id for p in alterados] == [contatos[1]]
+
+
+class TestExpiracao:
+    """Testes de expiração por TTL no backend SQLite"""
+
+    def test_expirar_heartbeat_vencido(self, contatos):
+        """Heartbeat mais antigo que o TTL deve ficar offline"""
+        presenca_repo.registrar_heartbeat(contatos[0])
+        presenca_repo.registrar_heartbeat(contatos[1])
+        _envelhecer_heartbeat(contatos[0], 120)
+
+        assert presenca_repo.expirar(90) == [contatos[0]]
+        assert presenca_repo.expirar(90) == []
+
+    async def test_obter_presencas_respeita_ttl(self, contatos):
+        """Antes da varredura, heartbeat vencido já aparece offline"""
+        servico = ServicoPresenca(backend=presenca_repo, ttl_segundos=90)
+        presenca_repo.registrar_heartbeat(contatos[0])
+        _envelhecer_heartbeat(contatos[0], 120)
+
+        presencas = await servico.obter_presencas([contatos[0]])
+
+        assert presencas[contatos[0]]["online"] is False
+        assert presencas[contatos[0]]["ultimo_acesso"] is not None
+
+
+class TestPublicacao:
+    """Testes da publicação de eventos de presença via SSE"""
+
+    async def test_conexao_publica_para_contato(self, contatos):
+        """Ficar online deve notificar o contato conectado"""
+        servico = ServicoPresenca(backend=BackendPresencaMemoria())
+        fila = await gerenciador_chat.conectar(contatos[1])
+
+        await servico.registrar_heartbeat(contatos[0])
+        await servico.registrar_heartbeat(contatos[0])
+
+        assert fila.qsize() == 1
+        evento = fila.get_nowait()
+        assert evento["tipo"] == "presenca"
+        assert evento["usuario_id"] == contatos[0]
+        assert evento["online"] is True
+
+    async def test_desconexao_publica_offline(self, contatos):
+        """Sair deve publicar o evento offline"""
+        servico = ServicoPresenca(backend=BackendPresencaMemoria())
+        await servico.registrar_heartbeat(contatos[0])
+        fila = await gerenciador_chat.conectar(contatos[1])
+
+        await servico.registrar_desconexao(contatos[0])
+
+        assert fila.get_nowait()["online"] is False
+
+    async def test_aba_em_outro_worker_mantem_online(self, contatos):
+        """Fechar o stream em um worker não derruba a conexão viva em outro"""
+        worker_a = ServicoPresenca(backend=presenca_repo)
+        worker_b = ServicoPresenca(backend=presenca_repo)
+        await worker_a.registrar_conexao(contatos[0])
+        await worker_b.registrar_conexao(contatos[0])
+
+        await worker_b.registrar_desconexao(contatos[0])
+
+        presencas = await worker_a.obter_presencas([contatos[0]])
+        assert presencas[contatos[0]]["online"] is True
+        await worker_a.registrar_desconexao(contatos[0])
+        presencas = await worker_a.obter_presencas([contatos[0]])
+        assert presencas[contatos[0]]["online"] is False
+
+    async def test_varredura_repassa_mudanca_de_outro_worker(self, contatos):
+        """Mudança gravada por outro processo chega às conexões locais uma vez"""
+        servico = ServicoPresenca(backend=presenca_repo)
+        servico._ultima_varredura = agora() - timedelta(seconds=5)
+        fila = await gerenciador_chat.conectar(contatos[1])
+
+        # Outro worker registra o heartbeat direto no banco compartilhado
+        presenca_repo.registrar_heartbeat(contatos[0])
+
+        assert await servico.varrer() == 1
+        assert await servico.varrer() == 0
+        assert fila.qsize() == 1
+
+    async def test_varredura_publica_expiracao(self, contatos):
+        """Conexão perdida sem desconexão deve ser publicada como offline"""
+        servico = ServicoPresenca(backend=presenca_repo, ttl_segundos=90)
+        await servico.registrar_heartbeat(contatos[0])
+        _envelhecer_heartbeat(contatos[0], 120)
+        fila = await gerenciador_chat.conectar(contatos[1])
+
+        await servico.varrer()
+
+        evento = fila.get_nowait()
+        assert evento["usuario_id"] == contatos[0]
+        assert evento["online"] is False
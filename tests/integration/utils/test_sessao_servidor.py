@@ -0,0 +1,264 @@
+"""
+Testes para o módulo util/sessao_servidor.py e repo/sessao_repo.py
+
+Testa o LRU de sessões com persistência no SQLite, a expiração, a
+revogação (logout e por usuário) e o cookie com apenas o ID da sessão.
+"""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from model.sessao_model import Sessao
+from repo import sessao_repo
+from util.datetime_util import agora
+from util.sessao_servidor import COOKIE_SESSAO, ArmazenamentoSessoes, SessaoRevogada, armazenamento_sessoes
+
+
+def _dados_usuario(usuario_id: int) -> dict:
+    """Conteúdo de sessão de um usuário logado."""
+    return {"usuario_logado": {"id": usuario_id, "nome": "Teste"}}
+
+
+@pytest.fixture
+def armazenamento():
+    """Armazenamento isolado, com cache e renovação longos."""
+    return ArmazenamentoSessoes(
+        max_idade_segundos=3600, max_entradas=100, cache_segundos=300, renovacao_segundos=300
+    )
+
+
+class TestSessaoRepo:
+    """Testes do repositório de sessões"""
+
+    def test_inserir_e_obter(self):
+        """Sessão salva deve ser lida com os mesmos dados"""
+        instante = agora()
+        sessao_repo.inserir(Sessao("abc", '{"a":1}', 7, instante + timedelta(hours=1), instante))
+
+        sessao = sessao_repo.obter_por_id("abc")
+
+        assert sessao.dados == '{"a":1}'
+        assert sessao.usuario_id == 7
+
+    def test_sessao_expirada_nao_e_retornada(self):
+        """Sessões expiradas são ignoradas e excluídas pela varredura"""
+        instante = agora()
+        sessao_repo.inserir(Sessao("velha", "{}", None, instante - timedelta(seconds=1), instante))
+
+        assert sessao_repo.obter_por_id("velha") is None
+        assert sessao_repo.excluir_expiradas() == 1
+
+    def test_excluir_por_usuario_preserva_excecao(self):
+        """A sessão informada em exceto_id não é excluída"""
+        expira_em = agora() + timedelta(hours=1)
+        for sessao_id in ["s1", "s2", "s3"]:
+            sessao_repo.inserir(Sessao(sessao_id, "{}", 5, expira_em))
+
+        assert sessao_repo.excluir_por_usuario(5, exceto_id="s2") == 2
+        assert sessao_repo.obter_por_id("s2") is not None
+
+
+class TestArmazenamentoSessoes:
+    """Testes do LRU com persistência"""
+
+    def test_salvar_e_carregar(self, armazenamento):
+        """Dados salvos voltam iguais, também após esvaziar a memória"""
+        armazenamento.salvar("s1", _dados_usuario(1), nova=True)
+
+        assert armazenamento.carregar("s1") == _dados_usuario(1)
+        armazenamento.limpar()
+        assert armazenamento.carregar("s1") == _dados_usuario(1)
+
+    def test_sessao_inexistente(self, armazenamento):
+        """ID desconhecido retorna None"""
+        assert armazenamento.carregar("nao-existe") is None
+
+    def test_sessao_inalterada_nao_e_regravada(self, armazenamento):
+        """Sem mudanças e dentro do intervalo de renovação, nada é gravado"""
+        assert armazenamento.salvar("s1", {"a": 1}, nova=True) is True
+
+        assert armazenamento.salvar("s1", {"a": 1}) is False
+        assert armazenamento.salvar("s1", {"a": 2}) is True
+
+    def test_renovacao_da_expiracao(self, armazenamento):
+        """Após o intervalo de renovação, a sessão é regravada com nova expiração"""
+        armazenamento.renovacao_segundos = 0
+        armazenamento.salvar("s1", {"a": 1}, nova=True)
+        expira_antes = sessao_repo.obter_por_id("s1").expira_em
+
+        assert armazenamento.salvar("s1", {"a": 1}) is True
+        assert sessao_repo.obter_por_id("s1").expira_em >= expira_antes
+
+    def test_lru_descarta_menos_usada(self, armazenamento):
+        """Acima do limite, a sessão menos usada sai da memória (não do banco)"""
+        armazenamento.max_entradas = 2
+        armazenamento.salvar("s1", {"a": 1}, nova=True)
+        armazenamento.salvar("s2", {"a": 2}, nova=True)
+        armazenamento.carregar("s1")
+        armazenamento.salvar("s3", {"a": 3}, nova=True)
+
+        assert list(armazenamento._cache) == ["s1", "s3"]
+        assert armazenamento.carregar("s2") == {"a": 2}
+
+    def test_sem_cache_rele_o_banco(self, armazenamento):
+        """Com cache_segundos=0, alterações de outro worker são vistas na hora"""
+        armazenamento.cache_segundos = 0
+        outro_worker = ArmazenamentoSessoes(max_idade_segundos=3600)
+        armazenamento.salvar("s1", {"a": 1}, nova=True)
+        armazenamento.carregar("s1")
+
+        outro_worker.salvar("s1", {"a": 2})
+
+        assert armazenamento.carregar("s1") == {"a": 2}
+
+    def test_revogar(self, armazenamento):
+        """Sessão revogada some da memória e do banco"""
+        armazenamento.salvar("s1", {"a": 1}, nova=True)
+
+        armazenamento.revogar("s1")
+
+        assert armazenamento.carregar("s1") is None
+        assert sessao_repo.obter_por_id("s1") is None
+
+    def test_sessao_revogada_nao_e_recriada(self, armazenamento):
+        """Um worker com a sessão em memória não recria a linha excluída por outro"""
+        outro_worker = ArmazenamentoSessoes(max_idade_segundos=3600, cache_segundos=300)
+        armazenamento.salvar("s1", _dados_usuario(1), nova=True)
+        outro_worker.carregar("s1")
+
+        armazenamento.revogar_usuario(1)
+
+        with pytest.raises(SessaoRevogada):
+            outro_worker.salvar("s1", {**_dados_usuario(1), "flash": ["ok"]})
+        assert sessao_repo.obter_por_id("s1") is None
+        assert "s1" not in outro_worker._cache
+
+    def test_revogar_usuario(self, armazenamento):
+        """Revoga todas as sessões do usuário, exceto a informada"""
+        armazenamento.salvar("s1", _dados_usuario(1), nova=True)
+        armazenamento.salvar("s2", _dados_usuario(1), nova=True)
+        armazenamento.salvar("s3", _dados_usuario(2), nova=True)
+
+        assert armazenamento.revogar_usuario(1, exceto_id="s2") == 1
+
+        assert armazenamento.carregar("s1") is None
+        assert armazenamento.carregar("s2") is not None
+        assert armazenamento.carregar("s3") is not None
+
+    def test_varrer_expiradas(self, armazenamento):
+        """A varredura exclui as sessões expiradas da memória e do banco"""
+        armazenamento.max_idade_segundos = -1
+        armazenamento.salvar("s1", {"a": 1}, nova=True)
+
+        assert armazenamento.varrer() == 1
+        assert "s1" not in armazenamento._cache
+
+
+class TestMiddlewareSessao:
+    """Testes da sessão no servidor pelas rotas da aplicação"""
+
+    def test_cookie_guarda_apenas_id(self, client, criar_usuario, fazer_login, usuario_teste):
+        """Após o login, o cookie leva só o ID assinado; os dados ficam no banco"""
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+
+        cookie = client.cookies.get(COOKIE_SESSAO)
+        assert cookie is not None
+        assert len(cookie) < 100
+        assert usuario_teste["email"] not in cookie
+        sessao_id = cookie.rsplit(".", 1)[0]
+        dados = armazenamento_sessoes.carregar(sessao_id)
+        assert dados["usuario_logado"]["email"] == usuario_teste["email"]
+
+    def test_login_troca_id_da_sessao(self, client, criar_usuario, fazer_login, usuario_teste):
+        """O ID usado antes do login deixa de valer (fixação de sessão)"""
+        # O cadastro deixa uma sessão anônima (com a mensagem flash)
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+        cookie_anterior = client.cookies.get(COOKIE_SESSAO)
+
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+
+        assert cookie_anterior is not None
+        assert client.cookies.get(COOKIE_SESSAO) != cookie_anterior
+        assert armazenamento_sessoes.carregar(cookie_anterior.rsplit(".", 1)[0]) is None
+
+    def test_logout_revoga_sessao(self, client, criar_usuario, fazer_login, usuario_teste):
+        """Reapresentar o cookie após o logout não autentica"""
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+        cookie = client.cookies.get(COOKIE_SESSAO)
+
+        client.get("/logout")
+
+        assert armazenamento_sessoes.carregar(cookie.rsplit(".", 1)[0]) is None
+        client.cookies.set(COOKIE_SESSAO, cookie)
+        response = client.get("/usuario", follow_redirects=False)
+
+        assert response.status_code == 303
+        assert response.headers["location"].startswith("/login")
+
+    def test_cookie_forjado_e_ignorado(self, client):
+        """Cookie sem assinatura válida é descartado sem consultar o banco"""
+        client.cookies.set(COOKIE_SESSAO, "forjado.assinatura")
+
+        response = client.get("/usuario", follow_redirects=False)
+
+        assert response.status_code == 303
+
+    def test_revogar_sessoes_do_usuario(self, client, criar_usuario, fazer_login, usuario_teste):
+        """Sessões revogadas por usuário deixam de autenticar"""
+        from repo import usuario_repo
+
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+        usuario = usuario_repo.obter_por_email(usuario_teste["email"])
+
+        assert armazenamento_sessoes.revogar_usuario(usuario.id) == 1
+        response = client.get("/usuario", follow_redirects=False)
+
+        assert response.status_code == 303
+
+    def test_sessao_revogada_em_outro_worker_apaga_cookie(
+        self, client, criar_usuario, fazer_login, usuario_teste, monkeypatch
+    ):
+        """Gravar uma sessão excluída por outro worker apaga o cookie em vez de recriá-la"""
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+        sessao_id = client.cookies.get(COOKIE_SESSAO).rsplit(".", 1)[0]
+        # Exclusão direta no banco: a memória deste worker ainda tem a sessão
+        sessao_repo.excluir(sessao_id)
+        monkeypatch.setattr(armazenamento_sessoes, "renovacao_segundos", 0)
+
+        response = client.get("/usuario", follow_redirects=False)
+
+        assert "Max-Age=0" in response.headers.get("set-cookie", "")
+        assert sessao_repo.obter_por_id(sessao_id) is None
+
+    def test_banco_acessado_fora_do_event_loop(self, client, criar_usuario, fazer_login, usuario_teste):
+        """Leitura (cache miss) e gravação da sessão não rodam no event loop"""
+        criar_usuario(usuario_teste["nome"], usuario_teste["email"], usuario_teste["senha"])
+        fazer_login(usuario_teste["email"], usuario_teste["senha"])
+        armazenamento_sessoes.limpar()
+        no_loop = []
+
+        def registrar(funcao):
+            def chamar(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    no_loop.append(funcao.__name__)
+                except RuntimeError:
+                    pass
+                return funcao(*args, **kwargs)
+            return chamar
+
+        with patch("util.sessao_servidor.sessao_repo.obter_por_id", registrar(sessao_repo.obter_por_id)), \
+                patch("util.sessao_servidor.sessao_repo.atualizar", registrar(sessao_repo.atualizar)), \
+                patch.object(armazenamento_sessoes, "renovacao_segundos", 0):
+            response = client.get("/usuario")
+
+        assert response.status_code == 200
+        assert no_loop == []
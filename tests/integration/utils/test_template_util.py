@@ -16,7 +16,9 @@ from util.template_util import (
     formatar_hora,
     foto_usuario,
     csrf_input,
-    criar_templates
+    criar_templates,
+    criar_ambiente,
+    precompilar_templates
 )
 
 
@@ -155,20 +157,52 @@ class TestFormatarHora:
 class TestFotoUsuario:
     """Testes para a função foto_usuario()"""
 
-    def test_id_1_formata_corretamente(self):
-        """ID 1 deve formatar para 000001.jpg"""
-        resultado = foto_usuario(1)
-        assert resultado == "/static/img/usuarios/000001.jpg"
+    def test_sem_foto_usa_foto_padrao(self):
+        """Usuário sem foto própria (ou inexistente) recebe a foto padrão"""
+        assert foto_usuario(999999) == "/static/img/user.jpg"
 
-    def test_id_grande_formata_corretamente(self):
-        """ID grande deve formatar com zeros à esquerda"""
-        resultado = foto_usuario(12345)
-        assert resultado == "/static/img/usuarios/012345.jpg"
+    def test_com_tamanho_usa_variante(self):
+        """Com tamanho, retorna a menor versão reduzida que o cobre"""
+        assert foto_usuario(999999, 40) == "/static/img/user-64.jpg"
 
-    def test_id_com_6_digitos(self):
-        """ID com 6 dígitos deve formatar sem zeros extras"""
-        resultado = foto_usuario(999999)
-        assert resultado == "/static/img/usuarios/999999.jpg"
+    def test_com_foto_usa_hash(self):
+        """Com ponteiro, a URL aponta para o armazenamento por hash"""
+        foto = "ab" * 32
+        with patch("util.foto_util.usuario_repo.obter_foto", return_value=foto):
+            resultado = foto_usuario(1)
+
+        assert resultado == f"/static/img/fotos/ab/ab/{foto}.jpg"
+
+
+class TestComponenteFotoUsuario:
+    """Testes do componente components/foto_usuario.html"""
+
+    def _renderizar(self, foto, tamanho):
+        template = criar_ambiente(diretorio_cache="").from_string(
+            "{% from 'components/foto_usuario.html' import foto_usuario_img %}"
+            "{{ foto_usuario_img(foto, tamanho, 'rounded-circle') }}"
+        )
+        return template.render(foto=foto, tamanho=tamanho)
+
+    def test_com_foto_emite_srcset_e_webp(self):
+        """Usa a menor versão reduzida que cobre o tamanho, com 2x e WebP"""
+        foto = "cd" * 32
+        with patch("util.foto_util.usuario_repo.obter_foto") as obter_foto:
+            html = self._renderizar(foto, 32)
+
+        # O ponteiro vem de quem chama: nenhuma consulta ao banco
+        obter_foto.assert_not_called()
+        assert 'type="image/webp"' in html
+        assert f"{foto}-32.webp 1x" in html and f"{foto}-64.webp 2x" in html
+        assert f"{foto}-32.jpg 1x" in html
+        assert 'width="32"' in html
+
+    def test_sem_foto_usa_variantes_da_padrao(self):
+        """Usuário sem foto própria exibe as versões reduzidas da foto padrão"""
+        html = self._renderizar(None, 40)
+
+        assert 'src="/static/img/user-64.jpg"' in html
+        assert "/static/img/user-128.jpg 2x" in html
 
 
 class TestCsrfInput:
@@ -223,3 +257,47 @@ class TestCriarTemplates:
         assert 'VERSION' in templates.env.globals
         assert 'csrf_input' in templates.env.globals
         assert 'TOAST_AUTO_HIDE_DELAY_MS' in templates.env.globals
+
+    def test_templates_compartilhados(self):
+        """Todas as chamadas retornam a mesma instância e o mesmo ambiente"""
+        assert criar_templates() is criar_templates()
+        assert criar_templates().env is criar_templates().env
+
+
+class TestAmbienteTemplates:
+    """Testes para criar_ambiente() e precompilar_templates()"""
+
+    def test_cache_de_bytecode_grava_em_disco(self, tmp_path):
+        """Templates compilados ficam no diretório do cache de bytecode"""
+        env = criar_ambiente(diretorio_cache=str(tmp_path))
+
+        env.get_template("errors/404.html")
+
+        assert list(tmp_path.glob("*.cache"))
+
+    def test_cache_de_bytecode_reaproveitado(self, tmp_path):
+        """Outro ambiente (ex: outro worker) carrega o bytecode sem recompilar"""
+        criar_ambiente(diretorio_cache=str(tmp_path)).get_template("errors/404.html")
+        env = criar_ambiente(diretorio_cache=str(tmp_path))
+
+        with patch.object(env, "compile", side_effect=AssertionError("recompilou")):
+            env.get_template("errors/404.html")
+
+    def test_sem_diretorio_desativa_cache(self):
+        """Diretório vazio desativa o cache de bytecode"""
+        env = criar_ambiente(diretorio_cache="")
+
+        assert env.bytecode_cache is None
+
+    def test_auto_reload_configuravel(self, tmp_path):
+        """auto_reload segue o parâmetro (desligado em produção)"""
+        assert criar_ambiente(str(tmp_path), auto_reload=False).auto_reload is False
+        assert criar_ambiente(str(tmp_path), auto_reload=True).auto_reload is True
+
+    def test_precompilar_todos_os_templates(self, tmp_path):
+        """Compila todos os .html de templates/ e os deixa no cache em memória"""
+        env = criar_ambiente(diretorio_cache=str(tmp_path))
+        total = len(env.list_templates(extensions=["html"]))
+
+        assert precompilar_templates(env) == total
+        assert len(env.cache) == total
@@ -0,0 +1,97 @@
+"""
+Testes para o módulo util/upload_util.py
+
+Testa a gravação do campo de arquivo em disco, o limite de bytes aplicado
+durante a leitura e a limpeza do arquivo temporário em caso de erro.
+"""
+
+import tempfile
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from util.upload_util import UploadMuitoGrande, receber_arquivo_multipart
+
+LIMITE = 10_000
+
+
+async def receber(request: Request):
+    try:
+        arquivo = await receber_arquivo_multipart(request, "foto", LIMITE)
+    except UploadMuitoGrande:
+        return JSONResponse({"erro": "grande"}, status_code=413)
+    except ValueError:
+        return JSONResponse({"erro": "invalido"}, status_code=400)
+    if arquivo is None:
+        return JSONResponse({"arquivo": None})
+    conteudo = arquivo.read_bytes()
+    arquivo.unlink()
+    return JSONResponse({"arquivo": conteudo.decode("latin-1")})
+
+
+@pytest.fixture
+def pasta_temporaria(tmp_path, monkeypatch):
+    """Arquivos temporários do upload ficam em tmp_path (para conferir a limpeza)."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def client(pasta_temporaria):
+    return TestClient(Starlette(routes=[Route("/upload", receber, methods=["POST"])]))
+
+
+class TestReceberArquivoMultipart:
+    """Testes do recebimento em streaming"""
+
+    def test_grava_somente_o_campo_pedido(self, client):
+        """O arquivo do campo "foto" é gravado; os demais campos são ignorados"""
+        response = client.post(
+            "/upload",
+            data={"outro": "valor"},
+            files={"foto": ("foto.jpg", b"\xff\xd8conteudo", "image/jpeg"),
+                   "anexo": ("a.txt", b"ignorado", "text/plain")},
+        )
+
+        assert response.json() == {"arquivo": "\xff\xd8conteudo"}
+
+    def test_campo_ausente_retorna_none(self, client, pasta_temporaria):
+        """Sem o campo (ou com ele vazio), nada fica em disco"""
+        response = client.post("/upload", files={"anexo": ("a.txt", b"x", "text/plain")})
+
+        assert response.json() == {"arquivo": None}
+        assert list(pasta_temporaria.iterdir()) == []
+
+    def test_content_length_acima_do_limite(self, client, pasta_temporaria):
+        """Corpo declarado grande demais é recusado antes da leitura"""
+        response = client.post("/upload", files={"foto": ("f.jpg", b"x" * 50_000, "image/jpeg")})
+
+        assert response.status_code == 413
+        assert list(pasta_temporaria.iterdir()) == []
+
+    def test_limite_aplicado_durante_a_leitura(self, client, pasta_temporaria):
+        """Sem Content-Length (chunked), a leitura para ao passar do limite"""
+        def corpo():
+            yield b'--limite\r\nContent-Disposition: form-data; name="foto"; filename="f.jpg"\r\n\r\n'
+            for _ in range(100):
+                yield b"x" * 1000
+            yield b"\r\n--limite--\r\n"
+
+        response = client.post(
+            "/upload",
+            content=corpo(),
+            headers={"Content-Type": "multipart/form-data; boundary=limite"},
+        )
+
+        assert response.status_code == 413
+        assert list(pasta_temporaria.iterdir()) == []
+
+    def test_requisicao_nao_multipart(self, client):
+        """Formulário urlencoded é rejeitado com ValueError"""
+        response = client.post("/upload", data={"foto": "base64"})
+
+        assert response.status_code == 400
@@ -326,6 +326,167 @@ class TestConfigCacheThreadSafety:
         assert resultado == "valor"
 
 
+class TestConfigCacheSnapshot:
+    """Testes do snapshot carregado em lote e das leituras sem lock"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+
+    def teardown_method(self):
+        """Não deixa snapshot de teste para os próximos"""
+        ConfigCache.limpar()
+
+    def _configs(self, **valores):
+        """Cria objetos com chave/valor como os retornados pelo repo."""
+        configs = []
+        for chave, valor in valores.items():
+            item = MagicMock()
+            item.chave = chave
+            item.valor = valor
+            configs.append(item)
+        return configs
+
+    def test_carregar_le_tabela_inteira(self):
+        """carregar deve fazer uma consulta e dispensar as demais"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = self._configs(a="1", b="2")
+
+            assert ConfigCache.carregar() == 2
+            assert ConfigCache.obter("a", "x") == "1"
+            # Chave fora do snapshot completo não existe no banco
+            assert ConfigCache.obter("inexistente", "padrao") == "padrao"
+
+            mock_repo.obter_todos.assert_called_once()
+            mock_repo.obter_por_chave.assert_not_called()
+
+    def test_carregar_com_erro_mantem_snapshot(self):
+        """Erro de banco no carregamento não deve apagar o snapshot atual"""
+        ConfigCache._cache = {"a": "1"}
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.side_effect = sqlite3.Error("Erro de banco")
+            with patch('util.config_cache.logger'):
+                ConfigCache.carregar()
+
+        assert ConfigCache._cache == {"a": "1"}
+
+    def test_leitura_nao_usa_lock(self):
+        """Acerto no snapshot não deve adquirir o lock"""
+        ConfigCache._cache = {"a": "1"}
+        lock = MagicMock()
+        lock.__enter__.side_effect = AssertionError("lock adquirido na leitura")
+
+        with patch.object(ConfigCache, '_lock', lock):
+            assert ConfigCache.obter("a", "x") == "1"
+            assert ConfigCache.obter_multiplos(["a"], ["x"]) == {"a": "1"}
+
+    def test_miss_publica_novo_snapshot(self):
+        """O snapshot publicado nunca é alterado no lugar"""
+        ConfigCache._cache = {"a": "1"}
+        anterior = ConfigCache._cache
+
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_por_chave.return_value = None
+            ConfigCache.obter("b", "2")
+
+        assert anterior == {"a": "1"}
+        assert ConfigCache._cache == {"a": "1", "b": "2"}
+
+    def test_obter_multiplos_snapshot_completo_sem_obter(self):
+        """Com snapshot completo, obter_multiplos é uma só passada no dict"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = self._configs(a="1")
+            ConfigCache.carregar()
+
+        with patch.object(ConfigCache, 'obter') as mock_obter:
+            resultado = ConfigCache.obter_multiplos(["a", "b"], ["x", "y"])
+
+        assert resultado == {"a": "1", "b": "y"}
+        mock_obter.assert_not_called()
+
+    def test_limpar_chave_volta_a_consultar_banco(self):
+        """Após limpar_chave, a chave removida deve ser relida do banco"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_todos.return_value = self._configs(a="1")
+            ConfigCache.carregar()
+            ConfigCache.limpar_chave("a")
+
+            mock_repo.obter_por_chave.return_value = self._configs(a="2")[0]
+            assert ConfigCache.obter("a", "x") == "2"
+
+
+class TestConfigCacheVersao:
+    """Testes da detecção de alterações feitas por outros processos"""
+
+    def setup_method(self):
+        """Limpa o cache antes de cada teste"""
+        ConfigCache.limpar()
+
+    def teardown_method(self):
+        """Não deixa snapshot de teste para os próximos"""
+        ConfigCache.limpar()
+
+    def _config(self, chave, valor):
+        item = MagicMock()
+        item.chave = chave
+        item.valor = valor
+        return item
+
+    def test_versao_alterada_recarrega(self):
+        """Versão diferente da do snapshot deve recarregar as configurações"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 1
+            mock_repo.obter_todos.return_value = [self._config("a", "1")]
+            ConfigCache.carregar()
+
+            # Outro worker salvou uma configuração
+            mock_repo.obter_versao.return_value = 2
+            mock_repo.obter_todos.return_value = [self._config("a", "2")]
+            ConfigCache._proxima_verificacao = 0
+
+            assert ConfigCache.obter("a", "x") == "2"
+            assert ConfigCache._versao == 2
+
+    def test_verifica_no_maximo_uma_vez_por_intervalo(self):
+        """Dentro do intervalo, leituras não consultam a versão"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 1
+            mock_repo.obter_todos.return_value = [self._config("a", "1")]
+            ConfigCache.carregar()
+            mock_repo.obter_versao.reset_mock()
+
+            for _ in range(100):
+                ConfigCache.obter("a", "x")
+
+            mock_repo.obter_versao.assert_not_called()
+
+    def test_versao_igual_nao_recarrega(self):
+        """Mesma versão mantém o snapshot sem nova consulta dos dados"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 1
+            mock_repo.obter_todos.return_value = [self._config("a", "1")]
+            ConfigCache.carregar()
+            ConfigCache._proxima_verificacao = 0
+
+            ConfigCache.obter("a", "x")
+
+            mock_repo.obter_versao.assert_called()
+            mock_repo.obter_todos.assert_called_once()
+
+    def test_erro_na_verificacao_mantem_snapshot(self):
+        """Erro ao ler a versão não deve afetar as leituras"""
+        with patch('util.config_cache.configuracao_repo') as mock_repo:
+            mock_repo.obter_versao.return_value = 1
+            mock_repo.obter_todos.return_value = [self._config("a", "1")]
+            ConfigCache.carregar()
+            mock_repo.obter_versao.side_effect = sqlite3.Error("Erro de banco")
+            ConfigCache._proxima_verificacao = 0
+
+            with patch('util.config_cache.logger'):
+                assert ConfigCache.obter("a", "x") == "1"
+
+
 class TestConfigInstanciaGlobal:
     """Testes para a instância global config"""
 
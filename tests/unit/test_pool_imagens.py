@@ -0,0 +1,122 @@
+"""
+Testes para o módulo util/pool_imagens.py
+
+Testa o processamento de imagens fora do event loop, o limite de fila
+e os tempos registrados por etapa.
+"""
+
+import asyncio
+import time
+
+import pytest
+from PIL import Image
+
+from util.foto_util import caminho_foto
+from util.processamento_foto import processar_foto_cropada
+from util.pool_imagens import FilaImagensCheia, PoolImagens
+
+
+def _etapas_lentas(segundos: float) -> tuple:
+    """Simula um processamento com duas etapas."""
+    time.sleep(segundos)
+    return "ok", {"decodificacao": segundos * 1000, "codificacao": 1.0}
+
+
+def _falha() -> tuple:
+    raise ValueError("imagem inválida")
+
+
+def _imagem_png(pasta, tamanho=(600, 400)):
+    origem = pasta / "upload.tmp"
+    Image.new("RGBA", tamanho, (255, 0, 0, 128)).save(origem, format="PNG")
+    return origem
+
+
+class TestPoolImagens:
+    """Testes do pool de imagens"""
+
+    async def test_processa_foto_em_processo(self, tmp_path):
+        """A foto é processada no pool e as etapas ficam nos histogramas"""
+        pool = PoolImagens(processos=1, max_concorrentes=1, max_fila=1)
+        try:
+            foto = await pool.executar(processar_foto_cropada, _imagem_png(tmp_path), 256, tmp_path)
+        finally:
+            pool.encerrar()
+
+        with Image.open(caminho_foto(foto, tmp_path)) as imagem:
+            assert imagem.mode == "RGB"
+            assert max(imagem.size) == 256
+
+        etapas = pool.obter_estatisticas()["etapas"]
+        assert list(etapas) == [
+            "espera", "decodificacao", "conversao", "redimensionamento", "codificacao",
+            "variantes", "gravacao", "total"
+        ]
+        assert all(h["total"] == 1 for h in etapas.values())
+
+    async def test_nao_bloqueia_event_loop(self):
+        """Durante o processamento, outras corrotinas continuam rodando"""
+        pool = PoolImagens(processos=1, max_concorrentes=1)
+        batidas = 0
+
+        async def batimento():
+            nonlocal batidas
+            while True:
+                await asyncio.sleep(0.01)
+                batidas += 1
+
+        tarefa = asyncio.create_task(batimento())
+        try:
+            await pool.executar(_etapas_lentas, 0.2)
+        finally:
+            tarefa.cancel()
+            pool.encerrar()
+
+        assert batidas > 5
+
+    async def test_fila_cheia_recusa(self):
+        """Acima de max_concorrentes + max_fila, o pedido é recusado na hora"""
+        pool = PoolImagens(processos=0, max_concorrentes=1, max_fila=1)
+
+        tarefas = [asyncio.create_task(pool.executar(_etapas_lentas, 0.1)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        assert pool.pendentes == 2
+        with pytest.raises(FilaImagensCheia):
+            await pool.executar(_etapas_lentas, 0.1)
+
+        assert await asyncio.gather(*tarefas) == ["ok", "ok"]
+        assert pool.pendentes == 0
+        assert pool.obter_estatisticas()["recusados"] == 1
+
+    async def test_espera_registrada(self):
+        """O segundo processamento aguarda o primeiro terminar"""
+        pool = PoolImagens(processos=0, max_concorrentes=1, max_fila=5)
+
+        await asyncio.gather(*[pool.executar(_etapas_lentas, 0.05) for _ in range(2)])
+
+        espera = pool.obter_estatisticas()["etapas"]["espera"]
+        assert espera["total"] == 2
+        assert espera["max_ms"] >= 40
+
+    async def test_erro_libera_vaga(self):
+        """Exceções são propagadas e a vaga na fila é liberada"""
+        pool = PoolImagens(processos=0, max_concorrentes=1, max_fila=0)
+
+        with pytest.raises(ValueError):
+            await pool.executar(_falha)
+
+        assert pool.pendentes == 0
+        assert pool.obter_estatisticas()["etapas"]["total"]["total"] == 1
+
+    def test_limpar_estatisticas(self):
+        """limpar_estatisticas zera histogramas e recusas"""
+        pool = PoolImagens(processos=0)
+        pool.recusados = 3
+        pool.histogramas["espera"].registrar(5)
+
+        pool.limpar_estatisticas()
+
+        estatisticas = pool.obter_estatisticas()
+        assert estatisticas["recusados"] == 0
+        assert estatisticas["etapas"]["espera"]["total"] == 0
@@ -0,0 +1,66 @@
+"""
+Testes para o módulo util/pool_processos.py
+
+Testa a base comum dos pools de senhas e imagens: criação e encerramento
+do pool de processos, método de início e execução em thread.
+"""
+
+import asyncio
+import os
+
+from util.pool_processos import METODO_INICIO, PoolProcessos
+
+
+class TestPoolProcessos:
+    """Testes da base dos pools de processos"""
+
+    async def test_executa_em_outro_processo(self):
+        """Com processos > 0, a função roda fora do processo atual"""
+        pool = PoolProcessos("teste", processos=1, max_concorrentes=1)
+        try:
+            pid = await pool._executar_no_pool(os.getpid)
+        finally:
+            pool.encerrar()
+
+        assert pid != os.getpid()
+
+    async def test_sem_processos_executa_em_thread(self):
+        """Com processos=0, a função roda no próprio processo, sem criar pool"""
+        pool = PoolProcessos("teste", processos=0, max_concorrentes=1)
+
+        assert await pool._executar_no_pool(os.getpid) == os.getpid()
+        assert pool._executor is None
+
+    def test_processos_nao_usam_fork(self):
+        """O pool nunca faz fork do servidor (que tem threads)"""
+        pool = PoolProcessos("teste", processos=1, max_concorrentes=1)
+        try:
+            metodo = pool._obter_executor()._mp_context.get_start_method()
+        finally:
+            pool.encerrar()
+
+        assert metodo == METODO_INICIO
+        assert metodo in ("forkserver", "spawn")
+
+    def test_encerrar_permite_recriar(self):
+        """Após encerrar, um novo pool é criado no próximo uso"""
+        pool = PoolProcessos("teste", processos=1, max_concorrentes=1)
+        primeiro = pool._obter_executor()
+        pool.encerrar()
+        try:
+            assert pool._obter_executor() is not primeiro
+        finally:
+            pool.encerrar()
+
+    def test_um_semaforo_por_event_loop(self):
+        """Cada event loop recebe o próprio semáforo, com o limite configurado"""
+        pool = PoolProcessos("teste", processos=0, max_concorrentes=3)
+
+        async def obter():
+            return pool._obter_semaforo()
+
+        primeiro = asyncio.run(obter())
+        segundo = asyncio.run(obter())
+
+        assert primeiro is not segundo
+        assert primeiro._value == 3
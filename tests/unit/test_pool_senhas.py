@@ -0,0 +1,145 @@
+"""
+Testes para os módulos util/pool_senhas.py e util/histograma.py
+
+Testa o hash/verificação de senhas fora do event loop, o limite de
+operações simultâneas e o histograma de latências.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from util.histograma import HistogramaLatencia
+from util.pool_senhas import PoolSenhas
+from util.security import criar_hash_senha, verificar_senha
+
+_em_andamento = 0
+_maximo_em_andamento = 0
+_lock_contagem = threading.Lock()
+
+
+def _operacao_lenta() -> int:
+    """Simula uma operação demorada contando quantas rodam ao mesmo tempo."""
+    global _em_andamento, _maximo_em_andamento
+    with _lock_contagem:
+        _em_andamento += 1
+        _maximo_em_andamento = max(_maximo_em_andamento, _em_andamento)
+    time.sleep(0.05)
+    with _lock_contagem:
+        _em_andamento -= 1
+    return _maximo_em_andamento
+
+
+class TestHistogramaLatencia:
+    """Testes do histograma de faixas fixas"""
+
+    def test_vazio(self):
+        """Sem medições, estatísticas ficam vazias"""
+        resultado = HistogramaLatencia().obter()
+
+        assert resultado["total"] == 0
+        assert resultado["p50_ms"] is None
+        assert resultado["media_ms"] is None
+
+    def test_faixas_e_percentis(self):
+        """Medições caem na faixa do limite superior"""
+        histograma = HistogramaLatencia(limites_ms=(100, 200, 500))
+        for ms in [50, 80, 150, 180, 190, 450, 700]:
+            histograma.registrar(ms)
+
+        resultado = histograma.obter()
+
+        assert [f["contagem"] for f in resultado["faixas"]] == [2, 3, 1, 1]
+        assert resultado["faixas"][-1]["ate_ms"] is None
+        assert resultado["p50_ms"] == 200
+        assert resultado["p99_ms"] == 700
+        assert resultado["max_ms"] == 700
+
+    def test_percentil_nao_passa_do_maximo(self):
+        """O percentil é limitado ao maior valor observado"""
+        histograma = HistogramaLatencia(limites_ms=(1000,))
+        histograma.registrar(120)
+
+        assert histograma.percentil(50) == 120
+
+    def test_limpar(self):
+        """limpar deve zerar as contagens"""
+        histograma = HistogramaLatencia()
+        histograma.registrar(10)
+
+        histograma.limpar()
+
+        assert histograma.obter()["total"] == 0
+
+
+class TestPoolSenhas:
+    """Testes do pool de senhas"""
+
+    async def test_hash_e_verificacao_em_processo(self):
+        """Hash feito no pool de processos deve ser verificável"""
+        pool = PoolSenhas(processos=1, max_concorrentes=2)
+        try:
+            senha_hash = await pool.executar("hash", criar_hash_senha, "Senha@123")
+
+            assert await pool.executar("verificacao", verificar_senha, "Senha@123", senha_hash) is True
+            assert await pool.executar("verificacao", verificar_senha, "Outra@123", senha_hash) is False
+        finally:
+            pool.encerrar()
+
+        estatisticas = pool.obter_estatisticas()
+        assert estatisticas["operacoes"]["hash"]["total"] == 1
+        assert estatisticas["operacoes"]["verificacao"]["total"] == 2
+
+    async def test_nao_bloqueia_event_loop(self):
+        """Durante o hash, outras corrotinas continuam rodando"""
+        pool = PoolSenhas(processos=1, max_concorrentes=1)
+        batidas = 0
+
+        async def batimento():
+            nonlocal batidas
+            while True:
+                await asyncio.sleep(0.01)
+                batidas += 1
+
+        tarefa = asyncio.create_task(batimento())
+        try:
+            await pool.executar("hash", criar_hash_senha, "Senha@123")
+        finally:
+            tarefa.cancel()
+            pool.encerrar()
+
+        assert batidas > 0
+
+    async def test_limite_de_concorrencia(self):
+        """Operações acima do limite aguardam a vez"""
+        pool = PoolSenhas(processos=0, max_concorrentes=2)
+
+        resultados = await asyncio.gather(
+            *[pool.executar("hash", _operacao_lenta) for _ in range(6)]
+        )
+
+        assert max(resultados) == 2
+
+    async def test_pool_recriado_apos_encerrar(self):
+        """Após encerrar, a próxima operação cria um novo pool"""
+        pool = PoolSenhas(processos=1, max_concorrentes=1)
+        await pool.executar("hash", criar_hash_senha, "a")
+        pool.encerrar()
+
+        try:
+            senha_hash = await pool.executar("hash", criar_hash_senha, "b")
+        finally:
+            pool.encerrar()
+
+        assert verificar_senha("b", senha_hash)
+
+    def test_operacao_com_erro_registra_latencia(self):
+        """Exceções são propagadas e a latência ainda é registrada"""
+        pool = PoolSenhas(processos=0, max_concorrentes=1)
+
+        with pytest.raises(ValueError):
+            asyncio.run(pool.executar("verificacao", verificar_senha, "senha", "hash_invalido"))
+
+        assert pool.obter_estatisticas()["operacoes"]["verificacao"]["total"] == 1
@@ -0,0 +1,153 @@
+"""
+Testes para o módulo util/rate_limit_armazenamento.py
+
+Testa os armazenamentos em memória e SQLite do rate limiter, incluindo o
+limite compartilhado entre processos.
+"""
+
+import multiprocessing
+
+import pytest
+
+from util.rate_limiter import RateLimiter
+from util.rate_limit_armazenamento import (
+    ArmazenamentoLimiter,
+    ArmazenamentoMemoria,
+    ArmazenamentoSQLite,
+    criar_armazenamento,
+)
+
+
+def _tentar_em_processo(caminho: str, tentativas: int, fila):
+    """Executado em outro processo: conta quantas tentativas foram permitidas."""
+    limiter = RateLimiter(
+        max_tentativas=10,
+        janela_minutos=5,
+        nome="login_compartilhado",
+        armazenamento=ArmazenamentoSQLite("login_compartilhado", caminho),
+    )
+    fila.put(sum(1 for _ in range(tentativas) if limiter.verificar("10.0.0.1")))
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def limiter(request, tmp_path):
+    """RateLimiter com cada um dos armazenamentos"""
+    if request.param == "memoria":
+        armazenamento = ArmazenamentoMemoria(max_identificadores=1000)
+    else:
+        armazenamento = ArmazenamentoSQLite("teste", str(tmp_path / "rate_limit.db"))
+    return RateLimiter(max_tentativas=3, janela_minutos=1, nome="teste", armazenamento=armazenamento)
+
+
+class TestArmazenamentos:
+    """Comportamento comum aos armazenamentos"""
+
+    def test_bloqueia_acima_do_limite(self, limiter):
+        """Deve permitir max_tentativas e bloquear a seguinte"""
+        assert [limiter.verificar("10.0.0.1") for _ in range(4)] == [True, True, True, False]
+        assert limiter.verificar("10.0.0.2") is True
+
+    def test_restantes_e_reset(self, limiter):
+        """Consultas devem refletir o estado gravado"""
+        limiter.verificar("10.0.0.1")
+
+        assert limiter.obter_tentativas_restantes("10.0.0.1") == 2
+        assert limiter.obter_tempo_reset("10.0.0.1") is None
+
+    def test_limpar(self, limiter):
+        """limpar deve remover um identificador ou todos"""
+        for _ in range(3):
+            limiter.verificar("10.0.0.1")
+        limiter.verificar("10.0.0.2")
+
+        limiter.limpar("10.0.0.1")
+        assert "10.0.0.1" not in limiter.tentativas
+        assert limiter.verificar("10.0.0.1") is True
+
+        limiter.limpar()
+        assert len(limiter.tentativas) == 0
+
+
+class TestArmazenamentoSQLite:
+    """Testes específicos do armazenamento compartilhado"""
+
+    def test_limiters_separados_por_nome(self, tmp_path):
+        """Limiters diferentes não devem compartilhar contagem"""
+        caminho = str(tmp_path / "rate_limit.db")
+        login = RateLimiter(1, 1, "login", armazenamento=ArmazenamentoSQLite("login", caminho))
+        cadastro = RateLimiter(1, 1, "cadastro", armazenamento=ArmazenamentoSQLite("cadastro", caminho))
+
+        assert login.verificar("10.0.0.1") is True
+        assert cadastro.verificar("10.0.0.1") is True
+        assert login.verificar("10.0.0.1") is False
+
+    def test_bloqueio_lembrado_localmente(self, tmp_path):
+        """Rajada de um IP bloqueado não deve consultar o banco"""
+        armazenamento = ArmazenamentoSQLite("rajada", str(tmp_path / "rate_limit.db"))
+        limiter = RateLimiter(1, 1, "rajada", armazenamento=armazenamento)
+        limiter.verificar("10.0.0.1")
+        limiter.verificar("10.0.0.1")
+
+        armazenamento.caminho = str(tmp_path / "inexistente" / "rate_limit.db")
+
+        # Se acessasse o banco, falharia ao abrir o caminho inexistente
+        assert limiter.verificar("10.0.0.1") is False
+
+    def test_reset_em_outro_worker_vale_apos_limite_local(self, tmp_path):
+        """remover() em outro worker deve valer em até BLOQUEIO_LOCAL_MAX_SEGUNDOS"""
+        caminho = str(tmp_path / "rate_limit.db")
+        worker_a = ArmazenamentoSQLite("reset", caminho)
+        worker_b = ArmazenamentoSQLite("reset", caminho)
+        agora = 1000.0
+        # Uma tentativa por minuto: o bloqueio duraria 60s
+        assert worker_a.consumir("10.0.0.1", agora, 60.0, 60.0) is True
+        assert worker_a.consumir("10.0.0.1", agora, 60.0, 60.0) is False
+
+        worker_b.remover("10.0.0.1")
+
+        assert worker_a.consumir("10.0.0.1", agora + 1, 60.0, 60.0) is False
+        limite = agora + ArmazenamentoSQLite.BLOQUEIO_LOCAL_MAX_SEGUNDOS
+        assert worker_a.consumir("10.0.0.1", limite, 60.0, 60.0) is True
+
+    def test_limite_compartilhado_entre_processos(self, tmp_path):
+        """Quatro processos juntos não devem passar do limite configurado"""
+        caminho = str(tmp_path / "rate_limit.db")
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        processos = [
+            contexto.Process(target=_tentar_em_processo, args=(caminho, 10, fila))
+            for _ in range(4)
+        ]
+        for processo in processos:
+            processo.start()
+        for processo in processos:
+            processo.join(timeout=60)
+
+        permitidas = sum(fila.get(timeout=5) for _ in processos)
+
+        assert permitidas == 10
+
+
+class TestCriarArmazenamento:
+    """Testes da fábrica de armazenamentos"""
+
+    def test_padrao_memoria(self):
+        """Backend desconhecido ou memória usa o dicionário local"""
+        assert isinstance(criar_armazenamento("x", 10, "memoria"), ArmazenamentoMemoria)
+        assert isinstance(criar_armazenamento("x", 10, "redis"), ArmazenamentoMemoria)
+
+    def test_sqlite(self):
+        """Backend sqlite usa o arquivo compartilhado"""
+        armazenamento = criar_armazenamento("x", 10, "sqlite")
+
+        assert isinstance(armazenamento, ArmazenamentoSQLite)
+        assert armazenamento.compartilhado is True
+
+    def test_backend_incompleto_falha_ao_instanciar(self):
+        """Um backend sem todos os métodos da interface não pode ser criado"""
+        class ArmazenamentoIncompleto(ArmazenamentoLimiter):
+            def consumir(self, chave, agora, intervalo, janela):
+                return True
+
+        with pytest.raises(TypeError):
+            ArmazenamentoIncompleto()
@@ -0,0 +1,211 @@
+"""
+Testes para o módulo util/rate_limit_metricas.py
+
+Testa o top-k Space-Saving, a série por minuto, as métricas por limiter e
+o painel agregado do registry.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from util import rate_limit_metricas
+from util.rate_limit_metricas import (
+    MAX_ROTAS,
+    ROTA_OUTRAS,
+    ROTA_SEM_REQUISICAO,
+    MetricasLimiter,
+    SerieMinutos,
+    SpaceSaving,
+    obter_rota_atual,
+)
+from util.rate_limiter import RateLimiter, RegistroLimiters, registro_limiters
+
+
+class _Rota:
+    """Rota falsa com o atributo path, como a APIRoute do FastAPI."""
+
+    def __init__(self, path):
+        self.path = path
+
+
+@pytest.fixture
+def requisicao():
+    """Define o escopo da requisição atual como faria o middleware."""
+    tokens = []
+
+    def _definir(metodo, caminho):
+        escopo = {"type": "http", "method": metodo, "route": _Rota(caminho)}
+        tokens.append(rate_limit_metricas._escopo_requisicao.set(escopo))
+
+    yield _definir
+
+    for token in reversed(tokens):
+        rate_limit_metricas._escopo_requisicao.reset(token)
+
+
+class TestSpaceSaving:
+    """Testes do top-k aproximado"""
+
+    def test_conta_exato_abaixo_da_capacidade(self):
+        """Sem substituições, as contagens são exatas"""
+        top = SpaceSaving(capacidade=5)
+        for identificador in ["a", "b", "a", "c", "a", "b"]:
+            top.adicionar(identificador)
+
+        assert top.top() == [
+            {"identificador": "a", "contagem": 3, "erro": 0},
+            {"identificador": "b", "contagem": 2, "erro": 0},
+            {"identificador": "c", "contagem": 1, "erro": 0},
+        ]
+
+    def test_memoria_limitada_mantem_infrator_frequente(self):
+        """Com muitos IPs distintos, o infrator frequente continua no topo"""
+        top = SpaceSaving(capacidade=10)
+        for i in range(5000):
+            top.adicionar(f"10.0.{i // 256}.{i % 256}")
+            if i % 3 == 0:
+                top.adicionar("203.0.113.7")
+
+        assert len(top) == 10
+        primeiro = top.top(1)[0]
+        assert primeiro["identificador"] == "203.0.113.7"
+        # A contagem nunca é menor que a real e o erro limita a diferença
+        assert primeiro["contagem"] >= 1667
+        assert primeiro["contagem"] - primeiro["erro"] <= 1667
+
+    def test_novo_identificador_herda_minimo_como_erro(self):
+        """Substituição deve registrar o erro máximo da estimativa"""
+        top = SpaceSaving(capacidade=1)
+        top.adicionar("a")
+        top.adicionar("a")
+        top.adicionar("b")
+
+        assert top.top() == [{"identificador": "b", "contagem": 3, "erro": 2}]
+
+
+class TestSerieMinutos:
+    """Testes da série circular por minuto"""
+
+    def test_minutos_sem_tentativas_zerados(self):
+        """A série sempre tem o tamanho configurado"""
+        serie = SerieMinutos(minutos=3)
+        serie.registrar(100, bloqueada=False)
+        serie.registrar(100, bloqueada=True)
+
+        pontos = serie.obter(101)
+
+        assert [p["inicio"] for p in pontos] == [99 * 60, 100 * 60, 101 * 60]
+        assert pontos[1]["permitidas"] == 1
+        assert pontos[1]["bloqueadas"] == 1
+        assert pontos[1]["taxa_bloqueio"] == 50.0
+        assert pontos[2]["permitidas"] == 0
+
+    def test_balde_reciclado_apos_uma_volta(self):
+        """Contagens de uma volta anterior não devem vazar para o minuto novo"""
+        serie = SerieMinutos(minutos=3)
+        serie.registrar(100, bloqueada=True)
+        serie.registrar(103, bloqueada=False)
+
+        pontos = serie.obter(103)
+
+        assert sum(p["bloqueadas"] for p in pontos) == 0
+        assert pontos[-1]["permitidas"] == 1
+
+
+class TestMetricasLimiter:
+    """Testes das métricas de um limiter"""
+
+    def test_bloqueios_por_rota(self, requisicao):
+        """Bloqueios devem ser agrupados pelo template da rota"""
+        metricas = MetricasLimiter()
+        requisicao("POST", "/login")
+        metricas.registrar("10.0.0.1", permitida=False)
+        metricas.registrar("10.0.0.1", permitida=False)
+        metricas.registrar("10.0.0.1", permitida=True)
+        requisicao("GET", "/admin/usuarios/editar/{id}")
+        metricas.registrar("10.0.0.2", permitida=False)
+
+        resultado = metricas.obter()
+
+        assert resultado["bloqueios_por_rota"] == [
+            ("POST /login", 2),
+            ("GET /admin/usuarios/editar/{id}", 1),
+        ]
+        assert resultado["taxa_bloqueio"] == 75.0
+
+    def test_fora_de_requisicao(self):
+        """Sem middleware, a rota é marcada como fora de requisição"""
+        assert obter_rota_atual() == ROTA_SEM_REQUISICAO
+
+    def test_rotas_limitadas(self, requisicao):
+        """Acima de MAX_ROTAS, as rotas novas somam em ROTA_OUTRAS"""
+        metricas = MetricasLimiter()
+        for i in range(MAX_ROTAS + 5):
+            requisicao("GET", f"/rota/{i}")
+            metricas.registrar("10.0.0.1", permitida=False)
+
+        rotas = dict(metricas.obter()["bloqueios_por_rota"])
+
+        assert len(rotas) == MAX_ROTAS + 1
+        assert rotas[ROTA_OUTRAS] == 5
+
+    def test_serie_usa_minuto_atual(self):
+        """A tentativa deve cair no balde do minuto corrente"""
+        metricas = MetricasLimiter(minutos=5)
+        with patch("util.rate_limit_metricas._agora", return_value=600.0):
+            metricas.registrar("10.0.0.1", permitida=False)
+            serie = metricas.obter()["serie"]
+
+        assert serie[-1]["inicio"] == 600
+        assert serie[-1]["bloqueadas"] == 1
+
+    def test_limpar(self, requisicao):
+        """limpar deve zerar totais, série, rotas e infratores"""
+        metricas = MetricasLimiter()
+        requisicao("POST", "/login")
+        metricas.registrar("10.0.0.1", permitida=False)
+
+        metricas.limpar()
+        resultado = metricas.obter()
+
+        assert resultado["bloqueadas"] == 0
+        assert resultado["infratores"] == []
+        assert resultado["bloqueios_por_rota"] == []
+
+
+class TestPainelRegistro:
+    """Testes da integração com RateLimiter e RegistroLimiters"""
+
+    def test_limiter_registra_resultado_e_se_registra(self):
+        """verificar deve alimentar as métricas e o limiter entra no registry"""
+        limiter = RateLimiter(max_tentativas=1, janela_minutos=1, nome="metricas_auto")
+        limiter.verificar("10.0.0.1")
+        limiter.verificar("10.0.0.1")
+
+        assert registro_limiters.obter("metricas_auto") is limiter
+        assert limiter.metricas.permitidas == 1
+        assert limiter.metricas.bloqueadas == 1
+
+    def test_painel_agrega_limiters(self):
+        """O painel soma rotas e infratores entre os limiters"""
+        registro = RegistroLimiters()
+        login = RateLimiter(max_tentativas=1, janela_minutos=1, nome="painel_login")
+        cadastro = RateLimiter(max_tentativas=1, janela_minutos=1, nome="painel_cadastro")
+        registro.registrar(login)
+        registro.registrar(cadastro)
+
+        for _ in range(3):
+            login.verificar("10.0.0.1")
+        for _ in range(2):
+            cadastro.verificar("10.0.0.1")
+
+        painel = registro.obter_painel()
+
+        assert painel["permitidas"] == 2
+        assert painel["bloqueadas"] == 3
+        assert painel["taxa_bloqueio"] == 60.0
+        assert painel["bloqueios_por_rota"] == [(ROTA_SEM_REQUISICAO, 3)]
+        assert painel["infratores"][0]["contagem"] == 3
+        assert sorted(painel["infratores"][0]["limiters"]) == ["painel_cadastro", "painel_login"]
+        assert [item["nome"] for item in painel["limiters"]] == ["painel_login", "painel_cadastro"]
@@ -210,6 +210,115 @@ class TestRateLimiter:
         assert "5" in repr_str
 
 
+class RelogioFalso:
+    """Relógio monotônico controlado pelo teste"""
+
+    def __init__(self, inicio: float = 1000.0):
+        self.agora = inicio
+
+    def __call__(self) -> float:
+        return self.agora
+
+    def avancar(self, segundos: float):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio():
+    """Substitui o relógio do rate limiter por um relógio controlado"""
+    relogio_falso = RelogioFalso()
+    with patch("util.rate_limiter._agora_monotonico", relogio_falso):
+        yield relogio_falso
+
+
+class TestRateLimiterGCRA:
+    """Testes do motor GCRA (um float por identificador)"""
+
+    def test_guarda_um_float_por_identificador(self, relogio):
+        """Cada identificador deve ocupar apenas o TAT"""
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="gcra")
+
+        for _ in range(3):
+            limiter.verificar("10.0.0.1")
+
+        assert list(limiter.tentativas) == ["10.0.0.1"]
+        assert isinstance(limiter.tentativas["10.0.0.1"], float)
+
+    def test_recarrega_uma_tentativa_por_intervalo(self, relogio):
+        """Bloqueado, deve liberar uma tentativa a cada janela/max"""
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, nome="gcra")
+        for _ in range(3):
+            assert limiter.verificar("10.0.0.1") is True
+        assert limiter.verificar("10.0.0.1") is False
+
+        # Intervalo de emissão: 60s / 3 = 20s
+        relogio.avancar(19)
+        assert limiter.verificar("10.0.0.1") is False
+        relogio.avancar(1)
+        assert limiter.verificar("10.0.0.1") is True
+        assert limiter.verificar("10.0.0.1") is False
+
+    def test_tempo_reset_ate_proxima_tentativa(self, relogio):
+        """Tempo de reset deve ser o tempo até a próxima tentativa liberada"""
+        limiter = RateLimiter(max_tentativas=2, janela_minutos=1, nome="gcra")
+        limiter.verificar("10.0.0.1")
+        limiter.verificar("10.0.0.1")
+
+        relogio.avancar(10)
+
+        assert limiter.obter_tempo_reset("10.0.0.1") == timedelta(seconds=20)
+
+    def test_identificadores_inativos_sao_removidos(self, relogio):
+        """Identificadores que pararam de enviar não devem acumular"""
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="gcra")
+        for i in range(100):
+            limiter.verificar(f"10.0.{i // 256}.{i % 256}")
+
+        # Depois da janela, todos estão com o balde cheio
+        relogio.avancar(61)
+        for i in range(20):
+            limiter.verificar(f"10.1.0.{i}")
+
+        assert len(limiter.tentativas) == 20
+
+    def test_varredura_de_muitos_ips_tem_memoria_limitada(self, relogio):
+        """Uma tentativa por IP nunca deve manter mais IPs que uma janela"""
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="gcra")
+
+        # 10 novos IPs por segundo durante 5 minutos
+        for segundo in range(300):
+            for i in range(10):
+                limiter.verificar(f"ip-{segundo}-{i}")
+            relogio.avancar(1)
+
+        # Cada IP fica ativo por 12s (janela / max)
+        assert len(limiter.tentativas) <= 130
+
+    def test_remover_inativos(self, relogio):
+        """remover_inativos deve fazer a limpeza completa"""
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, nome="gcra")
+        limiter.verificar("10.0.0.1")
+        limiter.verificar("10.0.0.2")
+        for _ in range(5):
+            limiter.verificar("10.0.0.3")
+        relogio.avancar(30)
+
+        # 10.0.0.3 esgotou o balde (recarga total em 60s); os demais já recarregaram
+        assert limiter.remover_inativos() == 2
+        assert list(limiter.tentativas) == ["10.0.0.3"]
+
+    def test_limite_de_identificadores(self, relogio):
+        """Acima do limite, o identificador usado há mais tempo é descartado"""
+        limiter = RateLimiter(
+            max_tentativas=5, janela_minutos=1, nome="gcra", max_identificadores=3
+        )
+
+        for i in range(5):
+            limiter.verificar(f"10.0.0.{i}")
+
+        assert list(limiter.tentativas) == ["10.0.0.2", "10.0.0.3", "10.0.0.4"]
+
+
 class TestDynamicRateLimiter:
     """Testes para a classe DynamicRateLimiter"""
 
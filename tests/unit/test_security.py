@@ -0,0 +1,63 @@
+"""
+Testes para o módulo util/security.py
+
+Testa o custo configurável do bcrypt, a detecção de hashes com outro custo
+e a medição do tempo por hash.
+"""
+
+from passlib.context import CryptContext
+
+from util.config import SENHA_BCRYPT_ROUNDS
+from util.security import (
+    criar_hash_senha,
+    medir_custo_hash,
+    obter_custo_hash,
+    verificar_e_atualizar_senha,
+)
+
+
+def _hash_com_custo(senha: str, rounds: int) -> str:
+    """Gera um hash bcrypt com um custo específico."""
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(senha)
+
+
+class TestCustoBcrypt:
+    """Testes do custo configurável"""
+
+    def test_hash_usa_custo_configurado(self):
+        """Novos hashes usam SENHA_BCRYPT_ROUNDS"""
+        assert obter_custo_hash(criar_hash_senha("Senha@123")) == SENHA_BCRYPT_ROUNDS
+
+    def test_custo_de_hash_invalido(self):
+        """Valores que não são bcrypt retornam None"""
+        assert obter_custo_hash("nao_e_um_hash") is None
+
+    def test_medir_custo_hash(self):
+        """A medição retorna um tempo positivo em milissegundos"""
+        assert medir_custo_hash() > 0
+
+
+class TestVerificarEAtualizar:
+    """Testes da verificação com atualização do hash"""
+
+    def test_hash_no_custo_atual_nao_e_refeito(self):
+        """Hash no custo configurado não gera novo hash"""
+        senha_hash = criar_hash_senha("Senha@123")
+
+        assert verificar_e_atualizar_senha("Senha@123", senha_hash) == (True, None)
+
+    def test_hash_com_custo_menor_e_refeito(self):
+        """Hash com outro custo gera um novo hash no custo configurado"""
+        senha_hash = _hash_com_custo("Senha@123", 4)
+
+        correta, novo_hash = verificar_e_atualizar_senha("Senha@123", senha_hash)
+
+        assert correta is True
+        assert obter_custo_hash(novo_hash) == SENHA_BCRYPT_ROUNDS
+        assert verificar_e_atualizar_senha("Senha@123", novo_hash) == (True, None)
+
+    def test_senha_incorreta_nao_gera_hash(self):
+        """Com senha incorreta, nada é refeito"""
+        senha_hash = _hash_com_custo("Senha@123", 4)
+
+        assert verificar_e_atualizar_senha("Errada@123", senha_hash) == (False, None)
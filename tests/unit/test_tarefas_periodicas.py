@@ -0,0 +1,100 @@
+"""
+Testes para o módulo util/tarefas_periodicas.py
+
+Testa o registro, a execução e o cancelamento de tarefas periódicas.
+"""
+
+import asyncio
+import pytest
+
+from util import tarefas_periodicas
+from util.tarefas_periodicas import (
+    TarefaPeriodica,
+    registrar_tarefa,
+    listar_tarefas,
+    iniciar_tarefas,
+    parar_tarefas,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolar_tarefas():
+    """Isola a lista global de tarefas durante cada teste"""
+    originais = list(tarefas_periodicas._tarefas)
+    tarefas_periodicas._tarefas.clear()
+    yield
+    tarefas_periodicas._tarefas[:] = originais
+
+
+class TestRegistrarTarefa:
+    """Testes para registrar_tarefa"""
+
+    def test_registrar_adiciona_tarefa(self):
+        """Deve adicionar tarefa à lista"""
+        registrar_tarefa("teste", lambda: None, 10)
+
+        assert [t.nome for t in listar_tarefas()] == ["teste"]
+
+    def test_registrar_mesmo_nome_substitui(self):
+        """Registrar o mesmo nome deve substituir a tarefa anterior"""
+        registrar_tarefa("teste", lambda: None, 10)
+        registrar_tarefa("teste", lambda: None, 20)
+
+        tarefas = listar_tarefas()
+        assert len(tarefas) == 1
+        assert tarefas[0].obter_intervalo() == 20
+
+    def test_intervalo_dinamico(self):
+        """Intervalo pode ser uma função avaliada a cada execução"""
+        tarefa = TarefaPeriodica(nome="t", funcao=lambda: None, intervalo_segundos=lambda: 3)
+
+        assert tarefa.obter_intervalo() == 3.0
+
+
+class TestExecucao:
+    """Testes de execução das tarefas"""
+
+    async def test_executa_funcao_sincrona_repetidamente(self):
+        """Deve executar a função síncrona várias vezes e parar ao cancelar"""
+        chamadas = []
+        registrar_tarefa("sync", lambda: chamadas.append(1), 0.01, atraso_inicial_segundos=0)
+
+        await iniciar_tarefas()
+        await asyncio.sleep(0.1)
+        await parar_tarefas()
+
+        quantidade = len(chamadas)
+        assert quantidade >= 2
+        await asyncio.sleep(0.05)
+        assert len(chamadas) == quantidade
+
+    async def test_executa_funcao_async(self):
+        """Deve aguardar funções async"""
+        chamadas = []
+
+        async def tarefa():
+            chamadas.append(1)
+
+        registrar_tarefa("async", tarefa, 10, atraso_inicial_segundos=0)
+
+        await iniciar_tarefas()
+        await asyncio.sleep(0.05)
+        await parar_tarefas()
+
+        assert chamadas == [1]
+
+    async def test_erro_nao_interrompe_agendamento(self):
+        """Exceção em uma execução não deve encerrar a tarefa"""
+        chamadas = []
+
+        def falha():
+            chamadas.append(1)
+            raise RuntimeError("falha")
+
+        registrar_tarefa("falha", falha, 0.01, atraso_inicial_segundos=0)
+
+        await iniciar_tarefas()
+        await asyncio.sleep(0.1)
+        await parar_tarefas()
+
+        assert len(chamadas) >= 2
@@ -227,7 +227,8 @@ class TestToDict:
             "id": 42,
             "nome": "Teste",
             "email": "teste@email.com",
-            "perfil": "Aluno"
+            "perfil": "Aluno",
+            "foto": None
         }
 
 
@@ -250,6 +251,14 @@ class TestFromDict:
         assert usuario.nome == "João"
         assert usuario.email == "joao@email.com"
         assert usuario.perfil == "Aluno"
+        # Sessões criadas antes do campo foto usam a foto padrão
+        assert usuario.foto is None
+
+    def test_preserva_foto(self):
+        """Deve ler o ponteiro da foto guardado na sessão"""
+        dados = {"id": 1, "nome": "João", "email": "joao@email.com", "perfil": "Aluno", "foto": "ab" * 32}
+
+        assert UsuarioLogado.from_dict(dados).foto == "ab" * 32
 
     def test_retorna_none_para_none(self):
         """Deve retornar None quando data é None"""
@@ -296,6 +305,7 @@ class TestFromUsuario:
         usuario_mock.nome = "Maria"
         usuario_mock.email = "maria@email.com"
         usuario_mock.perfil = "Professor"
+        usuario_mock.foto = "cd" * 32
 
         usuario_logado = UsuarioLogado.from_usuario(usuario_mock)
 
@@ -303,3 +313,4 @@ class TestFromUsuario:
         assert usuario_logado.nome == "Maria"
         assert usuario_logado.email == "maria@email.com"
         assert usuario_logado.perfil == "Professor"
+        assert usuario_logado.foto == "cd" * 32
@@ -0,0 +1,271 @@
+"""
+Arquivos estáticos com hash no nome, pré-comprimidos e cache longo.
+
+Etapa de build (python -m util.assets): copia os arquivos de static/ para
+static/dist/ com o hash do conteúdo no nome (ex: css/custom.3f9a1c2b7d4e.css),
+grava ao lado versões .gz (e .br, se o pacote brotli estiver instalado) dos
+tipos textuais e um manifest.json com o mapeamento caminho -> arquivo com hash.
+
+- Nos templates, asset("css/custom.css") retorna a URL com hash (ou a URL
+  original, se o build não foi executado, como em desenvolvimento)
+- Como o nome muda quando o conteúdo muda, os arquivos de static/dist/ são
+  servidos com "Cache-Control: public, max-age=31536000, immutable", e na
+  versão comprimida aceita pelo navegador (Accept-Encoding)
+- Os demais arquivos de /static continuam disponíveis, com "no-cache"
+  (revalidados pelo ETag do StaticFiles)
+
+As fotos dos usuários (img/fotos) já têm o hash do conteúdo no nome (ver
+util/foto_util.py): ficam de fora do build e também são servidas com cache
+imutável. O tema ativo usa o CSS do Bootswatch correspondente com hash
+(url_tema), em vez do bootstrap.min.css sobrescrito ao trocar de tema.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import stat
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from util.config import TEMPLATES_AUTO_RELOAD
+from util.logger_config import logger
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem brotli, apenas .gz
+    brotli = None
+
+DIRETORIO_STATIC = "static"
+SUBDIRETORIO_DIST = "dist"
+ARQUIVO_MANIFESTO = "manifest.json"
+
+# Subdiretórios de static/ que não passam pelo build
+IGNORADOS = ("dist", "img/usuarios", "img/fotos")
+
+# Subdiretório endereçado por conteúdo, servido sem pré-compressão
+SUBDIRETORIO_FOTOS = os.path.join("img", "fotos")
+
+# Extensões que valem a pena comprimir (imagens já são comprimidas)
+EXTENSOES_COMPRIMIVEIS = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map", ".xml"}
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+# Codificações servidas a partir dos arquivos pré-comprimidos, em ordem de preferência
+CODIFICACOES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _nome_com_hash(caminho: Path, conteudo: bytes) -> Path:
+    """Insere o hash do conteúdo antes da extensão (ex: app.js -> app.1a2b3c4d5e6f.js)."""
+    resumo = hashlib.sha256(conteudo).hexdigest()[:12]
+    return caminho.with_name(f"{caminho.stem}.{resumo}{caminho.suffix}")
+
+
+def construir_assets(origem: str = DIRETORIO_STATIC, brotli_ativo: bool = True) -> dict:
+    """
+    Gera static/dist/ com nomes com hash, versões comprimidas e o manifesto.
+
+    Arquivos de builds anteriores que não fazem parte do novo manifesto são
+    removidos.
+
+    Args:
+        origem: Diretório dos arquivos estáticos
+        brotli_ativo: Gerar .br quando o pacote brotli estiver instalado
+
+    Returns:
+        Dict com as quantidades de arquivos, .gz e .br gerados
+    """
+    raiz = Path(origem)
+    destino = raiz / SUBDIRETORIO_DIST
+    destino.mkdir(parents=True, exist_ok=True)
+    usar_brotli = brotli_ativo and brotli is not None
+
+    manifesto: Dict[str, str] = {}
+    gerados = set()
+    resultado = {"arquivos": 0, "gzip": 0, "brotli": 0}
+
+    for arquivo in sorted(raiz.rglob("*")):
+        relativo = arquivo.relative_to(raiz)
+        if not arquivo.is_file() or any(
+            relativo.as_posix() == ignorado or relativo.as_posix().startswith(f"{ignorado}/")
+            for ignorado in IGNORADOS
+        ):
+            continue
+
+        conteudo = arquivo.read_bytes()
+        com_hash = _nome_com_hash(relativo, conteudo)
+        alvo = destino / com_hash
+        alvo.parent.mkdir(parents=True, exist_ok=True)
+        if not alvo.exists():
+            shutil.copyfile(arquivo, alvo)
+        manifesto[relativo.as_posix()] = com_hash.as_posix()
+        gerados.add(alvo)
+        resultado["arquivos"] += 1
+
+        if arquivo.suffix.lower() not in EXTENSOES_COMPRIMIVEIS:
+            continue
+
+        # mtime=0: o mesmo conteúdo gera sempre o mesmo .gz
+        comprimido = gzip.compress(conteudo, compresslevel=9, mtime=0)
+        if len(comprimido) < len(conteudo):
+            alvo_gz = alvo.with_name(alvo.name + ".gz")
+            alvo_gz.write_bytes(comprimido)
+            gerados.add(alvo_gz)
+            resultado["gzip"] += 1
+
+        if usar_brotli:
+            comprimido = brotli.compress(conteudo, quality=11)
+            if len(comprimido) < len(conteudo):
+                alvo_br = alvo.with_name(alvo.name + ".br")
+                alvo_br.write_bytes(comprimido)
+                gerados.add(alvo_br)
+                resultado["brotli"] += 1
+
+    arquivo_manifesto = destino / ARQUIVO_MANIFESTO
+    arquivo_manifesto.write_text(json.dumps(manifesto, indent=2, sort_keys=True), encoding="utf-8")
+    gerados.add(arquivo_manifesto)
+
+    for antigo in destino.rglob("*"):
+        if antigo.is_file() and antigo not in gerados:
+            antigo.unlink()
+
+    logger.info(
+        f"Assets: {resultado['arquivos']} arquivo(s), {resultado['gzip']} .gz, "
+        f"{resultado['brotli']} .br em {destino}"
+    )
+    return resultado
+
+
+class ManifestoAssets:
+    """
+    Mapeamento caminho -> arquivo com hash, lido de static/dist/manifest.json.
+
+    Lido uma vez; com TEMPLATES_AUTO_RELOAD (desenvolvimento), relido
+    quando o arquivo muda.
+    """
+
+    def __init__(self, origem: str = DIRETORIO_STATIC, recarregar: bool = TEMPLATES_AUTO_RELOAD):
+        self.arquivo = Path(origem) / SUBDIRETORIO_DIST / ARQUIVO_MANIFESTO
+        self.recarregar = recarregar
+        self._mapa: Optional[Dict[str, str]] = None
+        self._mtime: Optional[float] = None
+
+    def _obter_mapa(self) -> Dict[str, str]:
+        """Carrega o manifesto (vazio se o build não foi executado)."""
+        if self._mapa is not None and not self.recarregar:
+            return self._mapa
+        try:
+            mtime = self.arquivo.stat().st_mtime
+        except OSError:
+            self._mapa, self._mtime = {}, None
+            return self._mapa
+        if self._mapa is None or mtime != self._mtime:
+            try:
+                self._mapa = json.loads(self.arquivo.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.error(f"Erro ao ler manifesto de assets {self.arquivo}: {e}")
+                self._mapa = {}
+            self._mtime = mtime
+        return self._mapa
+
+    def versao(self) -> str:
+        """Carimbo do manifesto atual (muda a cada build; vazio sem build)."""
+        self._obter_mapa()
+        return str(self._mtime or "")
+
+    def url(self, caminho: str) -> str:
+        """
+        URL de um arquivo estático, com hash quando disponível.
+
+        Args:
+            caminho: Caminho relativo a static/ (ex: "css/custom.css")
+
+        Returns:
+            URL em /static/dist/ ou, sem build, a URL original em /static/
+        """
+        caminho = caminho.lstrip("/")
+        com_hash = self._obter_mapa().get(caminho)
+        if com_hash:
+            return f"/static/{SUBDIRETORIO_DIST}/{com_hash}"
+        return f"/static/{caminho}"
+
+    def url_tema(self, tema: str) -> str:
+        """
+        URL do CSS do tema ativo.
+
+        Com build, o CSS do Bootswatch do tema (com hash); sem build, o
+        bootstrap.min.css copiado ao aplicar o tema, com o tema na query
+        para invalidar a cópia do navegador.
+        """
+        com_hash = self._obter_mapa().get(f"css/bootswatch/{tema}.bootstrap.min.css")
+        if com_hash:
+            return f"/static/{SUBDIRETORIO_DIST}/{com_hash}"
+        return f"/static/css/bootstrap.min.css?v={tema}"
+
+
+def codificacoes_aceitas(accept_encoding: str) -> set:
+    """Codificações aceitas pelo cliente (ignora as com q=0)."""
+    aceitas = set()
+    for parte in accept_encoding.split(","):
+        nome, _, parametros = parte.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if nome:
+            aceitas.add(nome.strip().lower())
+    return aceitas
+
+
+class StaticFilesComCache(StaticFiles):
+    """
+    StaticFiles que serve static/dist/ com cache imutável e pré-compressão.
+
+    As fotos de img/fotos/ também são imutáveis (nome = hash), mas não têm
+    versões comprimidas. Os demais arquivos recebem "Cache-Control: no-cache": o navegador
+    guarda, mas revalida pelo ETag antes de usar.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if path.startswith(SUBDIRETORIO_FOTOS + os.sep):
+            response = await super().get_response(path, scope)
+            response.headers["Cache-Control"] = CACHE_IMUTAVEL
+            return response
+
+        if not path.startswith(SUBDIRETORIO_DIST + os.sep):
+            response = await super().get_response(path, scope)
+            response.headers.setdefault("Cache-Control", "no-cache")
+            return response
+
+        response = None
+        if scope["method"] in ("GET", "HEAD"):
+            aceitas = codificacoes_aceitas(Headers(scope=scope).get("accept-encoding", ""))
+            for codificacao, extensao in CODIFICACOES:
+                if codificacao not in aceitas:
+                    continue
+                caminho, info = await anyio.to_thread.run_sync(self.lookup_path, path + extensao)
+                if info and stat.S_ISREG(info.st_mode):
+                    response = self.file_response(caminho, info, scope)
+                    response.headers["Content-Encoding"] = codificacao
+                    break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = CACHE_IMUTAVEL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+# Instância singleton global
+manifesto_assets = ManifestoAssets()
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    construir_assets()
+    print(f"Assets gerados em {(time.perf_counter() - inicio) * 1000:.0f} ms")
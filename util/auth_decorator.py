@@ -1,3 +1,4 @@
+import inspect
 from fastapi import Request, status
 from fastapi.responses import RedirectResponse
 from functools import wraps
@@ -5,22 +6,30 @@ from typing import List, Optional
 from util.logger_config import logger
 from util.flash_messages import informar_erro
 from model.usuario_logado_model import UsuarioLogado
+from util.sessao_servidor import DadosSessao
 
 
 def criar_sessao(request: Request, usuario_logado: UsuarioLogado):
     """
     Cria sessão de usuário.
 
+    O ID da sessão é trocado no login, para que um ID obtido antes da
+    autenticação não dê acesso à conta (fixação de sessão).
+
     Args:
         request: Objeto Request do FastAPI
         usuario_logado: Instância de UsuarioLogado
     """
     request.session["usuario_logado"] = usuario_logado.to_dict()
+    if isinstance(request.session, DadosSessao):
+        request.session.regenerar()
 
 
 def destruir_sessao(request: Request):
-    """Destroi sessão de usuário"""
+    """Destroi sessão de usuário (o ID atual é revogado no servidor)"""
     request.session.clear()
+    if isinstance(request.session, DadosSessao):
+        request.session.regenerar()
 
 
 def obter_usuario_logado(request: Request) -> Optional[UsuarioLogado]:
@@ -75,5 +84,13 @@ def requer_autenticacao(perfis_permitidos: Optional[List[str]] = None):
             kwargs['usuario_logado'] = usuario
             return await func(*args, **kwargs)
 
+        # usuario_logado é injetado aqui, não vem da requisição: fora da
+        # assinatura vista pelo FastAPI, ele não vira parâmetro de corpo (o que
+        # faria o FastAPI ler o corpo inteiro antes da rota, ex: uploads em streaming)
+        assinatura = inspect.signature(func)
+        wrapper.__signature__ = assinatura.replace(parameters=[
+            parametro for parametro in assinatura.parameters.values()
+            if parametro.name != 'usuario_logado'
+        ])
         return wrapper
     return decorator
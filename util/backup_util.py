@@ -3,29 +3,98 @@ Módulo de gerenciamento de backups do banco de dados SQLite.
 
 Fornece funções para criar, listar, restaurar e excluir backups do banco de dados.
 Os backups são armazenados no diretório 'backups/' com nomenclatura padronizada.
+
+Os backups são feitos com a API de backup online do SQLite
+(sqlite3.Connection.backup), e não copiando o arquivo: a cópia é consistente
+mesmo com escritas em andamento. As páginas são copiadas em passos de
+BACKUP_PAGINAS_POR_PASSO, com uma pausa de BACKUP_PAUSA_MS entre eles, e o
+banco só fica bloqueado durante cada passo. Se outra conexão escrever no
+banco durante a cópia, o SQLite recomeça do início.
+
+A cópia é então comprimida em streaming (BACKUP_COMPRESSAO: gzip, zstd ou
+nenhuma), sem carregar o banco em memória:
+- backup completo: backup_<data>.db.gz (ou .db.zst, ou .db sem compressão)
+- backup incremental: backup_<data>.incr.gz, com apenas as páginas que mudaram
+  em relação ao último backup completo (restaurar = base + páginas)
+
+O arquivo manifest.json do diretório guarda, por backup, tamanho, SHA-256,
+resultado do integrity_check e base do incremental. A listagem lê o manifesto
+(sem stat/leitura de cada arquivo) e a restauração pula o integrity_check
+quando o checksum confere com um backup já verificado. Arquivos copiados
+manualmente para o diretório (inclusive .db do formato antigo) entram no
+manifesto na próxima listagem.
+
+Pela interface admin, o backup roda em segundo plano
+(iniciar_backup_em_segundo_plano), com o progresso em obter_progresso_backup.
 """
+import gzip
+import hashlib
+import json
+import os
+import re
 import shutil
 import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List
-from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterator, Optional, List
+from dataclasses import dataclass, replace
 
-from util.config import DATABASE_PATH
+from util.cache_fragmentos import cache_fragmentos
+from util.config import DATABASE_PATH, BACKUP_COMPRESSAO, BACKUP_PAGINAS_POR_PASSO, BACKUP_PAUSA_MS
 from util.logger_config import logger
 from util.datetime_util import agora
 
+try:
+    import zstandard
+except ImportError:  # Opcional: sem o pacote, BACKUP_COMPRESSAO=zstd usa gzip
+    zstandard = None
+
 
 # Diretório onde os backups são armazenados
 BACKUP_DIR = Path("backups")
 
-# Formato do nome do arquivo de backup
-BACKUP_FILENAME_FORMAT = "backup_%Y-%m-%d_%H-%M-%S.db"
-BACKUP_AUTO_FILENAME_FORMAT = "backup_auto_%Y-%m-%d_%H-%M-%S.db"
+# Formato do nome do arquivo de backup (a extensão depende do tipo e da compressão)
+BACKUP_FILENAME_FORMAT = "backup_%Y-%m-%d_%H-%M-%S"
+BACKUP_AUTO_FILENAME_FORMAT = "backup_auto_%Y-%m-%d_%H-%M-%S"
 
 # Padrão para validação de nomes de arquivo de backup
 BACKUP_FILENAME_PATTERN = "backup_"
 
+# Extensões aceitas e a compressão de cada uma (.incr = backup incremental)
+EXTENSOES_BACKUP = {
+    ".db": "nenhuma",
+    ".db.gz": "gzip",
+    ".db.zst": "zstd",
+    ".incr": "nenhuma",
+    ".incr.gz": "gzip",
+    ".incr.zst": "zstd",
+}
+SUFIXOS_COMPRESSAO = {"nenhuma": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Cache de tamanho, checksum e integridade dos backups
+ARQUIVO_MANIFESTO = "manifest.json"
+
+# Nível 6: bem mais rápido que o 9 com compressão quase igual em bancos SQLite
+NIVEL_GZIP = 6
+NIVEL_ZSTD = 3
+TAMANHO_BLOCO = 1024 * 1024
+
+# Formato do incremental: MAGICA, tamanho da página (>I), nome da base (>H + bytes),
+# registros (número da página >I + página), 0 (>I) e total de páginas do banco (>I)
+MAGICA_INCREMENTAL = b"SQLINCR1"
+
+_PADRAO_DATA = re.compile(r"^backup_(?:auto_)?(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})\.")
+
+# Erros de leitura de um backup comprimido truncado ou corrompido
+ERROS_DESCOMPRESSAO: tuple = (OSError, ValueError, EOFError, zlib.error, struct.error)
+if zstandard is not None:
+    ERROS_DESCOMPRESSAO += (zstandard.ZstdError,)
+
 
 @dataclass
 class BackupInfo:
@@ -36,6 +105,45 @@ class BackupInfo:
     tamanho_bytes: int
     tamanho_formatado: str
     tipo: str  # "manual" ou "automático"
+    compressao: str = "nenhuma"  # "gzip", "zstd" ou "nenhuma"
+    incremental: bool = False
+    incremental_de: Optional[str] = None  # Backup completo usado como base
+    sha256: Optional[str] = None
+    integridade: Optional[str] = None  # "ok", "erro" ou None (não verificado)
+    tamanho_banco_bytes: Optional[int] = None  # Tamanho do banco descomprimido
+
+
+@dataclass
+class ProgressoBackup:
+    """Andamento do backup em segundo plano (o último iniciado)"""
+    em_andamento: bool
+    iniciado_em: datetime
+    paginas_copiadas: int = 0
+    paginas_total: int = 0
+    concluido_em: Optional[datetime] = None
+    sucesso: Optional[bool] = None
+    mensagem: str = ""
+
+    @property
+    def percentual(self) -> int:
+        """Percentual concluído (0 a 100)"""
+        if self.sucesso:
+            return 100
+        if not self.paginas_total:
+            return 0
+        return min(100, self.paginas_copiadas * 100 // self.paginas_total)
+
+
+# Estado do backup em segundo plano (um por vez)
+_lock_progresso = threading.Lock()
+_progresso: Optional[ProgressoBackup] = None
+_thread_backup: Optional[threading.Thread] = None
+
+# Leitura e gravação do manifesto (thread do backup x requisições)
+_lock_manifesto = threading.RLock()
+
+# Bases de incrementais em gravação: não podem ser excluídas (sob _lock_manifesto)
+_bases_reservadas: set[str] = set()
 
 
 def _formatar_tamanho(bytes: int) -> str:
@@ -58,6 +166,27 @@ def _formatar_tamanho(bytes: int) -> str:
         return f"{bytes / (1024 * 1024 * 1024):.2f} GB"
 
 
+def _extensao_backup(nome_arquivo: str) -> Optional[str]:
+    """
+    Retorna a extensão de backup do nome (ex: ".db.gz"), ou None se não for aceita
+
+    Args:
+        nome_arquivo: Nome do arquivo
+
+    Returns:
+        Chave de EXTENSOES_BACKUP ou None
+    """
+    for extensao in sorted(EXTENSOES_BACKUP, key=len, reverse=True):
+        if nome_arquivo.endswith(extensao):
+            return extensao
+    return None
+
+
+def _eh_incremental(nome_arquivo: str) -> bool:
+    """Indica se o nome é de um backup incremental (.incr, .incr.gz, .incr.zst)"""
+    return (_extensao_backup(nome_arquivo) or "").startswith(".incr")
+
+
 def _validar_nome_arquivo(nome_arquivo: str) -> bool:
     """
     Valida nome de arquivo de backup para evitar path traversal
@@ -79,7 +208,7 @@ def _validar_nome_arquivo(nome_arquivo: str) -> bool:
         return False
 
     # Verificar extensão
-    if not nome_arquivo.endswith(".db"):
+    if _extensao_backup(nome_arquivo) is None:
         logger.warning(f"Extensão de arquivo de backup inválida: {nome_arquivo}")
         return False
 
@@ -111,21 +240,38 @@ def _extrair_data_do_nome(nome_arquivo: str) -> Optional[datetime]:
     Extrai data/hora do nome do arquivo de backup
 
     Args:
-        nome_arquivo: Nome do arquivo (ex: "backup_2025-10-20_14-30-45.db" ou "backup_auto_2025-10-20_14-30-45.db")
+        nome_arquivo: Nome do arquivo (ex: "backup_2025-10-20_14-30-45.db.gz" ou "backup_auto_2025-10-20_14-30-45.db")
 
     Returns:
         Objeto datetime ou None se não conseguir extrair
     """
     try:
-        # Remover prefixo "backup_" ou "backup_auto_" e sufixo ".db"
-        data_str = nome_arquivo.replace("backup_auto_", "").replace("backup_", "").replace(".db", "")
+        correspondencia = _PADRAO_DATA.match(nome_arquivo)
+        if correspondencia is None:
+            raise ValueError(nome_arquivo)
         # Converter para datetime
-        return datetime.strptime(data_str, "%Y-%m-%d_%H-%M-%S")
+        return datetime.strptime(correspondencia.group(1), "%Y-%m-%d_%H-%M-%S")
     except ValueError:
         logger.warning(f"Não foi possível extrair data do nome do arquivo: {nome_arquivo}")
         return None
 
 
+def _compressao_configurada() -> str:
+    """
+    Compressão a usar nos novos backups, conforme BACKUP_COMPRESSAO
+
+    Returns:
+        "gzip", "zstd" ou "nenhuma" (zstd sem o pacote zstandard vira gzip)
+    """
+    if BACKUP_COMPRESSAO not in SUFIXOS_COMPRESSAO:
+        logger.warning(f"BACKUP_COMPRESSAO inválida: {BACKUP_COMPRESSAO}. Usando gzip")
+        return "gzip"
+    if BACKUP_COMPRESSAO == "zstd" and zstandard is None:
+        logger.warning("BACKUP_COMPRESSAO=zstd, mas o pacote zstandard não está instalado. Usando gzip")
+        return "gzip"
+    return BACKUP_COMPRESSAO
+
+
 def _validar_integridade_backup(caminho: Path) -> tuple[bool, str]:
     """
     Valida a integridade de um arquivo de backup SQLite
@@ -188,17 +334,411 @@ def _verificar_database_pos_restauracao() -> bool:
     return valido
 
 
-def criar_backup(automatico: bool = False) -> tuple[bool, str]:
+# ============================================================
+# Compressão em streaming
+# ============================================================
+
+class _EscritaComHash:
+    """Repassa as escritas ao arquivo, calculando o SHA-256 do que foi gravado"""
+
+    def __init__(self, arquivo: BinaryIO):
+        self.arquivo = arquivo
+        self.hash = hashlib.sha256()
+
+    def write(self, dados) -> int:
+        self.hash.update(dados)
+        return self.arquivo.write(dados)
+
+    def flush(self) -> None:
+        self.arquivo.flush()
+
+
+class _LeituraComHash:
+    """Repassa as leituras do arquivo, calculando o SHA-256 do que foi lido"""
+
+    def __init__(self, arquivo: BinaryIO):
+        self.arquivo = arquivo
+        self.hash = hashlib.sha256()
+
+    def read(self, tamanho: int = -1) -> bytes:
+        dados = self.arquivo.read(tamanho)
+        self.hash.update(dados)
+        return dados
+
+    def finalizar(self) -> str:
+        """Lê o restante do arquivo e retorna o SHA-256 do arquivo inteiro"""
+        while self.read(TAMANHO_BLOCO):
+            pass
+        return self.hash.hexdigest()
+
+
+@contextmanager
+def _gravar_comprimido(caminho: Path, compressao: str) -> Iterator[tuple[BinaryIO, _EscritaComHash]]:
     """
-    Cria um novo backup do banco de dados
+    Abre um arquivo para gravação com a compressão indicada
+
+    Yields:
+        Tupla (saída descomprimida, arquivo bruto); o SHA-256 do arquivo gravado
+        fica em bruto.hash ao sair do bloco
+    """
+    with open(caminho, "wb") as arquivo:
+        bruto = _EscritaComHash(arquivo)
+        if compressao == "gzip":
+            saida = gzip.GzipFile(fileobj=bruto, mode="wb", compresslevel=NIVEL_GZIP, mtime=0)
+        elif compressao == "zstd":
+            saida = zstandard.ZstdCompressor(level=NIVEL_ZSTD).stream_writer(bruto, closefd=False)
+        else:
+            saida = bruto
+        try:
+            yield saida, bruto
+        finally:
+            if saida is not bruto:
+                saida.close()
+
+
+@contextmanager
+def _ler_descomprimido(caminho: Path) -> Iterator[tuple[BinaryIO, _LeituraComHash]]:
+    """
+    Abre um backup para leitura, descomprimindo conforme a extensão
+
+    Yields:
+        Tupla (entrada descomprimida, arquivo bruto); bruto.finalizar() retorna
+        o SHA-256 do arquivo
+
+    Raises:
+        OSError: Backup em zstd sem o pacote zstandard instalado
+    """
+    compressao = EXTENSOES_BACKUP[_extensao_backup(caminho.name)]
+    if compressao == "zstd" and zstandard is None:
+        raise OSError(f"O pacote zstandard é necessário para ler {caminho.name}")
+
+    with open(caminho, "rb") as arquivo:
+        bruto = _LeituraComHash(arquivo)
+        if compressao == "gzip":
+            entrada = gzip.GzipFile(fileobj=bruto, mode="rb")
+        elif compressao == "zstd":
+            entrada = zstandard.ZstdDecompressor().stream_reader(bruto, closefd=False)
+        else:
+            entrada = bruto
+        try:
+            yield entrada, bruto
+        finally:
+            if entrada is not bruto:
+                entrada.close()
+
+
+def _ler_bloco(arquivo: BinaryIO, tamanho: int) -> bytes:
+    """Lê até `tamanho` bytes (menos só no fim do arquivo)"""
+    partes = []
+    restante = tamanho
+    while restante:
+        dados = arquivo.read(restante)
+        if not dados:
+            break
+        partes.append(dados)
+        restante -= len(dados)
+    return b"".join(partes)
+
+
+def _ler_inteiro(arquivo: BinaryIO) -> int:
+    """Lê um inteiro sem sinal de 4 bytes (big-endian) do incremental"""
+    dados = _ler_bloco(arquivo, 4)
+    if len(dados) < 4:
+        raise EOFError("Backup incremental truncado")
+    return struct.unpack(">I", dados)[0]
+
+
+def _gravar_completo(banco: Path, destino: Path, compressao: str) -> str:
+    """
+    Grava o banco inteiro comprimido em destino
+
+    Returns:
+        SHA-256 do arquivo gravado
+    """
+    with open(banco, "rb") as origem, _gravar_comprimido(destino, compressao) as (saida, bruto):
+        shutil.copyfileobj(origem, saida, TAMANHO_BLOCO)
+    return bruto.hash.hexdigest()
+
+
+def _gravar_incremental(banco: Path, base: Path, destino: Path, compressao: str) -> tuple[str, int, int]:
+    """
+    Grava em destino as páginas do banco que diferem do backup completo base
+
+    O banco e a base são lidos em paralelo, página a página, e nenhum dos
+    dois é carregado em memória.
+
+    Returns:
+        Tupla (SHA-256 do arquivo gravado, páginas alteradas, total de páginas)
+    """
+    conn = sqlite3.connect(str(banco))
+    try:
+        tamanho_pagina = conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+    nome_base = base.name.encode()
+    alteradas = total = 0
+    with open(banco, "rb") as novo, \
+            _ler_descomprimido(base) as (antigo, _), \
+            _gravar_comprimido(destino, compressao) as (saida, bruto):
+        saida.write(MAGICA_INCREMENTAL + struct.pack(">IH", tamanho_pagina, len(nome_base)) + nome_base)
+        while pagina := _ler_bloco(novo, tamanho_pagina):
+            total += 1
+            if _ler_bloco(antigo, tamanho_pagina) != pagina:
+                saida.write(struct.pack(">I", total))
+                saida.write(pagina)
+                alteradas += 1
+        saida.write(struct.pack(">II", 0, total))
+    return bruto.hash.hexdigest(), alteradas, total
+
+
+def _extrair_banco(nome_arquivo: str, destino: Path, manifesto: dict) -> bool:
+    """
+    Grava em destino o banco contido no backup
+
+    Descomprime o backup e, se for incremental, extrai a base e aplica as
+    páginas por cima. O SHA-256 de cada arquivo lido é comparado com o do
+    manifesto (e registrado, se ainda não estava).
 
     Args:
-        automatico: Se True, cria backup automático (prefixo "backup_auto_"),
-                   se False, cria backup manual (prefixo "backup_")
+        nome_arquivo: Nome do backup
+        destino: Arquivo a gerar (sobrescrito se existir)
+        manifesto: Manifesto atual (ver _sincronizar_manifesto)
 
     Returns:
-        Tupla (sucesso: bool, mensagem: str)
+        True se todos os arquivos lidos conferem com checksums já registrados
+
+    Raises:
+        ValueError: Checksum diferente do manifesto ou incremental inválido
+        (e os erros de ERROS_DESCOMPRESSAO)
+    """
+    caminho = BACKUP_DIR / nome_arquivo
+
+    if _eh_incremental(nome_arquivo):
+        with _ler_descomprimido(caminho) as (entrada, bruto):
+            cabecalho = _ler_bloco(entrada, len(MAGICA_INCREMENTAL) + 6)
+            if not cabecalho.startswith(MAGICA_INCREMENTAL) or len(cabecalho) < len(MAGICA_INCREMENTAL) + 6:
+                raise ValueError(f"Backup incremental inválido: {nome_arquivo}")
+            tamanho_pagina, tamanho_nome = struct.unpack(">IH", cabecalho[len(MAGICA_INCREMENTAL):])
+            nome_base = _ler_bloco(entrada, tamanho_nome).decode("utf-8", errors="replace")
+            if not _validar_nome_arquivo(nome_base) or _eh_incremental(nome_base) \
+                    or not (BACKUP_DIR / nome_base).exists():
+                raise ValueError(f"Backup completo de base não encontrado: {nome_base}")
+
+            conferido = _extrair_banco(nome_base, destino, manifesto)
+            with open(destino, "r+b") as banco:
+                while numero := _ler_inteiro(entrada):
+                    pagina = _ler_bloco(entrada, tamanho_pagina)
+                    if len(pagina) < tamanho_pagina:
+                        raise EOFError("Backup incremental truncado")
+                    banco.seek((numero - 1) * tamanho_pagina)
+                    banco.write(pagina)
+                banco.truncate(_ler_inteiro(entrada) * tamanho_pagina)
+            sha256 = bruto.finalizar()
+    else:
+        with _ler_descomprimido(caminho) as (entrada, bruto), open(destino, "wb") as saida:
+            shutil.copyfileobj(entrada, saida, TAMANHO_BLOCO)
+            sha256 = bruto.finalizar()
+        conferido = True
+
+    registrado = manifesto.get(nome_arquivo, {}).get("sha256")
+    if registrado and registrado != sha256:
+        raise ValueError(f"Checksum de {nome_arquivo} não confere com o registrado no manifesto")
+    if not registrado:
+        _atualizar_manifesto(nome_arquivo, sha256=sha256)
+    return conferido and bool(registrado)
+
+
+# ============================================================
+# Manifesto
+# ============================================================
+
+def _caminho_manifesto() -> Path:
+    return BACKUP_DIR / ARQUIVO_MANIFESTO
+
+
+def _ler_manifesto() -> dict:
+    """Lê o manifesto; se ausente ou ilegível, retorna vazio (é refeito a partir dos arquivos)"""
+    try:
+        return json.loads(_caminho_manifesto().read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Manifesto de backups ilegível, será recriado: {e}")
+        return {}
+
+
+def _gravar_manifesto(manifesto: dict) -> None:
+    """Grava o manifesto de forma atômica (arquivo temporário + os.replace)"""
+    caminho = _caminho_manifesto()
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    try:
+        temporario.write_text(json.dumps(manifesto, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(temporario, caminho)
+    except OSError as e:
+        # Sem o manifesto em disco, os dados são recalculados na próxima leitura
+        logger.warning(f"Não foi possível gravar o manifesto de backups: {e}")
+
+
+def _entrada_do_arquivo(nome_arquivo: str) -> dict:
+    """
+    Entrada do manifesto para um arquivo ainda não registrado (via stat)
+
+    Raises:
+        OSError: Erro ao obter informações do arquivo
+    """
+    stat = (BACKUP_DIR / nome_arquivo).stat()
+    data_criacao = _extrair_data_do_nome(nome_arquivo)
+    if data_criacao is None:
+        data_criacao = datetime.fromtimestamp(stat.st_mtime)
+    return {
+        "data_criacao": data_criacao.isoformat(),
+        "tamanho_bytes": stat.st_size,
+        "compressao": EXTENSOES_BACKUP[_extensao_backup(nome_arquivo)],
+        "incremental_de": None,
+        "sha256": None,
+        "integridade": None,
+        "tamanho_banco_bytes": None,
+    }
+
+
+def _sincronizar_manifesto() -> dict:
+    """
+    Retorna o manifesto alinhado aos arquivos do diretório
+
+    Apenas a listagem de nomes é feita a cada chamada: arquivos novos (ex:
+    copiados manualmente) são registrados com um stat, e entradas de
+    arquivos removidos são descartadas.
+
+    Returns:
+        Dicionário nome do arquivo -> entrada
+
+    Raises:
+        OSError: Erro ao listar o diretório
+    """
+    with _lock_manifesto:
+        # Listar sob o lock: um backup registrado entre a listagem e a leitura
+        # do manifesto seria descartado como arquivo removido. Listar antes de
+        # ler o manifesto: erro no diretório interrompe aqui
+        nomes = {
+            arquivo.name for arquivo in BACKUP_DIR.glob(f"{BACKUP_FILENAME_PATTERN}*")
+            if _extensao_backup(arquivo.name) is not None
+        }
+        manifesto = _ler_manifesto()
+        alterado = False
+
+        for nome in set(manifesto) - nomes:
+            del manifesto[nome]
+            alterado = True
+
+        for nome in sorted(nomes - set(manifesto)):
+            try:
+                manifesto[nome] = _entrada_do_arquivo(nome)
+            except OSError as e:
+                logger.warning(f"Erro ao processar arquivo de backup {nome}: {str(e)}")
+                continue
+            alterado = True
+
+        if alterado:
+            _gravar_manifesto(manifesto)
+        return manifesto
+
+
+def _atualizar_manifesto(nome_arquivo: str, **campos) -> None:
+    """Atualiza (ou cria) a entrada de um backup no manifesto"""
+    with _lock_manifesto:
+        manifesto = _ler_manifesto()
+        entrada = manifesto.get(nome_arquivo)
+        if entrada is None:
+            try:
+                entrada = _entrada_do_arquivo(nome_arquivo)
+            except OSError as e:
+                logger.warning(f"Erro ao registrar backup {nome_arquivo} no manifesto: {e}")
+                return
+        entrada.update(campos)
+        manifesto[nome_arquivo] = entrada
+        _gravar_manifesto(manifesto)
+
+
+def _info_da_entrada(nome_arquivo: str, entrada: dict) -> BackupInfo:
+    """Monta o BackupInfo a partir da entrada do manifesto"""
+    return BackupInfo(
+        nome_arquivo=nome_arquivo,
+        caminho_completo=str(BACKUP_DIR / nome_arquivo),
+        data_criacao=datetime.fromisoformat(entrada["data_criacao"]),
+        tamanho_bytes=entrada["tamanho_bytes"],
+        tamanho_formatado=_formatar_tamanho(entrada["tamanho_bytes"]),
+        tipo=_detectar_tipo_backup(nome_arquivo),
+        compressao=entrada.get("compressao", "nenhuma"),
+        incremental=_eh_incremental(nome_arquivo),
+        incremental_de=entrada.get("incremental_de"),
+        sha256=entrada.get("sha256"),
+        integridade=entrada.get("integridade"),
+        tamanho_banco_bytes=entrada.get("tamanho_banco_bytes"),
+    )
+
+
+def _ultimo_backup_completo(manifesto: dict) -> Optional[str]:
+    """Backup completo mais recente que pode servir de base a um incremental"""
+    completos = [
+        (entrada["data_criacao"], nome) for nome, entrada in manifesto.items()
+        if not _eh_incremental(nome) and entrada.get("integridade") != "erro"
+    ]
+    return max(completos)[1] if completos else None
+
+
+# ============================================================
+# Criação
+# ============================================================
+
+def _copiar_banco_online(
+    origem: Path,
+    destino: Path,
+    progresso: Optional[Callable[[int, int], None]] = None,
+) -> None:
+    """
+    Copia o banco com a API de backup online do SQLite, em passos.
+
+    Args:
+        origem: Arquivo do banco em uso
+        destino: Arquivo a gerar (sobrescrito se existir)
+        progresso: Chamada após cada passo com (páginas copiadas, total)
+
+    Raises:
+        sqlite3.Error: Erro do SQLite durante a cópia
     """
+    pausa = BACKUP_PAUSA_MS / 1000
+
+    def _passo(status: int, restantes: int, total: int) -> None:
+        if progresso:
+            progresso(total - restantes, total)
+        # O lock de leitura do banco é liberado entre os passos
+        if restantes and pausa:
+            time.sleep(pausa)
+
+    conn_origem = sqlite3.connect(str(origem))
+    conn_destino = sqlite3.connect(str(destino))
+    try:
+        conn_origem.backup(conn_destino, pages=BACKUP_PAGINAS_POR_PASSO, progress=_passo)
+    finally:
+        conn_destino.close()
+        conn_origem.close()
+
+
+def _gerar_backup(
+    automatico: bool = False,
+    progresso: Optional[Callable[[int, int], None]] = None,
+    incremental: bool = False,
+) -> tuple[bool, str, Optional[str]]:
+    """
+    Cria um backup (ver criar_backup)
+
+    Returns:
+        Tupla (sucesso: bool, mensagem: str, nome do arquivo criado ou None)
+    """
+    caminho_copia = None
+    caminho_parcial = None
+    base = None
     try:
         # Garantir que o diretório de backups existe
         _garantir_diretorio_backup()
@@ -208,36 +748,209 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
         if not db_path.exists():
             mensagem = f"Banco de dados não encontrado: {DATABASE_PATH}"
             logger.error(mensagem)
-            return False, mensagem
+            return False, mensagem, None
+
+        compressao = _compressao_configurada()
+        if incremental:
+            # Escolher e reservar a base juntos: excluir_backup recusa bases reservadas
+            with _lock_manifesto:
+                base = _ultimo_backup_completo(_sincronizar_manifesto())
+                if base:
+                    _bases_reservadas.add(base)
 
         # Gerar nome do arquivo de backup com timestamp
         formato = BACKUP_AUTO_FILENAME_FORMAT if automatico else BACKUP_FILENAME_FORMAT
-        nome_backup = agora().strftime(formato)
+        carimbo = agora().strftime(formato)
+        nome_backup = carimbo + (".incr" if base else ".db") + SUFIXOS_COMPRESSAO[compressao]
         caminho_backup = BACKUP_DIR / nome_backup
 
-        # Copiar arquivo do banco de dados
-        shutil.copy2(db_path, caminho_backup)
+        # Arquivos temporários ficam fora do padrão de nomes (não aparecem na listagem)
+        caminho_copia = BACKUP_DIR / f".{nome_backup}.copia"
+        caminho_parcial = caminho_backup.with_name(nome_backup + ".parcial")
+
+        # Cópia online, verificada uma vez aqui (o resultado fica no manifesto)
+        _copiar_banco_online(db_path, caminho_copia, progresso)
+        valido, _ = _validar_integridade_backup(caminho_copia)
+        tamanho_banco = caminho_copia.stat().st_size
+
+        if base:
+            sha256, alteradas, total = _gravar_incremental(caminho_copia, BACKUP_DIR / base, caminho_parcial, compressao)
+            # A reserva vale só neste processo: outro worker pode ter excluído a base
+            if not (BACKUP_DIR / base).exists():
+                logger.warning(f"Backup base {base} excluído durante o incremental: gravando backup completo")
+                with _lock_manifesto:
+                    _bases_reservadas.discard(base)
+                base = None
+                nome_backup = carimbo + ".db" + SUFIXOS_COMPRESSAO[compressao]
+                caminho_backup = BACKUP_DIR / nome_backup
+        if not base:
+            sha256 = _gravar_completo(caminho_copia, caminho_parcial, compressao)
+        os.replace(caminho_parcial, caminho_backup)
 
         # Obter tamanho do backup
         tamanho = caminho_backup.stat().st_size
         tamanho_formatado = _formatar_tamanho(tamanho)
 
+        _atualizar_manifesto(
+            nome_backup,
+            tamanho_bytes=tamanho,
+            compressao=compressao,
+            incremental_de=base,
+            sha256=sha256,
+            integridade="ok" if valido else "erro",
+            tamanho_banco_bytes=tamanho_banco,
+        )
+
         tipo = "automático" if automatico else "manual"
-        mensagem = f"Backup {tipo} criado com sucesso: {nome_backup} ({tamanho_formatado})"
-        logger.info(mensagem)
+        if base:
+            mensagem = (
+                f"Backup {tipo} incremental criado com sucesso: {nome_backup} ({tamanho_formatado}, "
+                f"{alteradas} de {total} páginas alteradas desde {base})"
+            )
+        else:
+            mensagem = f"Backup {tipo} criado com sucesso: {nome_backup} ({tamanho_formatado})"
+            if incremental:
+                mensagem += ". Não há backup completo para servir de base: foi feito um backup completo"
+        if not valido:
+            mensagem += ". ATENÇÃO: o banco atual falhou na verificação de integridade"
+            logger.warning(mensagem)
+        else:
+            logger.info(mensagem)
 
-        return True, mensagem
+        return True, mensagem, nome_backup
 
-    except OSError as e:
+    except (OSError, sqlite3.Error) as e:
         mensagem = f"Erro ao criar backup: {str(e)}"
         logger.error(mensagem)
-        return False, mensagem
+        if caminho_parcial is not None:
+            caminho_parcial.unlink(missing_ok=True)
+        return False, mensagem, None
+
+    finally:
+        if caminho_copia is not None:
+            caminho_copia.unlink(missing_ok=True)
+        if base:
+            with _lock_manifesto:
+                _bases_reservadas.discard(base)
+
+
+def criar_backup(
+    automatico: bool = False,
+    progresso: Optional[Callable[[int, int], None]] = None,
+    incremental: bool = False,
+) -> tuple[bool, str]:
+    """
+    Cria um novo backup do banco de dados
+
+    Bloqueante (a duração cresce com o tamanho do banco): nas rotas, use
+    iniciar_backup_em_segundo_plano.
+
+    Args:
+        automatico: Se True, cria backup automático (prefixo "backup_auto_"),
+                   se False, cria backup manual (prefixo "backup_")
+        progresso: Chamada após cada passo com (páginas copiadas, total)
+        incremental: Se True, grava apenas as páginas alteradas desde o último
+                    backup completo (sem backup completo, faz um completo)
+
+    Returns:
+        Tupla (sucesso: bool, mensagem: str)
+    """
+    sucesso, mensagem, _ = _gerar_backup(automatico, progresso, incremental)
+    return sucesso, mensagem
+
+
+def _executar_backup_em_segundo_plano(automatico: bool, incremental: bool = False) -> None:
+    """Corpo da thread de backup: executa criar_backup e registra o progresso."""
+
+    def _atualizar(copiadas: int, total: int) -> None:
+        with _lock_progresso:
+            _progresso.paginas_copiadas = copiadas
+            _progresso.paginas_total = total
+
+    try:
+        sucesso, mensagem = criar_backup(automatico, progresso=_atualizar, incremental=incremental)
+    except Exception as e:  # A thread não pode terminar sem registrar o fim
+        logger.error(f"Erro inesperado no backup em segundo plano: {e}", exc_info=True)
+        sucesso, mensagem = False, f"Erro ao criar backup: {e}"
+
+    with _lock_progresso:
+        _progresso.em_andamento = False
+        _progresso.sucesso = sucesso
+        _progresso.mensagem = mensagem
+        _progresso.concluido_em = agora()
+
+
+def iniciar_backup_em_segundo_plano(automatico: bool = False, incremental: bool = False) -> tuple[bool, str]:
+    """
+    Inicia a criação de um backup em uma thread e retorna imediatamente.
+
+    Apenas um backup em segundo plano roda por vez. O andamento fica em
+    obter_progresso_backup().
+
+    Args:
+        automatico: Tipo do backup (ver criar_backup)
+        incremental: Backup incremental (ver criar_backup)
+
+    Returns:
+        Tupla (iniciado: bool, mensagem: str)
+    """
+    global _progresso, _thread_backup
+
+    with _lock_progresso:
+        if _progresso is not None and _progresso.em_andamento:
+            return False, "Já existe um backup em andamento. Aguarde a conclusão."
+
+        _progresso = ProgressoBackup(em_andamento=True, iniciado_em=agora())
+        _thread_backup = threading.Thread(
+            target=_executar_backup_em_segundo_plano,
+            args=(automatico, incremental),
+            name="backup",
+            daemon=True,
+        )
+        _thread_backup.start()
 
+    logger.info("Backup iniciado em segundo plano")
+    return True, "Backup iniciado. O progresso é exibido nesta página."
+
+
+def obter_progresso_backup() -> Optional[ProgressoBackup]:
+    """
+    Retorna o andamento do último backup em segundo plano.
+
+    Returns:
+        Cópia do progresso, ou None se nenhum backup foi iniciado
+    """
+    with _lock_progresso:
+        return replace(_progresso) if _progresso is not None else None
+
+
+def aguardar_backup(timeout: Optional[float] = None) -> bool:
+    """
+    Aguarda o backup em segundo plano terminar (ex: no encerramento da aplicação).
+
+    Args:
+        timeout: Tempo máximo de espera em segundos (None = sem limite)
+
+    Returns:
+        True se não há backup em andamento ao retornar
+    """
+    thread = _thread_backup
+    if thread is not None:
+        thread.join(timeout)
+        return not thread.is_alive()
+    return True
+
+
+# ============================================================
+# Consulta, restauração e exclusão
+# ============================================================
 
 def listar_backups() -> List[BackupInfo]:
     """
     Lista todos os backups disponíveis
 
+    Os dados vêm do manifesto: o custo não depende do tamanho dos arquivos.
+
     Returns:
         Lista de objetos BackupInfo ordenados por data (mais recente primeiro)
     """
@@ -245,34 +958,8 @@ def listar_backups() -> List[BackupInfo]:
         # Garantir que o diretório existe
         _garantir_diretorio_backup()
 
-        backups = []
-
-        # Listar todos os arquivos .db no diretório de backups
-        for arquivo in BACKUP_DIR.glob("backup_*.db"):
-            try:
-                # Obter informações do arquivo
-                stat = arquivo.stat()
-                tamanho = stat.st_size
-                data_criacao = _extrair_data_do_nome(arquivo.name)
-
-                # Se não conseguiu extrair data do nome, usar data de modificação do arquivo
-                if data_criacao is None:
-                    data_criacao = datetime.fromtimestamp(stat.st_mtime)
-
-                # Detectar tipo do backup
-                tipo = _detectar_tipo_backup(arquivo.name)
-
-                backups.append(BackupInfo(
-                    nome_arquivo=arquivo.name,
-                    caminho_completo=str(arquivo),
-                    data_criacao=data_criacao,
-                    tamanho_bytes=tamanho,
-                    tamanho_formatado=_formatar_tamanho(tamanho),
-                    tipo=tipo
-                ))
-            except OSError as e:
-                logger.warning(f"Erro ao processar arquivo de backup {arquivo.name}: {str(e)}")
-                continue
+        manifesto = _sincronizar_manifesto()
+        backups = [_info_da_entrada(nome, entrada) for nome, entrada in manifesto.items()]
 
         # Ordenar por data (mais recente primeiro)
         backups.sort(key=lambda x: x.data_criacao, reverse=True)
@@ -285,13 +972,29 @@ def listar_backups() -> List[BackupInfo]:
         return []
 
 
+def _restaurar_arquivo(nome_arquivo: str, db_path: Path) -> None:
+    """
+    Extrai um backup e o copia sobre o banco (usado no rollback)
+
+    Raises:
+        ERROS_DESCOMPRESSAO
+    """
+    caminho_extraido = BACKUP_DIR / f".{nome_arquivo}.restaurar"
+    try:
+        _extrair_banco(nome_arquivo, caminho_extraido, _sincronizar_manifesto())
+        shutil.copy2(caminho_extraido, db_path)
+    finally:
+        caminho_extraido.unlink(missing_ok=True)
+
+
 def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tuple[bool, str, Optional[str]]:
     """
     Restaura um backup do banco de dados com validação de integridade
 
     IMPORTANTE: Esta operação sobrescreve o banco de dados atual!
     Por padrão, cria um backup automático antes de restaurar e valida
-    a integridade do backup antes de aplicar.
+    a integridade do backup antes de aplicar. O integrity_check é dispensado
+    se o backup já foi verificado e o checksum confere com o manifesto.
 
     Args:
         nome_arquivo: Nome do arquivo de backup a restaurar
@@ -301,6 +1004,8 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
         Tupla (sucesso: bool, mensagem: str, nome_backup_automatico: Optional[str])
     """
     caminho_backup_seguranca = None
+    nome_backup_automatico = None
+    caminho_extraido = None
 
     try:
         # Validar nome do arquivo
@@ -316,34 +1021,49 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error(mensagem)
             return False, mensagem, None
 
-        # VALIDAÇÃO DE INTEGRIDADE: Verificar se backup está íntegro
-        logger.info(f"Validando integridade do backup: {nome_arquivo}")
-        valido, msg_validacao = _validar_integridade_backup(caminho_backup)
-        if not valido:
-            mensagem = f"Backup corrompido ou inválido! {msg_validacao}. Restauração abortada."
+        # Sobrescrever o banco no meio da cópia estragaria o backup em andamento
+        if not aguardar_backup(timeout=0):
+            mensagem = "Há um backup em andamento. Aguarde a conclusão para restaurar."
+            logger.warning(mensagem)
+            return False, mensagem, None
+
+        # Descomprimir (e aplicar o incremental) em um arquivo temporário
+        manifesto = _sincronizar_manifesto()
+        caminho_extraido = BACKUP_DIR / f".{nome_arquivo}.restaurar"
+        try:
+            conferido = _extrair_banco(nome_arquivo, caminho_extraido, manifesto)
+        except ERROS_DESCOMPRESSAO as e:
+            mensagem = f"Backup corrompido ou inválido! {str(e)}. Restauração abortada."
             logger.error(mensagem)
             return False, mensagem, None
 
+        # VALIDAÇÃO DE INTEGRIDADE: Verificar se backup está íntegro
+        if conferido and manifesto.get(nome_arquivo, {}).get("integridade") == "ok":
+            logger.info(f"Checksum confere com backup já verificado, integrity_check dispensado: {nome_arquivo}")
+        else:
+            logger.info(f"Validando integridade do backup: {nome_arquivo}")
+            valido, msg_validacao = _validar_integridade_backup(caminho_extraido)
+            _atualizar_manifesto(nome_arquivo, integridade="ok" if valido else "erro")
+            if not valido:
+                mensagem = f"Backup corrompido ou inválido! {msg_validacao}. Restauração abortada."
+                logger.error(mensagem)
+                return False, mensagem, None
+
         logger.info(f"Validação de integridade OK: {nome_arquivo}")
 
         # Criar backup de segurança do estado atual antes de restaurar
-        nome_backup_automatico = None
         if criar_backup_antes:
-            sucesso, msg = criar_backup(automatico=True)
+            sucesso, msg, nome_backup_automatico = _gerar_backup(automatico=True)
             if sucesso:
-                # Obter o último backup criado (que acabamos de criar)
-                backups = listar_backups()
-                if backups and backups[0].tipo == "automático":
-                    nome_backup_automatico = backups[0].nome_arquivo
-                    caminho_backup_seguranca = BACKUP_DIR / nome_backup_automatico
-                    logger.info(f"Backup de segurança criado: {nome_backup_automatico}")
+                caminho_backup_seguranca = BACKUP_DIR / nome_backup_automatico
+                logger.info(f"Backup de segurança criado: {nome_backup_automatico}")
             else:
                 logger.warning(f"Falha ao criar backup de segurança: {msg}")
                 # Continua mesmo se falhar o backup automático
 
         # Restaurar backup (copiar sobre o arquivo atual)
         db_path = Path(DATABASE_PATH)
-        shutil.copy2(caminho_backup, db_path)
+        shutil.copy2(caminho_extraido, db_path)
 
         # VALIDAÇÃO PÓS-RESTAURAÇÃO: Verificar se banco restaurado está válido
         logger.info("Verificando integridade do banco após restauração...")
@@ -352,7 +1072,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error("Banco corrompido após restauração! Executando rollback...")
 
             if caminho_backup_seguranca and caminho_backup_seguranca.exists():
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                _restaurar_arquivo(nome_backup_automatico, db_path)
                 mensagem = (
                     f"Restauração falhou! Banco revertido para estado anterior. "
                     f"Backup '{nome_arquivo}' pode estar corrompido."
@@ -367,33 +1087,42 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
                 logger.critical(mensagem)
                 return False, mensagem, None
 
+        # Fragmentos de templates renderizados com os dados anteriores
+        cache_fragmentos.limpar()
+
         mensagem = f"Backup restaurado com sucesso: {nome_arquivo}"
         logger.info(mensagem)
 
         return True, mensagem, nome_backup_automatico
 
-    except OSError as e:
+    except ERROS_DESCOMPRESSAO as e:
         mensagem = f"Erro ao restaurar backup: {str(e)}"
         logger.error(mensagem)
 
         # Tentar rollback em caso de exceção
         if caminho_backup_seguranca and caminho_backup_seguranca.exists():
             try:
-                db_path = Path(DATABASE_PATH)
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                _restaurar_arquivo(nome_backup_automatico, Path(DATABASE_PATH))
                 logger.info("Rollback executado com sucesso após exceção")
                 mensagem += " (Banco revertido para estado anterior)"
-            except OSError as rollback_error:
+            except ERROS_DESCOMPRESSAO as rollback_error:
                 logger.critical(f"Falha no rollback: {rollback_error}")
                 mensagem += " (CRÍTICO: Falha no rollback!)"
 
         return False, mensagem, None
 
+    finally:
+        if caminho_extraido is not None:
+            caminho_extraido.unlink(missing_ok=True)
+
 
 def excluir_backup(nome_arquivo: str) -> tuple[bool, str]:
     """
     Exclui um arquivo de backup
 
+    Um backup completo usado como base por incrementais só pode ser excluído
+    depois deles (ou depois que o incremental em gravação terminar).
+
     Args:
         nome_arquivo: Nome do arquivo de backup a excluir
 
@@ -414,8 +1143,34 @@ def excluir_backup(nome_arquivo: str) -> tuple[bool, str]:
             logger.error(mensagem)
             return False, mensagem
 
-        # Excluir arquivo
-        caminho_backup.unlink()
+        # Incrementais não podem ser restaurados sem a base
+        with _lock_manifesto:
+            if nome_arquivo in _bases_reservadas:
+                mensagem = (
+                    f"O backup {nome_arquivo} é a base de um backup incremental em andamento. "
+                    "Tente novamente quando ele terminar"
+                )
+                logger.warning(mensagem)
+                return False, mensagem
+
+            dependentes = sorted(
+                nome for nome, entrada in _sincronizar_manifesto().items()
+                if entrada.get("incremental_de") == nome_arquivo
+            )
+            if dependentes:
+                mensagem = (
+                    f"O backup {nome_arquivo} é a base de {len(dependentes)} backup(s) incremental(is). "
+                    f"Exclua-os antes: {', '.join(dependentes)}"
+                )
+                logger.warning(mensagem)
+                return False, mensagem
+
+            # Excluir arquivo
+            caminho_backup.unlink()
+
+            manifesto = _ler_manifesto()
+            if manifesto.pop(nome_arquivo, None) is not None:
+                _gravar_manifesto(manifesto)
 
         mensagem = f"Backup excluído com sucesso: {nome_arquivo}"
         logger.info(mensagem)
@@ -448,25 +1203,11 @@ def obter_info_backup(nome_arquivo: str) -> Optional[BackupInfo]:
         if not caminho_backup.exists():
             return None
 
-        # Obter informações do arquivo
-        stat = caminho_backup.stat()
-        tamanho = stat.st_size
-        data_criacao = _extrair_data_do_nome(nome_arquivo)
-
-        if data_criacao is None:
-            data_criacao = datetime.fromtimestamp(stat.st_mtime)
-
-        # Detectar tipo do backup
-        tipo = _detectar_tipo_backup(nome_arquivo)
+        entrada = _sincronizar_manifesto().get(nome_arquivo)
+        if entrada is None:
+            return None
 
-        return BackupInfo(
-            nome_arquivo=nome_arquivo,
-            caminho_completo=str(caminho_backup),
-            data_criacao=data_criacao,
-            tamanho_bytes=tamanho,
-            tamanho_formatado=_formatar_tamanho(tamanho),
-            tipo=tipo
-        )
+        return _info_da_entrada(nome_arquivo, entrada)
 
     except OSError as e:
         logger.error(f"Erro ao obter informações do backup {nome_arquivo}: {str(e)}")
@@ -0,0 +1,133 @@
+"""
+Cache de fragmentos de templates já renderizados.
+
+Trechos que saem iguais para muitas requisições (menus, listas de
+categorias e atividades, links do tema) são renderizados uma vez e
+reaproveitados pela tag {% cache %} (ver util/template_util.py). As
+entradas ficam em um LRU com TTL e carregam tags; os repositórios invalidam
+as tags dos dados que alteram (ex: "categoria", "atividade",
+"config:theme").
+
+A invalidação vale para o processo que fez a alteração. Em outros workers
+o fragmento antigo é servido por no máximo FRAGMENTOS_CACHE_TTL_SEGUNDOS
+(as tags "config:<chave>" também são invalidadas quando o ConfigCache
+recarrega configurações alteradas por outro worker).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from util.config import FRAGMENTOS_CACHE_MAX, FRAGMENTOS_CACHE_TTL_SEGUNDOS
+
+
+class CacheFragmentos:
+    """
+    Cache LRU com TTL de HTML renderizado, invalidável por tags.
+
+    Thread-safe: utiliza Lock para sincronização de acesso ao cache.
+    """
+
+    def __init__(
+        self,
+        max_entradas: int = FRAGMENTOS_CACHE_MAX,
+        ttl_segundos: int = FRAGMENTOS_CACHE_TTL_SEGUNDOS
+    ):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        # chave -> (html, instante de expiração em time.monotonic, tags)
+        self._entradas: "OrderedDict[str, Tuple[str, float, frozenset]]" = OrderedDict()
+        # tag -> chaves das entradas com a tag
+        self._por_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _remover(self, chave: str) -> None:
+        """Remove uma entrada e suas referências no índice de tags (com o lock)."""
+        _, _, tags = self._entradas.pop(chave)
+        for tag in tags:
+            chaves = self._por_tag.get(tag)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_tag[tag]
+
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Obtém o HTML de um fragmento ainda válido.
+
+        Args:
+            chave: Chave do fragmento
+
+        Returns:
+            HTML renderizado ou None se ausente ou expirado
+        """
+        with self._lock:
+            item = self._entradas.get(chave)
+            if item is None:
+                return None
+            if item[1] <= time.monotonic():
+                self._remover(chave)
+                return None
+            self._entradas.move_to_end(chave)
+            return item[0]
+
+    def guardar(
+        self,
+        chave: str,
+        html: str,
+        tags: Iterable[str] = (),
+        ttl_segundos: Optional[int] = None
+    ) -> None:
+        """
+        Guarda um fragmento renderizado, descartando os menos usados.
+
+        Args:
+            chave: Chave do fragmento
+            html: HTML renderizado
+            tags: Tags que invalidam o fragmento
+            ttl_segundos: Validade (padrão: a do cache)
+        """
+        if self.max_entradas <= 0:
+            return
+
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        tags = frozenset(tags)
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = (html, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._por_tag.setdefault(tag, set()).add(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._remover(next(iter(self._entradas)))
+
+    def invalidar(self, *tags: str) -> int:
+        """
+        Remove os fragmentos marcados com qualquer uma das tags.
+
+        Args:
+            tags: Tags alteradas (ex: "categoria", "config:theme")
+
+        Returns:
+            Quantidade de fragmentos removidos
+        """
+        with self._lock:
+            chaves = set()
+            for tag in tags:
+                chaves.update(self._por_tag.get(tag, ()))
+            for chave in chaves:
+                self._remover(chave)
+        return len(chaves)
+
+    def limpar(self) -> None:
+        """Limpa todo o cache."""
+        with self._lock:
+            self._entradas.clear()
+            self._por_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+# Instância singleton global
+cache_fragmentos = CacheFragmentos()
@@ -0,0 +1,250 @@
+"""
+Validadores HTTP (ETag/Last-Modified) e políticas de Cache-Control.
+
+O decorator controlar_cache() responde 304 Not Modified quando a cópia
+do navegador (ou de um proxy reverso) ainda vale, de duas formas:
+
+- Por carimbo de versão: uma função calcula, sem renderizar, uma string
+  que muda sempre que o conteúdo muda (ex: versão da aplicação, dos
+  templates e das configurações). Se o ETag bate, a rota nem é executada.
+- Por conteúdo: sem carimbo, a rota é executada e o ETag é o hash do
+  corpo; o 304 economiza a transferência, não o processamento.
+
+O Last-Modified de respostas com carimbo é o instante em que este processo
+viu o carimbo pela primeira vez (como o conteúdo é função do carimbo, um
+carimbo novo sempre tem data posterior às cópias antigas).
+
+Páginas públicas são "public" (cacheáveis por proxy) apenas para quem não
+tem sessão; as demais respostas são "private, no-cache" (o navegador
+guarda, mas revalida a cada uso) com Vary: Cookie.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import wraps
+from typing import Callable, Optional, Union
+
+from fastapi import Request, Response, status
+
+from util.assets import manifesto_assets
+from util.config import VERSION, CACHE_HTTP_PUBLICO_SEGUNDOS
+from util.config_cache import config
+from util.sessao_servidor import COOKIE_SESSAO
+from util.template_util import assinatura_templates
+
+# O navegador guarda a resposta, mas revalida (ETag) antes de cada uso
+POLITICA_PRIVADA = "private, no-cache"
+
+# Cabeçalhos repetidos na resposta 304 (RFC 9110, seção 15.4.5)
+_CABECALHOS_304 = ("cache-control", "etag", "last-modified", "vary")
+
+
+def gerar_etag(conteudo: Union[bytes, str]) -> str:
+    """
+    Gera um ETag fraco a partir do conteúdo ou de um carimbo de versão.
+
+    Args:
+        conteudo: Corpo da resposta ou carimbo
+
+    Returns:
+        ETag no formato W/"<hash>"
+    """
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode()
+    return f'W/"{hashlib.sha1(conteudo).hexdigest()[:20]}"'
+
+
+def etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica o cabeçalho If-None-Match (comparação fraca).
+
+    Args:
+        if_none_match: Valor do cabeçalho (lista separada por vírgulas ou "*")
+        etag: ETag atual do recurso
+
+    Returns:
+        True se o cliente já tem esta versão
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    atual = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == atual
+        for candidato in if_none_match.split(",")
+    )
+
+
+def nao_modificado_desde(if_modified_since: Optional[str], ultima_modificacao: datetime) -> bool:
+    """
+    Verifica o cabeçalho If-Modified-Since (resolução de segundos).
+
+    Args:
+        if_modified_since: Valor do cabeçalho (data HTTP)
+        ultima_modificacao: Data de modificação do recurso (com fuso)
+
+    Returns:
+        True se o recurso não mudou desde a data informada
+    """
+    if not if_modified_since:
+        return False
+    try:
+        data = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return ultima_modificacao.replace(microsecond=0) <= data
+
+
+class CarimbosVistos:
+    """
+    Instante em que cada carimbo de versão foi visto pela primeira vez.
+
+    As datas são estritamente crescentes e arredondadas para o segundo
+    seguinte, então um carimbo novo nunca repete a data de um anterior.
+
+    Thread-safe: utiliza Lock para sincronização de acesso.
+    """
+
+    def __init__(self, max_entradas: int = 1000):
+        self.max_entradas = max_entradas
+        self._datas: "OrderedDict[str, datetime]" = OrderedDict()
+        self._ultima: float = 0.0
+        self._lock = threading.Lock()
+
+    def data(self, carimbo: str) -> datetime:
+        """Data de modificação associada ao carimbo."""
+        with self._lock:
+            data = self._datas.get(carimbo)
+            if data is None:
+                self._ultima = max(math.ceil(time.time()), self._ultima + 1)
+                data = datetime.fromtimestamp(self._ultima, tz=timezone.utc)
+                self._datas[carimbo] = data
+                while len(self._datas) > self.max_entradas:
+                    self._datas.popitem(last=False)
+            return data
+
+
+carimbos_vistos = CarimbosVistos()
+
+
+def _nao_modificado(request: Request, etag: str, ultima_modificacao: Optional[datetime]) -> bool:
+    """Aplica as pré-condições: If-None-Match tem precedência sobre If-Modified-Since."""
+    if "if-none-match" in request.headers:
+        return etag_corresponde(request.headers["if-none-match"], etag)
+    if ultima_modificacao is not None:
+        return nao_modificado_desde(request.headers.get("if-modified-since"), ultima_modificacao)
+    return False
+
+
+def _resposta_304(cabecalhos: dict) -> Response:
+    """Resposta 304 sem corpo, com os cabeçalhos de validação."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={nome: valor for nome, valor in cabecalhos.items() if nome.lower() in _CABECALHOS_304}
+    )
+
+
+def controlar_cache(
+    cache_control: Union[str, Callable[[Request], str]] = POLITICA_PRIVADA,
+    versao: Optional[Callable[[Request], Optional[str]]] = None
+) -> Callable:
+    """
+    Decorator que adiciona ETag/Last-Modified e Cache-Control a rotas GET.
+
+    Respostas 200 com corpo recebem os validadores; pedidos condicionais
+    que correspondem recebem 304. Redirecionamentos, erros e streams
+    passam sem alteração.
+
+    Args:
+        cache_control: Política (ex: POLITICA_PRIVADA) ou função que a
+                       escolhe a partir da requisição
+        versao: Função que retorna o carimbo de versão do conteúdo, ou None
+                quando não é possível calculá-lo (aí o ETag vem do corpo)
+
+    Returns:
+        Decorator function
+
+    Exemplo:
+        @router.get("/sobre")
+        @controlar_cache(politica_pagina_publica, versao=versao_pagina_publica)
+        async def sobre(request: Request): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(request: Request, *args, **kwargs):
+            politica = cache_control(request) if callable(cache_control) else cache_control
+            cabecalhos = {"Cache-Control": politica, "Vary": "Cookie"}
+
+            etag = None
+            ultima_modificacao = None
+            carimbo = versao(request) if versao else None
+            if carimbo is not None:
+                etag = gerar_etag(carimbo)
+                ultima_modificacao = carimbos_vistos.data(carimbo)
+                cabecalhos["ETag"] = etag
+                cabecalhos["Last-Modified"] = format_datetime(ultima_modificacao, usegmt=True)
+                if _nao_modificado(request, etag, ultima_modificacao):
+                    return _resposta_304(cabecalhos)
+
+            response = await func(request, *args, **kwargs)
+            corpo = getattr(response, "body", None)
+            if response.status_code != status.HTTP_200_OK or corpo is None:
+                return response
+
+            if etag is None:
+                etag = gerar_etag(corpo)
+                cabecalhos["ETag"] = etag
+                if _nao_modificado(request, etag, None):
+                    return _resposta_304(cabecalhos)
+
+            response.headers.update(cabecalhos)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _sem_sessao(request: Request) -> bool:
+    """True se a requisição não tem sessão (nem cookie, nem dados)."""
+    return COOKIE_SESSAO not in request.cookies and not request.session
+
+
+def politica_pagina_publica(request: Request) -> str:
+    """
+    Cache-Control de páginas públicas.
+
+    Visitantes sem sessão recebem a mesma página: pode ser guardada por
+    proxies por CACHE_HTTP_PUBLICO_SEGUNDOS. Com sessão (usuário logado,
+    mensagens flash), a página é pessoal.
+    """
+    if _sem_sessao(request):
+        return f"public, max-age={CACHE_HTTP_PUBLICO_SEGUNDOS}"
+    return POLITICA_PRIVADA
+
+
+def versao_pagina_publica(request: Request) -> Optional[str]:
+    """
+    Carimbo de uma página pública que só depende dos templates, das URLs
+    dos arquivos estáticos e das configurações.
+
+    Returns:
+        Carimbo, ou None se a página depende da sessão (usuário logado ou
+        mensagens flash pendentes) ou se as configurações não foram carregadas
+    """
+    if request.session.get("usuario_logado") or request.session.get("mensagens"):
+        return None
+    versao_config = config.obter_versao()
+    if versao_config is None:
+        return None
+    return (
+        f"{VERSION}:{assinatura_templates()}:{manifesto_assets.versao()}:"
+        f"{versao_config}:{request.url.path}"
+    )
@@ -0,0 +1,85 @@
+"""
+Retenção e arquivamento das mensagens do chat.
+
+Um job periódico move as mensagens mais antigas que `chat_retencao_dias`
+de chat_mensagem para chat_mensagem_arquivo, em lotes curtos (uma transação
+por lote) para não segurar o banco, e depois executa vacuum incremental.
+O histórico continua disponível: chat_mensagem_repo.listar_por_sala lê o
+arquivo de forma transparente.
+"""
+import time
+from datetime import timedelta
+from typing import Optional
+
+from repo import chat_mensagem_arquivo_repo
+from util.config import (
+    CHAT_RETENCAO_DIAS,
+    CHAT_ARQUIVAMENTO_COMPRIMIR,
+    CHAT_ARQUIVAMENTO_LOTE,
+    CHAT_ARQUIVAMENTO_INTERVALO_MINUTOS,
+    obter_config_int,
+    obter_config_bool,
+)
+from util.datetime_util import agora
+from util.db_util import executar_vacuum_incremental
+from util.logger_config import logger
+from util.tarefas_periodicas import registrar_tarefa
+
+# Pausa entre lotes para dar vez a outras escritas no banco
+PAUSA_ENTRE_LOTES_SEGUNDOS = 0.05
+
+
+def arquivar_mensagens_antigas(
+    dias: Optional[int] = None,
+    tamanho_lote: Optional[int] = None,
+    comprimir: Optional[bool] = None
+) -> int:
+    """
+    Arquiva as mensagens mais antigas que o período de retenção.
+
+    Args:
+        dias: Período de retenção (padrão: configuração chat_retencao_dias)
+        tamanho_lote: Mensagens por transação (padrão: CHAT_ARQUIVAMENTO_LOTE)
+        comprimir: Comprimir blocos (padrão: configuração chat_arquivamento_comprimir)
+
+    Returns:
+        Número total de mensagens arquivadas
+    """
+    if dias is None:
+        dias = obter_config_int("chat_retencao_dias", CHAT_RETENCAO_DIAS)
+    if dias <= 0:
+        return 0
+    if tamanho_lote is None:
+        tamanho_lote = CHAT_ARQUIVAMENTO_LOTE
+    if comprimir is None:
+        comprimir = obter_config_bool("chat_arquivamento_comprimir", CHAT_ARQUIVAMENTO_COMPRIMIR)
+
+    limite = agora() - timedelta(days=dias)
+    total = 0
+    inicio = time.perf_counter()
+
+    while True:
+        arquivadas = chat_mensagem_arquivo_repo.arquivar_lote(limite, tamanho_lote, comprimir)
+        total += arquivadas
+        if arquivadas < tamanho_lote:
+            break
+        time.sleep(PAUSA_ENTRE_LOTES_SEGUNDOS)
+
+    if total:
+        vacuum = executar_vacuum_incremental()
+        logger.info(
+            f"[Chat] {total} mensagens com mais de {dias} dias arquivadas "
+            f"em {time.perf_counter() - inicio:.2f}s"
+            f"{' (vacuum incremental executado)' if vacuum else ''}"
+        )
+
+    return total
+
+
+def registrar_tarefa_arquivamento():
+    """Registra o job periódico de arquivamento do chat."""
+    registrar_tarefa(
+        "arquivamento_chat",
+        arquivar_mensagens_antigas,
+        intervalo_segundos=CHAT_ARQUIVAMENTO_INTERVALO_MINUTOS * 60,
+    )
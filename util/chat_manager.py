@@ -3,7 +3,7 @@ Gerenciador de conexões SSE do chat.
 Mantém conexões ativas e faz broadcast de mensagens para usuários conectados.
 """
 import asyncio
-from typing import Dict, Set
+from typing import Dict, Iterable, Optional, Set
 from util.logger_config import logger
 
 
@@ -43,14 +43,23 @@ class GerenciadorChat:
 
         return queue
 
-    async def desconectar(self, usuario_id: int):
+    async def desconectar(self, usuario_id: int, queue: Optional[asyncio.Queue] = None) -> bool:
         """
         Remove conexão SSE de um usuário.
 
         Args:
             usuario_id: ID do usuário desconectando
+            queue: Fila da conexão que está fechando. Se informada e o usuário
+                já tiver reconectado com outra fila, a conexão nova é mantida.
+
+        Returns:
+            True se a conexão foi removida, False caso contrário
         """
-        if usuario_id in self._connections:
+        if queue is not None and self._connections.get(usuario_id) is not queue:
+            return False
+
+        removida = usuario_id in self._connections
+        if removida:
             del self._connections[usuario_id]
 
         if usuario_id in self._active_connections:
@@ -60,6 +69,7 @@ class GerenciadorChat:
             f"[GerenciadorChat] Usuário {usuario_id} desconectado. "
             f"Total conexões: {len(self._active_connections)}"
         )
+        return removida
 
     async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
         """
@@ -90,6 +100,19 @@ class GerenciadorChat:
             else:
                 logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
 
+    async def enviar_para_usuarios(self, usuario_ids: Iterable[int], mensagem_dict: dict):
+        """
+        Envia um evento SSE para vários usuários (apenas os conectados).
+
+        Args:
+            usuario_ids: IDs dos usuários destinatários
+            mensagem_dict: Dicionário com dados do evento a enviar
+        """
+        for usuario_id in usuario_ids:
+            queue = self._connections.get(usuario_id)
+            if queue is not None:
+                await queue.put(mensagem_dict)
+
     def esta_conectado(self, usuario_id: int) -> bool:
         """
         Verifica se um usuário está conectado.
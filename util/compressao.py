@@ -0,0 +1,141 @@
+"""
+Compressão gzip das respostas HTTP.
+
+O MiddlewareCompressao comprime, para clientes que aceitam gzip, respostas
+de tipos textuais (HTML, JSON, CSS, JS...) a partir de COMPRESSAO_MIN_BYTES.
+Ficam de fora:
+
+- text/event-stream: os eventos SSE do chat precisam chegar na hora, e o
+  compressor acumularia bytes antes de enviar
+- respostas que já têm Content-Encoding (ex: os .gz de static/dist servidos
+  por util/assets.py)
+- 204, 206 (Range) e 304
+
+Respostas com o corpo inteiro em uma mensagem são comprimidas de uma vez;
+respostas em streaming são comprimidas pedaço a pedaço, sem Content-Length.
+"""
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from util.assets import codificacoes_aceitas
+from util.config import COMPRESSAO_MIN_BYTES, COMPRESSAO_NIVEL
+
+# Tipos que valem a pena comprimir (imagens, PDFs e zips já são comprimidos)
+TIPOS_COMPRIMIVEIS = (
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/javascript",
+    "text/csv",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+TIPOS_NUNCA_COMPRIMIDOS = ("text/event-stream",)
+
+STATUS_SEM_COMPRESSAO = (204, 206, 304)
+
+
+def _comprimivel(status: int, cabecalhos: Headers) -> bool:
+    """Indica se uma resposta pode ser comprimida, a partir do início dela."""
+    if status in STATUS_SEM_COMPRESSAO or "content-encoding" in cabecalhos:
+        return False
+    tipo = cabecalhos.get("content-type", "").split(";")[0].strip().lower()
+    if tipo in TIPOS_NUNCA_COMPRIMIDOS:
+        return False
+    return tipo in TIPOS_COMPRIMIVEIS
+
+
+def _marcar_comprimida(cabecalhos: MutableHeaders) -> None:
+    """Ajusta os cabeçalhos para a representação comprimida."""
+    cabecalhos["Content-Encoding"] = "gzip"
+    cabecalhos.add_vary_header("Accept-Encoding")
+    # O corpo mudou: um ETag forte passa a ser fraco
+    etag = cabecalhos.get("etag")
+    if etag and not etag.startswith("W/"):
+        cabecalhos["ETag"] = f"W/{etag}"
+
+
+class MiddlewareCompressao:
+    """
+    Middleware ASGI que comprime respostas textuais com gzip.
+
+    Args:
+        app: Aplicação ASGI
+        nivel: Nível do gzip (1 a 9)
+        min_bytes: Tamanho mínimo do corpo para comprimir
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        nivel: int = COMPRESSAO_NIVEL,
+        min_bytes: int = COMPRESSAO_MIN_BYTES
+    ):
+        self.app = app
+        self.nivel = nivel
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in codificacoes_aceitas(
+            Headers(scope=scope).get("accept-encoding", "")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Message = {}
+        comprimir = False
+        compressor = None
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio, comprimir, compressor
+
+            if message["type"] == "http.response.start":
+                # Segura o início até ver o primeiro pedaço do corpo
+                inicio = message
+                comprimir = _comprimivel(message["status"], Headers(raw=message["headers"]))
+                if not comprimir:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or not comprimir:
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            mais = message.get("more_body", False)
+            cabecalhos = MutableHeaders(raw=inicio["headers"])
+
+            if compressor is None and not mais:
+                # Corpo inteiro em uma mensagem
+                if len(corpo) < self.min_bytes:
+                    comprimir = False
+                    await send(inicio)
+                    await send(message)
+                    return
+                corpo = gzip.compress(corpo, compresslevel=self.nivel)
+                _marcar_comprimida(cabecalhos)
+                cabecalhos["Content-Length"] = str(len(corpo))
+                await send(inicio)
+                await send({"type": "http.response.body", "body": corpo})
+                return
+
+            if compressor is None:
+                # Streaming: o tamanho final não é conhecido
+                compressor = zlib.compressobj(self.nivel, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+                _marcar_comprimida(cabecalhos)
+                del cabecalhos["Content-Length"]
+                await send(inicio)
+
+            saida = compressor.compress(corpo)
+            if not mais:
+                saida += compressor.flush()
+            if saida or not mais:
+                await send({"type": "http.response.body", "body": saida, "more_body": mais})
+
+        await self.app(scope, receive, enviar)
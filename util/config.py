@@ -42,6 +42,15 @@ if RUNNING_MODE_CHECK.lower() != "development":
 
 # === Configurações do Banco de Dados ===
 DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
+# Intervalo mínimo entre verificações da versão das configurações (mudanças
+# feitas por outros workers são aplicadas em até este tempo)
+CONFIG_VERSAO_INTERVALO_MS = int(os.getenv("CONFIG_VERSAO_INTERVALO_MS", "1000"))
+# Backup online (API de backup do SQLite): páginas copiadas por passo e pausa
+# entre os passos, para as escritas da aplicação não esperarem a cópia inteira
+BACKUP_PAGINAS_POR_PASSO = int(os.getenv("BACKUP_PAGINAS_POR_PASSO", "256"))
+BACKUP_PAUSA_MS = int(os.getenv("BACKUP_PAUSA_MS", "10"))
+# Compressão dos backups: "gzip", "zstd" (requer o pacote zstandard) ou "nenhuma"
+BACKUP_COMPRESSAO = os.getenv("BACKUP_COMPRESSAO", "gzip").lower()
 
 # === Configurações de Logging ===
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -52,6 +61,23 @@ RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
 RESEND_FROM_EMAIL = os.getenv("RESEND_FROM_EMAIL", "noreply@seudominio.com")
 RESEND_FROM_NAME = os.getenv("RESEND_FROM_NAME", APP_NAME)
 
+# === Fila de Saída de E-mails ===
+# Transporte: "resend" (produção), "arquivo" (grava .eml em EMAIL_ARQUIVO_DIR)
+# ou "smtp" (ex: servidor de depuração local em EMAIL_SMTP_HOST:EMAIL_SMTP_PORTA)
+EMAIL_TRANSPORTE = os.getenv("EMAIL_TRANSPORTE", "resend").lower()
+EMAIL_ARQUIVO_DIR = os.getenv("EMAIL_ARQUIVO_DIR", "emails")
+EMAIL_SMTP_HOST = os.getenv("EMAIL_SMTP_HOST", "localhost")
+EMAIL_SMTP_PORTA = int(os.getenv("EMAIL_SMTP_PORTA", "1025"))
+# Intervalo do job de envio e e-mails enviados por lote
+EMAIL_SAIDA_INTERVALO_SEGUNDOS = int(os.getenv("EMAIL_SAIDA_INTERVALO_SEGUNDOS", "5"))
+EMAIL_SAIDA_LOTE = int(os.getenv("EMAIL_SAIDA_LOTE", "20"))
+# Tentativas antes de desistir; a espera entre elas dobra a cada falha, até o máximo
+EMAIL_MAX_TENTATIVAS = int(os.getenv("EMAIL_MAX_TENTATIVAS", "5"))
+EMAIL_ESPERA_INICIAL_SEGUNDOS = int(os.getenv("EMAIL_ESPERA_INICIAL_SEGUNDOS", "30"))
+EMAIL_ESPERA_MAXIMA_SEGUNDOS = int(os.getenv("EMAIL_ESPERA_MAXIMA_SEGUNDOS", "3600"))
+# E-mails enviados são excluídos da fila após este número de dias
+EMAIL_SAIDA_RETENCAO_DIAS = int(os.getenv("EMAIL_SAIDA_RETENCAO_DIAS", "7"))
+
 # === Configurações do Servidor ===
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
@@ -65,15 +91,62 @@ IS_DEVELOPMENT = RUNNING_MODE.lower() == "development"
 FOTO_PERFIL_TAMANHO_MAX = int(os.getenv("FOTO_PERFIL_TAMANHO_MAX", "256"))
 # Tamanho máximo em bytes (5MB)
 FOTO_MAX_UPLOAD_BYTES = int(os.getenv("FOTO_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+# Intervalo da remoção de fotos que nenhum usuário referencia mais
+FOTO_GC_INTERVALO_MINUTOS = int(os.getenv("FOTO_GC_INTERVALO_MINUTOS", "360"))
+# Processamento de imagens fora do event loop: processos do pool (0 = usar
+# uma thread), processamentos simultâneos e quantos podem aguardar a vez
+# (acima disso o upload é recusado com "servidor ocupado")
+IMAGEM_POOL_PROCESSOS = int(os.getenv("IMAGEM_POOL_PROCESSOS", "2"))
+IMAGEM_POOL_MAX_CONCORRENTES = int(os.getenv("IMAGEM_POOL_MAX_CONCORRENTES", "2"))
+IMAGEM_POOL_MAX_FILA = int(os.getenv("IMAGEM_POOL_MAX_FILA", "8"))
 
 # === Configurações de Senha ===
 PASSWORD_MIN_LENGTH = int(os.getenv("PASSWORD_MIN_LENGTH", "8"))
 PASSWORD_MAX_LENGTH = int(os.getenv("PASSWORD_MAX_LENGTH", "128"))
+# Hash/verificação bcrypt fora do event loop: processos do pool (0 = usar
+# uma thread) e máximo de operações em andamento (as demais aguardam a vez)
+SENHA_POOL_PROCESSOS = int(os.getenv("SENHA_POOL_PROCESSOS", "2"))
+SENHA_POOL_MAX_CONCORRENTES = int(os.getenv("SENHA_POOL_MAX_CONCORRENTES", "4"))
+# Custo do bcrypt (log2 das iterações, 4 a 31). Cada +1 dobra o tempo por
+# hash; senhas com outro custo são refeitas no próximo login
+SENHA_BCRYPT_ROUNDS = min(max(int(os.getenv("SENHA_BCRYPT_ROUNDS", "12")), 4), 31)
 
 # === Configurações de UI (Frontend) ===
 TOAST_AUTO_HIDE_DELAY_MS = int(os.getenv("TOAST_AUTO_HIDE_DELAY_MS", "5000"))
 
+# === Templates ===
+# Diretório do cache de bytecode dos templates Jinja2 (vazio = desativado)
+TEMPLATES_CACHE_DIR = os.getenv("TEMPLATES_CACHE_DIR", ".cache/templates")
+# Verificar a cada uso se o arquivo do template mudou (padrão: só em desenvolvimento)
+TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", str(IS_DEVELOPMENT)).lower() == "true"
+# Compilar todos os templates na inicialização (padrão: só em produção)
+TEMPLATES_PRECOMPILAR = os.getenv("TEMPLATES_PRECOMPILAR", str(not IS_DEVELOPMENT)).lower() == "true"
+# Fragmentos renderizados mantidos pela tag {% cache %} (0 = desativado;
+# padrão: desativado em desenvolvimento, para alterações aparecerem na hora)
+FRAGMENTOS_CACHE_MAX = int(os.getenv("FRAGMENTOS_CACHE_MAX", "0" if IS_DEVELOPMENT else "1000"))
+# Validade de um fragmento: limite de atraso para alterações feitas em outro worker
+FRAGMENTOS_CACHE_TTL_SEGUNDOS = int(os.getenv("FRAGMENTOS_CACHE_TTL_SEGUNDOS", "300"))
+
+# === Cache HTTP ===
+# Por quanto tempo navegadores e proxies reutilizam páginas públicas servidas a
+# visitantes sem sessão, sem revalidar (as demais respostas sempre revalidam via ETag)
+CACHE_HTTP_PUBLICO_SEGUNDOS = int(os.getenv("CACHE_HTTP_PUBLICO_SEGUNDOS", "60"))
+
+# === Compressão de respostas ===
+# Nível do gzip (1 = mais rápido, 9 = menor); respostas menores que o mínimo
+# (em bytes) não compensam o custo e saem sem compressão
+COMPRESSAO_NIVEL = min(max(int(os.getenv("COMPRESSAO_NIVEL", "6")), 1), 9)
+COMPRESSAO_MIN_BYTES = int(os.getenv("COMPRESSAO_MIN_BYTES", "1000"))
+
 # === Configurações de Rate Limiting ===
+# Onde fica o estado dos limiters: "memoria" (por processo) ou "sqlite"
+# (arquivo compartilhado por todos os workers da máquina)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memoria").lower()
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "rate_limit.db")
+# Métricas por limiter: tamanho do top de infratores e minutos da série de bloqueios
+RATE_LIMIT_METRICAS_TOP = int(os.getenv("RATE_LIMIT_METRICAS_TOP", "20"))
+RATE_LIMIT_METRICAS_MINUTOS = int(os.getenv("RATE_LIMIT_METRICAS_MINUTOS", "60"))
+
 # Autenticação
 RATE_LIMIT_LOGIN_MAX = int(os.getenv("RATE_LIMIT_LOGIN_MAX", "5"))
 RATE_LIMIT_LOGIN_MINUTOS = int(os.getenv("RATE_LIMIT_LOGIN_MINUTOS", "5"))
@@ -134,6 +207,43 @@ RATE_LIMIT_PUBLIC_MINUTOS = int(os.getenv("RATE_LIMIT_PUBLIC_MINUTOS", "1"))
 RATE_LIMIT_EXAMPLES_MAX = int(os.getenv("RATE_LIMIT_EXAMPLES_MAX", "100"))
 RATE_LIMIT_EXAMPLES_MINUTOS = int(os.getenv("RATE_LIMIT_EXAMPLES_MINUTOS", "1"))
 
+# === Retenção do Chat ===
+# Mensagens mais antigas que este número de dias são movidas para o arquivo (0 = desativado)
+CHAT_RETENCAO_DIAS = int(os.getenv("CHAT_RETENCAO_DIAS", "0"))
+# Comprimir com zlib os blocos arquivados (um bloco por sala e dia)
+CHAT_ARQUIVAMENTO_COMPRIMIR = os.getenv("CHAT_ARQUIVAMENTO_COMPRIMIR", "True").lower() == "true"
+# Mensagens movidas por transação e intervalo entre execuções do job
+CHAT_ARQUIVAMENTO_LOTE = int(os.getenv("CHAT_ARQUIVAMENTO_LOTE", "500"))
+CHAT_ARQUIVAMENTO_INTERVALO_MINUTOS = int(os.getenv("CHAT_ARQUIVAMENTO_INTERVALO_MINUTOS", "60"))
+
+# === Envio de Mensagens do Chat ===
+# Cache das verificações de participação (sala, usuário) das salas ativas
+CHAT_CACHE_PARTICIPACAO_TTL_SEGUNDOS = int(os.getenv("CHAT_CACHE_PARTICIPACAO_TTL_SEGUNDOS", "60"))
+CHAT_CACHE_PARTICIPACAO_MAX = int(os.getenv("CHAT_CACHE_PARTICIPACAO_MAX", "10000"))
+
+# === Presença no Chat ===
+# Backend de presença: "sqlite" (compartilhado entre workers) ou "memoria" (um único processo)
+PRESENCA_BACKEND = os.getenv("PRESENCA_BACKEND", "sqlite").lower()
+# Intervalo dos heartbeats enviados pelo stream SSE e tempo sem heartbeat até ficar offline
+PRESENCA_HEARTBEAT_SEGUNDOS = int(os.getenv("PRESENCA_HEARTBEAT_SEGUNDOS", "30"))
+PRESENCA_TTL_SEGUNDOS = int(os.getenv("PRESENCA_TTL_SEGUNDOS", "90"))
+# Intervalo da varredura que expira heartbeats vencidos e repassa mudanças de outros workers
+PRESENCA_VARREDURA_SEGUNDOS = int(os.getenv("PRESENCA_VARREDURA_SEGUNDOS", "15"))
+
+# === Sessões ===
+# Tempo sem uso até a sessão expirar (renovado conforme o usuário navega)
+SESSAO_MAX_IDADE_SEGUNDOS = int(os.getenv("SESSAO_MAX_IDADE_SEGUNDOS", str(14 * 24 * 60 * 60)))
+# Sessões mantidas em memória (LRU) na frente da tabela sessao
+SESSAO_CACHE_MAX = int(os.getenv("SESSAO_CACHE_MAX", "10000"))
+# Por quanto tempo uma sessão lida do banco é servida da memória: é também o
+# atraso máximo para uma revogação (logout, troca de senha) feita em outro
+# worker valer neste. 0 relê a sessão a cada requisição
+SESSAO_CACHE_SEGUNDOS = int(os.getenv("SESSAO_CACHE_SEGUNDOS", "5"))
+# Sessões sem alteração só têm a expiração regravada após este intervalo
+SESSAO_RENOVACAO_SEGUNDOS = int(os.getenv("SESSAO_RENOVACAO_SEGUNDOS", "300"))
+# Intervalo da varredura que exclui sessões expiradas
+SESSAO_VARREDURA_MINUTOS = int(os.getenv("SESSAO_VARREDURA_MINUTOS", "60"))
+
 # === Versão da Aplicação ===
 VERSION = "1.0.0"
 
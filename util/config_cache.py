@@ -1,26 +1,139 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import sqlite3
 import threading
+import time
 from repo import configuracao_repo
+from util.cache_fragmentos import cache_fragmentos
+from util.config import CONFIG_VERSAO_INTERVALO_MS
 from util.logger_config import logger
 
+# Marcador de chave ausente no snapshot (None pode ser um valor válido)
+_AUSENTE = object()
+
 
 class ConfigCache:
     """
     Cache de configurações do sistema para melhor performance.
 
-    Thread-safe: utiliza RLock para sincronização de acesso ao cache
-    em ambientes multi-thread.
+    O cache é um snapshot: um dicionário que nunca é alterado depois de
+    publicado. Escritas montam um dicionário novo e trocam a referência
+    (atribuição atômica), então leituras não usam lock: um leitor vê o
+    snapshot anterior ou o novo, nunca um estado intermediário.
+
+    `carregar()` lê a tabela `configuracao` inteira de uma vez (na
+    inicialização e após alterações). Com o snapshot completo, uma chave
+    ausente não existe no banco e nem é consultada. Sem ele (ex: após
+    `limpar()`), cada chave ausente é buscada uma vez, fora do lock.
+
+    Alterações feitas por outros workers são detectadas pela versão das
+    configurações no banco (incrementada por gatilhos): depois de um
+    carregar(), as leituras comparam essa versão com a do snapshot no
+    máximo a cada CONFIG_VERSAO_INTERVALO_MS e recarregam se mudou. Cada
+    recarga invalida as tags "config:<chave>" das chaves alteradas no
+    cache de fragmentos de templates.
+
+    Thread-safe: o RLock serializa apenas as trocas de snapshot.
     """
     _cache: Dict[str, Any] = {}
+    _completo: bool = False
     _lock: threading.RLock = threading.RLock()
+    # Versão do banco refletida no snapshot (None: sem verificação de versão)
+    _versao: Optional[int] = None
+    _proxima_verificacao: float = 0.0
+    _lock_versao: threading.Lock = threading.Lock()
+
+    @classmethod
+    def carregar(cls) -> int:
+        """
+        Carrega todas as configurações do banco e publica um novo snapshot.
+
+        Em caso de erro de banco, mantém o snapshot atual.
+
+        Returns:
+            Número de configurações carregadas
+        """
+        try:
+            # Versão lida antes dos dados: uma alteração concorrente
+            # provoca uma nova recarga na próxima verificação
+            versao = configuracao_repo.obter_versao()
+            snapshot = {c.chave: c.valor for c in configuracao_repo.obter_todos()}
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao carregar configurações do banco: {e}")
+            return len(cls._cache)
+
+        with cls._lock:
+            anterior = cls._cache
+            cls._cache = snapshot
+            cls._completo = True
+            cls._versao = versao
+            cls._proxima_verificacao = time.monotonic() + CONFIG_VERSAO_INTERVALO_MS / 1000
+
+        # Fragmentos de templates que dependem de chaves alteradas (inclusive
+        # por outro worker) deixam de valer
+        alteradas = [c for c in snapshot.keys() | anterior.keys() if snapshot.get(c) != anterior.get(c)]
+        if alteradas:
+            cache_fragmentos.invalidar(*(f"config:{chave}" for chave in alteradas))
+
+        logger.debug(f"Cache de configurações carregado: {len(snapshot)} chave(s)")
+        return len(snapshot)
+
+    @classmethod
+    def _verificar_versao(cls) -> None:
+        """
+        Recarrega o snapshot se outro processo alterou as configurações.
+
+        Consulta o banco no máximo uma vez por CONFIG_VERSAO_INTERVALO_MS; as
+        demais leituras só comparam o relógio. Uma thread verifica por vez e
+        as outras seguem com o snapshot atual, sem esperar.
+        """
+        agora = time.monotonic()
+        if agora < cls._proxima_verificacao or not cls._lock_versao.acquire(blocking=False):
+            return
+
+        try:
+            cls._proxima_verificacao = agora + CONFIG_VERSAO_INTERVALO_MS / 1000
+            versao = configuracao_repo.obter_versao()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao verificar versão das configurações: {e}")
+            return
+        finally:
+            cls._lock_versao.release()
+
+        if versao != cls._versao:
+            logger.info(
+                f"Configurações alteradas (versão {cls._versao} -> {versao}), recarregando cache"
+            )
+            cls.carregar()
+
+    @classmethod
+    def _publicar(cls, chave: str, valor: str) -> None:
+        """Publica um snapshot novo com a chave adicionada (cópia na escrita)."""
+        with cls._lock:
+            snapshot = dict(cls._cache)
+            snapshot[chave] = valor
+            cls._cache = snapshot
+
+    @classmethod
+    def obter_versao(cls) -> Optional[int]:
+        """
+        Versão das configurações refletida no snapshot.
+
+        Serve de carimbo para conteúdo derivado das configurações (ex: ETag
+        de páginas). Verifica antes se outro processo as alterou.
+
+        Returns:
+            Versão do snapshot ou None se não houve carregar()
+        """
+        if cls._versao is not None:
+            cls._verificar_versao()
+        return cls._versao
 
     @classmethod
     def obter(cls, chave: str, padrao: str = "") -> str:
         """
         Obtém configuração com cache e tratamento de erros.
 
-        Thread-safe: utiliza lock para sincronização.
+        Leitura sem lock: acerto no snapshot é uma única consulta ao dict.
 
         Args:
             chave: Chave da configuração
@@ -32,30 +145,33 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        with cls._lock:
-            # Retorna do cache se disponível
-            if chave in cls._cache:
-                return cls._cache[chave]
-
-            # Tenta buscar do banco com error handling
-            try:
-                config = configuracao_repo.obter_por_chave(chave)
-                if config:
-                    cls._cache[chave] = config.valor
-                    return config.valor
-                else:
-                    cls._cache[chave] = padrao
-                    return padrao
-
-            except sqlite3.Error as e:
-                logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
-                # Retorna padrão em vez de crashar a aplicação
-                return padrao
-
-            except Exception as e:
-                logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
-                # Ainda retorna padrão, mas loga como crítico
-                return padrao
+        if cls._versao is not None:
+            cls._verificar_versao()
+
+        # Uma única leitura da referência: o snapshot não muda depois de publicado
+        snapshot = cls._cache
+        valor = snapshot.get(chave, _AUSENTE)
+        if valor is not _AUSENTE:
+            return valor
+        if cls._completo:
+            return padrao
+
+        # Tenta buscar do banco com error handling (fora do lock)
+        try:
+            config = configuracao_repo.obter_por_chave(chave)
+            valor = config.valor if config else padrao
+            cls._publicar(chave, valor)
+            return valor
+
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
+            # Retorna padrão em vez de crashar a aplicação
+            return padrao
+
+        except Exception as e:
+            logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
+            # Ainda retorna padrão, mas loga como crítico
+            return padrao
 
     @classmethod
     def obter_int(cls, chave: str, padrao: int) -> int:
@@ -129,6 +245,9 @@ class ConfigCache:
         """
         Obtém múltiplas configurações de uma vez para melhor performance
 
+        Lê todas as chaves do mesmo snapshot (valores consistentes entre si);
+        só as ausentes, com snapshot incompleto, passam por obter().
+
         Args:
             chaves: Lista de chaves a buscar
             padroes: Lista de valores padrão correspondentes
@@ -143,9 +262,15 @@ class ConfigCache:
             logger.error("obter_multiplos: número de chaves diferente de padrões")
             return dict(zip(chaves, padroes))
 
-        resultado = {}
+        if cls._versao is not None:
+            cls._verificar_versao()
+
+        snapshot = cls._cache
+        resultado = {chave: snapshot.get(chave, _AUSENTE) for chave in chaves}
+
         for chave, padrao in zip(chaves, padroes):
-            resultado[chave] = cls.obter(chave, padrao)
+            if resultado[chave] is _AUSENTE:
+                resultado[chave] = padrao if cls._completo else cls.obter(chave, padrao)
 
         return resultado
 
@@ -154,10 +279,13 @@ class ConfigCache:
         """
         Limpa todo o cache de configurações.
 
-        Thread-safe: utiliza lock para sincronização.
+        As chaves voltam a ser buscadas individualmente até o próximo
+        carregar(). Thread-safe: utiliza lock para sincronização.
         """
         with cls._lock:
             cls._cache = {}
+            cls._completo = False
+            cls._versao = None
 
     @classmethod
     def limpar_chave(cls, chave: str):
@@ -168,7 +296,10 @@ class ConfigCache:
         """
         with cls._lock:
             if chave in cls._cache:
-                del cls._cache[chave]
+                snapshot = dict(cls._cache)
+                del snapshot[chave]
+                cls._cache = snapshot
+                cls._completo = False
 
 
 # Instância global para uso em toda a aplicação
@@ -33,6 +33,33 @@ def obter_conexao():
         conn.close()
 
 
+def habilitar_vacuum_incremental() -> None:
+    """
+    Ativa auto_vacuum incremental no banco.
+
+    Só tem efeito em bancos novos (antes da primeira tabela ser criada);
+    bancos existentes precisam de um VACUUM manual para adotar o modo.
+    """
+    with obter_conexao() as conn:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+
+def executar_vacuum_incremental() -> bool:
+    """
+    Devolve ao sistema de arquivos as páginas livres do banco.
+
+    Returns:
+        True se executado, False se o banco não está em modo incremental
+    """
+    with obter_conexao() as conn:
+        modo = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if modo != 2:  # 2 = INCREMENTAL
+            return False
+        # incremental_vacuum libera páginas à medida que as linhas são lidas
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+        return True
+
+
 def adaptar_datetime(dt: datetime) -> str:
     """
     Adaptador para converter datetime para string, armazenando em UTC naive.
@@ -0,0 +1,143 @@
+"""
+Envio em segundo plano da fila de e-mails (tabela email_saida).
+
+As rotas apenas gravam o e-mail na fila (ServicoEmail.enviar_email), então
+o tempo de resposta não depende mais do provedor. Um job periódico reserva
+lotes de e-mails prontos, entrega cada um ao transporte configurado e
+registra o resultado:
+- sucesso: status Enviado, com o ID do provedor
+- falha temporária: nova tentativa com espera exponencial
+  (EMAIL_ESPERA_INICIAL_SEGUNDOS, dobrando até EMAIL_ESPERA_MAXIMA_SEGUNDOS)
+- falha permanente ou EMAIL_MAX_TENTATIVAS esgotadas: status Falhou
+
+Reservas de um processo encerrado no meio do envio voltam para a fila
+após RESERVA_ABANDONADA_MINUTOS. E-mails enviados são excluídos após
+EMAIL_SAIDA_RETENCAO_DIAS (eles contêm links de redefinição de senha).
+"""
+from datetime import timedelta
+from typing import Optional
+
+from model.email_saida_model import EmailSaida
+from repo import email_saida_repo
+from util.config import (
+    EMAIL_TRANSPORTE,
+    EMAIL_SAIDA_INTERVALO_SEGUNDOS,
+    EMAIL_SAIDA_LOTE,
+    EMAIL_MAX_TENTATIVAS,
+    EMAIL_ESPERA_INICIAL_SEGUNDOS,
+    EMAIL_ESPERA_MAXIMA_SEGUNDOS,
+    EMAIL_SAIDA_RETENCAO_DIAS,
+)
+from util.datetime_util import agora
+from util.email_transporte import ErroTransporteEmail, criar_transporte
+from util.logger_config import logger
+from util.tarefas_periodicas import registrar_tarefa
+
+# Reservas mais antigas que isto são de processos que pararam durante o envio
+RESERVA_ABANDONADA_MINUTOS = 10
+
+# Lotes por execução do job (o restante fica para a próxima)
+MAX_LOTES_POR_EXECUCAO = 10
+
+transporte_email = criar_transporte(EMAIL_TRANSPORTE)
+
+
+def calcular_espera(tentativa: int) -> int:
+    """
+    Espera até a próxima tentativa, dobrando a cada falha.
+
+    Args:
+        tentativa: Número da tentativa que falhou (1 = primeira)
+
+    Returns:
+        Segundos até a próxima tentativa
+    """
+    espera = EMAIL_ESPERA_INICIAL_SEGUNDOS * 2 ** max(tentativa - 1, 0)
+    return min(espera, EMAIL_ESPERA_MAXIMA_SEGUNDOS)
+
+
+def _enviar(email: EmailSaida, transporte, resultado: dict) -> None:
+    """Envia um e-mail reservado e registra o resultado na fila."""
+    tentativa = email.tentativas + 1
+    try:
+        id_externo = transporte.enviar(email)
+    except Exception as e:
+        permanente = isinstance(e, ErroTransporteEmail) and e.permanente
+        if not isinstance(e, ErroTransporteEmail):
+            logger.error(f"[E-mail] Erro inesperado ao enviar e-mail {email.id}: {e}", exc_info=True)
+
+        if permanente or tentativa >= EMAIL_MAX_TENTATIVAS:
+            email_saida_repo.marcar_falhou(email.id, str(e))
+            resultado["falhas"] += 1
+            logger.error(
+                f"[E-mail] Envio para {email.para_email} desistido após {tentativa} tentativa(s): {e}"
+            )
+        else:
+            email_saida_repo.reagendar(
+                email.id, agora() + timedelta(seconds=calcular_espera(tentativa)), str(e)
+            )
+            resultado["reagendados"] += 1
+            logger.warning(f"[E-mail] Falha ao enviar para {email.para_email} (tentativa {tentativa}): {e}")
+        return
+
+    email_saida_repo.marcar_enviado(email.id, id_externo)
+    resultado["enviados"] += 1
+    logger.info(f"[E-mail] Enviado para {email.para_email} - ID: {id_externo or 'N/A'}")
+
+
+def processar_fila(transporte=None, tamanho_lote: Optional[int] = None) -> dict:
+    """
+    Envia os e-mails prontos da fila, em lotes.
+
+    Args:
+        transporte: Transporte de e-mail (padrão: o configurado em EMAIL_TRANSPORTE)
+        tamanho_lote: E-mails reservados por vez (padrão: EMAIL_SAIDA_LOTE)
+
+    Returns:
+        Dict com as quantidades de enviados, reagendados e falhas
+    """
+    transporte = transporte or transporte_email
+    tamanho_lote = tamanho_lote or EMAIL_SAIDA_LOTE
+    resultado = {"enviados": 0, "reagendados": 0, "falhas": 0}
+
+    liberados = email_saida_repo.liberar_reservas_antigas(
+        agora() - timedelta(minutes=RESERVA_ABANDONADA_MINUTOS)
+    )
+    if liberados:
+        logger.warning(f"[E-mail] {liberados} reserva(s) abandonada(s) devolvida(s) à fila")
+
+    for _ in range(MAX_LOTES_POR_EXECUCAO):
+        lote = email_saida_repo.reservar_lote(tamanho_lote)
+        for email in lote:
+            _enviar(email, transporte, resultado)
+        if len(lote) < tamanho_lote:
+            break
+
+    return resultado
+
+
+def excluir_enviados_antigos(dias: int = EMAIL_SAIDA_RETENCAO_DIAS) -> int:
+    """
+    Exclui da fila os e-mails enviados há mais de `dias` dias.
+
+    Returns:
+        Quantidade de e-mails excluídos
+    """
+    excluidos = email_saida_repo.excluir_enviados_antes(agora() - timedelta(days=dias))
+    if excluidos:
+        logger.info(f"[E-mail] {excluidos} e-mail(s) enviado(s) excluído(s) da fila")
+    return excluidos
+
+
+def registrar_tarefa_email():
+    """Registra o envio periódico da fila e a limpeza dos e-mails enviados."""
+    registrar_tarefa(
+        "email_saida",
+        processar_fila,
+        intervalo_segundos=EMAIL_SAIDA_INTERVALO_SEGUNDOS,
+    )
+    registrar_tarefa(
+        "email_saida_retencao",
+        excluir_enviados_antigos,
+        intervalo_segundos=24 * 60 * 60,
+    )
@@ -1,22 +1,20 @@
+"""
+Serviço de e-mails da aplicação.
+
+Monta os e-mails (recuperação de senha, boas-vindas) e os coloca na fila de
+saída (tabela email_saida). O envio ao provedor é feito em segundo plano
+por util/email_saida.py, com novas tentativas em caso de falha.
+"""
 import os
+import sqlite3
 from typing import Optional
 
-import resend
-from resend.exceptions import ResendError
-
+from model.email_saida_model import EmailSaida
+from repo import email_saida_repo
 from util.logger_config import logger
 
 
 class ServicoEmail:
-    def __init__(self):
-        self.api_key = os.getenv('RESEND_API_KEY')
-        self.from_email = os.getenv('RESEND_FROM_EMAIL', 'noreply@seudominio.com')
-        self.from_name = os.getenv('RESEND_FROM_NAME', 'Sistema')
-
-        # Configura a API key do Resend
-        if self.api_key:
-            resend.api_key = self.api_key
-
     def enviar_email(
         self,
         para_email: str,
@@ -25,26 +23,29 @@ class ServicoEmail:
         html: str,
         texto: Optional[str] = None
     ) -> bool:
-        """Envia e-mail via Resend.com"""
-        if not self.api_key:
-            logger.warning("RESEND_API_KEY não configurada")
-            return False
-
-        params = {
-            "from": f"{self.from_name} <{self.from_email}>",
-            "to": [para_email],
-            "subject": assunto,
-            "html": html
-        }
+        """
+        Coloca o e-mail na fila de saída (não espera o provedor).
 
+        Returns:
+            True se o e-mail entrou na fila
+        """
+        email = EmailSaida(
+            id=0,
+            para_email=para_email,
+            para_nome=para_nome,
+            assunto=assunto,
+            html=html,
+            texto=texto
+        )
         try:
-            email = resend.Emails.send(params)
-            logger.info(f"E-mail enviado para {para_email} - ID: {email.get('id', 'N/A')}")
-            return True
-        except ResendError as e:
-            logger.error(f"Erro ao enviar e-mail: {e}")
+            email_id = email_saida_repo.inserir(email)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao colocar e-mail para {para_email} na fila: {e}")
             return False
 
+        logger.info(f"E-mail para {para_email} colocado na fila - ID: {email_id}")
+        return True
+
     def enviar_recuperacao_senha(self, para_email: str, para_nome: str, token: str) -> bool:
         """Envia e-mail de recuperação de senha"""
         url_recuperacao = f"{os.getenv('BASE_URL', 'http://localhost:8000')}/redefinir-senha?token={token}"
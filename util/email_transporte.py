@@ -0,0 +1,197 @@
+"""
+Transportes de e-mail usados pelo job de envio (util/email_saida.py).
+
+Todos têm o método enviar(email) -> ID no provedor (ou None), e levantam
+ErroTransporteEmail em caso de falha, indicando se vale tentar de novo.
+
+- resend: API do Resend.com (produção)
+- arquivo: grava cada e-mail como .eml em EMAIL_ARQUIVO_DIR (desenvolvimento)
+- smtp: envia para um servidor SMTP, por exemplo um servidor de depuração
+  local (python -m aiosmtpd -n -l localhost:1025)
+"""
+import smtplib
+from email.message import EmailMessage
+from email.utils import formataddr
+from pathlib import Path
+from typing import Optional
+
+import resend
+from resend.exceptions import ResendError
+
+from model.email_saida_model import EmailSaida
+from util.config import (
+    RESEND_API_KEY,
+    RESEND_FROM_EMAIL,
+    RESEND_FROM_NAME,
+    EMAIL_ARQUIVO_DIR,
+    EMAIL_SMTP_HOST,
+    EMAIL_SMTP_PORTA,
+)
+from util.logger_config import logger
+
+
+class ErroTransporteEmail(Exception):
+    """
+    Falha ao entregar um e-mail ao transporte.
+
+    Attributes:
+        permanente: True se uma nova tentativa não adiantaria
+            (ex: destinatário inválido, transporte não configurado)
+    """
+
+    def __init__(self, mensagem: str, permanente: bool = False):
+        super().__init__(mensagem)
+        self.permanente = permanente
+
+
+def _remetente(from_name: str, from_email: str) -> str:
+    """Monta o cabeçalho From ("Nome <email>")."""
+    return formataddr((from_name, from_email))
+
+
+def montar_mensagem(email: EmailSaida, remetente: str) -> EmailMessage:
+    """
+    Monta a mensagem MIME (texto + HTML) de um e-mail da fila.
+
+    Args:
+        email: E-mail da fila
+        remetente: Cabeçalho From
+
+    Returns:
+        EmailMessage pronta para envio ou gravação
+    """
+    mensagem = EmailMessage()
+    mensagem["From"] = remetente
+    mensagem["To"] = formataddr((email.para_nome, email.para_email))
+    mensagem["Subject"] = email.assunto
+    mensagem.set_content(email.texto or "Este e-mail requer um leitor com suporte a HTML.")
+    mensagem.add_alternative(email.html, subtype="html")
+    return mensagem
+
+
+class TransporteResend:
+    """Envia pela API do Resend.com."""
+
+    nome = "resend"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = RESEND_API_KEY,
+        from_email: str = RESEND_FROM_EMAIL,
+        from_name: str = RESEND_FROM_NAME
+    ):
+        self.api_key = api_key
+        self.remetente = _remetente(from_name, from_email)
+        if self.api_key:
+            resend.api_key = self.api_key
+
+    def enviar(self, email: EmailSaida) -> Optional[str]:
+        """
+        Envia o e-mail.
+
+        Returns:
+            ID do e-mail no Resend
+
+        Raises:
+            ErroTransporteEmail: Falha no envio
+        """
+        if not self.api_key:
+            raise ErroTransporteEmail("RESEND_API_KEY não configurada", permanente=True)
+
+        params = {
+            "from": self.remetente,
+            "to": [email.para_email],
+            "subject": email.assunto,
+            "html": email.html,
+        }
+        if email.texto:
+            params["text"] = email.texto
+
+        try:
+            resposta = resend.Emails.send(params)
+        except ResendError as e:
+            # 4xx (exceto 429) são erros do pedido: repetir não resolve
+            try:
+                codigo = int(e.code)
+            except (TypeError, ValueError):
+                codigo = 0
+            raise ErroTransporteEmail(
+                f"Resend: {e}", permanente=400 <= codigo < 500 and codigo != 429
+            ) from e
+        return resposta.get("id")
+
+
+class TransporteArquivo:
+    """Grava cada e-mail como um arquivo .eml (para desenvolvimento)."""
+
+    nome = "arquivo"
+
+    def __init__(
+        self,
+        diretorio: str = EMAIL_ARQUIVO_DIR,
+        from_email: str = RESEND_FROM_EMAIL,
+        from_name: str = RESEND_FROM_NAME
+    ):
+        self.diretorio = Path(diretorio)
+        self.remetente = _remetente(from_name, from_email)
+
+    def enviar(self, email: EmailSaida) -> Optional[str]:
+        """Grava o e-mail e retorna o nome do arquivo."""
+        mensagem = montar_mensagem(email, self.remetente)
+        try:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            caminho = self.diretorio / f"{email.id:08d}.eml"
+            caminho.write_bytes(bytes(mensagem))
+        except OSError as e:
+            raise ErroTransporteEmail(f"Erro ao gravar e-mail: {e}") from e
+        return caminho.name
+
+
+class TransporteSMTP:
+    """Envia para um servidor SMTP sem autenticação (ex: servidor de depuração)."""
+
+    nome = "smtp"
+
+    def __init__(
+        self,
+        host: str = EMAIL_SMTP_HOST,
+        porta: int = EMAIL_SMTP_PORTA,
+        timeout_segundos: float = 10,
+        from_email: str = RESEND_FROM_EMAIL,
+        from_name: str = RESEND_FROM_NAME
+    ):
+        self.host = host
+        self.porta = porta
+        self.timeout_segundos = timeout_segundos
+        self.remetente = _remetente(from_name, from_email)
+
+    def enviar(self, email: EmailSaida) -> Optional[str]:
+        """Entrega o e-mail ao servidor SMTP (sem ID de retorno)."""
+        mensagem = montar_mensagem(email, self.remetente)
+        try:
+            with smtplib.SMTP(self.host, self.porta, timeout=self.timeout_segundos) as smtp:
+                smtp.send_message(mensagem)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise ErroTransporteEmail(f"SMTP: destinatário recusado: {e}", permanente=True) from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise ErroTransporteEmail(f"SMTP: {e}") from e
+        return None
+
+
+def criar_transporte(nome: str):
+    """
+    Cria o transporte de e-mail configurado.
+
+    Args:
+        nome: "resend", "arquivo" ou "smtp"
+
+    Returns:
+        Objeto com o método enviar(email)
+    """
+    if nome == "arquivo":
+        return TransporteArquivo()
+    if nome == "smtp":
+        return TransporteSMTP()
+    if nome != "resend":
+        logger.warning(f"[E-mail] Transporte '{nome}' desconhecido, usando resend")
+    return TransporteResend()
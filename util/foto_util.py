@@ -1,98 +1,397 @@
 """
 Utilitário para gerenciamento de fotos de usuários.
 
+As fotos ficam em static/img/fotos endereçadas pelo conteúdo: o nome do
+arquivo é o SHA-256 do JPG, em subpastas pelos 4 primeiros caracteres do
+hash (ex: fotos/ab/cd/abcd...ef.jpg). Cada usuário guarda apenas um ponteiro
+(coluna usuario.foto); NULL aponta para a foto padrão (static/img/user.jpg),
+compartilhada por todos. Fotos idênticas são gravadas uma única vez e, como
+o conteúdo nunca muda sob o mesmo nome, são servidas com cache imutável.
+
 Este módulo fornece funções para:
-- Obter caminhos de fotos de usuários (padrão: {id:06d}.jpg)
-- Criar foto padrão ao cadastrar usuário
-- Salvar foto cropada do upload
+- Obter a URL (e o srcset) da foto de um usuário
+- Salvar foto cropada do upload (nas rotas, no pool de imagens, a partir do
+  arquivo temporário gravado por util.upload_util)
+- Gerar versões reduzidas da foto ({hash}-{tamanho}.jpg e .webp), usadas
+  em srcset por quem exibe a foto pequena (navbar, chat)
+- Migrar as fotos do formato anterior (static/img/usuarios/{id:06d}.jpg,
+  uma cópia por usuário), executado na inicialização
+- Remover fotos que nenhum usuário referencia mais (tarefa periódica)
+
+Para migrar, gerar versões reduzidas que faltem e remover fotos órfãs:
+    python -m util.foto_util
 """
 
+import asyncio
 import base64
 import binascii
 import io
+import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional, Union
 
 from PIL import Image, UnidentifiedImageError
 
+from repo import usuario_repo
+from util.assets import manifesto_assets
 from util.logger_config import logger
-from util.config import FOTO_PERFIL_TAMANHO_MAX
+from util.config import FOTO_PERFIL_TAMANHO_MAX, FOTO_GC_INTERVALO_MINUTOS
 from util.config_cache import config
+from util.pool_imagens import pool_imagens
+# Processamento executado no pool de imagens (módulo leve, sem estado da aplicação)
+from util.processamento_foto import (
+    FORMATO_FOTO,
+    QUALIDADE_FOTO,
+    TAMANHOS_FOTO,
+    FORMATOS_VARIANTES,
+    calcular_hash,
+    caminho_foto_na_pasta,
+    caminho_variante,
+    gravar_atomico,
+    gerar_variantes,
+    processar_foto_cropada,
+)
+from util.tarefas_periodicas import registrar_tarefa
 
 
 # Configurações
-PASTA_FOTO_DEFAULT = Path("static/img")
-FOTO_DEFAULT = PASTA_FOTO_DEFAULT / "user.jpg"
-PASTA_FOTOS = PASTA_FOTO_DEFAULT / "usuarios"
-FORMATO_FOTO = "JPEG"
-QUALIDADE_FOTO = 90
+PASTA_STATIC = Path("static")
+# Foto padrão, relativa a static/ (servida pelo manifesto de assets, com hash)
+ASSET_FOTO_DEFAULT = Path("img/user.jpg")
+FOTO_DEFAULT = PASTA_STATIC / ASSET_FOTO_DEFAULT
+PASTA_FOTOS = PASTA_STATIC / "img" / "fotos"
+# Formato anterior: uma cópia por usuário, migrada por migrar_fotos_legado
+PASTA_FOTOS_LEGADO = PASTA_STATIC / "img" / "usuarios"
+# Fotos órfãs mais novas que isso são mantidas: o upload grava a foto antes
+# de o ponteiro do usuário ser atualizado
+FOTO_GC_IDADE_MINIMA_SEGUNDOS = 3600
+
+
+def _eh_hash(nome: str) -> bool:
+    return len(nome) == 64 and all(c in "0123456789abcdef" for c in nome)
 
 
-def obter_caminho_foto_usuario(id: int) -> str:
+def caminho_foto(foto: str, pasta: Optional[Path] = None) -> Path:
     """
-    Retorna o caminho absoluto da foto do usuário para uso em templates.
+    Retorna o Path do arquivo de uma foto a partir do hash.
 
     Args:
-        id: ID do usuário
+        foto: Hash da foto (usuario.foto)
+        pasta: Raiz do armazenamento (padrão: PASTA_FOTOS)
 
     Returns:
-        String com caminho absoluto (ex: /static/img/usuarios/000001.jpg)
+        Path no formato {pasta}/ab/cd/abcd....jpg
     """
-    return f"/{PASTA_FOTOS}/{id:06d}.jpg"
+    return caminho_foto_na_pasta(foto, PASTA_FOTOS if pasta is None else pasta)
 
 
-def obter_path_absoluto_foto(id: int) -> Path:
+def escolher_tamanho(tamanho: int) -> int:
+    """Menor tamanho de variante que cobre `tamanho` pixels (ou o maior disponível)."""
+    return next((t for t in TAMANHOS_FOTO if t >= tamanho), TAMANHOS_FOTO[-1])
+
+
+def _url_arquivo(foto: Optional[str], tamanho: Optional[int], extensao: str) -> str:
+    """URL da foto (ou da versão reduzida), sem consultar o disco."""
+    arquivo = ASSET_FOTO_DEFAULT if foto is None else caminho_foto(foto)
+    if tamanho is not None:
+        arquivo = caminho_variante(arquivo, escolher_tamanho(tamanho), extensao)
+    if foto is None:
+        return manifesto_assets.url(arquivo.as_posix())
+    return f"/{arquivo.as_posix()}"
+
+
+def url_foto(foto: Optional[str], tamanho: Optional[int] = None) -> str:
+    """
+    Retorna a URL de uma foto para uso em templates e respostas JSON.
+
+    As versões reduzidas são gravadas junto com a foto (upload, migração),
+    então a URL é montada sem verificar se o arquivo existe.
+
+    Args:
+        foto: Hash da foto (usuario.foto); None para a foto padrão
+        tamanho: Tamanho de exibição em pixels; se informado, retorna a menor
+                 versão reduzida que o cobre
+
+    Returns:
+        String com caminho absoluto (ex: /static/img/fotos/ab/cd/abcd....jpg,
+        /static/img/fotos/ab/cd/abcd...-64.jpg ou a foto padrão)
+    """
+    return _url_arquivo(foto, tamanho, "jpg")
+
+
+def srcset_foto(foto: Optional[str], tamanho: int, extensao: str = "jpg") -> str:
     """
-    Retorna o Path absoluto do arquivo de foto do usuário.
+    Monta o atributo srcset (1x e 2x) das versões reduzidas de uma foto.
+
+    Args:
+        foto: Hash da foto (usuario.foto); None para a foto padrão
+        tamanho: Tamanho de exibição em pixels
+        extensao: "jpg" ou "webp"
+
+    Returns:
+        String para srcset (ex: "/static/img/fotos/ab/cd/abcd...-32.webp 1x,
+        /static/img/fotos/ab/cd/abcd...-64.webp 2x") ou vazia se o formato
+        não é gerado (Pillow sem WebP)
+    """
+    if extensao not in FORMATOS_VARIANTES:
+        return ""
+    return ", ".join(
+        f"{_url_arquivo(foto, tamanho * densidade, extensao)} {densidade}x"
+        for densidade in (1, 2)
+    )
+
+
+def obter_foto_usuario(id: int) -> Optional[str]:
+    """
+    Retorna o ponteiro da foto do usuário.
 
     Args:
         id: ID do usuário
 
     Returns:
-        Path do arquivo de foto
+        Hash da foto, ou None se o usuário usa a foto padrão
     """
-    PASTA_FOTOS.mkdir(parents=True, exist_ok=True)
-    return PASTA_FOTOS / f"{id:06d}.jpg"
+    return usuario_repo.obter_foto(id)
 
 
-def criar_foto_padrao_usuario(id: int) -> bool:
+def obter_caminho_foto_usuario(id: int, tamanho: Optional[int] = None) -> str:
     """
-    Cria uma cópia da foto padrão para o usuário.
+    Retorna o caminho absoluto da foto do usuário para uso em templates.
 
-    Copia o arquivo user.jpg para {id:06d}.jpg quando um novo usuário é criado.
+    Quando o objeto Usuario já está carregado, prefira url_foto(usuario.foto),
+    que não consulta o banco.
 
     Args:
         id: ID do usuário
+        tamanho: Tamanho de exibição em pixels (ver url_foto)
 
     Returns:
-        True se criou com sucesso, False caso contrário
+        String com caminho absoluto (ver url_foto)
+    """
+    return url_foto(obter_foto_usuario(id), tamanho)
+
+
+def obter_srcset_foto_usuario(id: int, tamanho: int, extensao: str = "jpg") -> str:
+    """
+    Monta o atributo srcset (1x e 2x) da foto do usuário (ver srcset_foto).
+
+    Args:
+        id: ID do usuário
+        tamanho: Tamanho de exibição em pixels
+        extensao: "jpg" ou "webp"
     """
+    return srcset_foto(obter_foto_usuario(id), tamanho, extensao)
+
+
+def _listar_fotos() -> Iterator[Path]:
+    """Arquivos das fotos do armazenamento (sem as versões reduzidas)."""
+    for foto in PASTA_FOTOS.glob("*/*/*.jpg"):
+        if _eh_hash(foto.stem):
+            yield foto
+
+
+def gerar_variantes_arquivo(foto: Path, forcar: bool = False, verificar_mtime: bool = True) -> int:
+    """
+    Gera as versões reduzidas de uma foto já gravada.
+
+    Args:
+        foto: Arquivo JPG da foto
+        forcar: Regerar mesmo se as variantes já existirem
+        verificar_mtime: Regerar variantes mais antigas que a foto (só faz
+                         sentido para a foto padrão: as do armazenamento
+                         nunca mudam de conteúdo)
+
+    Returns:
+        Quantidade de arquivos gravados (0 se já estavam atualizadas)
+    """
+    if not forcar:
+        mtime = foto.stat().st_mtime
+        atualizadas = all(
+            caminho_variante(foto, tamanho, extensao).exists()
+            and (not verificar_mtime or caminho_variante(foto, tamanho, extensao).stat().st_mtime >= mtime)
+            for tamanho in TAMANHOS_FOTO
+            for extensao in FORMATOS_VARIANTES
+        )
+        if atualizadas:
+            return 0
+    with Image.open(foto) as imagem:
+        return gerar_variantes(imagem.convert("RGB"), foto)
+
+
+def gerar_variantes_fotos_existentes(forcar: bool = False) -> dict:
+    """
+    Gera as versões reduzidas que faltam da foto padrão e das fotos do armazenamento.
+
+    Args:
+        forcar: Regerar todas, mesmo as já atualizadas
+
+    Returns:
+        Dict com fotos processadas, atualizadas e com erro
+    """
+    resultado = {"fotos": 0, "atualizadas": 0, "erros": 0}
+    fotos = [FOTO_DEFAULT] + sorted(_listar_fotos())
+    for foto in fotos:
+        if not foto.exists():
+            continue
+        resultado["fotos"] += 1
+        try:
+            if gerar_variantes_arquivo(foto, forcar, verificar_mtime=foto == FOTO_DEFAULT):
+                resultado["atualizadas"] += 1
+        except (OSError, UnidentifiedImageError, ValueError) as e:
+            logger.error(f"Erro ao gerar versões reduzidas de {foto}: {e}")
+            resultado["erros"] += 1
+
+    logger.info(
+        f"Versões reduzidas: {resultado['atualizadas']} de {resultado['fotos']} foto(s) "
+        f"atualizada(s), {resultado['erros']} erro(s)"
+    )
+    return resultado
+
+
+def migrar_fotos_legado() -> dict:
+    """
+    Migra as fotos do formato anterior (static/img/usuarios/{id:06d}.jpg)
+    para o armazenamento por hash.
+
+    Cópias da foto padrão apenas são apagadas (o ponteiro NULL já aponta para
+    ela). As demais são gravadas pelo hash, reaproveitando as versões
+    reduzidas que já existirem, e viram o ponteiro do usuário, se ele ainda
+    não tiver foto no formato novo. Arquivos com erro são mantidos.
+
+    Returns:
+        Dict com fotos encontradas, migradas, iguais à padrão e com erro
+    """
+    resultado = {"fotos": 0, "migradas": 0, "padrao": 0, "erros": 0}
+    if not PASTA_FOTOS_LEGADO.is_dir():
+        return resultado
+
+    conteudo_padrao = FOTO_DEFAULT.read_bytes() if FOTO_DEFAULT.exists() else None
+    for antiga in sorted(PASTA_FOTOS_LEGADO.glob("*.jpg")):
+        if not antiga.stem.isdigit():
+            continue
+        resultado["fotos"] += 1
+        variantes_antigas = [
+            caminho_variante(antiga, tamanho, extensao)
+            for tamanho in TAMANHOS_FOTO
+            for extensao in ("jpg", "webp")
+        ]
+        try:
+            conteudo = antiga.read_bytes()
+            if conteudo == conteudo_padrao:
+                resultado["padrao"] += 1
+            else:
+                foto = calcular_hash(conteudo)
+                destino = caminho_foto(foto)
+                if not destino.exists():
+                    destino.parent.mkdir(parents=True, exist_ok=True)
+                    for variante in variantes_antigas:
+                        if variante.exists():
+                            tamanho, extensao = variante.stem.rsplit("-", 1)[1], variante.suffix[1:]
+                            os.replace(variante, caminho_variante(destino, int(tamanho), extensao))
+                    gravar_atomico(destino, conteudo)
+                    gerar_variantes_arquivo(destino, verificar_mtime=False)
+                usuario_id = int(antiga.stem)
+                if usuario_repo.obter_foto(usuario_id) is None:
+                    usuario_repo.atualizar_foto(usuario_id, foto)
+                resultado["migradas"] += 1
+        except (OSError, UnidentifiedImageError, ValueError) as e:
+            logger.error(f"Erro ao migrar a foto {antiga}: {e}")
+            resultado["erros"] += 1
+            continue
+
+        for arquivo in [antiga] + variantes_antigas:
+            arquivo.unlink(missing_ok=True)
+
     try:
-        destino = obter_path_absoluto_foto(id)
+        # Vazia após a migração (fica se restou alguma foto com erro)
+        PASTA_FOTOS_LEGADO.rmdir()
+    except OSError:
+        pass
 
-        # Verificar se foto padrão existe
-        if not FOTO_DEFAULT.exists():
-            logger.warning(f"Foto padrão não encontrada em {FOTO_DEFAULT}")
-            return False
+    if resultado["fotos"]:
+        logger.info(
+            f"Fotos migradas para o armazenamento por hash: {resultado['migradas']} própria(s), "
+            f"{resultado['padrao']} cópia(s) da foto padrão removida(s), {resultado['erros']} erro(s)"
+        )
+    return resultado
 
-        # Copiar foto padrão
-        with open(FOTO_DEFAULT, "rb") as f_origem:
-            with open(destino, "wb") as f_destino:
-                f_destino.write(f_origem.read())
 
-        logger.info(f"Foto padrão criada para usuário ID: {id}")
-        return True
+def coletar_fotos_orfas(idade_minima_segundos: float = FOTO_GC_IDADE_MINIMA_SEGUNDOS) -> dict:
+    """
+    Remove as fotos (e suas versões reduzidas) que nenhum usuário referencia,
+    ex: a foto anterior de quem trocou de foto ou de um usuário excluído.
 
-    except OSError as e:
-        logger.error(f"Erro ao criar foto padrão para usuário {id}: {e}")
-        return False
+    Args:
+        idade_minima_segundos: Fotos modificadas há menos tempo são mantidas
+                               (um upload em andamento ainda não gravou o ponteiro)
+
+    Returns:
+        Dict com fotos verificadas e removidas
+    """
+    referenciadas = usuario_repo.obter_fotos_referenciadas()
+    limite = time.time() - idade_minima_segundos
+    resultado = {"fotos": 0, "removidas": 0}
+
+    for foto in list(_listar_fotos()):
+        resultado["fotos"] += 1
+        if foto.stem in referenciadas:
+            continue
+        try:
+            if foto.stat().st_mtime > limite:
+                continue
+            # A foto primeiro: um upload idêntico passa a gravá-la de novo
+            foto.unlink()
+            for tamanho in TAMANHOS_FOTO:
+                for extensao in ("jpg", "webp"):
+                    caminho_variante(foto, tamanho, extensao).unlink(missing_ok=True)
+            resultado["removidas"] += 1
+        except OSError as e:
+            logger.warning(f"Erro ao remover a foto órfã {foto}: {e}")
+
+    if resultado["removidas"]:
+        logger.info(f"Fotos órfãs removidas: {resultado['removidas']} de {resultado['fotos']}")
+    return resultado
+
+
+def registrar_tarefa_fotos():
+    """Registra a remoção periódica de fotos órfãs."""
+    registrar_tarefa(
+        "fotos_orfas",
+        coletar_fotos_orfas,
+        intervalo_segundos=FOTO_GC_INTERVALO_MINUTOS * 60,
+    )
+
+
+def obter_path_absoluto_foto(id: int) -> Path:
+    """
+    Retorna o Path do arquivo da foto atual do usuário.
+
+    Args:
+        id: ID do usuário
+
+    Returns:
+        Path da foto no armazenamento, ou da foto padrão
+    """
+    foto = obter_foto_usuario(id)
+    return FOTO_DEFAULT if foto is None else caminho_foto(foto)
+
+
+def _argumentos_processamento(origem: Union[Path, BinaryIO]) -> tuple:
+    """Argumentos de processar_foto_cropada (configuração lida no processo principal)."""
+    # Lê tamanho máximo do cache (database → .env)
+    tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
+    return origem, tamanho_max, PASTA_FOTOS
 
 
 def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
     """
-    Salva a foto cropada do usuário enviada do frontend.
+    Salva a foto cropada do usuário a partir de uma imagem em base64.
 
-    Recebe imagem em base64, decodifica, processa e salva como JPG.
+    Recebe imagem em base64, decodifica, processa, grava como JPG no
+    armazenamento e aponta o usuário para ela.
+    Bloqueante: nas rotas, o upload é binário (util.upload_util) e vai para
+    salvar_foto_cropada_usuario_async.
 
     Args:
         id: ID do usuário
@@ -105,36 +404,10 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
         # Remover prefixo data:image/...;base64, se existir
         if "," in conteudo_base64:
             conteudo_base64 = conteudo_base64.split(",", 1)[1]
+        origem = io.BytesIO(base64.b64decode(conteudo_base64))
 
-        # Decodificar base64
-        image_data = base64.b64decode(conteudo_base64)
-
-        # Abrir imagem com Pillow
-        imagem = Image.open(io.BytesIO(image_data))
-
-        # Converter para RGB se necessário (remove canal alpha)
-        if imagem.mode in ("RGBA", "LA", "P"):
-            # Criar fundo branco
-            fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
-            if imagem.mode == "P":
-                imagem = imagem.convert("RGBA")
-            fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
-            imagem = fundo
-        elif imagem.mode != "RGB":
-            imagem = imagem.convert("RGB")
-
-        # Redimensionar se necessário (mantendo aspect ratio)
-        # Lê tamanho máximo do cache (database → .env)
-        tamanho_max = config.obter_int("foto_perfil_tamanho_max", FOTO_PERFIL_TAMANHO_MAX)
-        if imagem.width > tamanho_max or imagem.height > tamanho_max:
-            # thumbnail redimensiona mantendo aspect ratio
-            imagem.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS)
-            logger.info(f"Imagem redimensionada para {imagem.width}x{imagem.height}px (max: {tamanho_max}px)")
-
-        # Salvar como JPG
-        destino = obter_path_absoluto_foto(id)
-        imagem.save(destino, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
-
+        foto, _ = processar_foto_cropada(*_argumentos_processamento(origem))
+        usuario_repo.atualizar_foto(id, foto)
         logger.info(f"Foto cropada salva para usuário ID: {id}")
         return True
 
@@ -147,17 +420,49 @@ def salvar_foto_cropada_usuario(id: int, conteudo_base64: str) -> bool:
         return False
 
 
+async def salvar_foto_cropada_usuario_async(id: int, arquivo: Path) -> Optional[str]:
+    """
+    Salva a foto cropada enviada no upload, processando-a no pool de
+    imagens, sem bloquear o event loop.
+
+    Args:
+        id: ID do usuário
+        arquivo: Arquivo temporário com a imagem enviada (o processo do pool
+                 o lê direto do disco; quem chama continua responsável por apagá-lo)
+
+    Returns:
+        Hash da foto salva (para atualizar a sessão), ou None em caso de erro
+
+    Raises:
+        FilaImagensCheia: Se o pool já tem processamentos demais pendentes
+    """
+    try:
+        foto = await pool_imagens.executar(
+            processar_foto_cropada, *_argumentos_processamento(arquivo)
+        )
+        # A foto anterior, se ninguém mais a usar, sai na coleta de órfãs
+        await asyncio.to_thread(usuario_repo.atualizar_foto, id, foto)
+        logger.info(f"Foto cropada salva para usuário ID: {id}")
+        return foto
+
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        logger.error(f"Erro ao salvar foto cropada para usuário {id}: {e}")
+        return None
+
+
 def foto_existe(id: int) -> bool:
     """
-    Verifica se a foto do usuário existe no filesystem.
+    Verifica se o usuário tem foto própria gravada.
 
     Args:
         id: ID do usuário
 
     Returns:
-        True se a foto existe, False caso contrário
+        True se o usuário aponta para uma foto existente, False se usa a
+        foto padrão ou o arquivo não existe
     """
-    return obter_path_absoluto_foto(id).exists()
+    foto = obter_foto_usuario(id)
+    return foto is not None and caminho_foto(foto).exists()
 
 
 def obter_tamanho_foto(id: int) -> Optional[int]:
@@ -172,3 +477,12 @@ def obter_tamanho_foto(id: int) -> Optional[int]:
     """
     path = obter_path_absoluto_foto(id)
     return path.stat().st_size if path.exists() else None
+
+
+if __name__ == "__main__":
+    inicio = time.perf_counter()
+    migrar_fotos_legado()
+    gerar_variantes_fotos_existentes()
+    coletar_fotos_orfas()
+    print(f"Fotos migradas, versões reduzidas geradas e órfãs removidas em "
+          f"{(time.perf_counter() - inicio) * 1000:.0f} ms")
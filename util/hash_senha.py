@@ -0,0 +1,67 @@
+"""
+Hash e verificação de senhas com bcrypt (operações síncronas).
+
+Estas são as funções executadas nos processos do pool de senhas: o módulo
+é mantido leve (passlib e util.config apenas) para que cada processo do
+pool o importe rápido, sem carregar banco, rotas ou logger. As versões
+assíncronas e o restante dos utilitários de segurança ficam em
+util.security, que reexporta estas funções.
+"""
+import time
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from util.config import SENHA_BCRYPT_ROUNDS
+
+# Hashes com custo diferente de SENHA_BCRYPT_ROUNDS são marcados para atualização
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=SENHA_BCRYPT_ROUNDS)
+
+
+def criar_hash_senha(senha: str) -> str:
+    """Cria hash da senha"""
+    return pwd_context.hash(senha)
+
+
+def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
+    """Verifica se senha corresponde ao hash"""
+    return pwd_context.verify(senha_plana, senha_hash)
+
+
+def verificar_e_atualizar_senha(senha_plana: str, senha_hash: str) -> tuple[bool, Optional[str]]:
+    """
+    Verifica a senha e, se o hash usar outro custo, gera um novo hash.
+
+    Args:
+        senha_plana: Senha informada
+        senha_hash: Hash armazenado
+
+    Returns:
+        (senha_correta, novo_hash): novo_hash é None quando o hash atual
+        já está no custo configurado (ou a senha está incorreta)
+    """
+    return pwd_context.verify_and_update(senha_plana, senha_hash)
+
+
+def obter_custo_hash(senha_hash: str) -> Optional[int]:
+    """Retorna o custo (rounds) de um hash bcrypt, ou None se não for bcrypt"""
+    try:
+        return pwd_context.handler("bcrypt").from_string(senha_hash).rounds
+    except ValueError:
+        return None
+
+
+def medir_custo_hash(amostras: int = 1) -> float:
+    """
+    Mede o tempo médio de um hash com o custo configurado.
+
+    Args:
+        amostras: Quantidade de hashes medidos
+
+    Returns:
+        Tempo médio por hash, em milissegundos
+    """
+    inicio = time.perf_counter()
+    for _ in range(amostras):
+        pwd_context.hash("medicao-de-custo")
+    return (time.perf_counter() - inicio) * 1000 / amostras
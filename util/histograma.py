@@ -0,0 +1,95 @@
+"""
+Histograma de latências com faixas fixas.
+
+Guarda apenas uma contagem por faixa (memória constante), o suficiente para
+média, máximo e percentis aproximados (limite superior da faixa).
+"""
+import threading
+from bisect import bisect_left
+from typing import Optional, Sequence
+
+# Limites superiores das faixas, em milissegundos (a última faixa é aberta)
+LIMITES_PADRAO_MS = (10, 25, 50, 100, 200, 300, 500, 1000, 2000, 5000)
+
+
+class HistogramaLatencia:
+    """
+    Histograma de latências em milissegundos.
+
+    Thread-safe: utiliza Lock para sincronização das contagens.
+    """
+
+    def __init__(self, limites_ms: Sequence[float] = LIMITES_PADRAO_MS):
+        self.limites_ms = tuple(limites_ms)
+        self._contagens = [0] * (len(self.limites_ms) + 1)
+        self._total = 0
+        self._soma_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self, milissegundos: float) -> None:
+        """Conta uma medição na faixa correspondente."""
+        indice = bisect_left(self.limites_ms, milissegundos)
+        with self._lock:
+            self._contagens[indice] += 1
+            self._total += 1
+            self._soma_ms += milissegundos
+            self._max_ms = max(self._max_ms, milissegundos)
+
+    def _percentil(self, percentual: float) -> Optional[float]:
+        """Limite superior da faixa que contém o percentil (chamar com o lock)."""
+        if not self._total:
+            return None
+        alvo = self._total * percentual / 100
+        acumulado = 0
+        for indice, contagem in enumerate(self._contagens):
+            acumulado += contagem
+            if acumulado >= alvo and contagem:
+                if indice < len(self.limites_ms):
+                    return min(float(self.limites_ms[indice]), self._max_ms)
+                return self._max_ms
+        return self._max_ms
+
+    def percentil(self, percentual: float) -> Optional[float]:
+        """
+        Retorna o percentil aproximado, em milissegundos.
+
+        Args:
+            percentual: Percentil desejado (0 a 100)
+
+        Returns:
+            Limite superior da faixa do percentil (ou o máximo observado, se
+            menor), ou None sem medições
+        """
+        with self._lock:
+            return self._percentil(percentual)
+
+    def obter(self) -> dict:
+        """
+        Retorna um retrato do histograma.
+
+        Returns:
+            Dict com total, média, máximo, p50/p95/p99 e as faixas
+            ({"ate_ms": limite ou None para a última, "contagem"})
+        """
+        with self._lock:
+            return {
+                "total": self._total,
+                "media_ms": round(self._soma_ms / self._total, 1) if self._total else None,
+                "max_ms": round(self._max_ms, 1) if self._total else None,
+                "p50_ms": self._percentil(50),
+                "p95_ms": self._percentil(95),
+                "p99_ms": self._percentil(99),
+                "faixas": [
+                    {"ate_ms": limite, "contagem": contagem}
+                    for limite, contagem in zip(list(self.limites_ms) + [None], self._contagens)
+                ],
+            }
+
+    def limpar(self) -> None:
+        """Zera todas as contagens."""
+        with self._lock:
+            self._contagens = [0] * (len(self.limites_ms) + 1)
+            self._total = 0
+            self._soma_ms = 0.0
+            self._max_ms = 0.0
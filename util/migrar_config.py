@@ -155,6 +155,16 @@ CONFIGS_PARA_MIGRAR = {
         "Período em minutos para listagem",
         "Chat"
     ),
+    "chat_retencao_dias": (
+        "CHAT_RETENCAO_DIAS",
+        "Dias até mensagens do chat serem arquivadas (0 = desativado)",
+        "Chat"
+    ),
+    "chat_arquivamento_comprimir": (
+        "CHAT_ARQUIVAMENTO_COMPRIMIR",
+        "Comprimir mensagens arquivadas do chat (True/False)",
+        "Chat"
+    ),
 
     # === Rate Limiting - Suporte (Chamados) ===
     "rate_limit_chamado_criar_max": (
@@ -1,9 +1,12 @@
 """
 Script para migrar schema do banco de dados para adicionar colunas de auditoria.
-Adiciona data_cadastro e data_atualizacao nas tabelas chamado, turma e outras.
+Adiciona data_cadastro e data_atualizacao nas tabelas chamado, turma e outras,
+o contador materializado nao_lidas em chat_participante e o ponteiro da
+foto de perfil (foto) em usuario, e remove indices substituidos.
 """
 from util.db_util import obter_conexao as get_connection
 from util.logger_config import logger
+from sql.chat_participante_sql import RECALCULAR_NAO_LIDAS
 import sqlite3
 
 
@@ -106,10 +109,56 @@ def migrar_schema():
                         ALTER TABLE usuario
                         ADD COLUMN data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     """)
+
+                if 'foto' not in colunas_usuario:
+                    logger.info("Adicionando coluna foto na tabela usuario")
+                    cursor.execute("""
+                        ALTER TABLE usuario
+                        ADD COLUMN foto TEXT
+                    """)
         except sqlite3.OperationalError as e:
             if "no such table" not in str(e).lower():
                 logger.warning(f"Erro ao migrar tabela usuario: {e}")
 
+        # Verificar e adicionar contador de nao lidas na tabela chat_participante
+        try:
+            cursor.execute("PRAGMA table_info(chat_participante)")
+            rows = cursor.fetchall()
+            if rows:  # Tabela existe
+                colunas_participante = [col[1] for col in rows]
+
+                if 'nao_lidas' not in colunas_participante:
+                    logger.info("Adicionando coluna nao_lidas na tabela chat_participante")
+                    cursor.execute("""
+                        ALTER TABLE chat_participante
+                        ADD COLUMN nao_lidas INTEGER NOT NULL DEFAULT 0
+                    """)
+                    cursor.execute(RECALCULAR_NAO_LIDAS)
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e).lower():
+                logger.warning(f"Erro ao migrar tabela chat_participante: {e}")
+
+        # Verificar e adicionar contador de conexoes na tabela presenca
+        try:
+            cursor.execute("PRAGMA table_info(presenca)")
+            rows = cursor.fetchall()
+            if rows:  # Tabela existe
+                colunas_presenca = [col[1] for col in rows]
+
+                if 'conexoes' not in colunas_presenca:
+                    logger.info("Adicionando coluna conexoes na tabela presenca")
+                    cursor.execute("""
+                        ALTER TABLE presenca
+                        ADD COLUMN conexoes INTEGER NOT NULL DEFAULT 0
+                    """)
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e).lower():
+                logger.warning(f"Erro ao migrar tabela presenca: {e}")
+
+        # Remover indice substituido pelo composto idx_chat_mensagem_sala_id_id
+        # (redundante: so acrescentaria uma escrita a cada mensagem inserida)
+        cursor.execute("DROP INDEX IF EXISTS idx_chat_mensagem_sala_id")
+
         conn.commit()
 
     logger.info("Migracao de schema concluida!")
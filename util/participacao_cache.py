@@ -0,0 +1,121 @@
+"""
+Cache das verificações de participação em salas de chat.
+
+Toda listagem, envio e leitura de mensagens verifica se o usuário participa
+da sala. Em salas ativas a resposta é sempre a mesma, então apenas as
+respostas positivas ficam em cache (LRU com TTL): um participante recém
+adicionado é reconhecido na hora. A remoção de um participante, a exclusão
+de uma sala e a de um usuário invalidam o cache do próprio worker (pelos
+repositórios); feitas por outro worker, deixam de valer em no máximo
+CHAT_CACHE_PARTICIPACAO_TTL_SEGUNDOS.
+
+Nas rotas, use participa_async: em cache miss, a consulta ao banco roda
+fora do event loop.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from repo import chat_participante_repo
+from util.config import CHAT_CACHE_PARTICIPACAO_TTL_SEGUNDOS, CHAT_CACHE_PARTICIPACAO_MAX
+
+
+class ParticipacaoCache:
+    """
+    Cache LRU com TTL de pares (sala_id, usuario_id) que participam da sala.
+
+    Thread-safe: utiliza Lock para sincronização de acesso ao cache.
+    """
+
+    def __init__(
+        self,
+        ttl_segundos: int = CHAT_CACHE_PARTICIPACAO_TTL_SEGUNDOS,
+        max_entradas: int = CHAT_CACHE_PARTICIPACAO_MAX
+    ):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        # (sala_id, usuario_id) -> instante de expiração (time.monotonic)
+        self._entradas: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _em_cache(self, chave: Tuple[str, int]) -> bool:
+        """Verifica se a participação está em cache e dentro do TTL."""
+        with self._lock:
+            expira_em = self._entradas.get(chave)
+            if expira_em is not None:
+                if expira_em > time.monotonic():
+                    self._entradas.move_to_end(chave)
+                    return True
+                del self._entradas[chave]
+        return False
+
+    def participa(self, sala_id: str, usuario_id: int) -> bool:
+        """
+        Verifica se o usuário participa da sala, consultando o banco só em cache miss.
+
+        Args:
+            sala_id: ID da sala
+            usuario_id: ID do usuário
+
+        Returns:
+            True se o usuário participa da sala
+        """
+        chave = (sala_id, usuario_id)
+        if self._em_cache(chave):
+            return True
+
+        if not chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id):
+            return False
+
+        with self._lock:
+            self._entradas[chave] = time.monotonic() + self.ttl_segundos
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return True
+
+    async def participa_async(self, sala_id: str, usuario_id: int) -> bool:
+        """Versão de participa para rotas: em cache miss, consulta o banco em uma thread."""
+        if self._em_cache((sala_id, usuario_id)):
+            return True
+        return await asyncio.to_thread(self.participa, sala_id, usuario_id)
+
+    def invalidar(self, sala_id: str, usuario_id: Optional[int] = None):
+        """
+        Remove do cache uma participação ou todas as participações de uma sala.
+
+        Args:
+            sala_id: ID da sala
+            usuario_id: ID do usuário (None para todos os participantes)
+        """
+        with self._lock:
+            if usuario_id is not None:
+                self._entradas.pop((sala_id, usuario_id), None)
+                return
+            for chave in [c for c in self._entradas if c[0] == sala_id]:
+                del self._entradas[chave]
+
+    def invalidar_usuario(self, usuario_id: int):
+        """
+        Remove do cache todas as participações de um usuário (ex: usuário excluído).
+
+        Args:
+            usuario_id: ID do usuário
+        """
+        with self._lock:
+            for chave in [c for c in self._entradas if c[1] == usuario_id]:
+                del self._entradas[chave]
+
+    def limpar(self):
+        """Limpa todo o cache."""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+# Instância singleton global
+participacao_cache = ParticipacaoCache()
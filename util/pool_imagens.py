@@ -0,0 +1,137 @@
+"""
+Pool de processos para o processamento de imagens (fotos de perfil).
+
+Decodificar, converter, redimensionar (LANCZOS) e codificar um JPEG com
+optimize=True consome dezenas a centenas de ms de CPU. Executado direto em
+uma rota `async def`, isso bloqueia o event loop e atrasa todas as outras
+requisições. Aqui o trabalho roda em um pool de processos dedicado:
+
+- um semáforo limita quantos processamentos ficam em andamento
+- uma fila limitada segura os demais; acima dela, FilaImagensCheia é
+  levantada na hora (melhor recusar do que acumular uploads de vários MB)
+
+As funções executadas (util.processamento_foto, leve de importar nos
+processos do pool) retornam (resultado, tempos por etapa em ms). Os
+tempos de cada etapa, a espera na fila e o total ficam em histogramas,
+exibidos no painel /admin/rate-limits.
+
+Configuração:
+    IMAGEM_POOL_PROCESSOS: processos do pool (0 = uma thread, sem pool)
+    IMAGEM_POOL_MAX_CONCORRENTES: processamentos simultâneos
+    IMAGEM_POOL_MAX_FILA: processamentos aguardando a vez
+"""
+import time
+from typing import Callable, Dict
+
+from util.config import IMAGEM_POOL_PROCESSOS, IMAGEM_POOL_MAX_CONCORRENTES, IMAGEM_POOL_MAX_FILA
+from util.histograma import HistogramaLatencia
+from util.pool_processos import PoolProcessos
+
+
+class FilaImagensCheia(Exception):
+    """Levantada quando já há processamentos demais em andamento e na fila."""
+
+
+class PoolImagens(PoolProcessos):
+    """
+    Executa o processamento de imagens fora do event loop, com limite de
+    concorrência (ver util.pool_processos) e de fila.
+    """
+
+    def __init__(
+        self,
+        processos: int = IMAGEM_POOL_PROCESSOS,
+        max_concorrentes: int = IMAGEM_POOL_MAX_CONCORRENTES,
+        max_fila: int = IMAGEM_POOL_MAX_FILA
+    ):
+        super().__init__("imagens", processos, max_concorrentes)
+        self.max_fila = max(0, max_fila)
+        # Processamentos em andamento + aguardando (todos os event loops)
+        self._pendentes = 0
+        self.recusados = 0
+        self.histogramas: Dict[str, HistogramaLatencia] = {
+            "espera": HistogramaLatencia(),
+            "total": HistogramaLatencia(),
+        }
+
+    def _registrar(self, etapa: str, milissegundos: float) -> None:
+        """Registra a duração de uma etapa, criando o histograma se necessário."""
+        with self._lock:
+            histograma = self.histogramas.get(etapa)
+            if histograma is None:
+                histograma = self.histogramas[etapa] = HistogramaLatencia()
+        histograma.registrar(milissegundos)
+
+    @property
+    def pendentes(self) -> int:
+        """Processamentos em andamento ou aguardando a vez."""
+        return self._pendentes
+
+    async def executar(self, funcao: Callable, *args):
+        """
+        Executa `funcao(*args)` no pool e registra os tempos por etapa.
+
+        Args:
+            funcao: Função de nível de módulo (precisa ser serializável) que
+                    retorna (resultado, {etapa: milissegundos})
+            *args: Argumentos da função
+
+        Returns:
+            Resultado da função (sem os tempos)
+
+        Raises:
+            FilaImagensCheia: Se a fila de espera estiver cheia
+        """
+        with self._lock:
+            if self._pendentes >= self.max_concorrentes + self.max_fila:
+                self.recusados += 1
+                raise FilaImagensCheia(
+                    f"{self._pendentes} processamento(s) de imagem pendente(s)"
+                )
+            self._pendentes += 1
+
+        inicio = time.perf_counter()
+        try:
+            async with self._obter_semaforo():
+                self._registrar("espera", (time.perf_counter() - inicio) * 1000)
+                resultado, tempos = await self._executar_no_pool(funcao, *args)
+            for etapa, milissegundos in tempos.items():
+                self._registrar(etapa, milissegundos)
+            return resultado
+        finally:
+            with self._lock:
+                self._pendentes -= 1
+            self._registrar("total", (time.perf_counter() - inicio) * 1000)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna configuração, ocupação e histogramas do pool.
+
+        Returns:
+            Dict com processos, max_concorrentes, max_fila, pendentes,
+            recusados e o retrato de cada histograma (espera, etapas e total)
+        """
+        with self._lock:
+            histogramas = dict(self.histogramas)
+        # "total" por último, depois das etapas
+        etapas = [nome for nome in histogramas if nome != "total"] + ["total"]
+        return {
+            "processos": self.processos,
+            "max_concorrentes": self.max_concorrentes,
+            "max_fila": self.max_fila,
+            "pendentes": self._pendentes,
+            "recusados": self.recusados,
+            "etapas": {nome: histogramas[nome].obter() for nome in etapas},
+        }
+
+    def limpar_estatisticas(self) -> None:
+        """Zera os histogramas e o contador de recusas."""
+        with self._lock:
+            histogramas = list(self.histogramas.values())
+            self.recusados = 0
+        for histograma in histogramas:
+            histograma.limpar()
+
+
+# Instância singleton global
+pool_imagens = PoolImagens()
@@ -0,0 +1,96 @@
+"""
+Base dos pools de processos (senhas e imagens).
+
+Trabalho de CPU (bcrypt, Pillow) executado direto em uma rota `async def`
+bloqueia o event loop. As subclasses (util.pool_senhas, util.pool_imagens)
+o enviam a um pool de processos dedicado; esta base cuida do que é comum:
+
+- o ProcessPoolExecutor, criado no primeiro uso e recriado se tiver sido
+  encerrado (ex: entre ciclos de lifespan nos testes)
+- o método de início dos processos: nunca fork. O servidor tem threads
+  (tarefas periódicas, to_thread) e um fork pode herdar um lock travado;
+  o forkserver cria os processos a partir de um servidor limpo (spawn só
+  onde forkserver não existe). As funções executadas devem ficar em
+  módulos leves, importados por cada processo do pool
+- um semáforo por event loop, que limita as execuções em andamento
+- processos=0: executa em uma thread, sem pool (testes, ambientes restritos)
+"""
+import asyncio
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from util.logger_config import logger
+
+# Método de início dos processos dos pools (ver docstring do módulo)
+METODO_INICIO = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class PoolProcessos:
+    """
+    Executa funções fora do event loop, em um pool de processos, com
+    limite de concorrência.
+
+    Args:
+        nome: Nome do pool nos logs (ex: "senhas")
+        processos: Processos do pool (0 = uma thread, sem pool)
+        max_concorrentes: Execuções simultâneas em andamento
+    """
+
+    def __init__(self, nome: str, processos: int, max_concorrentes: int):
+        self.nome = nome
+        self.processos = processos
+        self.max_concorrentes = max(1, max_concorrentes)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Um semáforo por event loop (asyncio.Semaphore fica preso ao loop)
+        self._semaforos: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _obter_executor(self) -> ProcessPoolExecutor:
+        """Retorna o pool de processos, criando-o se necessário."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processos,
+                    mp_context=multiprocessing.get_context(METODO_INICIO),
+                )
+                logger.info(f"Pool de {self.nome} iniciado: {self.processos} processo(s) ({METODO_INICIO})")
+            return self._executor
+
+    def _obter_semaforo(self) -> asyncio.Semaphore:
+        """Retorna o semáforo do event loop atual."""
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concorrentes)
+        return semaforo
+
+    async def _executar_no_pool(self, funcao: Callable, *args):
+        """
+        Executa `funcao(*args)` no pool (ou em uma thread, com processos=0).
+
+        Quem chama já deve ter o semáforo do event loop.
+
+        Args:
+            funcao: Função de nível de módulo (precisa ser serializável)
+            *args: Argumentos da função
+
+        Returns:
+            Resultado da função
+        """
+        if self.processos <= 0:
+            return await asyncio.to_thread(funcao, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._obter_executor(), funcao, *args)
+
+    def encerrar(self) -> None:
+        """Encerra o pool de processos (um novo é criado se for usado de novo)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info(f"Pool de {self.nome} encerrado")
@@ -0,0 +1,82 @@
+"""
+Pool de processos para hash e verificação de senhas (bcrypt).
+
+Cada operação bcrypt leva de 100 a 300 ms de CPU. Executada direto em uma
+rota `async def`, ela bloqueia o event loop: uma rajada de logins congela
+todas as conexões SSE do chat. Aqui as operações rodam em um pool de
+processos dedicado, e um semáforo limita quantas ficam em andamento ao
+mesmo tempo (as demais aguardam sem bloquear o loop). As funções
+executadas ficam em util.hash_senha, leve de importar nos processos do pool.
+
+As latências (espera na fila + execução) de cada operação ficam em
+histogramas, exibidos no painel /admin/rate-limits.
+
+Configuração:
+    SENHA_POOL_PROCESSOS: processos do pool (0 = uma thread, sem pool)
+    SENHA_POOL_MAX_CONCORRENTES: operações simultâneas em andamento
+"""
+import time
+from typing import Callable
+
+from util.config import SENHA_POOL_PROCESSOS, SENHA_POOL_MAX_CONCORRENTES
+from util.histograma import HistogramaLatencia
+from util.pool_processos import PoolProcessos
+
+
+class PoolSenhas(PoolProcessos):
+    """
+    Executa funções de senha fora do event loop, com limite de concorrência
+    (ver util.pool_processos).
+    """
+
+    def __init__(
+        self,
+        processos: int = SENHA_POOL_PROCESSOS,
+        max_concorrentes: int = SENHA_POOL_MAX_CONCORRENTES
+    ):
+        super().__init__("senhas", processos, max_concorrentes)
+        self.histogramas = {
+            "hash": HistogramaLatencia(),
+            "verificacao": HistogramaLatencia(),
+        }
+
+    async def executar(self, operacao: str, funcao: Callable, *args):
+        """
+        Executa `funcao(*args)` no pool e registra a latência da operação.
+
+        Args:
+            operacao: Nome do histograma ("hash" ou "verificacao")
+            funcao: Função de nível de módulo (precisa ser serializável)
+            *args: Argumentos da função
+
+        Returns:
+            Resultado da função
+        """
+        inicio = time.perf_counter()
+        try:
+            async with self._obter_semaforo():
+                return await self._executar_no_pool(funcao, *args)
+        finally:
+            self.histogramas[operacao].registrar((time.perf_counter() - inicio) * 1000)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna configuração e histogramas do pool.
+
+        Returns:
+            Dict com processos, max_concorrentes e o retrato de cada histograma
+        """
+        return {
+            "processos": self.processos,
+            "max_concorrentes": self.max_concorrentes,
+            "operacoes": {nome: h.obter() for nome, h in self.histogramas.items()},
+        }
+
+    def limpar_estatisticas(self) -> None:
+        """Zera os histogramas."""
+        for histograma in self.histogramas.values():
+            histograma.limpar()
+
+
+# Instância singleton global
+pool_senhas = PoolSenhas()
@@ -0,0 +1,274 @@
+"""
+Serviço de presença do chat (online / visto por último).
+
+A presença é alimentada pelo próprio stream SSE do chat: a conexão registra
+um heartbeat ao abrir e a cada PRESENCA_HEARTBEAT_SEGUNDOS. O backend conta
+as conexões abertas de cada usuário (somando todos os workers) e a
+desconexão limpa da última marca o usuário como offline. Conexões perdidas
+sem desconexão expiram depois de PRESENCA_TTL_SEGUNDOS sem heartbeat.
+
+Mudanças de presença são publicadas como eventos SSE {"tipo": "presenca"}
+para os contatos conectados, sem polling no cliente. Com o backend SQLite
+(padrão) o estado é compartilhado entre workers: uma varredura periódica
+expira heartbeats vencidos e repassa às conexões locais as mudanças feitas
+pelos outros processos.
+"""
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from model.presenca_model import Presenca
+from repo import chat_participante_repo, presenca_repo
+from util.chat_manager import gerenciador_chat
+from util.config import (
+    PRESENCA_BACKEND,
+    PRESENCA_TTL_SEGUNDOS,
+    PRESENCA_VARREDURA_SEGUNDOS,
+)
+from util.datetime_util import agora
+from util.logger_config import logger
+from util.tarefas_periodicas import registrar_tarefa
+
+# Sobreposição entre varreduras para não perder mudanças gravadas durante a anterior
+_SOBREPOSICAO_VARREDURA = timedelta(seconds=1)
+
+
+class BackendPresencaMemoria:
+    """
+    Backend de presença em memória, para execução com um único processo.
+
+    Tem a mesma interface do repositório presenca_repo.
+    """
+
+    def __init__(self):
+        self._presencas: Dict[int, Presenca] = {}
+        self._conexoes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar_heartbeat(self, usuario_id: int) -> bool:
+        instante = agora()
+        with self._lock:
+            atual = self._presencas.get(usuario_id)
+            if atual and atual.online:
+                atual.ultimo_acesso = instante
+                return False
+            self._presencas[usuario_id] = Presenca(usuario_id, True, instante, instante)
+            return True
+
+    def registrar_conexao(self, usuario_id: int) -> bool:
+        with self._lock:
+            self._conexoes[usuario_id] = self._conexoes.get(usuario_id, 0) + 1
+        return self.registrar_heartbeat(usuario_id)
+
+    def registrar_desconexao(self, usuario_id: int) -> bool:
+        instante = agora()
+        with self._lock:
+            restantes = max(self._conexoes.pop(usuario_id, 0) - 1, 0)
+            if restantes:
+                self._conexoes[usuario_id] = restantes
+                return False
+            atual = self._presencas.get(usuario_id)
+            if not atual or not atual.online:
+                return False
+            self._presencas[usuario_id] = Presenca(usuario_id, False, instante, instante)
+            return True
+
+    def expirar(self, ttl_segundos: int) -> List[int]:
+        instante = agora()
+        limite = instante - timedelta(seconds=ttl_segundos)
+        expirados = []
+        with self._lock:
+            for presenca in self._presencas.values():
+                if presenca.online and presenca.ultimo_acesso < limite:
+                    presenca.online = False
+                    presenca.alterado_em = instante
+                    self._conexoes.pop(presenca.usuario_id, None)
+                    expirados.append(presenca.usuario_id)
+        return expirados
+
+    def obter_por_usuarios(self, usuario_ids: Iterable[int]) -> Dict[int, Presenca]:
+        with self._lock:
+            return {
+                usuario_id: self._presencas[usuario_id]
+                for usuario_id in usuario_ids
+                if usuario_id in self._presencas
+            }
+
+    def listar_alterados_desde(self, instante: datetime) -> List[Presenca]:
+        with self._lock:
+            alterados = [p for p in self._presencas.values() if p.alterado_em > instante]
+        return sorted(alterados, key=lambda p: p.alterado_em)
+
+
+def criar_backend(nome: str):
+    """
+    Cria o backend de presença configurado.
+
+    Args:
+        nome: "sqlite" (tabela presenca, compartilhada entre workers) ou "memoria"
+
+    Returns:
+        Objeto com a interface de presenca_repo
+    """
+    if nome == "memoria":
+        return BackendPresencaMemoria()
+    if nome != "sqlite":
+        logger.warning(f"[Presença] Backend '{nome}' desconhecido, usando sqlite")
+    return presenca_repo
+
+
+class ServicoPresenca:
+    """
+    Mantém a presença dos usuários do chat e publica as mudanças via SSE.
+
+    As operações de backend rodam em thread (asyncio.to_thread) para não
+    bloquear o event loop; falhas do backend são registradas em log e nunca
+    derrubam o stream do chat.
+    """
+
+    def __init__(self, backend=None, ttl_segundos: int = PRESENCA_TTL_SEGUNDOS):
+        self.backend = backend if backend is not None else criar_backend(PRESENCA_BACKEND)
+        self.ttl_segundos = ttl_segundos
+        # Último estado publicado por este worker (apenas usuários online)
+        self._publicados: Dict[int, bool] = {}
+        self._ultima_varredura = agora()
+
+    async def _executar(self, funcao, *args):
+        """Executa uma operação do backend em thread, registrando falhas."""
+        try:
+            return await asyncio.to_thread(funcao, *args)
+        except sqlite3.Error as e:
+            logger.error(f"[Presença] Erro no backend de presença: {e}")
+            return None
+
+    async def registrar_conexao(self, usuario_id: int):
+        """
+        Registra a abertura de um stream SSE (conta a conexão e faz o heartbeat).
+
+        Args:
+            usuario_id: ID do usuário
+        """
+        if await self._executar(self.backend.registrar_conexao, usuario_id):
+            await self._publicar(Presenca(usuario_id, True, agora()))
+
+    async def registrar_heartbeat(self, usuario_id: int):
+        """
+        Registra um heartbeat (keepalive do stream SSE).
+
+        Args:
+            usuario_id: ID do usuário
+        """
+        if await self._executar(self.backend.registrar_heartbeat, usuario_id):
+            await self._publicar(Presenca(usuario_id, True, agora()))
+
+    async def registrar_desconexao(self, usuario_id: int):
+        """
+        Registra o fechamento de um stream SSE; o usuário fica offline ao fechar
+        a última conexão, considerando as de todos os workers.
+
+        Args:
+            usuario_id: ID do usuário
+        """
+        if await self._executar(self.backend.registrar_desconexao, usuario_id):
+            await self._publicar(Presenca(usuario_id, False, agora()))
+
+    async def obter_presencas(self, usuario_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        Obtém a presença de vários usuários com uma única consulta ao backend.
+
+        Um usuário só é considerado online se o último heartbeat estiver dentro
+        do TTL, mesmo que a varredura ainda não o tenha expirado.
+
+        Args:
+            usuario_ids: IDs dos usuários
+
+        Returns:
+            Dicionário usuario_id -> {"online": bool, "ultimo_acesso": str ISO ou None}
+        """
+        ids = list(dict.fromkeys(usuario_ids))
+        if not ids:
+            return {}
+
+        presencas = await self._executar(self.backend.obter_por_usuarios, ids) or {}
+        limite = agora() - timedelta(seconds=self.ttl_segundos)
+
+        resultado = {}
+        for usuario_id in ids:
+            presenca = presencas.get(usuario_id)
+            if presenca is None:
+                resultado[usuario_id] = {"online": False, "ultimo_acesso": None}
+                continue
+            resultado[usuario_id] = {
+                "online": presenca.online and presenca.ultimo_acesso >= limite,
+                "ultimo_acesso": presenca.ultimo_acesso.isoformat() if presenca.ultimo_acesso else None
+            }
+        return resultado
+
+    async def varrer(self) -> int:
+        """
+        Expira heartbeats vencidos e publica as mudanças desde a última varredura.
+
+        Inclui mudanças feitas por outros workers no backend compartilhado;
+        eventos já publicados por este worker não são repetidos.
+
+        Returns:
+            Número de eventos de presença publicados
+        """
+        inicio = agora()
+        await self._executar(self.backend.expirar, self.ttl_segundos)
+        alterados = await self._executar(
+            self.backend.listar_alterados_desde,
+            self._ultima_varredura - _SOBREPOSICAO_VARREDURA
+        ) or []
+        self._ultima_varredura = inicio
+
+        publicados = 0
+        for presenca in alterados:
+            if await self._publicar(presenca):
+                publicados += 1
+        return publicados
+
+    async def _publicar(self, presenca: Presenca) -> bool:
+        """
+        Envia o evento de presença aos contatos conectados a este worker.
+
+        Returns:
+            True se o evento foi publicado, False se já havia sido
+        """
+        if self._publicados.get(presenca.usuario_id, False) == presenca.online:
+            return False
+        if presenca.online:
+            self._publicados[presenca.usuario_id] = True
+        else:
+            self._publicados.pop(presenca.usuario_id, None)
+
+        contatos = await self._executar(chat_participante_repo.listar_contatos, presenca.usuario_id) or []
+        destinos = [c for c in contatos if gerenciador_chat.esta_conectado(c)]
+        if destinos:
+            await gerenciador_chat.enviar_para_usuarios(destinos, {
+                "tipo": "presenca",
+                "usuario_id": presenca.usuario_id,
+                "online": presenca.online,
+                "ultimo_acesso": presenca.ultimo_acesso.isoformat() if presenca.ultimo_acesso else None
+            })
+        return True
+
+    def limpar(self):
+        """Esquece o estado publicado por este worker (usado em testes)."""
+        self._publicados.clear()
+        self._ultima_varredura = agora()
+
+
+def registrar_tarefa_presenca():
+    """Registra a varredura periódica de presença."""
+    registrar_tarefa(
+        "presenca_chat",
+        servico_presenca.varrer,
+        intervalo_segundos=PRESENCA_VARREDURA_SEGUNDOS,
+    )
+
+
+# Instância singleton global
+servico_presenca = ServicoPresenca()
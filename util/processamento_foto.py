@@ -0,0 +1,167 @@
+"""
+Processamento das fotos de perfil (Pillow), sem estado da aplicação.
+
+Decodificação, redimensionamento, codificação e gravação das fotos e de
+suas versões reduzidas. É o código executado nos processos do pool de
+imagens: o módulo importa apenas Pillow e a biblioteca padrão, para que
+cada processo o carregue rápido, sem banco, configurações ou logger.
+util.foto_util reexporta estas funções e cuida do restante (URLs, banco,
+migração e coleta de órfãs).
+"""
+import hashlib
+import io
+import os
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterable, Union
+
+from PIL import Image, features
+
+FORMATO_FOTO = "JPEG"
+QUALIDADE_FOTO = 90
+
+# Versões reduzidas (lado máximo em pixels), geradas a cada upload
+TAMANHOS_FOTO = (32, 64, 128, 256)
+# Extensão -> (formato do Pillow, opções de gravação); WebP só se o Pillow suportar
+FORMATOS_VARIANTES = {"jpg": ("JPEG", {"quality": 85, "optimize": True})}
+if features.check("webp"):
+    FORMATOS_VARIANTES["webp"] = ("WEBP", {"quality": 80, "method": 4})
+
+
+def calcular_hash(conteudo: bytes) -> str:
+    """SHA-256 (hexadecimal) do JPG: o nome da foto no armazenamento."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def caminho_foto_na_pasta(foto: str, pasta: Path) -> Path:
+    """Path de uma foto a partir do hash: {pasta}/ab/cd/abcd....jpg"""
+    return pasta / foto[:2] / foto[2:4] / f"{foto}.jpg"
+
+
+def caminho_variante(foto: Path, tamanho: int, extensao: str = "jpg") -> Path:
+    """
+    Retorna o Path da versão reduzida de uma foto (ex: abcd...ef.jpg -> abcd...ef-64.webp).
+
+    Args:
+        foto: Arquivo da foto original
+        tamanho: Um dos TAMANHOS_FOTO
+        extensao: "jpg" ou "webp"
+    """
+    return foto.with_name(f"{foto.stem}-{tamanho}.{extensao}")
+
+
+def gravar_atomico(destino: Path, conteudo: bytes) -> None:
+    """Grava em um temporário e renomeia: leitores nunca veem o arquivo pela metade."""
+    temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    temporario.write_bytes(conteudo)
+    os.replace(temporario, destino)
+
+
+def gerar_variantes(imagem: Image.Image, foto: Path, tamanhos: Iterable[int] = TAMANHOS_FOTO) -> int:
+    """
+    Grava as versões reduzidas de uma imagem ao lado do arquivo da foto.
+
+    Imagens menores que um tamanho não são ampliadas (a variante fica com o
+    tamanho original).
+
+    Args:
+        imagem: Imagem RGB já carregada
+        foto: Arquivo da foto original (define o nome das variantes)
+        tamanhos: Tamanhos a gerar
+
+    Returns:
+        Quantidade de arquivos gravados
+    """
+    gravados = 0
+    # Do maior para o menor: cada redução parte da anterior (menos pixels)
+    reduzida = imagem
+    for tamanho in sorted(tamanhos, reverse=True):
+        reduzida = reduzida.copy()
+        reduzida.thumbnail((tamanho, tamanho), Image.Resampling.LANCZOS)
+        for extensao, (formato, opcoes) in FORMATOS_VARIANTES.items():
+            reduzida.save(caminho_variante(foto, tamanho, extensao), format=formato, **opcoes)
+            gravados += 1
+    return gravados
+
+
+def processar_foto_cropada(
+    origem: Union[Path, BinaryIO], tamanho_max: int, pasta: Path
+) -> tuple[str, dict]:
+    """
+    Decodifica, converte para RGB, redimensiona e grava a foto como JPG no
+    armazenamento por hash, junto com as versões reduzidas (TAMANHOS_FOTO).
+
+    Executada no pool de imagens (processo separado): não lê configurações,
+    não acessa o banco nem escreve no log, e mede o tempo de cada etapa.
+    Os argumentos vêm de util.foto_util._argumentos_processamento.
+
+    JPEGs com o dobro ou mais do tamanho final são decodificados já em escala
+    reduzida (draft: 1/2, 1/4 ou 1/8), o que corta tempo e memória da
+    decodificação; o LANCZOS do redimensionamento faz o ajuste fino.
+
+    Args:
+        origem: Arquivo da imagem enviada (Path ou arquivo binário aberto)
+        tamanho_max: Largura/altura máxima em pixels
+        pasta: Raiz do armazenamento de fotos
+
+    Returns:
+        (hash da foto, {etapa: milissegundos}) para decodificacao, conversao,
+        redimensionamento, codificacao, variantes e gravacao
+
+    Raises:
+        OSError, UnidentifiedImageError, ValueError: imagem inválida ou erro de I/O
+    """
+    tempos = {}
+    inicio = time.perf_counter()
+
+    def medir(etapa: str) -> None:
+        nonlocal inicio
+        agora = time.perf_counter()
+        tempos[etapa] = (agora - inicio) * 1000
+        inicio = agora
+
+    # Decodificar com Pillow (load força a decodificação aqui)
+    imagem = Image.open(origem)
+    if imagem.format == "JPEG":
+        # Sem efeito se a imagem tiver menos que o dobro do tamanho final
+        imagem.draft("RGB", (tamanho_max, tamanho_max))
+    imagem.load()
+    medir("decodificacao")
+
+    # Converter para RGB se necessário (remove canal alpha)
+    if imagem.mode in ("RGBA", "LA", "P"):
+        # Criar fundo branco
+        fundo: Image.Image = Image.new("RGB", imagem.size, (255, 255, 255))
+        if imagem.mode == "P":
+            imagem = imagem.convert("RGBA")
+        fundo.paste(imagem, mask=imagem.split()[-1] if "A" in imagem.mode else None)
+        imagem = fundo
+    elif imagem.mode != "RGB":
+        imagem = imagem.convert("RGB")
+    medir("conversao")
+
+    # Redimensionar se necessário (thumbnail mantém o aspect ratio)
+    if imagem.width > tamanho_max or imagem.height > tamanho_max:
+        imagem.thumbnail((tamanho_max, tamanho_max), Image.Resampling.LANCZOS)
+    medir("redimensionamento")
+
+    # Codificar como JPG; o hash do conteúdo é o nome do arquivo
+    buffer = io.BytesIO()
+    imagem.save(buffer, format=FORMATO_FOTO, quality=QUALIDADE_FOTO, optimize=True)
+    conteudo = buffer.getvalue()
+    foto = calcular_hash(conteudo)
+    destino = caminho_foto_na_pasta(foto, pasta)
+    medir("codificacao")
+
+    try:
+        # Foto idêntica já gravada: renovar o mtime a protege da coleta de órfãs
+        os.utime(destino)
+    except FileNotFoundError:
+        # Versões reduzidas antes da foto: quem encontra a foto encontra as variantes
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        gerar_variantes(imagem, destino)
+        medir("variantes")
+        gravar_atomico(destino, conteudo)
+        medir("gravacao")
+
+    return foto, tempos
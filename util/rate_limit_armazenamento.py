@@ -0,0 +1,333 @@
+"""
+Armazenamento do estado dos rate limiters.
+
+O RateLimiter (GCRA) guarda um único float por identificador, o TAT
+(theoretical arrival time). Este módulo define onde esse valor fica:
+
+    - ArmazenamentoMemoria: dicionário LRU no próprio processo (padrão).
+      Cada worker tem o seu, então com N workers o limite efetivo é N vezes
+      o configurado.
+    - ArmazenamentoSQLite: arquivo SQLite (WAL) compartilhado por todos os
+      workers da máquina, sem serviço externo. A decisão é uma única
+      instrução UPSERT ... RETURNING, atômica entre processos.
+
+Escolha com RATE_LIMIT_BACKEND ("memoria" ou "sqlite").
+"""
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+from util.config import RATE_LIMIT_BACKEND, RATE_LIMIT_DB_PATH
+from util.logger_config import logger
+
+# Identificadores inativos removidos por chamada de consumir() (memória)
+_REMOCOES_POR_CONSUMO = 8
+
+# Tolerância para erros de arredondamento de ponto flutuante
+EPSILON = 1e-9
+
+
+class ArmazenamentoLimiter(ABC):
+    """
+    Interface dos armazenamentos de rate limit.
+
+    Classe abstrata: um backend que não implementa todos os métodos falha ao
+    ser instanciado, e não na primeira requisição.
+
+    Attributes:
+        compartilhado: True se o estado é visto por todos os processos. Nesse
+            caso os instantes usam o relógio de parede (comum aos workers e
+            persistente entre reinícios) em vez do relógio monotônico.
+    """
+
+    compartilhado = False
+
+    @abstractmethod
+    def consumir(self, chave: str, agora: float, intervalo: float, janela: float) -> bool:
+        """
+        Registra uma tentativa se couber no limite (passo do GCRA, atômico).
+
+        Args:
+            chave: Identificador (geralmente IP)
+            agora: Instante atual em segundos
+            intervalo: Intervalo de emissão (janela / max_tentativas)
+            janela: Tamanho da janela em segundos
+
+        Returns:
+            True se permitida, False se bloqueada
+        """
+
+    @abstractmethod
+    def obter(self, chave: str) -> Optional[float]:
+        """Retorna o TAT do identificador ou None se não houver registro."""
+
+    @abstractmethod
+    def remover(self, chave: Optional[str] = None) -> None:
+        """Remove um identificador ou, se None, todos."""
+
+    @abstractmethod
+    def remover_inativos(self, agora: float) -> int:
+        """Remove identificadores com TAT no passado (balde cheio)."""
+
+    @property
+    @abstractmethod
+    def tentativas(self) -> Mapping:
+        """Visão somente leitura identificador -> TAT."""
+
+
+class ArmazenamentoMemoria(ArmazenamentoLimiter):
+    """
+    Estado em um dicionário LRU no próprio processo.
+
+    Os identificadores inativos são removidos aos poucos do início da LRU a
+    cada consumo, e acima de `max_identificadores` descarta-se o usado há
+    mais tempo.
+    """
+
+    def __init__(self, max_identificadores: int):
+        self.max_identificadores = max_identificadores
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remover_inicio_inativo(self, agora: float, limite: int) -> None:
+        removidos = 0
+        while self._tats and removidos < limite:
+            chave, tat = next(iter(self._tats.items()))
+            if tat > agora:
+                break
+            del self._tats[chave]
+            removidos += 1
+
+    def consumir(self, chave: str, agora: float, intervalo: float, janela: float) -> bool:
+        with self._lock:
+            novo_tat = max(self._tats.get(chave, agora), agora) + intervalo
+            if novo_tat - agora > janela + EPSILON:
+                return False
+
+            self._tats[chave] = novo_tat
+            self._tats.move_to_end(chave)
+
+            self._remover_inicio_inativo(agora, _REMOCOES_POR_CONSUMO)
+            while len(self._tats) > self.max_identificadores:
+                self._tats.popitem(last=False)
+        return True
+
+    def obter(self, chave: str) -> Optional[float]:
+        return self._tats.get(chave)
+
+    def remover(self, chave: Optional[str] = None) -> None:
+        with self._lock:
+            if chave is None:
+                self._tats.clear()
+            else:
+                self._tats.pop(chave, None)
+
+    def remover_inativos(self, agora: float) -> int:
+        with self._lock:
+            inativos = [c for c, tat in self._tats.items() if tat <= agora]
+            for chave in inativos:
+                del self._tats[chave]
+        return len(inativos)
+
+    @property
+    def tentativas(self) -> Mapping:
+        return self._tats
+
+
+# =============================================================================
+# SQLite compartilhado
+# =============================================================================
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS rate_limit (
+    limiter TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    tat REAL NOT NULL,
+    PRIMARY KEY (limiter, chave)
+) WITHOUT ROWID
+"""
+
+# Passo do GCRA em uma instrução: só grava (e só retorna linha) se a
+# tentativa couber na janela. Sem linha retornada = bloqueado.
+CONSUMIR = """
+INSERT INTO rate_limit (limiter, chave, tat)
+VALUES (:limiter, :chave, :agora + :intervalo)
+ON CONFLICT (limiter, chave) DO UPDATE
+SET tat = max(tat, :agora) + :intervalo
+WHERE max(tat, :agora) + :intervalo - :agora <= :janela + :epsilon
+RETURNING tat
+"""
+
+OBTER = "SELECT tat FROM rate_limit WHERE limiter = ? AND chave = ?"
+LISTAR = "SELECT chave, tat FROM rate_limit WHERE limiter = ?"
+CONTAR = "SELECT COUNT(*) FROM rate_limit WHERE limiter = ?"
+REMOVER = "DELETE FROM rate_limit WHERE limiter = ? AND chave = ?"
+REMOVER_TODOS = "DELETE FROM rate_limit WHERE limiter = ?"
+REMOVER_INATIVOS = "DELETE FROM rate_limit WHERE limiter = ? AND tat <= ?"
+
+_conexoes = threading.local()
+
+
+def _obter_conexao(caminho: str) -> sqlite3.Connection:
+    """
+    Retorna a conexão persistente desta thread para o arquivo de rate limit.
+
+    A conexão fica aberta (sem custo de abertura por requisição), em
+    autocommit e com WAL + synchronous=NORMAL: cada decisão é uma escrita no
+    WAL, sem fsync por commit.
+    """
+    # Conexões herdadas via fork não podem ser usadas pelo processo filho
+    conexoes = getattr(_conexoes, "por_caminho", None)
+    if conexoes is None or getattr(_conexoes, "pid", None) != os.getpid():
+        conexoes = _conexoes.por_caminho = {}
+        _conexoes.pid = os.getpid()
+
+    conn = conexoes.get(caminho)
+    if conn is None:
+        conn = sqlite3.connect(caminho, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(CRIAR_TABELA)
+        conexoes[caminho] = conn
+    return conn
+
+
+class _VisaoTentativasSQLite(Mapping):
+    """Visão somente leitura (identificador -> TAT) de um limiter no SQLite."""
+
+    def __init__(self, armazenamento: "ArmazenamentoSQLite"):
+        self._armazenamento = armazenamento
+
+    def _conn(self) -> sqlite3.Connection:
+        return _obter_conexao(self._armazenamento.caminho)
+
+    def __getitem__(self, chave: str) -> float:
+        tat = self._armazenamento.obter(chave)
+        if tat is None:
+            raise KeyError(chave)
+        return tat
+
+    def __iter__(self) -> Iterator[str]:
+        linhas = self._conn().execute(LISTAR, (self._armazenamento.namespace,)).fetchall()
+        return iter([chave for chave, _ in linhas])
+
+    def __len__(self) -> int:
+        return self._conn().execute(CONTAR, (self._armazenamento.namespace,)).fetchone()[0]
+
+
+class ArmazenamentoSQLite(ArmazenamentoLimiter):
+    """
+    Estado em um arquivo SQLite compartilhado pelos workers da máquina.
+
+    Otimizações do caminho quente:
+        - uma instrução por decisão (UPSERT ... RETURNING) em conexão
+          persistente por thread;
+        - identificadores bloqueados são lembrados localmente até o instante
+          em que voltam a ter tentativa, por no máximo
+          BLOQUEIO_LOCAL_MAX_SEGUNDOS: rajadas de um mesmo IP são rejeitadas
+          sem acessar o banco. O limite existe porque o TAT só diminui por
+          remover(), que limpa a memória apenas do worker que o executou;
+          nos demais, um reset pelo admin vale em no máximo esse tempo;
+        - a remoção de inativos é feita em lote, no máximo uma vez por janela.
+    """
+
+    compartilhado = True
+
+    # Máximo de bloqueios lembrados localmente
+    MAX_BLOQUEIOS_LOCAIS = 10_000
+
+    # Tempo máximo de um bloqueio lembrado localmente sem reler o banco
+    BLOQUEIO_LOCAL_MAX_SEGUNDOS = 2.0
+
+    def __init__(self, namespace: str, caminho: str = RATE_LIMIT_DB_PATH):
+        self.namespace = namespace
+        self.caminho = caminho
+        self._bloqueados: dict[str, float] = {}
+        self._proxima_limpeza = 0.0
+        self._lock = threading.Lock()
+
+    def consumir(self, chave: str, agora: float, intervalo: float, janela: float) -> bool:
+        liberado_em = self._bloqueados.get(chave)
+        if liberado_em is not None:
+            if agora < liberado_em:
+                return False
+            self._bloqueados.pop(chave, None)
+
+        conn = _obter_conexao(self.caminho)
+        linha = conn.execute(CONSUMIR, {
+            "limiter": self.namespace,
+            "chave": chave,
+            "agora": agora,
+            "intervalo": intervalo,
+            "janela": janela,
+            "epsilon": EPSILON,
+        }).fetchone()
+
+        if agora >= self._proxima_limpeza:
+            self._proxima_limpeza = agora + janela
+            conn.execute(REMOVER_INATIVOS, (self.namespace, agora))
+
+        if linha is not None:
+            return True
+
+        # Bloqueado: lembrar até a próxima tentativa possível (ou até reler o banco)
+        tat = self.obter(chave)
+        if tat is not None:
+            with self._lock:
+                if len(self._bloqueados) >= self.MAX_BLOQUEIOS_LOCAIS:
+                    self._bloqueados = {c: t for c, t in self._bloqueados.items() if t > agora}
+                if len(self._bloqueados) < self.MAX_BLOQUEIOS_LOCAIS:
+                    self._bloqueados[chave] = min(
+                        tat + intervalo - janela, agora + self.BLOQUEIO_LOCAL_MAX_SEGUNDOS
+                    )
+        return False
+
+    def obter(self, chave: str) -> Optional[float]:
+        linha = _obter_conexao(self.caminho).execute(OBTER, (self.namespace, chave)).fetchone()
+        return linha[0] if linha else None
+
+    def remover(self, chave: Optional[str] = None) -> None:
+        conn = _obter_conexao(self.caminho)
+        with self._lock:
+            if chave is None:
+                conn.execute(REMOVER_TODOS, (self.namespace,))
+                self._bloqueados.clear()
+            else:
+                conn.execute(REMOVER, (self.namespace, chave))
+                self._bloqueados.pop(chave, None)
+
+    def remover_inativos(self, agora: float) -> int:
+        cursor = _obter_conexao(self.caminho).execute(REMOVER_INATIVOS, (self.namespace, agora))
+        return cursor.rowcount
+
+    @property
+    def tentativas(self) -> Mapping:
+        return _VisaoTentativasSQLite(self)
+
+
+def criar_armazenamento(
+    namespace: str,
+    max_identificadores: int,
+    backend: Optional[str] = None
+) -> ArmazenamentoLimiter:
+    """
+    Cria o armazenamento configurado para um limiter.
+
+    Args:
+        namespace: Nome do limiter (separa os limiters no armazenamento compartilhado)
+        max_identificadores: Limite de identificadores do armazenamento em memória
+        backend: "memoria" ou "sqlite" (padrão: RATE_LIMIT_BACKEND)
+
+    Returns:
+        Instância de ArmazenamentoLimiter
+    """
+    backend = (backend or RATE_LIMIT_BACKEND).lower()
+    if backend == "sqlite":
+        return ArmazenamentoSQLite(namespace)
+    if backend != "memoria":
+        logger.warning(f"Backend de rate limit '{backend}' desconhecido, usando memória")
+    return ArmazenamentoMemoria(max_identificadores)
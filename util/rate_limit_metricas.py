@@ -0,0 +1,253 @@
+"""
+Métricas dos rate limiters.
+
+Cada limiter mantém, em memória e com tamanho fixo:
+    - totais de tentativas permitidas e bloqueadas;
+    - uma série por minuto (últimos RATE_LIMIT_METRICAS_MINUTOS minutos)
+      com a taxa de bloqueio ao longo do tempo;
+    - bloqueios por rota (template da rota, ex: "POST /login");
+    - os maiores infratores, pelo algoritmo Space-Saving: os identificadores
+      mais bloqueados com memória O(k), sem manter uma lista por IP.
+
+A rota é obtida do escopo da requisição atual, exposto pelo
+MiddlewareRotaRateLimit. As métricas são por processo: com vários workers,
+cada um exibe as suas.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from util.config import RATE_LIMIT_METRICAS_TOP, RATE_LIMIT_METRICAS_MINUTOS
+
+# Máximo de rotas distintas contadas por limiter; as demais somam em ROTA_OUTRAS
+MAX_ROTAS = 200
+
+ROTA_OUTRAS = "(outras)"
+ROTA_SEM_REQUISICAO = "(fora de requisição)"
+ROTA_DESCONHECIDA = "(sem rota)"
+
+_escopo_requisicao: ContextVar[Optional[dict]] = ContextVar("escopo_requisicao_rate_limit", default=None)
+
+
+def _agora() -> float:
+    """Relógio de parede usado nas séries (isolado para testes)."""
+    return time.time()
+
+
+def _taxa(bloqueadas: int, permitidas: int) -> float:
+    """Percentual de tentativas bloqueadas, com uma casa decimal."""
+    total = bloqueadas + permitidas
+    return round(bloqueadas / total * 100, 1) if total else 0.0
+
+
+def obter_rota_atual() -> str:
+    """
+    Retorna a rota da requisição em andamento, ex: "POST /admin/usuarios/editar/{id}".
+
+    Usa o template da rota (e não o caminho) para que IDs não multipliquem
+    as entradas.
+    """
+    escopo = _escopo_requisicao.get()
+    if escopo is None:
+        return ROTA_SEM_REQUISICAO
+    caminho = getattr(escopo.get("route"), "path", None) or ROTA_DESCONHECIDA
+    metodo = escopo.get("method")
+    return f"{metodo} {caminho}" if metodo else caminho
+
+
+class MiddlewareRotaRateLimit:
+    """
+    Middleware ASGI que expõe o escopo da requisição às métricas de rate limit.
+
+    O roteador grava a rota encontrada no mesmo escopo, então o limiter,
+    chamado dentro da rota, sabe qual template foi acionado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _escopo_requisicao.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _escopo_requisicao.reset(token)
+
+
+class SpaceSaving:
+    """
+    Top-k aproximado de identificadores (algoritmo Space-Saving).
+
+    Guarda no máximo `capacidade` contadores. Um identificador novo com a
+    tabela cheia substitui o de menor contagem e herda essa contagem como
+    erro. A contagem exibida nunca é menor que a real e supera a real em no
+    máximo `erro`; todo identificador com mais de N/capacidade ocorrências
+    (N = total observado) está garantidamente na tabela.
+    """
+
+    def __init__(self, capacidade: int):
+        self.capacidade = capacidade
+        # identificador -> [contagem, erro]
+        self._contadores: dict[str, list[int]] = {}
+
+    def adicionar(self, identificador: str) -> None:
+        """Conta uma ocorrência do identificador."""
+        contador = self._contadores.get(identificador)
+        if contador is not None:
+            contador[0] += 1
+            return
+
+        if len(self._contadores) < self.capacidade:
+            self._contadores[identificador] = [1, 0]
+            return
+
+        menor = min(self._contadores, key=lambda chave: self._contadores[chave][0])
+        minimo = self._contadores.pop(menor)[0]
+        self._contadores[identificador] = [minimo + 1, minimo]
+
+    def top(self, quantidade: Optional[int] = None) -> list[dict]:
+        """
+        Retorna os identificadores mais frequentes, do maior para o menor.
+
+        Args:
+            quantidade: Máximo de itens (padrão: todos os contadores)
+
+        Returns:
+            Lista de dicts com identificador, contagem e erro
+        """
+        ordenados = sorted(self._contadores.items(), key=lambda item: item[1][0], reverse=True)
+        return [
+            {"identificador": chave, "contagem": contagem, "erro": erro}
+            for chave, (contagem, erro) in ordenados[:quantidade]
+        ]
+
+    def limpar(self) -> None:
+        """Remove todos os contadores."""
+        self._contadores.clear()
+
+    def __len__(self) -> int:
+        return len(self._contadores)
+
+
+class SerieMinutos:
+    """
+    Contagem de tentativas permitidas e bloqueadas por minuto.
+
+    Buffer circular de `minutos` posições: o balde de um minuto é reciclado
+    quando o mesmo índice volta a ser usado.
+    """
+
+    def __init__(self, minutos: int):
+        self.minutos = minutos
+        # [minuto (epoch // 60), permitidas, bloqueadas]
+        self._baldes = [[-1, 0, 0] for _ in range(minutos)]
+
+    def registrar(self, minuto: int, bloqueada: bool) -> None:
+        """Conta uma tentativa no minuto informado."""
+        balde = self._baldes[minuto % self.minutos]
+        if balde[0] != minuto:
+            balde[0], balde[1], balde[2] = minuto, 0, 0
+        balde[2 if bloqueada else 1] += 1
+
+    def obter(self, minuto_atual: int) -> list[dict]:
+        """
+        Retorna a série dos últimos minutos, do mais antigo ao atual.
+
+        Minutos sem tentativas aparecem zerados.
+        """
+        serie = []
+        for minuto in range(minuto_atual - self.minutos + 1, minuto_atual + 1):
+            balde = self._baldes[minuto % self.minutos]
+            permitidas, bloqueadas = (balde[1], balde[2]) if balde[0] == minuto else (0, 0)
+            serie.append({
+                "inicio": minuto * 60,
+                "permitidas": permitidas,
+                "bloqueadas": bloqueadas,
+                "taxa_bloqueio": _taxa(bloqueadas, permitidas),
+            })
+        return serie
+
+    def limpar(self) -> None:
+        """Zera todos os baldes."""
+        for balde in self._baldes:
+            balde[0], balde[1], balde[2] = -1, 0, 0
+
+
+class MetricasLimiter:
+    """
+    Métricas de um rate limiter, com memória limitada.
+
+    Thread-safe: utiliza Lock para sincronização das contagens.
+    """
+
+    def __init__(
+        self,
+        top_infratores: int = RATE_LIMIT_METRICAS_TOP,
+        minutos: int = RATE_LIMIT_METRICAS_MINUTOS
+    ):
+        self.permitidas = 0
+        self.bloqueadas = 0
+        self._serie = SerieMinutos(minutos)
+        self._infratores = SpaceSaving(top_infratores)
+        self._bloqueios_por_rota: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, identificador: str, permitida: bool) -> None:
+        """
+        Registra o resultado de uma verificação.
+
+        Args:
+            identificador: Identificador verificado (geralmente IP)
+            permitida: True se a tentativa foi permitida
+        """
+        minuto = int(_agora() // 60)
+
+        if permitida:
+            with self._lock:
+                self.permitidas += 1
+                self._serie.registrar(minuto, bloqueada=False)
+            return
+
+        rota = obter_rota_atual()
+        with self._lock:
+            self.bloqueadas += 1
+            self._serie.registrar(minuto, bloqueada=True)
+            self._infratores.adicionar(identificador)
+            if rota not in self._bloqueios_por_rota and len(self._bloqueios_por_rota) >= MAX_ROTAS:
+                rota = ROTA_OUTRAS
+            self._bloqueios_por_rota[rota] = self._bloqueios_por_rota.get(rota, 0) + 1
+
+    def obter(self) -> dict:
+        """
+        Retorna um retrato das métricas.
+
+        Returns:
+            Dict com totais, taxa de bloqueio, série por minuto,
+            maiores infratores e bloqueios por rota (decrescente)
+        """
+        minuto_atual = int(_agora() // 60)
+        with self._lock:
+            return {
+                "permitidas": self.permitidas,
+                "bloqueadas": self.bloqueadas,
+                "taxa_bloqueio": _taxa(self.bloqueadas, self.permitidas),
+                "serie": self._serie.obter(minuto_atual),
+                "infratores": self._infratores.top(),
+                "bloqueios_por_rota": sorted(
+                    self._bloqueios_por_rota.items(), key=lambda item: item[1], reverse=True
+                ),
+            }
+
+    def limpar(self) -> None:
+        """Zera todas as métricas."""
+        with self._lock:
+            self.permitidas = 0
+            self.bloqueadas = 0
+            self._serie.limpar()
+            self._infratores.limpar()
+            self._bloqueios_por_rota.clear()
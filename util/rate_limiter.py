@@ -7,27 +7,52 @@ rotas contra abuso, brute force e DDoS.
 Oferece duas classes:
     - RateLimiter: Rate limiter estático (valores fixos na inicialização)
     - DynamicRateLimiter: Rate limiter dinâmico (lê valores do config_cache)
+
+Ambas usam GCRA e guardam um único float por identificador, em memória
+(por processo) ou em SQLite compartilhado entre workers (RATE_LIMIT_BACKEND).
+Todo limiter se registra em `registro_limiters` e mantém métricas de
+bloqueios (util/rate_limit_metricas.py), exibidas em /admin/rate-limits.
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
+import time
+from collections.abc import Mapping
+from datetime import timedelta
 from typing import Optional
 from util.logger_config import logger
 from util.config_cache import config
-from util.datetime_util import agora as obter_agora
+from util.rate_limit_armazenamento import ArmazenamentoLimiter, EPSILON, criar_armazenamento
+from util.rate_limit_metricas import MetricasLimiter
+
+# Limite de identificadores mantidos por limiter em memória. Com a remoção
+# dos inativos ele só é atingido sob varredura de muitos IPs; acima dele
+# descarta-se o identificador usado há mais tempo.
+MAX_IDENTIFICADORES_PADRAO = 100_000
+
+
+def _agora_monotonico() -> float:
+    """Relógio monotônico usado pelos limiters (isolado para testes)."""
+    return time.monotonic()
 
 
 class RateLimiter:
     """
-    Rate limiter baseado em janela deslizante (sliding window).
+    Rate limiter baseado em GCRA (Generic Cell Rate Algorithm).
 
-    Mantém registro de tentativas por identificador (geralmente IP)
-    e bloqueia se exceder limite em janela de tempo.
+    Equivale a um token bucket com capacidade `max_tentativas` que recarrega
+    uma tentativa a cada `janela / max_tentativas`: permite até
+    max_tentativas seguidas e depois uma a cada intervalo de emissão.
+
+    Cada identificador guarda um único float, o TAT (theoretical arrival
+    time): memória O(1) por chave. Um TAT no passado equivale a balde cheio,
+    então o identificador pode ser esquecido. Onde o TAT fica é definido pelo
+    armazenamento (util/rate_limit_armazenamento.py): em memória, por
+    processo, ou em SQLite, compartilhado entre os workers.
 
     Attributes:
         max_tentativas: Número máximo de tentativas permitidas
         janela: Timedelta representando janela de tempo
-        tentativas: Dict de identificador -> lista de timestamps
+        tentativas: Visão identificador -> TAT dos identificadores ativos
+        metricas: Contagens de permitidas/bloqueadas, infratores e rotas
     """
 
     def __init__(
@@ -35,6 +60,8 @@ class RateLimiter:
         max_tentativas: int = 5,
         janela_minutos: int = 5,
         nome: str = "default",
+        max_identificadores: int = MAX_IDENTIFICADORES_PADRAO,
+        armazenamento: Optional[ArmazenamentoLimiter] = None,
     ):
         """
         Inicializa rate limiter.
@@ -42,7 +69,10 @@ class RateLimiter:
         Args:
             max_tentativas: Número máximo de tentativas na janela
             janela_minutos: Tamanho da janela em minutos
-            nome: Nome descritivo do limiter (para logs)
+            nome: Nome descritivo do limiter (para logs e como namespace
+                no armazenamento compartilhado)
+            max_identificadores: Máximo de identificadores mantidos em memória
+            armazenamento: Armazenamento do estado (padrão: RATE_LIMIT_BACKEND)
         """
         if max_tentativas <= 0:
             raise ValueError("max_tentativas deve ser positivo")
@@ -53,14 +83,32 @@ class RateLimiter:
         self.janela = timedelta(minutes=janela_minutos)
         self.janela_minutos = janela_minutos
         self.nome = nome
-        self.tentativas: defaultdict[str, list[datetime]] = defaultdict(list)
+        self.max_identificadores = max_identificadores
+        self.armazenamento = armazenamento or criar_armazenamento(nome, max_identificadores)
+        self.metricas = MetricasLimiter()
+        registro_limiters.registrar(self)
+
+    @property
+    def tentativas(self) -> Mapping:
+        """Identificadores ativos e seus TATs (somente leitura)."""
+        return self.armazenamento.tentativas
+
+    def _agora(self) -> float:
+        """Instante atual no relógio adequado ao armazenamento."""
+        if self.armazenamento.compartilhado:
+            return time.time()
+        return _agora_monotonico()
+
+    def _parametros(self) -> tuple[float, float]:
+        """Retorna (janela em segundos, intervalo de emissão em segundos)."""
+        janela_segundos = self.janela.total_seconds()
+        return janela_segundos, janela_segundos / self.max_tentativas
 
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite.
 
-        Remove tentativas antigas da janela e verifica se está
-        abaixo do máximo. Se estiver, registra nova tentativa.
+        Se estiver, registra a tentativa avançando o TAT do identificador.
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -69,26 +117,33 @@ class RateLimiter:
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        momento_atual = obter_agora()
+        janela_segundos, intervalo = self._parametros()
 
-        # Limpar tentativas antigas (fora da janela)
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
+        permitida = self.armazenamento.consumir(identificador, self._agora(), intervalo, janela_segundos)
+        self.metricas.registrar(identificador, permitida)
 
-        # Verificar se excedeu limite
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
+        if not permitida:
             logger.warning(
                 f"Rate limit excedido [{self.nome}] - "
                 f"Identificador: {identificador}, "
-                f"Tentativas: {len(self.tentativas[identificador])}/{self.max_tentativas}"
+                f"Tentativas: {self.max_tentativas}/{self.max_tentativas}"
             )
             return False
 
-        # Registrar nova tentativa
-        self.tentativas[identificador].append(momento_atual)
         return True
 
+    def remover_inativos(self) -> int:
+        """
+        Remove todos os identificadores inativos (balde cheio).
+
+        A remoção já acontece aos poucos durante as verificações; este método
+        permite uma limpeza completa (ex: job periódico ou administração).
+
+        Returns:
+            Número de identificadores removidos
+        """
+        return self.armazenamento.remover_inativos(self._agora())
+
     def limpar(self, identificador: Optional[str] = None) -> None:
         """
         Limpa tentativas registradas.
@@ -98,11 +153,10 @@ class RateLimiter:
                           Se None, limpa todos (útil para testes).
         """
         if identificador:
-            if identificador in self.tentativas:
-                del self.tentativas[identificador]
-                logger.debug(f"Limpo rate limit para identificador: {identificador}")
+            self.armazenamento.remover(identificador)
+            logger.debug(f"Limpo rate limit para identificador: {identificador}")
         else:
-            self.tentativas.clear()
+            self.armazenamento.remover()
             logger.debug(f"Limpo todos os rate limits [{self.nome}]")
 
     def obter_tentativas_restantes(self, identificador: str) -> int:
@@ -115,15 +169,14 @@ class RateLimiter:
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        momento_atual = obter_agora()
+        tat = self.armazenamento.obter(identificador)
+        if tat is None:
+            return self.max_tentativas
 
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
-
-        tentativas_atuais = len(self.tentativas[identificador])
-        return max(0, self.max_tentativas - tentativas_atuais)
+        janela_segundos, intervalo = self._parametros()
+        ocupado = max(tat - self._agora(), 0.0)
+        restantes = int((janela_segundos - ocupado) / intervalo + EPSILON)
+        return max(0, min(self.max_tentativas, restantes))
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
         """
@@ -133,24 +186,18 @@ class RateLimiter:
             identificador: Identificador único
 
         Returns:
-            Timedelta até reset, ou None se não bloqueado
+            Timedelta até a próxima tentativa ser permitida, ou None se não bloqueado
         """
-        if identificador not in self.tentativas or not self.tentativas[identificador]:
+        tat = self.armazenamento.obter(identificador)
+        if tat is None:
             return None
 
-        momento_atual = obter_agora()
+        momento_atual = self._agora()
+        janela_segundos, intervalo = self._parametros()
 
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if momento_atual - t < self.janela
-        ]
-
-        # Se ainda está bloqueado, calcular tempo até reset
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
-            # Reset quando a tentativa mais antiga sair da janela
-            tentativa_mais_antiga = self.tentativas[identificador][0]
-            tempo_reset = (tentativa_mais_antiga + self.janela) - momento_atual
-            return tempo_reset if tempo_reset.total_seconds() > 0 else None
+        espera = max(tat, momento_atual) + intervalo - momento_atual - janela_segundos
+        if espera > EPSILON:
+            return timedelta(seconds=espera)
 
         return None
 
@@ -323,9 +370,12 @@ class RegistroLimiters:
     """
     Registry global para gerenciar e monitorar todos os rate limiters.
 
+    Todo RateLimiter se registra ao ser criado (por nome; um limiter novo
+    com o mesmo nome substitui o anterior).
+
     Permite:
     - Listar todos os limiters registrados
-    - Obter estatísticas globais
+    - Obter estatísticas globais e o painel de métricas
     - Limpar todos os limiters de uma vez (útil para testes)
     """
 
@@ -381,11 +431,68 @@ class RegistroLimiters:
                 "max_tentativas": limiter.max_tentativas,
                 "janela_minutos": limiter.janela_minutos,
                 "identificadores_ativos": len(limiter.tentativas),
+                "permitidas": limiter.metricas.permitidas,
+                "bloqueadas": limiter.metricas.bloqueadas,
                 "tipo": "dinamico" if isinstance(limiter, DynamicRateLimiter) else "estatico"
             }
 
         return stats
 
+    def obter_painel(self, top_infratores: int = 10) -> dict:
+        """
+        Retorna as métricas de todos os limiters para o painel administrativo.
+
+        Args:
+            top_infratores: Quantidade de infratores no ranking geral
+
+        Returns:
+            Dict com totais gerais, bloqueios por rota e maiores infratores
+            somados entre os limiters, e as métricas de cada limiter
+            (ordenados do mais bloqueado para o menos)
+        """
+        limiters = []
+        bloqueios_por_rota: dict[str, int] = {}
+        infratores: dict[str, dict] = {}
+
+        for nome, limiter in self._limiters.items():
+            metricas = limiter.metricas.obter()
+            limiters.append({
+                "nome": nome,
+                "max_tentativas": limiter.max_tentativas,
+                "janela_minutos": limiter.janela_minutos,
+                "tipo": "dinamico" if isinstance(limiter, DynamicRateLimiter) else "estatico",
+                **metricas,
+            })
+            for rota, total in metricas["bloqueios_por_rota"]:
+                bloqueios_por_rota[rota] = bloqueios_por_rota.get(rota, 0) + total
+            for item in metricas["infratores"]:
+                acumulado = infratores.setdefault(
+                    item["identificador"],
+                    {"identificador": item["identificador"], "contagem": 0, "erro": 0, "limiters": []}
+                )
+                acumulado["contagem"] += item["contagem"]
+                acumulado["erro"] += item["erro"]
+                acumulado["limiters"].append(nome)
+
+        limiters.sort(key=lambda item: item["bloqueadas"], reverse=True)
+        permitidas = sum(item["permitidas"] for item in limiters)
+        bloqueadas = sum(item["bloqueadas"] for item in limiters)
+
+        return {
+            "permitidas": permitidas,
+            "bloqueadas": bloqueadas,
+            "taxa_bloqueio": round(bloqueadas / (permitidas + bloqueadas) * 100, 1) if bloqueadas else 0.0,
+            "bloqueios_por_rota": sorted(bloqueios_por_rota.items(), key=lambda item: item[1], reverse=True),
+            "infratores": sorted(infratores.values(), key=lambda item: item["contagem"], reverse=True)[:top_infratores],
+            "limiters": limiters,
+        }
+
+    def limpar_metricas(self) -> None:
+        """Zera as métricas de todos os limiters registrados."""
+        for limiter in self._limiters.values():
+            limiter.metricas.limpar()
+        logger.debug("Métricas dos rate limiters zeradas")
+
     def limpar_todos(self) -> None:
         """
         Limpa tentativas de todos os limiters registrados.
@@ -1,19 +1,33 @@
-from passlib.context import CryptContext
 import secrets
 from datetime import datetime, timedelta
+from typing import Optional
 from util.datetime_util import agora
+from util.pool_senhas import pool_senhas
+# Funções síncronas do bcrypt: ficam em um módulo leve, importado pelos
+# processos do pool de senhas
+from util.hash_senha import (
+    pwd_context,
+    criar_hash_senha,
+    verificar_senha,
+    verificar_e_atualizar_senha,
+    obter_custo_hash,
+    medir_custo_hash,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+async def criar_hash_senha_async(senha: str) -> str:
+    """Cria hash da senha no pool de senhas, sem bloquear o event loop"""
+    return await pool_senhas.executar("hash", criar_hash_senha, senha)
 
-def criar_hash_senha(senha: str) -> str:
-    """Cria hash da senha"""
-    return pwd_context.hash(senha)
 
+async def verificar_senha_async(senha_plana: str, senha_hash: str) -> bool:
+    """Verifica a senha no pool de senhas, sem bloquear o event loop"""
+    return await pool_senhas.executar("verificacao", verificar_senha, senha_plana, senha_hash)
 
-def verificar_senha(senha_plana: str, senha_hash: str) -> bool:
-    """Verifica se senha corresponde ao hash"""
-    return pwd_context.verify(senha_plana, senha_hash)
+
+async def verificar_e_atualizar_senha_async(senha_plana: str, senha_hash: str) -> tuple[bool, Optional[str]]:
+    """Versão de verificar_e_atualizar_senha executada no pool de senhas"""
+    return await pool_senhas.executar("verificacao", verificar_e_atualizar_senha, senha_plana, senha_hash)
 
 
 def gerar_token_redefinicao() -> str:
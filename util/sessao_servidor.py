@@ -0,0 +1,378 @@
+"""
+Sessões guardadas no servidor.
+
+Com o SessionMiddleware do Starlette, a sessão inteira (usuário logado,
+mensagens flash, token CSRF) viaja assinada no cookie: toda requisição a
+reenvia, verifica a assinatura e decodifica, e listas de flash grandes
+incham os cabeçalhos. Aqui o cookie leva apenas um ID aleatório (assinado
+com SECRET_KEY, para descartar IDs forjados sem consultar o banco); os dados
+ficam em um LRU em memória na frente da tabela sessao (SQLite), que é
+compartilhada pelos workers e sobrevive a reinícios.
+
+- A sessão só é regravada quando muda, ou para renovar a expiração
+  (no máximo a cada SESSAO_RENOVACAO_SEGUNDOS)
+- Sessões esvaziadas (logout) são excluídas do banco, e o cookie é apagado
+- Sessões existentes são apenas atualizadas (nunca recriadas): uma
+  requisição que carregou a sessão antes de ela ser revogada não a traz de
+  volta; a sessão é descartada e o cookie, apagado
+- Leituras e gravações no banco rodam em uma thread, fora do event loop
+- revogar_sessoes_usuario() encerra as sessões de um usuário em todos os
+  dispositivos (ex: após redefinir a senha)
+- Uma tarefa periódica exclui as sessões expiradas
+
+Configuração:
+    SESSAO_MAX_IDADE_SEGUNDOS: tempo sem uso até a sessão expirar
+    SESSAO_CACHE_MAX: sessões mantidas em memória
+    SESSAO_CACHE_SEGUNDOS: tempo em que uma sessão lida do banco é servida
+        da memória (atraso máximo de uma revogação feita em outro worker)
+    SESSAO_RENOVACAO_SEGUNDOS: intervalo mínimo para regravar só a expiração
+    SESSAO_VARREDURA_MINUTOS: intervalo da varredura de sessões expiradas
+"""
+import asyncio
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from itsdangerous import BadSignature, Signer
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection, Request
+
+from model.sessao_model import Sessao
+from repo import sessao_repo
+from util.config import (
+    SECRET_KEY,
+    SESSAO_MAX_IDADE_SEGUNDOS,
+    SESSAO_CACHE_MAX,
+    SESSAO_CACHE_SEGUNDOS,
+    SESSAO_RENOVACAO_SEGUNDOS,
+    SESSAO_VARREDURA_MINUTOS,
+)
+from util.datetime_util import agora
+from util.logger_config import logger
+from util.tarefas_periodicas import registrar_tarefa
+
+# Mesmo nome de cookie do SessionMiddleware: cookies antigos (assinados) não
+# correspondem a nenhum ID e dão lugar a uma sessão nova
+COOKIE_SESSAO = "session"
+
+
+class DadosSessao(dict):
+    """
+    Conteúdo de request.session, com o ID da sessão.
+
+    Um dict comum para as rotas; o middleware usa `id` e `regenerar_id`.
+    """
+
+    def __init__(self, sessao_id: Optional[str] = None, dados: Optional[dict] = None):
+        super().__init__(dados or {})
+        self.id = sessao_id
+        self.regenerar_id = False
+
+    def regenerar(self) -> None:
+        """Troca o ID da sessão na resposta (evita fixação de sessão no login)."""
+        self.regenerar_id = True
+
+
+class SessaoRevogada(Exception):
+    """Levantada ao gravar uma sessão que foi excluída do banco (logout, revogação)."""
+
+
+class ArmazenamentoSessoes:
+    """
+    LRU de sessões em memória com persistência na tabela sessao.
+
+    Thread-safe: utiliza Lock para sincronização de acesso ao cache.
+    """
+
+    def __init__(
+        self,
+        max_idade_segundos: int = SESSAO_MAX_IDADE_SEGUNDOS,
+        max_entradas: int = SESSAO_CACHE_MAX,
+        cache_segundos: int = SESSAO_CACHE_SEGUNDOS,
+        renovacao_segundos: int = SESSAO_RENOVACAO_SEGUNDOS
+    ):
+        self.max_idade_segundos = max_idade_segundos
+        self.max_entradas = max_entradas
+        self.cache_segundos = cache_segundos
+        self.renovacao_segundos = renovacao_segundos
+        # ID -> (sessão, instante da leitura/gravação em time.monotonic)
+        self._cache: "OrderedDict[str, Tuple[Sessao, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _guardar(self, sessao: Sessao) -> None:
+        """Coloca a sessão no topo do LRU, descartando as menos usadas."""
+        with self._lock:
+            self._cache[sessao.id] = (sessao, time.monotonic())
+            self._cache.move_to_end(sessao.id)
+            while len(self._cache) > self.max_entradas:
+                self._cache.popitem(last=False)
+
+    def carregar_da_memoria(self, sessao_id: str) -> Optional[dict]:
+        """
+        Obtém os dados de uma sessão do cache, sem consultar o banco.
+
+        Args:
+            sessao_id: ID da sessão (valor do cookie)
+
+        Returns:
+            Dados da sessão, ou None se ela não está na memória (ou a leitura
+            já passou de cache_segundos): nesse caso, use carregar
+        """
+        with self._lock:
+            item = self._cache.get(sessao_id)
+            if item is not None:
+                sessao, lida_em = item
+                if sessao.expira_em <= agora():
+                    del self._cache[sessao_id]
+                elif time.monotonic() - lida_em < self.cache_segundos:
+                    self._cache.move_to_end(sessao_id)
+                    return json.loads(sessao.dados)
+        return None
+
+    def carregar(self, sessao_id: str) -> Optional[dict]:
+        """
+        Obtém os dados de uma sessão válida, consultando o banco só em cache miss.
+
+        Args:
+            sessao_id: ID da sessão (valor do cookie)
+
+        Returns:
+            Dados da sessão ou None se não existir ou estiver expirada
+        """
+        dados = self.carregar_da_memoria(sessao_id)
+        if dados is not None:
+            return dados
+
+        sessao = sessao_repo.obter_por_id(sessao_id)
+        if sessao is None:
+            with self._lock:
+                self._cache.pop(sessao_id, None)
+            return None
+
+        self._guardar(sessao)
+        return json.loads(sessao.dados)
+
+    def salvar(self, sessao_id: str, dados: dict, nova: bool = False) -> bool:
+        """
+        Grava a sessão se ela mudou ou se a expiração precisa ser renovada.
+
+        Args:
+            sessao_id: ID da sessão
+            dados: Conteúdo de request.session
+            nova: ID recém-gerado (insere); senão, só atualiza uma sessão existente
+
+        Returns:
+            True se a sessão foi gravada (com nova expiração)
+
+        Raises:
+            SessaoRevogada: Se a sessão existente foi excluída do banco
+        """
+        dados_json = json.dumps(dados, ensure_ascii=False, separators=(",", ":"))
+        instante = agora()
+
+        with self._lock:
+            item = self._cache.get(sessao_id)
+        if item is not None:
+            atual = item[0]
+            if (
+                atual.dados == dados_json
+                and instante - atual.atualizada_em < timedelta(seconds=self.renovacao_segundos)
+            ):
+                return False
+
+        usuario = dados.get("usuario_logado") or {}
+        sessao = Sessao(
+            id=sessao_id,
+            dados=dados_json,
+            usuario_id=usuario.get("id"),
+            expira_em=instante + timedelta(seconds=self.max_idade_segundos),
+            atualizada_em=instante
+        )
+        if nova:
+            sessao_repo.inserir(sessao)
+        elif not sessao_repo.atualizar(sessao):
+            with self._lock:
+                self._cache.pop(sessao_id, None)
+            raise SessaoRevogada(sessao_id)
+        self._guardar(sessao)
+        return True
+
+    def revogar(self, sessao_id: str) -> None:
+        """Exclui uma sessão da memória e do banco."""
+        with self._lock:
+            self._cache.pop(sessao_id, None)
+        sessao_repo.excluir(sessao_id)
+
+    def revogar_usuario(self, usuario_id: int, exceto_id: str = "") -> int:
+        """
+        Exclui todas as sessões de um usuário.
+
+        Args:
+            usuario_id: ID do usuário
+            exceto_id: ID de uma sessão a preservar (ex: a sessão atual)
+
+        Returns:
+            Quantidade de sessões excluídas do banco
+        """
+        with self._lock:
+            for sessao_id in [
+                sessao_id for sessao_id, (sessao, _) in self._cache.items()
+                if sessao.usuario_id == usuario_id and sessao_id != exceto_id
+            ]:
+                del self._cache[sessao_id]
+        return sessao_repo.excluir_por_usuario(usuario_id, exceto_id)
+
+    def varrer(self) -> int:
+        """
+        Exclui as sessões expiradas da memória e do banco.
+
+        Returns:
+            Quantidade de sessões excluídas do banco
+        """
+        instante = agora()
+        with self._lock:
+            for sessao_id in [
+                sessao_id for sessao_id, (sessao, _) in self._cache.items()
+                if sessao.expira_em <= instante
+            ]:
+                del self._cache[sessao_id]
+        excluidas = sessao_repo.excluir_expiradas(instante)
+        if excluidas:
+            logger.info(f"[Sessões] {excluidas} sessão(ões) expirada(s) excluída(s)")
+        return excluidas
+
+    def limpar(self) -> None:
+        """Esvazia o cache em memória (usado em testes)."""
+        with self._lock:
+            self._cache.clear()
+
+
+class MiddlewareSessaoServidor:
+    """
+    Middleware ASGI que substitui o SessionMiddleware do Starlette.
+
+    Disponibiliza request.session normalmente; o cookie guarda apenas o ID
+    da sessão e os dados ficam no ArmazenamentoSessoes.
+    """
+
+    def __init__(
+        self,
+        app,
+        armazenamento: Optional[ArmazenamentoSessoes] = None,
+        secret_key: str = SECRET_KEY,
+        cookie: str = COOKIE_SESSAO,
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False
+    ):
+        self.app = app
+        self.armazenamento = armazenamento or armazenamento_sessoes
+        self.assinador = Signer(secret_key)
+        self.cookie = cookie
+        self.flags = f"path={path}; httponly; samesite={same_site}"
+        if https_only:
+            self.flags += "; secure"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        cookie = HTTPConnection(scope).cookies.get(self.cookie)
+        sessao_id = self._obter_id(cookie) if cookie else None
+        dados = None
+        if sessao_id:
+            # Cache miss: a consulta ao banco roda fora do event loop
+            dados = self.armazenamento.carregar_da_memoria(sessao_id)
+            if dados is None:
+                dados = await asyncio.to_thread(self.armazenamento.carregar, sessao_id)
+        sessao = DadosSessao(sessao_id if dados is not None else None, dados)
+        scope["session"] = sessao
+
+        if scope["type"] == "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                cabecalho = await asyncio.to_thread(
+                    self._persistir, sessao, cookie_recebido=cookie is not None
+                )
+                if cabecalho:
+                    MutableHeaders(scope=message).append("Set-Cookie", cabecalho)
+            await send(message)
+
+        await self.app(scope, receive, enviar)
+
+    def _obter_id(self, cookie: str) -> Optional[str]:
+        """Extrai o ID do cookie assinado (None se a assinatura não confere)."""
+        try:
+            return self.assinador.unsign(cookie).decode()
+        except BadSignature:
+            return None
+
+    def _persistir(self, sessao: DadosSessao, cookie_recebido: bool) -> Optional[str]:
+        """
+        Grava ou exclui a sessão ao fim da requisição (bloqueante: o
+        middleware a executa em uma thread).
+
+        Returns:
+            Valor do cabeçalho Set-Cookie, ou None se o cookie não muda
+        """
+        if not sessao:
+            if sessao.id:
+                self.armazenamento.revogar(sessao.id)
+            if cookie_recebido:
+                return f"{self.cookie}=; Max-Age=0; {self.flags}"
+            return None
+
+        novo_id = sessao.id is None or sessao.regenerar_id
+        if novo_id:
+            if sessao.id:
+                self.armazenamento.revogar(sessao.id)
+            sessao.id = secrets.token_urlsafe(32)
+            sessao.regenerar_id = False
+
+        try:
+            gravada = self.armazenamento.salvar(sessao.id, dict(sessao), nova=novo_id)
+        except SessaoRevogada:
+            # Revogada durante a requisição (ou em outro worker): não recriar
+            if cookie_recebido:
+                return f"{self.cookie}=; Max-Age=0; {self.flags}"
+            return None
+        if novo_id or gravada:
+            valor = self.assinador.sign(sessao.id).decode()
+            return f"{self.cookie}={valor}; Max-Age={self.armazenamento.max_idade_segundos}; {self.flags}"
+        return None
+
+
+def revogar_sessoes_usuario(usuario_id: int, request: Optional[Request] = None) -> int:
+    """
+    Encerra as sessões de um usuário em todos os dispositivos.
+
+    Args:
+        usuario_id: ID do usuário
+        request: Requisição atual; se informada, a sessão dela é preservada
+
+    Returns:
+        Quantidade de sessões revogadas
+    """
+    exceto_id = getattr(request.session, "id", None) if request is not None else None
+    return armazenamento_sessoes.revogar_usuario(usuario_id, exceto_id=exceto_id or "")
+
+
+def registrar_tarefa_sessoes():
+    """Registra a varredura periódica de sessões expiradas."""
+    registrar_tarefa(
+        "sessoes_expiradas",
+        armazenamento_sessoes.varrer,
+        intervalo_segundos=SESSAO_VARREDURA_MINUTOS * 60,
+    )
+
+
+# Instância singleton global
+armazenamento_sessoes = ArmazenamentoSessoes()
@@ -0,0 +1,121 @@
+"""
+Agendador de tarefas periódicas em segundo plano.
+
+Cada módulo registra suas tarefas (arquivamento do chat, limpezas, etc.)
+com registrar_tarefa(); o lifespan da aplicação em main.py inicia todas
+com iniciar_tarefas() e as cancela com parar_tarefas() no encerramento.
+
+Funções síncronas (que acessam o banco) são executadas em thread via
+asyncio.to_thread, para não bloquear o event loop.
+"""
+import asyncio
+import inspect
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Union
+
+from util.logger_config import logger
+
+
+@dataclass
+class TarefaPeriodica:
+    """
+    Tarefa executada repetidamente em segundo plano.
+
+    Attributes:
+        nome: Nome usado nos logs
+        funcao: Função (síncrona ou async) sem argumentos
+        intervalo_segundos: Intervalo entre execuções (número ou função que o retorna)
+        atraso_inicial_segundos: Espera antes da primeira execução (padrão: o intervalo)
+    """
+    nome: str
+    funcao: Callable
+    intervalo_segundos: Union[float, Callable[[], float]]
+    atraso_inicial_segundos: Optional[float] = None
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def obter_intervalo(self) -> float:
+        """Retorna o intervalo atual (permite intervalos configuráveis em runtime)."""
+        if callable(self.intervalo_segundos):
+            return float(self.intervalo_segundos())
+        return float(self.intervalo_segundos)
+
+    async def executar_uma_vez(self):
+        """Executa a função uma vez, registrando erros sem interromper o agendamento."""
+        try:
+            if inspect.iscoroutinefunction(self.funcao):
+                await self.funcao()
+            else:
+                await asyncio.to_thread(self.funcao)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Tarefas] Erro na tarefa '{self.nome}': {e}", exc_info=True)
+
+    async def _loop(self):
+        atraso = self.atraso_inicial_segundos
+        if atraso is None:
+            atraso = self.obter_intervalo()
+        await asyncio.sleep(atraso)
+
+        while True:
+            await self.executar_uma_vez()
+            await asyncio.sleep(self.obter_intervalo())
+
+
+_tarefas: List[TarefaPeriodica] = []
+
+
+def registrar_tarefa(
+    nome: str,
+    funcao: Callable,
+    intervalo_segundos: Union[float, Callable[[], float]],
+    atraso_inicial_segundos: Optional[float] = None
+) -> TarefaPeriodica:
+    """
+    Registra uma tarefa periódica. Registrar o mesmo nome substitui a anterior.
+
+    Args:
+        nome: Nome único da tarefa
+        funcao: Função síncrona ou async sem argumentos
+        intervalo_segundos: Intervalo entre execuções
+        atraso_inicial_segundos: Espera antes da primeira execução
+
+    Returns:
+        A tarefa registrada
+    """
+    tarefa = TarefaPeriodica(
+        nome=nome,
+        funcao=funcao,
+        intervalo_segundos=intervalo_segundos,
+        atraso_inicial_segundos=atraso_inicial_segundos
+    )
+    _tarefas[:] = [t for t in _tarefas if t.nome != nome]
+    _tarefas.append(tarefa)
+    return tarefa
+
+
+def listar_tarefas() -> List[TarefaPeriodica]:
+    """Retorna as tarefas registradas."""
+    return list(_tarefas)
+
+
+async def iniciar_tarefas():
+    """Inicia todas as tarefas registradas no event loop atual."""
+    for tarefa in _tarefas:
+        if tarefa._task is None or tarefa._task.done():
+            tarefa._task = asyncio.create_task(tarefa._loop(), name=f"tarefa:{tarefa.nome}")
+            logger.info(f"[Tarefas] Tarefa '{tarefa.nome}' iniciada")
+
+
+async def parar_tarefas():
+    """Cancela todas as tarefas em execução e aguarda o encerramento."""
+    tasks = []
+    for tarefa in _tarefas:
+        if tarefa._task is not None and not tarefa._task.done():
+            tarefa._task.cancel()
+            tasks.append(tarefa._task)
+        tarefa._task = None
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"[Tarefas] {len(tasks)} tarefa(s) encerrada(s)")
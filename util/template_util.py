@@ -3,18 +3,37 @@ Módulo de utilidades para templates Jinja2.
 
 Fornece filtros customizados, funções globais e configuração
 do ambiente Jinja2 para a aplicação FastAPI.
+
+Todos os módulos de rotas compartilham um único Environment (criado na
+primeira chamada a criar_templates()), então cada template é compilado uma
+vez por processo, e não uma vez por router. O bytecode compilado fica em
+TEMPLATES_CACHE_DIR, aproveitado por outros workers e após reinícios.
 """
 
+import hashlib
+import os
+import time
 from typing import Union, Optional
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, nodes
+from jinja2.ext import Extension
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 
 from util.flash_messages import obter_mensagens
-from util.config import APP_NAME, VERSION, TOAST_AUTO_HIDE_DELAY_MS
+from util.config import (
+    APP_NAME,
+    VERSION,
+    TOAST_AUTO_HIDE_DELAY_MS,
+    TEMPLATES_CACHE_DIR,
+    TEMPLATES_AUTO_RELOAD,
+)
 from util.csrf_protection import obter_token_csrf, CSRF_FORM_FIELD
 from util.config_cache import config
+from util.cache_fragmentos import cache_fragmentos
+from util.assets import manifesto_assets
+from util.foto_util import obter_caminho_foto_usuario, obter_foto_usuario, srcset_foto, url_foto
+from util.logger_config import logger
 from model.usuario_logado_model import UsuarioLogado
 
 
@@ -131,17 +150,19 @@ def formatar_hora(data: Union[datetime, None]) -> str:
     return ""
 
 
-def foto_usuario(id: int) -> str:
+def foto_usuario(id: int, tamanho: Optional[int] = None) -> str:
     """
     Retorna o caminho da foto do usuário para uso em templates.
 
     Args:
         id: ID do usuário
+        tamanho: Tamanho de exibição em pixels (usa a menor versão reduzida
+                 que o cobre)
 
     Returns:
-        String com caminho da foto (ex: /static/img/usuarios/000001.jpg)
+        String com caminho da foto (ex: /static/img/fotos/ab/cd/abcd....jpg)
     """
-    return f"/static/img/usuarios/{id:06d}.jpg"
+    return obter_caminho_foto_usuario(id, tamanho)
 
 
 def csrf_input(request: Optional[Request] = None) -> str:
@@ -162,6 +183,52 @@ def csrf_input(request: Optional[Request] = None) -> str:
     return f'<input type="hidden" name="{CSRF_FORM_FIELD}" value="{token}">'
 
 
+# Seções do menu do navbar privado, marcadas como ativas pelo caminho.
+# Prefixos mais específicos antes dos genéricos (/admin/chamados/ antes de /chamados/)
+SECOES_MENU = (
+    "/usuario/perfil/",
+    "/usuario/minhas-turmas",
+    "/usuario/turma/",
+    "/usuario/minhas-matriculas",
+    "/usuario/meus-pagamentos",
+    "/admin/categorias/",
+    "/admin/atividades/",
+    "/admin/turmas/",
+    "/admin/matriculas/",
+    "/admin/pagamentos/",
+    "/admin/chamados/",
+    "/admin/usuarios/",
+    "/admin/configuracoes",
+    "/admin/tema",
+    "/admin/auditoria",
+    "/admin/rate-limits",
+    "/admin/backups/",
+    "/chamados/",
+)
+
+
+def menu_ativo(caminho: str) -> str:
+    """
+    Retorna a seção do menu ativa para um caminho.
+
+    Usada no lugar de request.path no navbar (e na sua chave de cache):
+    /admin/usuarios/editar/1 e /admin/usuarios/editar/2 compartilham o
+    mesmo fragmento, em vez de um por ID.
+
+    Args:
+        caminho: Caminho da requisição (request.path)
+
+    Returns:
+        Prefixo da seção ("/usuario" no dashboard, "" fora do menu)
+    """
+    if caminho == "/usuario":
+        return caminho
+    for secao in SECOES_MENU:
+        if secao in caminho:
+            return secao
+    return ""
+
+
 def obter_usuario_logado_template(request: Optional[Request] = None) -> Optional[UsuarioLogado]:
     """
     Obtém o usuário logado da sessão para uso nos templates.
@@ -183,25 +250,92 @@ def obter_usuario_logado_template(request: Optional[Request] = None) -> Optional
     return UsuarioLogado.from_dict(dados) if dados else None
 
 
-def criar_templates() -> Jinja2Templates:
+class ExtensaoCache(Extension):
+    """
+    Tag {% cache chave, tags, ttl %} ... {% endcache %} para fragmentos.
+
+    O conteúdo é renderizado uma vez e reaproveitado de
+    util.cache_fragmentos até expirar ou até uma das tags ser invalidada.
+    Tudo o que varia no fragmento (perfil, caminho, etc.) deve fazer parte
+    da chave.
+
+    Uso no template:
+        {% cache "categorias", ["categoria"] %}...{% endcache %}
+        {% cache ("navbar", usuario_logado.perfil, request.path) %}...{% endcache %}
+
+    Args da tag:
+        chave: String, ou lista/tupla de partes unidas por ":"
+        tags: Tag ou lista de tags (opcional)
+        ttl: Validade em segundos (opcional, padrão FRAGMENTOS_CACHE_TTL_SEGUNDOS)
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment: Environment):
+        super().__init__(environment)
+        environment.extend(cache_fragmentos=cache_fragmentos)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        for padrao in (nodes.Const(()), nodes.Const(None)):
+            args.append(parser.parse_expression() if parser.stream.skip_if("comma") else padrao)
+        corpo = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_renderizar", args), [], [], corpo
+        ).set_lineno(lineno)
+
+    def _renderizar(self, chave, tags, ttl, caller) -> str:
+        """Retorna o fragmento em cache ou renderiza e guarda o conteúdo."""
+        if isinstance(chave, (list, tuple)):
+            chave = ":".join(str(parte) for parte in chave)
+        cache = self.environment.cache_fragmentos
+
+        html = cache.obter(chave)
+        if html is None:
+            html = caller()
+            cache.guardar(chave, html, [tags] if isinstance(tags, str) else tags, ttl)
+        return html
+
+
+def criar_ambiente(
+    diretorio_cache: str = TEMPLATES_CACHE_DIR,
+    auto_reload: bool = TEMPLATES_AUTO_RELOAD
+) -> Environment:
     """
-    Cria instância de Jinja2Templates com configurações customizadas.
+    Cria o ambiente Jinja2 com as configurações customizadas.
 
     Configura o ambiente Jinja2 com:
     - Funções globais (obter_mensagens, csrf_input)
     - Variáveis globais (APP_NAME, VERSION)
     - Filtros customizados (data_br, data_hora_br, foto_usuario)
+    - Cache de bytecode em disco (se diretorio_cache não for vazio)
+    - Tag {% cache %} para fragmentos renderizados (ExtensaoCache)
+
+    Args:
+        diretorio_cache: Diretório do cache de bytecode ("" desativa)
+        auto_reload: Se True, verifica a cada uso se o arquivo do template
+                     mudou (desenvolvimento)
 
     Returns:
-        Instância configurada de Jinja2Templates
+        Environment configurado
 
     Note:
         Sempre usa o diretório raiz 'templates' para permitir
         acesso a templates base e componentes compartilhados.
     """
-    # Usar o diretório raiz 'templates' para permitir acesso a base.html e subpastas
-    env = Environment(loader=FileSystemLoader("templates"))
+    bytecode_cache = None
+    if diretorio_cache:
+        os.makedirs(diretorio_cache, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(diretorio_cache)
 
+    # Usar o diretório raiz 'templates' para permitir acesso a base.html e subpastas
+    env = Environment(
+        loader=FileSystemLoader("templates"),
+        bytecode_cache=bytecode_cache,
+        auto_reload=auto_reload,
+        extensions=[ExtensaoCache]
+    )
     # Adicionar função global para obter mensagens
     env.globals['obter_mensagens'] = obter_mensagens
 
@@ -209,6 +343,14 @@ def criar_templates() -> Jinja2Templates:
     env.globals['APP_NAME'] = APP_NAME
     env.globals['VERSION'] = VERSION
 
+    # Leitura de configurações do snapshot (ex: tema atual)
+    env.globals['obter_configuracao'] = config.obter
+
+    # URLs de arquivos estáticos com hash (cache longo), ver util/assets.py
+    # Uso no template: {{ asset('css/custom.css') }}
+    env.globals['asset'] = manifesto_assets.url
+    env.globals['url_tema'] = manifesto_assets.url_tema
+
     # Adicionar configuração dinâmica de toast delay (lê do banco → .env)
     env.globals['TOAST_AUTO_HIDE_DELAY_MS'] = config.obter_int(
         'toast_auto_hide_delay_ms',
@@ -224,9 +366,17 @@ def criar_templates() -> Jinja2Templates:
     # Uso no template: {% set usuario_logado = obter_usuario_logado(request) %}
     env.globals['obter_usuario_logado'] = obter_usuario_logado_template
 
+    # Seção ativa do navbar: {% set menu = menu_ativo(request.path) %}
+    env.globals['menu_ativo'] = menu_ativo
+
     # Adicionar filtros customizados
     env.filters['data_br'] = formatar_data_br
     env.filters['foto_usuario'] = foto_usuario
+    # Foto pelo ponteiro (usuario.foto), sem nova consulta ao banco:
+    # {{ url_foto(usuario.foto, 64) }}, {{ srcset_foto(usuario.foto, 32, 'webp') }}
+    env.globals['foto_de_usuario'] = obter_foto_usuario
+    env.globals['url_foto'] = url_foto
+    env.globals['srcset_foto'] = srcset_foto
 
     # Filtros de formatação de data/hora (em português)
     env.filters['formatar_data'] = formatar_data
@@ -234,5 +384,83 @@ def criar_templates() -> Jinja2Templates:
     env.filters['formatar_data_as_hora'] = formatar_data_as_hora
     env.filters['formatar_hora'] = formatar_hora
 
-    templates = Jinja2Templates(env=env)
-    return templates
+    return env
+
+
+# Instância compartilhada por todos os módulos de rotas
+_templates: Optional[Jinja2Templates] = None
+
+
+def criar_templates() -> Jinja2Templates:
+    """
+    Obtém a instância de Jinja2Templates compartilhada pela aplicação.
+
+    O ambiente é criado na primeira chamada; as seguintes retornam a mesma
+    instância, com o mesmo cache de templates compilados.
+
+    Returns:
+        Instância configurada de Jinja2Templates
+    """
+    global _templates
+    if _templates is None:
+        _templates = Jinja2Templates(env=criar_ambiente())
+    return _templates
+
+
+def precompilar_templates(env: Optional[Environment] = None) -> int:
+    """
+    Compila todos os templates de 'templates/' de uma vez (ex: na inicialização).
+
+    Assim a primeira requisição a cada página não paga a compilação, e
+    erros de sintaxe aparecem no log ao subir a aplicação.
+
+    Args:
+        env: Ambiente a usar (padrão: o compartilhado)
+
+    Returns:
+        Quantidade de templates compilados
+    """
+    env = env or criar_templates().env
+    inicio = time.perf_counter()
+    compilados = 0
+    for nome in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(nome)
+            compilados += 1
+        except Exception as e:
+            logger.error(f"Erro ao compilar template {nome}: {e}")
+
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    logger.info(f"{compilados} template(s) pré-compilado(s) em {duracao_ms:.0f} ms")
+    return compilados
+
+
+_assinatura_templates: Optional[str] = None
+
+
+def assinatura_templates(diretorio: str = "templates") -> str:
+    """
+    Carimbo do conjunto de templates (muda quando algum arquivo muda).
+
+    Usado em validadores HTTP (ETag) de páginas que dependem só dos
+    templates e das configurações. Calculado uma vez por processo, exceto
+    com TEMPLATES_AUTO_RELOAD (desenvolvimento), em que é refeito a cada
+    chamada.
+
+    Args:
+        diretorio: Diretório dos templates
+
+    Returns:
+        Hash do nome, tamanho e data de modificação de cada template
+    """
+    global _assinatura_templates
+    if _assinatura_templates is not None and not TEMPLATES_AUTO_RELOAD:
+        return _assinatura_templates
+
+    resumo = hashlib.sha1()
+    for raiz, _, arquivos in sorted(os.walk(diretorio)):
+        for arquivo in sorted(arquivos):
+            info = os.stat(os.path.join(raiz, arquivo))
+            resumo.update(f"{raiz}/{arquivo}:{info.st_size}:{info.st_mtime_ns};".encode())
+    _assinatura_templates = resumo.hexdigest()[:16]
+    return _assinatura_templates
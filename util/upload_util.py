@@ -0,0 +1,120 @@
+"""
+Recebimento de arquivos enviados em multipart/form-data, em streaming.
+
+request.form() do Starlette só aplica limites de tamanho depois de ler o
+corpo inteiro. Aqui o corpo é lido em blocos: o campo de arquivo pedido vai
+direto para um arquivo temporário em disco, e o limite de bytes é verificado
+a cada bloco, interrompendo a leitura assim que é ultrapassado.
+
+Uso:
+    arquivo = await receber_arquivo_multipart(request, "foto", limite_bytes)
+    try:
+        ...  # processar arquivo (Path)
+    finally:
+        arquivo.unlink(missing_ok=True)
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Folga para boundaries e cabeçalhos das partes na checagem do Content-Length
+MARGEM_CABECALHOS_BYTES = 16 * 1024
+
+
+class UploadMuitoGrande(Exception):
+    """Levantada quando o arquivo enviado ultrapassa o limite de bytes."""
+
+
+async def receber_arquivo_multipart(request: Request, campo: str, limite_bytes: int) -> Optional[Path]:
+    """
+    Lê o corpo multipart da requisição e grava o arquivo do campo informado
+    em um arquivo temporário. Os demais campos são ignorados.
+
+    Args:
+        request: Requisição com Content-Type multipart/form-data
+        campo: Nome do campo de arquivo
+        limite_bytes: Tamanho máximo do arquivo
+
+    Returns:
+        Path do arquivo temporário (quem chama deve apagá-lo), ou None se o
+        campo não foi enviado ou veio vazio
+
+    Raises:
+        UploadMuitoGrande: Se o arquivo (ou o corpo declarado) passar do limite
+        ValueError: Se a requisição não for multipart/form-data válida
+    """
+    tipo, parametros = parse_options_header(request.headers.get("content-type", ""))
+    boundary = parametros.get(b"boundary")
+    if tipo != b"multipart/form-data" or not boundary:
+        raise ValueError("Requisição não é multipart/form-data")
+
+    # Recusa antes de ler qualquer byte quando o tamanho declarado já excede
+    tamanho_declarado = request.headers.get("content-length", "")
+    if tamanho_declarado.isdigit() and int(tamanho_declarado) > limite_bytes + MARGEM_CABECALHOS_BYTES:
+        raise UploadMuitoGrande(f"Corpo de {tamanho_declarado} bytes (limite {limite_bytes})")
+
+    descritor, nome_temporario = tempfile.mkstemp(prefix="upload-", suffix=".tmp")
+    destino = Path(nome_temporario)
+    estado = {"cabecalho": b"", "valor": b"", "no_campo": False, "encontrado": False, "bytes": 0}
+
+    with os.fdopen(descritor, "wb") as arquivo:
+
+        def on_part_begin() -> None:
+            estado["no_campo"] = False
+
+        def on_header_field(dados: bytes, inicio: int, fim: int) -> None:
+            estado["cabecalho"] += dados[inicio:fim]
+
+        def on_header_value(dados: bytes, inicio: int, fim: int) -> None:
+            estado["valor"] += dados[inicio:fim]
+
+        def on_header_end() -> None:
+            if estado["cabecalho"].lower() == b"content-disposition":
+                _, opcoes = parse_options_header(estado["valor"])
+                # Só o primeiro campo com o nome pedido é gravado
+                if opcoes.get(b"name") == campo.encode() and not estado["encontrado"]:
+                    estado["no_campo"] = estado["encontrado"] = True
+            estado["cabecalho"] = estado["valor"] = b""
+
+        def on_part_data(dados: bytes, inicio: int, fim: int) -> None:
+            if not estado["no_campo"]:
+                return
+            estado["bytes"] += fim - inicio
+            if estado["bytes"] > limite_bytes:
+                raise UploadMuitoGrande(f"Arquivo com mais de {limite_bytes} bytes")
+            arquivo.write(dados[inicio:fim])
+
+        def on_part_end() -> None:
+            estado["no_campo"] = False
+
+        parser = MultipartParser(boundary, {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        })
+        try:
+            async for bloco in request.stream():
+                parser.write(bloco)
+            parser.finalize()
+        except BaseException:
+            # Limite excedido, multipart malformado (MultipartParseError é
+            # ValueError) ou cliente desconectado: não deixar o temporário
+            arquivo.close()
+            destino.unlink(missing_ok=True)
+            raise
+
+    if not estado["bytes"]:
+        destino.unlink(missing_ok=True)
+        return None
+    return destino